@@ -7,16 +7,22 @@ init module of camguard, which supports:
 
 import logging
 import sys
-import time
 from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser, Namespace
-from signal import SIGINT, SIGTERM, Signals, sigwait
-from typing import Any, Dict, Optional
-
-from daemon.daemon import DaemonContext  # type: ignore[reportMissingTypeStubs]
-from pid import PidFile  # type: ignore[reportMissingTypeStubs]
+from signal import SIGINT, SIGTERM, Signals, pause, sigwait
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from camguard.exceptions import \
     CamguardError  # type: ignore[reportMissingTypeStubs]
+from camguard.lazy_import import ImportProfiler, LazyImport
+
+if TYPE_CHECKING:
+    from camguard.metrics import MetricsServer
+    from daemon.daemon import DaemonContext  # type: ignore[reportMissingTypeStubs]
+    from pid import PidFile  # type: ignore[reportMissingTypeStubs]
+else:
+    # daemon dependencies are only needed when running daemonized, defer import to speed up startup
+    DaemonContext = LazyImport('daemon.daemon', 'DaemonContext')
+    PidFile = LazyImport('pid', 'PidFile')
 
 __version__ = '1.1.0-beta'
 LOGGER = logging.getLogger(__name__)
@@ -48,6 +54,14 @@ def _parser() -> ArgumentParser:
                         "only useful when combined with --daemonize. "
                         "Redundant if the process is started by the init system "
                         "(sys-v, systemd, ...)")
+    parser.add_argument('--startup-profile', default=False, action='store_true',
+                        help="Log per-module import cost and the elapsed time until camguard is armed, "
+                        "for analyzing startup performance")
+    parser.add_argument('--metrics-port', metavar='PORT', type=int, default=None, dest='metrics_port',
+                        help="Serve prometheus metrics on http://<metrics-address>:<PORT>/metrics, "
+                        "metrics are disabled if not set")
+    parser.add_argument('--metrics-address', metavar='ADDRESS', type=str, default='127.0.0.1', dest='metrics_address',
+                        help="Define the address for serving metrics, only used in combination with --metrics-port")
     return parser
 
 
@@ -123,23 +137,75 @@ def __configure_daemon(detach: bool, camguard: Any) -> DaemonContext:
                          working_directory=work_dir)
 
 
-def __run_daemonized(args: Namespace, camguard: Any) -> None:
+def __log_startup_profile(profiler: Optional[ImportProfiler]) -> None:
+    """log startup profile, if profiling is enabled
+
+    Args:
+        profiler (Optional[ImportProfiler]): import profiler which has been installed on startup
+    """
+    if profiler:
+        LOGGER.info(f"Camguard armed after {profiler.elapsed_sec * 1000:.1f} ms")
+        profiler.log_report()
+        profiler.uninstall()
+
+
+def __create_metrics(args: Namespace) -> Optional['MetricsServer']:
+    """create metrics registry for all components and the server exposing it, if metrics are enabled
+
+    Args:
+        args (Namespace): argument storage object which is returned from parsing arguments
+
+    Returns:
+        Optional[MetricsServer]: the metrics server, which has not been started yet, None if metrics are disabled
+    """
+    if args.metrics_port is None:
+        return None
+
+    from camguard.metrics import Metrics, MetricsServer
+    metrics = Metrics()
+    Metrics.set_current(metrics)
+    return MetricsServer(metrics, args.metrics_port, args.metrics_address)
+
+
+def __start_metrics_server(metrics_server: Optional['MetricsServer']) -> None:
+    """start the metrics server, if metrics are enabled. camguard keeps running without metrics,
+    if the server can't be started
+
+    Args:
+        metrics_server (Optional[MetricsServer]): the metrics server to start
+    """
+    if not metrics_server:
+        return
+
+    try:
+        metrics_server.start()
+    except OSError as e:
+        LOGGER.error("Failed to start metrics server, continuing without metrics", exc_info=e)
+
+
+def __run_daemonized(args: Namespace, camguard: Any, profiler: Optional[ImportProfiler] = None,
+                     metrics_server: Optional['MetricsServer'] = None) -> None:
     """in case of running daemonized, this configures the daemon and starts camguard in background,
      while staying in a main loop
 
     Args:
         args (Namespace): argument storage object which is returned from parsing arguments
         camguard (Any): the camguard instance to run 
+        profiler (Optional[ImportProfiler]): import profiler for logging the startup profile. Defaults to None.
+        metrics_server (Optional[MetricsServer]): metrics server to start. Defaults to None.
     """
     daemon_context: DaemonContext = __configure_daemon(args.detach, camguard)
     with daemon_context:
+        # started within the daemon context, the server thread would not survive detaching otherwise
+        __start_metrics_server(metrics_server)
         camguard.start()
+        __log_startup_profile(profiler)
         if not args.detach:
             LOGGER.info("Camguard running, press ctrl-c to quit")
 
-        # main loop
+        # main loop, sleeps until a signal arrives, shutdown is done by the signal handlers
         while True:
-            time.sleep(1.0)
+            pause()
 
 
 def __init(camguard: Any) -> bool:
@@ -166,19 +232,24 @@ def __init(camguard: Any) -> bool:
     return success
 
 
-def __run(args: Namespace, camguard: Any) -> None:
+def __run(args: Namespace, camguard: Any, profiler: Optional[ImportProfiler] = None,
+          metrics_server: Optional['MetricsServer'] = None) -> None:
     """Runs camguard as program or daemonized process.
     Shutdown is done by handling SystemExit exception.
 
     Args:
         args (Namespace): argument storage object, which is returned from parsing arguments
         camguard (Any): camguard instance to run
+        profiler (Optional[ImportProfiler]): import profiler for logging the startup profile. Defaults to None.
+        metrics_server (Optional[MetricsServer]): metrics server to start. Defaults to None.
 
     """
     if args.daemonize:
-        return __run_daemonized(args, camguard)
+        return __run_daemonized(args, camguard, profiler, metrics_server)
 
+    __start_metrics_server(metrics_server)
     camguard.start()
+    __log_startup_profile(profiler)
     LOGGER.info("Camguard running, press ctrl-c to quit")
     sigwait((SIGINT,))
     __shutdown(camguard, SIGINT)
@@ -189,18 +260,27 @@ def main() -> int:
     parses cli args, configures logging and handles startup
     """
     rc: int = 1
+    profiler: Optional[ImportProfiler] = None
+    metrics_server: Optional['MetricsServer'] = None
     try:
         args = __parse_args(_parser())
         __configure_logger(args.log)
 
         LOGGER.info(f"Starting up with args: {args}")
 
+        if args.startup_profile:
+            profiler = ImportProfiler()
+            profiler.install()
+
+        # components look up the metrics registry on creation and while running
+        metrics_server = __create_metrics(args)
+
         from camguard.camguard import Camguard
         _camguard = Camguard(args.config_path)
 
         # run camguard if it was successfully initialized
         if __init(_camguard):
-            __run(args, _camguard)
+            __run(args, _camguard, profiler, metrics_server)
     except SystemExit as sysEx:
         LOGGER.debug(f"Shut down by system exit: {str(sysEx)}")
         LOGGER.info("Camguard shut down gracefully")
@@ -209,5 +289,11 @@ def main() -> int:
     except Exception as ex:
         LOGGER.exception("Unexpected error occurred", exc_info=ex)
 
+    if profiler:
+        profiler.uninstall()
+
+    if metrics_server:
+        metrics_server.stop()
+
     LOGGER.debug(f"Camguard exit with code: {rc}")
     return rc
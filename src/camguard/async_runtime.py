@@ -0,0 +1,223 @@
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Awaitable, Callable, ClassVar, Optional
+
+from camguard.exceptions import CamguardError
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """asyncio runtime, which runs a single event loop on a dedicated thread.
+    components schedule their workers as tasks on this loop, instead of running them on their own threads.
+    blocking calls (i.e. camera, uploads, smtp) are pushed to a bounded executor by using run_blocking.
+    the runtime is optional, components check for the current runtime and fall back to threads if there is none.
+    """
+    __current: ClassVar[Optional['AsyncRuntime']] = None
+    __current_lock: ClassVar[Lock] = Lock()
+
+    def __init__(self, max_workers: int = 6) -> None:
+        """default initialization
+
+        Args:
+            max_workers (int, optional): maximum number of threads for blocking calls. Defaults to 6.
+        """
+        self.__max_workers = max_workers
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[Thread] = None
+        self.__executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def current(cls) -> Optional['AsyncRuntime']:
+        """get the runtime, which has been set as current runtime for all components - thread safe
+
+        Returns:
+            Optional[AsyncRuntime]: the current runtime, None if components should use threads
+        """
+        with AsyncRuntime.__current_lock:
+            return AsyncRuntime.__current
+
+    @classmethod
+    def set_current(cls, runtime: Optional['AsyncRuntime']) -> None:
+        """set the current runtime for all components - thread safe
+
+        Args:
+            runtime (Optional[AsyncRuntime]): the runtime to use, None for using threads
+        """
+        with AsyncRuntime.__current_lock:
+            AsyncRuntime.__current = runtime
+
+    @property
+    def running(self) -> bool:
+        """get running state of the event loop thread
+
+        Returns:
+            bool: True if the event loop is running
+        """
+        return bool(self.__thread and self.__thread.is_alive())
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """get the event loop of this runtime
+
+        Raises:
+            CamguardError: if the runtime hasn't been started
+
+        Returns:
+            asyncio.AbstractEventLoop: the running event loop
+        """
+        if not self.__loop:
+            raise CamguardError("Async runtime has not been started")
+        return self.__loop
+
+    def start(self) -> None:
+        """start event loop thread, does nothing if already running
+        """
+        if self.running:
+            LOGGER.debug("Async runtime already running")
+            return
+
+        LOGGER.info(f"Starting async runtime with {self.__max_workers} workers")
+        self.__executor = ThreadPoolExecutor(max_workers=self.__max_workers, thread_name_prefix='RuntimeWorkerThread')
+        self.__loop = asyncio.new_event_loop()
+        self.__loop.set_default_executor(self.__executor)
+        started = Event()
+        self.__thread = Thread(target=self.__run, args=(self.__loop, started), name="RuntimeLoopThread", daemon=True)
+        self.__thread.start()
+        started.wait()
+
+    def stop(self, timeout_sec: float = 4.0) -> None:
+        """stop event loop thread, remaining tasks will be cancelled.
+        blocking calls which are still running on the executor are not waited for
+
+        Args:
+            timeout_sec (float, optional): timeout for joining the event loop thread. Defaults to 4.0.
+        """
+        if not self.__thread or not self.__loop:
+            LOGGER.debug("Async runtime has never been started")
+            return
+
+        LOGGER.info("Stopping async runtime")
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join(timeout_sec)
+        if self.__thread.is_alive():
+            LOGGER.error(f"Failed to stop async runtime within {timeout_sec} seconds")
+
+        if self.__executor:
+            self.__executor.shutdown(wait=False)
+        self.__thread = None
+        self.__loop = None
+        self.__executor = None
+
+    def submit(self, coro: Awaitable[Any]) -> 'Future[Any]':
+        """schedule a coroutine as task on the event loop - thread safe
+
+        Args:
+            coro (Awaitable[Any]): the coroutine to run
+
+        Returns:
+            Future[Any]: future of the task result, cancelling the future cancels the task
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)  # type: ignore
+
+    def call_soon(self, fn: Callable[..., Any], *args: Any) -> None:
+        """call a function on the event loop thread - thread safe
+
+        Args:
+            fn (Callable[..., Any]): the function to call, must not block
+        """
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    async def run_blocking(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """run a blocking function on the bounded executor and wait for its result,
+        this has to be awaited on the event loop of this runtime
+
+        Args:
+            fn (Callable[..., Any]): the blocking function
+
+        Returns:
+            Any: the result of the function
+        """
+        return await self.loop.run_in_executor(self.__executor, partial(fn, *args, **kwargs))
+
+    def __run(self, loop: asyncio.AbstractEventLoop, started: Event) -> None:
+        LOGGER.info("Init")
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        try:
+            loop.run_forever()
+            # cancel remaining tasks and let them handle their cancellation
+            tasks = [task for task in asyncio.all_tasks(loop) if not task.done()]
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            loop.close()
+        LOGGER.info("Exit")
+
+
+class QueueWaiter:
+    """awaitable read access to a thread-safe queue from the event loop of a runtime.
+    producers keep putting their items without blocking from any thread, but have to call notify afterwards.
+    this way the bounded queue and its dropping behaviour is the same for threads and async tasks.
+    """
+
+    def __init__(self, runtime: AsyncRuntime, queue: 'Queue[Any]') -> None:
+        """default initialization
+
+        Args:
+            runtime (AsyncRuntime): runtime, whose event loop is used for waiting
+            queue (Queue[Any]): the queue to read from
+        """
+        self.__runtime = runtime
+        self.__queue = queue
+        self.__event: Optional[asyncio.Event] = None
+        self.__closed = False
+
+    @property
+    def closed(self) -> bool:
+        """get closed state
+
+        Returns:
+            bool: True if waiting has been closed
+        """
+        return self.__closed
+
+    def notify(self) -> None:
+        """wake up waiting tasks - thread safe
+        """
+        self.__runtime.call_soon(self.__set)
+
+    def close(self) -> None:
+        """close the waiter, waiting tasks get None instead of an item - thread safe
+        """
+        self.__closed = True
+        self.notify()
+
+    async def get(self) -> Any:
+        """wait for the next item of the queue, has to be awaited on the event loop of the runtime
+
+        Returns:
+            Any: the next item, None if the waiter has been closed
+        """
+        if not self.__event:
+            # event has to be created on the event loop thread
+            self.__event = asyncio.Event()
+
+        while not self.__closed:
+            try:
+                return self.__queue.get_nowait()
+            except Empty:
+                # no race with notify: it's executed on the event loop too, after the item has been put
+                self.__event.clear()
+                await self.__event.wait()
+
+        return None
+
+    def __set(self) -> None:
+        if self.__event:
+            self.__event.set()
@@ -1,14 +1,21 @@
 from functools import wraps
 import logging
 from threading import Lock
-from typing import Any, Callable, Generator, List, Tuple
+from time import monotonic
+from typing import Any, Callable, Generator, List, Optional, Tuple
 
 from camguard.bridge_impl import FileStorageImpl, MailClientImpl, MotionDetectorImpl, MotionHandlerImpl, NetworkDeviceDetectorImpl
+from camguard.event_dispatcher import EventDispatcher
+from camguard.event_tracer import EventTracer, MotionEvent, TraceMark
 from camguard.file_storage_settings import DummyGDriveStorageSettings, FileStorageSettings, GDriveStorageSettings
 from camguard.mail_client_settings import DummyMailClientSettings, GenericMailClientSettings, MailClientSettings
-from camguard.motion_detector_settings import DummyGpioSensorSettings, MotionDetectorSettings, RaspiGpioSensorSettings
+from camguard.metrics import Metric, Metrics
+from camguard.motion_detector_settings import (DummyGpioSensorSettings, FrameDiffDetectorSettings,
+                                               MotionDetectorSettings, MotionVectorDetectorSettings,
+                                               RaspiGpioSensorSettings)
 from camguard.motion_handler_settings import DummyCamSettings, MotionHandlerSettings, RaspiCamSettings
 from camguard.network_device_detector_settings import DummyNetworkDeviceDetectorSettings, NMapDeviceDetectorSettings, NetworkDeviceDetectorSettings
+from camguard.recorded_file import RecordedFile
 from camguard.settings import ImplementationType
 
 LOGGER = logging.getLogger(__name__)
@@ -36,21 +43,38 @@ class MotionHandler:
     """ motion handler api class which supports handler pipeline usage
     """
 
-    def __init__(self, config_path: str) -> None:
+    def __init__(self, config_path: str, index: int = 0) -> None:
         """default initialization
 
         Args:
             record_root_path (str): root path where to record files
             config_path (str): settings configuration path
+            index (int, optional): entry of the motion handler settings, if multiple handlers are configured.
+            Defaults to 0.
         """
         self._config_path = config_path
-        self._settings = MotionHandlerSettings.load_settings(config_path)
+        self._index = index
+        self._settings = MotionHandlerSettings.load_settings(config_path, index=index)
         self._get_impl()  # create impl objects
+        self.__activation_lock = Lock()
+        # time of the last motion activation of the ongoing motion event
+        self.__last_activation: Optional[float] = None
+        # a handler can be triggered by multiple detectors, but records only one motion event at a time
+        self.__motion_lock = Lock()
 
     @pipelinestep
-    def on_motion(self, pipeline: List[Generator[None, Any, None]]) -> Generator[None, 'MotionDetector', None]:
+    def on_motion(self, pipeline: List[Generator[None, Any, None]],
+                  frame_pipeline: Optional[List[Generator[None, Any, None]]] = None) \
+            -> Generator[None, 'MotionDetector', None]:
         """ motion handler pipeline step: on_motion
-        handle current motion event in handler and sends return value to sink pipeline
+        handle current motion event in handler and sends return value to sink pipeline.
+        if frame streaming is enabled, every recorded file is sent to the frame pipeline as soon as it has been
+        written, otherwise the frame pipeline receives all files after the record has finished
+
+        Args:
+            pipeline (List[Generator[None, Any, None]]): steps which receive all recorded files of a motion event
+            frame_pipeline (Optional[List[Generator[None, Any, None]]], optional): steps which receive recorded
+            files incrementally. Defaults to None.
 
         Yields:
             Generator[None, object, None]: motiondetector object which detected motion
@@ -59,10 +83,69 @@ class MotionHandler:
             detector: MotionDetector = (yield)
             LOGGER.info(f"Detected motion on detector with id: {detector.id}")
             LOGGER.debug("Forwarding event to pipeline")
-            ret_val = self._get_impl().handle_motion()
+            with self.__motion_lock:
+                with self.__activation_lock:
+                    self.__last_activation = monotonic()
+                # motion-driven records continue as long as the detector which triggered the event detects motion
+                self._get_impl().track_motion(lambda: detector.motion_active)
+
+                if self._settings.stream_frames:
+                    ret_val: List[Any] = []
+                    for file in self._get_impl().handle_motion_stream():
+                        ret_val.append(file)
+                        EventTracer.trace_record([file])
+                        for step in frame_pipeline or []:
+                            step.send([file])
+                else:
+                    ret_val = self._get_impl().handle_motion()
+                    EventTracer.trace_record(ret_val)
+                    for step in frame_pipeline or []:
+                        step.send(ret_val)
+
             for step in pipeline:
                 step.send(ret_val)
 
+    def extend_motion(self, detector: 'MotionDetector') -> bool:
+        """merge a motion activation into the ongoing motion event by extending its record,
+        if the activation occurred within the coalesce window after the previous activation - thread safe
+
+        Args:
+            detector (MotionDetector): motion detector which detected motion
+
+        Returns:
+            bool: True if the activation has been merged, False if it has to be handled as a new motion event
+        """
+        window_sec = self._settings.coalesce_window_sec
+        if window_sec <= 0:
+            return False
+
+        with self.__activation_lock:
+            now = monotonic()
+            if self.__last_activation is None or now - self.__last_activation > window_sec:
+                return False
+
+            if not self._get_impl().extend_record():
+                return False
+
+            self.__last_activation = now
+
+        LOGGER.info(f"Extended ongoing record by motion on detector with id: {detector.id}")
+        return True
+
+    def start(self) -> None:
+        """prepare motion handler for motion events, i.e. open a persistent camera
+        """
+        self._get_impl().start()
+
+    def on_disable(self, ips: List[Tuple[str, bool]]) -> None:
+        """handler function for disabling handler from network device detector,
+        a disabled handler releases resources which are kept for motion events
+
+        Args:
+            ips (List[Tuple[str, bool]]): detected network device ips
+        """
+        self._get_impl().on_disable(ips)
+
     def stop(self) -> None:
         """stop motion handler
         """
@@ -77,6 +160,15 @@ class MotionHandler:
         """
         return self._get_impl().id
 
+    @property
+    def name(self) -> str:
+        """get handler name, which is used for routing motion detectors to handlers
+
+        Returns:
+            str: the configured name, the position of the handler settings entry if not configured
+        """
+        return self._settings.name or str(self._index)
+
     def _get_impl(self) -> MotionHandlerImpl:
         """initializes implementation classes, if not already done
 
@@ -86,11 +178,11 @@ class MotionHandler:
         if not hasattr(self, '_impl') or not self._impl:
             if self._settings.impl_type == ImplementationType.DUMMY:
                 from .dummy_cam import DummyCam
-                self._impl = DummyCam(DummyCamSettings.load_settings(self._config_path))
+                self._impl = DummyCam(DummyCamSettings.load_settings(self._config_path, index=self._index))
             else:
                 # defaults to raspi cam implementation
                 from .raspi_cam import RaspiCam
-                self._impl = RaspiCam(RaspiCamSettings.load_settings(self._config_path))
+                self._impl = RaspiCam(RaspiCamSettings.load_settings(self._config_path, index=self._index))
 
         return self._impl
 
@@ -101,31 +193,47 @@ class MotionDetector:
 
     _lock: Lock = Lock()
 
-    def __init__(self, config_path: str) -> None:
+    def __init__(self, config_path: str, index: int = 0) -> None:
         """default initialization
 
         Args:
             config_path (str): settings configuration path
+            index (int, optional): entry of the motion detector settings, if multiple detectors are configured.
+            Defaults to 0.
         """
         self._pipeline: List[Generator[None, 'MotionDetector', None]] = []
+        self._coalesce: Optional[Callable[['MotionDetector'], bool]] = None
+        self._coalesced = 0
         self._config_path = config_path
-        self._settings: MotionDetectorSettings = MotionDetectorSettings.load_settings(config_path)
+        self._index = index
+        self._settings: MotionDetectorSettings = MotionDetectorSettings.load_settings(config_path, index=index)
         self._get_impl()  # create impl objects
+        # motion events are handled on a dedicated thread, so that the sensor callback returns immediately
+        self._dispatcher = EventDispatcher(name=f"MotionDispatcherThread-{self.id}",
+                                           handler=self.__forward_motion,
+                                           queue_size=self._settings.event_queue_size)
 
-    def register_handlers(self, pipeline: List[Generator[None, 'MotionDetector', None]]) -> None:
-        """register handler pipe
+    def register_handlers(self, pipeline: List[Generator[None, 'MotionDetector', None]],
+                          coalesce: Optional[Callable[['MotionDetector'], bool]] = None) -> None:
+        """register handler pipe and start dispatching motion events to it
 
         Args:
             pipeline (List[Generator[None, object, None]]): array of gen based 
             coroutines to build a handler pipe which will be called when motion occurs 
+            coalesce (Optional[Callable[[MotionDetector], bool]], optional): function which is called on motion
+            before dispatching, if it returns True the motion has been merged into an ongoing motion event
+            and won't be dispatched. Defaults to None.
         """
         self._pipeline = pipeline
+        self._coalesce = coalesce
+        self._dispatcher.start()
         self._get_impl().register_handler(self.__on_motion)
 
     def stop(self) -> None:
         """shutdown sensor, stops motion detection 
         """
         self._get_impl().shutdown()
+        self._dispatcher.stop()
 
     @property
     def id(self) -> int:
@@ -136,6 +244,52 @@ class MotionDetector:
         """
         return self._get_impl().id
 
+    @property
+    def handlers(self) -> List[str]:
+        """get names of the motion handlers, which handle motion of this detector
+
+        Returns:
+            List[str]: handler names, empty for default routing
+        """
+        return self._settings.handlers
+
+    @property
+    def motion_active(self) -> bool:
+        """get if motion is ongoing - thread safe
+
+        Returns:
+            bool: True while motion is detected, always False for detectors which can't tell the end of motion
+        """
+        with MotionDetector._lock:
+            return self._get_impl().motion_active
+
+    @property
+    def event_queue_depth(self) -> int:
+        """get number of motion events, which are waiting for the handler pipeline
+
+        Returns:
+            int: pending motion event count
+        """
+        return self._dispatcher.queue_depth
+
+    @property
+    def dropped_events(self) -> int:
+        """get number of motion events, which have been dropped due to a full event queue
+
+        Returns:
+            int: dropped motion event count
+        """
+        return self._dispatcher.dropped
+
+    @property
+    def coalesced_events(self) -> int:
+        """get number of motion events, which have been merged into an ongoing motion event
+
+        Returns:
+            int: coalesced motion event count
+        """
+        return self._coalesced
+
     @property
     def disabled(self) -> bool:
         """get disabled flag - thread safe
@@ -158,11 +312,45 @@ class MotionDetector:
             self._get_impl().on_disable(ips)
 
     def __on_motion(self) -> None:
-        """forward motion event to handler pipeline
+        """enqueue motion event for the dispatcher thread, called by the sensor implementation
         """
+        activation = monotonic()
+        Metrics.count(Metric.MOTION_EVENTS, detector=self.id)
+        if self._coalesce and self._coalesce(self):
+            LOGGER.debug("Motion event merged into ongoing motion event")
+            self._coalesced += 1
+            Metrics.count(Metric.MOTION_EVENTS_COALESCED, detector=self.id)
+            return
+
+        LOGGER.debug("Enqueuing motion event")
+        tracer = EventTracer.current()
+        event = tracer.begin(self.id, activation) if tracer else None
+        if self._dispatcher.dispatch((self, event)):
+            return
+
+        Metrics.count(Metric.MOTION_EVENTS_DROPPED, detector=self.id)
+        if tracer and event:
+            tracer.discard(event)
+
+    def __forward_motion(self, motion: Tuple['MotionDetector', Optional[MotionEvent]]) -> None:
+        """forward motion event to handler pipeline, called by the dispatcher thread
+
+        Args:
+            motion (Tuple[MotionDetector, Optional[MotionEvent]]): the motion detector which detected motion
+            and the traced motion event, if tracing is enabled
+        """
+        detector, event = motion
+        tracer = EventTracer.current()
+        if tracer and event:
+            tracer.activate(event)
+
         LOGGER.debug("Forwarding event to motion handler pipeline")
-        for step in self._pipeline:
-            step.send(self)
+        try:
+            for step in self._pipeline:
+                step.send(detector)
+        finally:
+            if tracer and event:
+                tracer.deactivate()
 
     def _get_impl(self) -> MotionDetectorImpl:
         """initializes implementation classes, if not already done
@@ -173,11 +361,21 @@ class MotionDetector:
         if not hasattr(self, '_impl') or not self._impl:
             if self._settings.impl_type == ImplementationType.DUMMY:
                 from .dummy_gpio_sensor import DummyGpioSensor
-                self._impl = DummyGpioSensor(DummyGpioSensorSettings.load_settings(self._config_path))
+                self._impl = DummyGpioSensor(DummyGpioSensorSettings.load_settings(self._config_path,
+                                                                                   index=self._index))
+            elif self._settings.impl_type == ImplementationType.CAMERA:
+                from .frame_diff_detector import FrameDiffDetector
+                self._impl = FrameDiffDetector(FrameDiffDetectorSettings.load_settings(self._config_path,
+                                                                                       index=self._index))
+            elif self._settings.impl_type == ImplementationType.MOTION_VECTORS:
+                from .motion_vector_detector import MotionVectorDetector
+                self._impl = MotionVectorDetector(MotionVectorDetectorSettings.load_settings(self._config_path,
+                                                                                             index=self._index))
             else:
                 # defaults to raspi cam implementation
                 from .raspi_gpio_sensor import RaspiGpioSensor
-                self._impl = RaspiGpioSensor(RaspiGpioSensorSettings.load_settings(self._config_path))
+                self._impl = RaspiGpioSensor(RaspiGpioSensorSettings.load_settings(self._config_path,
+                                                                                   index=self._index))
 
         return self._impl
 
@@ -212,15 +410,16 @@ class FileStorage:
         self._get_impl().stop()
 
     @pipelinestep
-    def enqueue_files(self) -> Generator[None, List[str], None]:
+    def enqueue_files(self) -> Generator[None, List[RecordedFile], None]:
         """motion handler pipeline step: enqueue files 
 
         Yields:
-            Generator[None, List[str], None]: file path array which will be enqueued
+            Generator[None, List[RecordedFile], None]: file array which will be enqueued
         """
         while True:
-            files: List[str] = (yield)
+            files: List[RecordedFile] = (yield)
             LOGGER.debug("Retrieving files from pipeline")
+            EventTracer.trace_files(files, TraceMark.ENQUEUE)
             self._get_impl().enqueue_files(files)
 
     def _get_impl(self) -> FileStorageImpl:
@@ -255,16 +454,19 @@ class MailClient:
         self._get_impl()  # create impl objects
 
     @pipelinestep
-    def send_mail(self) -> Generator[None, List[str], None]:
+    def send_mail(self) -> Generator[None, List[RecordedFile], None]:
         """motion handler pipeline step: send notification mail
 
         Yields:
             Generator[None, str, None]: gdrive link to folder which will be included in mail
         """
         while True:
-            files: List[str] = (yield)
+            files: List[RecordedFile] = (yield)
             LOGGER.debug("Retrieving files from pipeline")
+            start = monotonic()
             self._get_impl().send_mail(files)
+            Metrics.measure(Metric.MAIL_SEND_DURATION, monotonic() - start)
+            EventTracer.trace_files(files, TraceMark.MAIL_SENT)
 
     def _get_impl(self) -> MailClientImpl:
         """initializes implementation classes, if not already done
@@ -1,5 +1,13 @@
+import logging
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, Tuple
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Iterator, List, Tuple
+
+from camguard.event_tracer import EventTracer, TraceMark
+from camguard.recorded_file import RecordedFile
+
+LOGGER = logging.getLogger(__name__)
 
 # Handler Bridge
 
@@ -8,10 +16,153 @@ class MotionHandlerImpl(ABC):
     """abstract base class for motion handler implementations
     """
 
+    def __init__(self) -> None:
+        self._record_lock = Lock()
+        self._recording = False
+        self._recorded = 0
+        self._record_limit = 0
+        self._disabled = False
+        # motion-driven records: minimum number of files, tail after the motion ended and time of the last motion
+        self._record_min = 0
+        self._motion_tail_sec = 0.0
+        self._last_motion = 0.0
+        self._motion_active: Callable[[], bool] = lambda: False
+
     @abstractmethod
     def handle_motion(self) -> Any:
         pass
 
+    def start(self) -> None:
+        """prepare for motion events, implementations which don't keep any resources between motion events
+        do nothing
+        """
+
+    @property
+    def disabled(self) -> bool:
+        return self._disabled
+
+    def on_disable(self, ips: List[Tuple[str, bool]]) -> None:
+        # disable if any of the configured devices could be found on network
+        self._disabled = any(found for _, found in ips)
+
+    def extend_record(self) -> bool:
+        """extend the currently running record, implementations which are not able to extend a record return False
+
+        Returns:
+            bool: True if the running record has been extended
+        """
+        return False
+
+    def track_motion(self, active: Callable[[], bool]) -> None:
+        """set the function, which tells if the motion of the next motion event is still ongoing.
+        it's used by motion-driven records, which continue as long as there is motion
+
+        Args:
+            active (Callable[[], bool]): returns True while motion is detected
+        """
+        self._motion_active = active
+
+    def _start_record(self, count: int, max_count: int = 0, motion_tail_sec: float = 0.0) -> None:
+        """start a record of count files. with a motion tail, the record is motion-driven instead:
+        it continues while motion is detected and for the tail afterwards, with at least count files and at most
+        max_count files
+
+        Args:
+            count (int): number of files, minimum number of files of a motion-driven record
+            max_count (int, optional): maximum number of files of a motion-driven record. Defaults to 0.
+            motion_tail_sec (float, optional): seconds to continue after the motion ended, 0 for a record
+            of count files. Defaults to 0.0.
+        """
+        # record is started right after the camera has been opened
+        EventTracer.trace(TraceMark.CAMERA_OPEN)
+        with self._record_lock:
+            self._recording = True
+            self._recorded = 0
+            self._record_min = count
+            self._motion_tail_sec = motion_tail_sec
+            self._last_motion = monotonic()
+            self._record_limit = max(count, max_count) if motion_tail_sec > 0 else count
+
+    def _record_next(self) -> bool:
+        """count a recorded file
+
+        Returns:
+            bool: True if the record should be continued
+        """
+        EventTracer.trace(TraceMark.FRAME)
+        # detectors synchronize their state themselves, it's not queried with the record lock held
+        active = self._motion_tail_sec > 0 and self._motion_active()
+        with self._record_lock:
+            self._recorded += 1
+            if self._motion_tail_sec > 0:
+                now = monotonic()
+                if active:
+                    self._last_motion = now
+                elif self._recorded >= self._record_min and now - self._last_motion >= self._motion_tail_sec:
+                    LOGGER.debug(f"Motion ended {now - self._last_motion:.1f}s ago, finishing record")
+                    self._recording = False
+            if self._recorded >= self._record_limit:
+                # finish record atomically, so that no extension gets lost
+                self._recording = False
+            return self._recording
+
+    def _skip_records(self, count: int) -> bool:
+        """count files, which have been skipped because recording fell behind schedule
+
+        Args:
+            count (int): number of skipped files
+
+        Returns:
+            bool: True if the record should be continued
+        """
+        with self._record_lock:
+            self._recorded += count
+            if self._recorded >= self._record_limit:
+                self._recording = False
+            return self._recording
+
+    def _finish_record(self) -> None:
+        with self._record_lock:
+            self._recording = False
+
+    def _extend_record_limit(self, count: int, max_count: int) -> bool:
+        """extend the record limit of a running record to the currently recorded files plus count
+
+        Args:
+            count (int): number of files to record from now on
+            max_count (int): maximum number of files of the whole record
+
+        Returns:
+            bool: True if the record is running and its limit has been extended
+        """
+        with self._record_lock:
+            if not self._recording:
+                return False
+
+            if self._motion_tail_sec > 0:
+                # the limit of a motion-driven record is the maximum already, motion restarts the tail
+                if self._recorded >= self._record_limit:
+                    return False
+                self._last_motion = monotonic()
+                return True
+
+            limit = min(self._recorded + count, max_count)
+            if limit <= self._record_limit:
+                # maximum record length reached
+                return False
+
+            self._record_limit = limit
+            return True
+
+    def handle_motion_stream(self) -> Iterator[RecordedFile]:
+        """record files for the current motion event and yield every file as soon as it has been written.
+        implementations, which are not able to stream, yield the files after the whole record has finished
+
+        Yields:
+            Iterator[RecordedFile]: recorded file
+        """
+        yield from self.handle_motion()
+
     @abstractmethod
     def shutdown(self) -> None:
         pass
@@ -48,6 +199,15 @@ class MotionDetectorImpl(ABC):
     def disabled(self) -> bool:
         return self._disabled
 
+    @property
+    def motion_active(self) -> bool:
+        """get if motion is ongoing, detectors which can't tell the end of motion return False
+
+        Returns:
+            bool: True while motion is detected
+        """
+        return False
+
     def on_disable(self, ips: List[Tuple[str, bool]]) -> None:
         disabled = False
         if ips: 
@@ -76,7 +236,7 @@ class FileStorageImpl(ABC):
         pass
 
     @abstractmethod
-    def enqueue_files(self, files: List[str]) -> None:
+    def enqueue_files(self, files: List[RecordedFile]) -> None:
         pass
 
     @property
@@ -93,7 +253,7 @@ class MailClientImpl(ABC):
     """
 
     @abstractmethod
-    def send_mail(self, files: List[str]) -> None:
+    def send_mail(self, files: List[RecordedFile]) -> None:
         pass
 
 
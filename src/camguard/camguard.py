@@ -1,10 +1,27 @@
 import logging
-from typing import Any, Generator, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from threading import RLock
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Dict, Generator, List, Optional, Tuple
 
+from camguard.async_runtime import AsyncRuntime
 from camguard.bridge_api import (FileStorage, MailClient, MotionDetector,
-                                 MotionHandler, NetworkDeviceDetector)
+                                 MotionHandler, NetworkDeviceDetector, pipelinestep)
 from camguard.camguard_settings import CamguardSettings, ComponentsType
-from camguard.exceptions import CamguardError
+from camguard.event_tracer import EventTracer, TraceMark
+from camguard.exceptions import CamguardError, ConfigurationError
+from camguard.motion_detector_settings import MotionDetectorSettings
+from camguard.motion_handler_settings import MotionHandlerSettings
+from camguard.pipeline import PipelineStep
+from camguard.pipeline_settings import PipelineSettings
+from camguard.rate_control import UploadBandwidth
+from camguard.runtime_settings import RuntimeMode, RuntimeSettings
+from camguard.tracing_settings import TracingSettings
+
+if TYPE_CHECKING:
+    from camguard.frame_selector import FrameSelector
+    from camguard.frame_variants import VariantRenderer
+    from camguard.object_classifier import ObjectClassifier
 
 LOGGER = logging.getLogger(__name__)
 
@@ -12,6 +29,10 @@ LOGGER = logging.getLogger(__name__)
 class Camguard:
     """Camguard main device class, holds and manages equipment
     """
+    # maximum number of motion events which will be buffered per component during background initialization
+    __MAX_BUFFERED_EVENTS: ClassVar[int] = 30
+    # maximum seconds for waiting on background initialization during stop, i.e. for a hanging authentication
+    __INIT_STOP_TIMEOUT_SEC: ClassVar[float] = 5.0
 
     def __init__(self, config_path: str):
         """create camguard instance
@@ -22,37 +43,83 @@ class Camguard:
         self.__init = False
         self.__config_path = config_path
         self.__settings: CamguardSettings = CamguardSettings.load_settings(self.__config_path)
+        self.__pipeline_settings: PipelineSettings = PipelineSettings.load_settings(self.__config_path)
+        self.__runtime_settings: RuntimeSettings = RuntimeSettings.load_settings(self.__config_path)
+        self.__tracing_settings: TracingSettings = TracingSettings.load_settings(self.__config_path)
+
+        detector_count = MotionDetectorSettings.count_entries(self.__config_path)
+        handler_count = MotionHandlerSettings.count_entries(self.__config_path)
+        if not detector_count or not handler_count:
+            raise ConfigurationError("At least one motion detector and one motion handler have to be configured")
+
+        # the runtime and its singletons are created on start, because threads don't survive detaching the
+        # daemon process
+        self.__runtime: Optional[AsyncRuntime] = None
+        self.__tracer: Optional[EventTracer] = None
+        self.__bandwidth: Optional[UploadBandwidth] = None
 
-        self.__detector = MotionDetector(self.__config_path)
-        self.__handler = MotionHandler(self.__config_path)
+        # multiple detectors and handlers can be configured, they share the optional components
+        self.__detectors = [MotionDetector(self.__config_path, index) for index in range(detector_count)]
+        self.__handlers = [MotionHandler(self.__config_path, index) for index in range(handler_count)]
+        # motion handlers for every motion detector, by index of the detector
+        self.__routes: List[List[MotionHandler]] = []
         self.__file_storage: Optional[FileStorage] = None
         self.__mail_client: Optional[MailClient] = None
         self.__netw_dev_detector: Optional[NetworkDeviceDetector] = None
+        self.__variant_renderer: Optional['VariantRenderer'] = None
+        self.__classifier: Optional['ObjectClassifier'] = None
+        # classifies motion events before they are passed to the mail client and file storage steps
+        self.__classify_step: Optional[PipelineStep] = None
+
+        self.__init_executor: Optional[ThreadPoolExecutor] = None
+        self.__init_futures: List['Future[Optional[PipelineStep]]'] = []
+        # pipeline steps of optional components, None if component failed to initialize
+        self.__steps: Dict[ComponentsType, Optional[PipelineStep]] = {}
+        # motion events which occurred while component was still initializing
+        self.__buffers: Dict[ComponentsType, List[Any]] = {}
+        self.__steps_lock = RLock()
+        self.__stopped = False
+        # counts starts, background initialization of a previous run doesn't register its component anymore
+        self.__run = 0
 
     def init(self):
-        """initialize equipment, this *has* to be done before start
+        """initialize equipment, this *has* to be done before start.
+        motion detector and handler are ready after creation, optional components are initialized
+        concurrently in the background on start, so that arming the motion detection doesn't have to wait for them
+        (i.e. for the authentication of the file storage)
         """
         LOGGER.info("Initializing equipment")
+        self.__routes = [self.__route(index, detector) for index, detector in enumerate(self.__detectors)]
+        components = [component for component in self.__init_functions() if component in self.__settings.components]
 
-        if ComponentsType.FILE_STORAGE in self.__settings.components:
-            LOGGER.info("Setting up file storage")
-            self.__file_storage = FileStorage(self.__config_path)
-            self.__file_storage.authenticate()
-            self.__file_storage.start()
-
-        if ComponentsType.MAIL_CLIENT in self.__settings.components:
-            LOGGER.info("Setting up mail client")
-            self.__mail_client = MailClient(self.__config_path)
+        if self.__pipeline_settings.variants and \
+                (ComponentsType.MAIL_CLIENT in components or self.__pipeline_settings.upload_variant):
+            # pillow is only imported, if picture variants are configured
+            from camguard.frame_variants import VariantRenderer
+            # the worker processes are shared by the components, they are started on start
+            self.__variant_renderer = VariantRenderer(self.__pipeline_settings.variants,
+                                                      self.__pipeline_settings.variant_workers)
 
-        if ComponentsType.NETWORK_DEVICE_DETECTOR in self.__settings.components:
-            LOGGER.info("Setting up network device dector")
-            self.__netw_dev_detector = NetworkDeviceDetector(self.__config_path)
-            self.__netw_dev_detector.register_handler(self.__detector.on_disable)
+        if self.__pipeline_settings.classify_model and \
+                {ComponentsType.MAIL_CLIENT, ComponentsType.FILE_STORAGE}.intersection(components):
+            self.__init_classifier()
 
         self.__init = True
 
+    def wait_for_components(self, timeout_sec: Optional[float] = None) -> bool:
+        """wait until background initialization of optional components has finished
+
+        Args:
+            timeout_sec (Optional[float], optional): timeout in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if all components finished initialization (successful or not) within timeout
+        """
+        _, not_done = wait(self.__init_futures, timeout=timeout_sec)
+        return not not_done
+
     def start(self):
-        """start camguard
+        """start camguard, motion events for optional components which are still initializing will be buffered
 
         Raises:
             CamguardError: is camguard hasn't been initialized
@@ -60,33 +127,396 @@ class Camguard:
         if not self.__init:
             raise CamguardError("Components have not been initialized successfully before start")
 
-        if ComponentsType.NETWORK_DEVICE_DETECTOR in self.__settings.components and self.__netw_dev_detector:
-            self.__netw_dev_detector.start()
-
         LOGGER.info("Starting camguard")
+        self.__stopped = False
+        self.__run += 1
+        # started here instead of init, because threads don't survive detaching the daemon process
+        self.__start_runtime()
+        if self.__variant_renderer:
+            self.__variant_renderer.start()
+        self.__start_classifier()
+        self.__init_components()
+        for handler in self.__handlers:
+            handler.start()
 
-        # build handler pipe
-        on_motion_pipe: List[Generator[None, Any, None]] = []
-
-        if ComponentsType.FILE_STORAGE in self.__settings.components and self.__file_storage:
-            on_motion_pipe.append(self.__file_storage.enqueue_files()) 
-
-        if ComponentsType.MAIL_CLIENT in self.__settings.components and self.__mail_client:
-            on_motion_pipe.append(self.__mail_client.send_mail())
-
-        self.__detector.register_handlers([self.__handler.on_motion(on_motion_pipe)])
+        for detector, handlers in zip(self.__detectors, self.__routes):
+            # every detector dispatches on its own thread, therefore it gets its own pipeline generators,
+            # the pipeline steps of the optional components are shared and thread safe
+            detector.register_handlers([self.__handle_motion(handler) for handler in handlers],
+                                       coalesce=partial(Camguard.__extend_motion, handlers))
 
     def stop(self):
         """stop camguard
         """
         LOGGER.info("Stopping camguard")
-        self.__handler.stop()
-        self.__detector.stop()
+        self.__stopped = True
+        for handler in self.__handlers:
+            handler.stop()
+        for detector in self.__detectors:
+            detector.stop()
+
+        if self.__init_executor:
+            # initialization which hasn't finished in time is abandoned, i.e. a hanging authentication
+            for future in self.__init_futures:
+                future.cancel()
+            _, not_done = wait(self.__init_futures, timeout=Camguard.__INIT_STOP_TIMEOUT_SEC)
+            if not_done:
+                LOGGER.error(f"Initialization of {len(not_done)} components didn't finish within "
+                             f"{Camguard.__INIT_STOP_TIMEOUT_SEC} seconds, not waiting for them")
+            self.__init_executor.shutdown(wait=False)
+            self.__init_executor = None
+
+        if self.__classify_step:
+            self.__classify_step.stop()
+            self.__classify_step = None
+
+        with self.__steps_lock:
+            steps = list(self.__steps.values())
+        for step in steps:
+            if step:
+                step.stop()
 
         if ComponentsType.FILE_STORAGE in self.__settings.components and self.__file_storage:
             self.__file_storage.stop()
 
+        if self.__variant_renderer:
+            self.__variant_renderer.stop()
+            self.__variant_renderer = None
+
+        if self.__classifier:
+            self.__classifier.stop()
+            self.__classifier = None
+
         if ComponentsType.NETWORK_DEVICE_DETECTOR in self.__settings.components and self.__netw_dev_detector:
             self.__netw_dev_detector.stop()
 
+        if self.__tracer:
+            EventTracer.set_current(None)
+            self.__tracer = None
+
+        if self.__bandwidth:
+            UploadBandwidth.set_current(None)
+            self.__bandwidth = None
+
+        if self.__runtime:
+            AsyncRuntime.set_current(None)
+            self.__runtime.stop()
+            self.__runtime = None
+
+        # components are initialized again on the next start
+        with self.__steps_lock:
+            self.__steps.clear()
+            self.__buffers.clear()
+        self.__init_futures = []
+        self.__file_storage = None
+        self.__mail_client = None
+        self.__netw_dev_detector = None
         self.__init = False
+
+    def __start_runtime(self) -> None:
+        """create the async runtime, event tracer and upload bandwidth, the runtime has to be available
+        before creating components, so that they schedule their workers on it
+        """
+        if self.__runtime_settings.mode == RuntimeMode.ASYNCIO:
+            self.__runtime = AsyncRuntime(max_workers=self.__runtime_settings.max_workers)
+            self.__runtime.start()
+            AsyncRuntime.set_current(self.__runtime)
+
+        if self.__tracing_settings.enabled:
+            # an event is complete, when its files passed every configured component
+            expected = [mark for component, mark in [(ComponentsType.FILE_STORAGE, TraceMark.UPLOAD_END),
+                                                     (ComponentsType.MAIL_CLIENT, TraceMark.MAIL_SENT)]
+                        if component in self.__settings.components]
+            self.__tracer = EventTracer(expected=expected,
+                                        window_size=self.__tracing_settings.window_size,
+                                        summary_interval=self.__tracing_settings.summary_interval)
+            EventTracer.set_current(self.__tracer)
+
+        if ComponentsType.FILE_STORAGE in self.__settings.components:
+            # the cameras adapt the picture quality to the measured upload throughput, if rate control is enabled
+            self.__bandwidth = UploadBandwidth()
+            UploadBandwidth.set_current(self.__bandwidth)
+
+    def __init_functions(self) -> Dict[ComponentsType, Callable[[], Optional[PipelineStep]]]:
+        return {
+            ComponentsType.FILE_STORAGE: self.__init_file_storage,
+            ComponentsType.MAIL_CLIENT: self.__init_mail_client,
+            ComponentsType.NETWORK_DEVICE_DETECTOR: self.__init_netw_dev_detector
+        }
+
+    def __init_components(self) -> None:
+        """initialize the optional components concurrently in the background, motion events are buffered
+        until a component is ready
+        """
+        init_functions = self.__init_functions()
+        components = [component for component in init_functions if component in self.__settings.components]
+        if not components or self.__init_executor:
+            return
+
+        self.__init_executor = ThreadPoolExecutor(max_workers=len(components),
+                                                  thread_name_prefix='ComponentInitThread')
+        for component in components:
+            with self.__steps_lock:
+                self.__buffers[component] = []
+            future = self.__init_executor.submit(init_functions[component])
+            future.add_done_callback(partial(self.__on_component_ready, component, self.__run))
+            self.__init_futures.append(future)
+
+    def __init_file_storage(self) -> PipelineStep:
+        LOGGER.info("Setting up file storage")
+        self.__file_storage = FileStorage(self.__config_path)
+        self.__file_storage.authenticate()
+        self.__file_storage.start()
+        enqueue_files = self.__file_storage.enqueue_files
+
+        upload_variant = self.__pipeline_settings.upload_variant
+        renderer = self.__variant_renderer if upload_variant else None
+        if renderer:
+            LOGGER.info(f"Uploading variant {upload_variant} instead of the recorded pictures")
+
+        deduplicator = None
+        if self.__pipeline_settings.dedup_max_distance:
+            # pillow is only imported, if near-duplicate suppression is configured
+            from camguard.frame_dedup import FrameDeduplicator
+            LOGGER.info(f"Suppressing near-duplicate pictures within a hamming distance of "
+                        f"{self.__pipeline_settings.dedup_max_distance}")
+            deduplicator = FrameDeduplicator(self.__pipeline_settings.dedup_max_distance)
+
+        selector = self.__create_selector()
+        policy = self.__pipeline_settings.select_policy
+
+        def create_pipe() -> Generator[None, Any, None]:
+            # duplicates are dropped before selecting the best pictures, which are rendered afterwards,
+            # the variant replaces the picture for the upload
+            target = enqueue_files()
+            if renderer:
+                target = renderer.render(target, substitute=upload_variant)
+            if selector:
+                target = selector.select(target, TraceMark.UPLOAD_END, policy=policy)
+            if deduplicator:
+                target = deduplicator.deduplicate(target)
+            return target
+
+        # pictures are hashed and rendered on the worker of the file storage step, not on the recording thread
+        return self.__create_step("FileStorageStep", create_pipe)
+
+    def __init_mail_client(self) -> PipelineStep:
+        LOGGER.info("Setting up mail client")
+        self.__mail_client = MailClient(self.__config_path)
+        send_mail = self.__mail_client.send_mail
+        renderer = self.__variant_renderer
+        selector = self.__create_selector()
+
+        def create_pipe() -> Generator[None, Any, None]:
+            # only the best pictures are mailed and rendered
+            target = send_mail()
+            if renderer:
+                target = renderer.render(target)
+            if selector:
+                target = selector.select(target, TraceMark.MAIL_SENT)
+            return target
+
+        return self.__create_step("MailClientStep", create_pipe)
+
+    def __create_selector(self) -> Optional['FrameSelector']:
+        """create selector of the best pictures of a motion event, if configured
+        """
+        if not self.__pipeline_settings.select_top_k:
+            return None
+
+        # numpy and pillow are only imported, if best picture selection is configured
+        from camguard.frame_selector import FrameSelector
+        LOGGER.info(f"Selecting the best {self.__pipeline_settings.select_top_k} pictures of every motion event, "
+                    f"recorded files are uploaded after the record instead of being streamed")
+        return FrameSelector(self.__pipeline_settings.select_top_k)
+
+    def __init_classifier(self) -> None:
+        """set up object classification of motion events, the configured model and classes are validated here,
+        the worker processes and the classifier step are started on start
+        """
+        # opencv is only imported, if object classification is configured
+        from camguard.object_classifier import ObjectClassifier
+        self.__classifier = ObjectClassifier(self.__pipeline_settings)
+        LOGGER.info("Classifying motion events, recorded files are uploaded after classification instead of "
+                    "being streamed")
+
+    def __start_classifier(self) -> None:
+        """start object classification of motion events, the classifier step receives the files of a motion event
+        from the motion handlers and forwards them to the pipeline steps of the mail client and file storage
+        """
+        classifier = self.__classifier
+        if not classifier:
+            return
+
+        classifier.start()
+
+        def create_pipe() -> Generator[None, Any, None]:
+            # component steps are created on the worker of the classifier step, which is their only sender
+            return classifier.classify(self.__build_pipe([ComponentsType.MAIL_CLIENT]),
+                                       self.__build_pipe([ComponentsType.FILE_STORAGE]))
+
+        self.__classify_step = self.__create_step("ClassifierStep", create_pipe)
+
+    def __init_netw_dev_detector(self) -> None:
+        LOGGER.info("Setting up network device dector")
+        self.__netw_dev_detector = NetworkDeviceDetector(self.__config_path)
+        self.__netw_dev_detector.register_handler(self.__on_disable)
+        self.__netw_dev_detector.start()
+
+    def __route(self, index: int, detector: MotionDetector) -> List[MotionHandler]:
+        """get motion handlers for a motion detector, by default a detector is routed to the handler
+        at the same position, or to the first handler if there are less handlers than detectors
+
+        Args:
+            index (int): position of the detector
+            detector (MotionDetector): the motion detector
+
+        Raises:
+            ConfigurationError: if a configured handler name is unknown
+
+        Returns:
+            List[MotionHandler]: handlers, which handle motion of the detector
+        """
+        names = list(detector.handlers)
+        if not names:
+            handlers = [self.__handlers[index] if index < len(self.__handlers) else self.__handlers[0]]
+        else:
+            by_name = {handler.name: handler for handler in self.__handlers}
+            unknown = [name for name in names if name not in by_name]
+            if unknown:
+                raise ConfigurationError(f"Unknown motion handlers {unknown} configured for motion detector "
+                                         f"{index}. Available handlers are: {list(by_name)}")
+            handlers = [by_name[name] for name in names]
+
+        LOGGER.info(f"Routing motion detector {index} to handlers: {[handler.name for handler in handlers]}")
+        return handlers
+
+    def __handle_motion(self, handler: MotionHandler) -> Generator[None, MotionDetector, None]:
+        """create the motion handler pipeline step of a handler, which sends motion events to the
+        classifier step if classification is configured, or to the component steps otherwise
+        """
+        if self.__classify_step:
+            # classification needs all files of a motion event, therefore frames are not streamed to the storage
+            return handler.on_motion([self.__classify_step], [])  # type: ignore
+        if self.__pipeline_settings.select_top_k:
+            # selection needs all files of a motion event as well, a single streamed frame is always selected
+            return handler.on_motion(self.__build_pipe([ComponentsType.MAIL_CLIENT, ComponentsType.FILE_STORAGE]), [])
+        return handler.on_motion(self.__build_pipe([ComponentsType.MAIL_CLIENT]),
+                                 self.__build_pipe([ComponentsType.FILE_STORAGE]))
+
+    def __build_pipe(self, components: List[ComponentsType]) -> List[Generator[None, Any, None]]:
+        return [self.__component_step(component) for component in components
+                if component in self.__settings.components]
+
+    @staticmethod
+    def __extend_motion(handlers: List[MotionHandler], detector: MotionDetector) -> bool:
+        """coalesce function for a detector: motion is merged, if all of its handlers extended their record
+        """
+        # extend every handler, not only until the first one fails
+        extended = [handler.extend_motion(detector) for handler in handlers]
+        return all(extended)
+
+    def __on_disable(self, ips: List[Tuple[str, bool]]) -> None:
+        for detector in self.__detectors:
+            detector.on_disable(ips)
+        for handler in self.__handlers:
+            handler.on_disable(ips)
+
+    def __create_step(self, name: str, step_factory: Callable[[], Generator[None, Any, None]]) -> PipelineStep:
+        """create and start an isolated pipeline step, so that every component handles motion events
+        on its own worker thread
+
+        Args:
+            name (str): name of the step
+            step_factory (Callable[[], Generator[None, Any, None]]): pipeline step function of the component
+
+        Returns:
+            PipelineStep: the started pipeline step
+        """
+        step = PipelineStep(name, step_factory,
+                            queue_size=self.__pipeline_settings.step_queue_size,
+                            timeout_sec=self.__pipeline_settings.step_timeout_sec)
+        step.start()
+        return step
+
+    def __on_component_ready(self, component: ComponentsType, run: int,
+                             future: 'Future[Optional[PipelineStep]]') -> None:
+        """callback for finished background initialization, forwards buffered motion events to the component
+
+        Args:
+            component (ComponentsType): the initialized component
+            run (int): the start, which initialized the component
+            future (Future): the finished initialization, returns the pipeline step of the component
+        """
+        if future.cancelled():
+            LOGGER.debug(f"Initialization of {component.component_name} has been cancelled")
+            return
+
+        step: Optional[PipelineStep] = None
+        try:
+            step = future.result()
+            LOGGER.info(f"Component ready: {component.component_name}")
+        except CamguardError as e:
+            LOGGER.exception(f"Error during initialization of {component.component_name}: {e.message}",
+                             exc_info=e)
+        # skipcq: PYL-W0703
+        except Exception as e:
+            LOGGER.exception(f"Error during initialization of {component.component_name}", exc_info=e)
+
+        if self.__stopped or run != self.__run:
+            # initialization finished after stop didn't wait for it anymore
+            if step:
+                step.stop()
+            return
+
+        if not step:
+            with self.__steps_lock:
+                self.__steps[component] = None
+                buffered = self.__buffers.pop(component, [])
+            if buffered:
+                LOGGER.warning(f"Dropping {len(buffered)} buffered motion events for {component.component_name}")
+            return
+
+        # buffered events are forwarded outside of the lock, events which arrive meanwhile are buffered
+        # until the buffer is empty, so that the order of the events is kept
+        while True:
+            with self.__steps_lock:
+                buffered = self.__buffers.get(component, [])
+                if not buffered:
+                    self.__buffers.pop(component, None)
+                    self.__steps[component] = step
+                    return
+                self.__buffers[component] = []
+
+            LOGGER.info(f"Forwarding {len(buffered)} buffered motion events to {component.component_name}")
+            for files in buffered:
+                step.send(files)
+
+    @pipelinestep
+    def __component_step(self, component: ComponentsType) -> Generator[None, Any, None]:
+        """motion handler pipeline step: forward to the pipeline step of an optional component,
+        buffers motion events as long as the component is initializing
+
+        Yields:
+            Generator[None, Any, None]: recorded files from the motion handler
+        """
+        while True:
+            files: Any = (yield)
+            with self.__steps_lock:
+                ready = component in self.__steps
+                step = self.__steps.get(component)
+                if not ready:
+                    buffer = self.__buffers.setdefault(component, [])
+                    if len(buffer) >= Camguard.__MAX_BUFFERED_EVENTS:
+                        LOGGER.warning(f"Maximum buffer length of {Camguard.__MAX_BUFFERED_EVENTS} reached for "
+                                       f"{component.component_name}. Loosing motion event: {files}")
+                        continue
+                    LOGGER.debug(f"Component {component.component_name} still initializing, buffering motion event")
+                    buffer.append(files)
+                    continue
+
+            # sent outside of the lock, so that a slow step doesn't block the other components
+            if step:
+                step.send(files)
+            else:
+                LOGGER.debug(f"Component {component.component_name} not available, skipping")
@@ -0,0 +1,108 @@
+import logging
+import time
+from typing import Any, ClassVar, Optional
+
+from camguard.metrics import Metric, Metrics
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CaptureScheduler:
+    """schedules the captures of a motion event at a fixed rate. captures are due at absolute deadlines
+    (start of the event plus a multiple of the interval) on the monotonic clock, so that the duration of a capture
+    doesn't add to the interval. if a capture took longer than the interval, the missed deadlines are skipped
+    instead of capturing them back-to-back, therefore lag doesn't accumulate over the event
+    """
+    # deviations of the achieved frame rate below this fraction of the target are logged as warning
+    _FPS_WARN_RATIO: ClassVar[float] = 0.9
+
+    def __init__(self, interval_sec: float, **labels: Any) -> None:
+        """default initialization
+
+        Args:
+            interval_sec (float): interval between the captures in seconds
+            labels (Any): metric labels of the reported frame rate, i.e. the camera
+        """
+        self.__interval_sec = interval_sec
+        self.__labels = labels
+        self.__start = 0.0
+        self.__deadline = 0.0
+        self.__last_capture = 0.0
+        self.__captures = 0
+        self.__skipped = 0
+
+    @property
+    def target_fps(self) -> Optional[float]:
+        """get target frame rate
+
+        Returns:
+            Optional[float]: captures per second, None if captures are not delayed
+        """
+        return 1.0 / self.__interval_sec if self.__interval_sec > 0 else None
+
+    @property
+    def captures(self) -> int:
+        return self.__captures
+
+    @property
+    def skipped(self) -> int:
+        """get number of deadlines of the current event, which have been skipped
+        """
+        return self.__skipped
+
+    def start(self) -> None:
+        """start an event, the first capture is due immediately
+        """
+        self.__start = time.monotonic()
+        self.__deadline = self.__start
+        self.__last_capture = self.__start
+        self.__captures = 0
+        self.__skipped = 0
+
+    def wait(self) -> int:
+        """wait until the next capture is due, has to be called before every capture
+
+        Returns:
+            int: number of deadlines, which have been skipped because the previous capture was late
+        """
+        if self.__captures:
+            self.__deadline += self.__interval_sec
+        self.__captures += 1
+        now = time.monotonic()
+        if now <= self.__deadline:
+            time.sleep(self.__deadline - now)
+            self.__last_capture = self.__deadline
+            return 0
+
+        self.__last_capture = now
+        if self.__interval_sec <= 0:
+            return 0
+
+        # a capture which is late by less than an interval is taken right away, all earlier deadlines are skipped
+        skipped = int((now - self.__deadline) // self.__interval_sec)
+        self.__deadline += skipped * self.__interval_sec
+        self.__skipped += skipped
+        if skipped:
+            LOGGER.debug(f"Capture is {now - self.__deadline:.3f}s behind schedule, skipped {skipped} captures")
+        return skipped
+
+    def finish(self) -> float:
+        """finish the event and report the achieved frame rate
+
+        Returns:
+            float: achieved captures per second, 0.0 for less than two captures
+        """
+        duration_sec = time.monotonic() - self.__start
+        # the rate is measured from the first to the last capture, handling the last picture doesn't count
+        capture_sec = self.__last_capture - self.__start
+        achieved_fps = (self.__captures - 1) / capture_sec if self.__captures > 1 and capture_sec > 0 else 0.0
+        target_fps = self.target_fps
+        Metrics.gauge(Metric.CAPTURE_FPS, achieved_fps, **self.__labels)
+        target = f"{target_fps:.2f} fps" if target_fps else "unlimited"
+        message = (f"Captured {self.__captures} pictures in {duration_sec:.2f}s with {achieved_fps:.2f} fps "
+                   f"(target: {target}, skipped: {self.__skipped})")
+        if target_fps and self.__captures > 1 and achieved_fps < CaptureScheduler._FPS_WARN_RATIO * target_fps:
+            LOGGER.warning(message)
+        else:
+            LOGGER.info(message)
+        return achieved_fps
@@ -1,11 +1,16 @@
 import logging
 import time
 from datetime import date, datetime
-from typing import Any, ClassVar, List
+from typing import Any, ClassVar, Iterator, List, Optional
 from os import path, makedirs
 
 from .bridge_impl import MotionHandlerImpl
+from .capture_scheduler import CaptureScheduler
+from .memory_file import FilePersistence
+from .metrics import Metric, Metrics
 from .motion_handler_settings import DummyCamSettings
+from .rate_control import RateController
+from .recorded_file import MemoryFile, RecordedFile
 
 LOGGER = logging.getLogger(__name__)
 
@@ -15,6 +20,8 @@ class DummyCam(MotionHandlerImpl):
     this can be used for running camguard in a dummy mode
     """
     _id: ClassVar[int] = 0
+    # simulated picture size at full quality and resolution, only used with rate control
+    _PICTURE_SIZE: ClassVar[int] = 1048576
 
     def __init__(self, settings: DummyCamSettings) -> None:
         """default ctor
@@ -22,23 +29,51 @@ class DummyCam(MotionHandlerImpl):
         Args:
             settings (DummyCamSettings): dummy cam settings object
         """
+        super().__init__()
         self._settings = settings
         self._shutdown: bool = False
         DummyCam._id += 1
+        # identifier of this instance, multiple handlers can be configured
+        self.__id = DummyCam._id
+        self.__persistence: Optional[FilePersistence] = None
+        if self._settings.in_memory and not self._settings.memory_only:
+            self.__persistence = FilePersistence(f"DummyCamPersistence-{self.__id}")
+        self.__scheduler = CaptureScheduler(self._settings.record_interval_sec, camera=self.__id)
+        self.__rate_control: Optional[RateController] = None
+        if self._settings.rate_control:
+            self.__rate_control = RateController(self._settings.rate_control_upload_sec,
+                                                 self._settings.rate_control_max_quality,
+                                                 self._settings.rate_control_min_quality)
+
+    def start(self) -> None:
+        if self.__persistence:
+            self.__persistence.start()
 
     def handle_motion(self) -> Any:
         LOGGER.debug("Triggered by motion")
         return self._record_picture()
 
+    def handle_motion_stream(self) -> Iterator[RecordedFile]:
+        LOGGER.debug("Triggered by motion, streaming pictures")
+        yield from self._record_picture_stream()
+
+    def extend_record(self) -> bool:
+        return self._extend_record_limit(self._settings.record_count, self._settings.max_record_count)
+
     def shutdown(self) -> None:
         """shutdown picam recording 
         """
         LOGGER.info("Shutting down")
         self._shutdown = True
+        if self.__persistence:
+            self.__persistence.stop()
 
-    def _record_picture(self) -> List[str]:
+    def _record_picture(self) -> List[RecordedFile]:
+        return list(self._record_picture_stream())
+
+    def _record_picture_stream(self) -> Iterator[RecordedFile]:
         if self._shutdown:
-            return []
+            return
 
         LOGGER.info("Recording pictures")
 
@@ -52,27 +87,67 @@ class DummyCam(MotionHandlerImpl):
         if not path.exists(record_path):
             makedirs(record_path, exist_ok=True)
 
-        recorded: List[str] = []
-        for i in range(1, self._settings.record_count + 1):
-            filename = self._settings.record_file_format.format(counter=i,
-                                                                timestamp=datetime.today())
-            file_path = path.join(record_path, filename)
-            LOGGER.info(f"Recorded picture to {file_path}")
-
-            with open(file_path, 'w') as stream:
-                stream.write("dummy-mode")
+        self._start_record(self._settings.record_count, self._settings.max_record_count,
+                           self._settings.motion_tail_sec)
+        if self.__rate_control:
+            self.__rate_control.begin(self._settings.record_count)
+        counter = 0
+        self.__scheduler.start()
+        try:
+            while True:
+                skipped = self.__scheduler.wait()
+                if skipped and not self._skip_records(skipped):
+                    break
+
+                counter += 1
+                filename = self._settings.record_file_format.format(counter=counter,
+                                                                    timestamp=datetime.today())
+                file_path = path.join(record_path, filename)
+                capture_start = time.monotonic()
+                data = self.__picture()
+                file: RecordedFile = file_path
+                if self._settings.in_memory:
+                    file = MemoryFile(file_path, data)
+                    if self.__persistence:
+                        self.__persistence.persist(file)
+                else:
+                    with open(file_path, 'wb') as stream:
+                        stream.write(data)
+                Metrics.measure(Metric.CAPTURE_DURATION, time.monotonic() - capture_start, camera=self.id)
+                LOGGER.info(f"Recorded picture to {file_path}")
+
+                record_next = self._record_next()
+                yield file
+
+                if self._shutdown:
+                    LOGGER.debug("Record interrupted by shutdown")
+                    break
+
+                if not record_next:
+                    break
+        finally:
+            self._finish_record()
+            self.__scheduler.finish()
 
-            recorded.append(file_path)
+        LOGGER.info("Finished recording")
 
-            if self._shutdown:
-                LOGGER.debug("Record interrupted by shutdown")
-                break
+    def __picture(self) -> bytes:
+        """create dummy picture content, with rate control its size is simulated by the chosen quality
+        and resolution
 
-            time.sleep(self._settings.record_interval_sec)
+        Returns:
+            bytes: picture content
+        """
+        if not self.__rate_control:
+            return b"dummy-mode"
 
-        LOGGER.info("Finished recording")
-        return recorded
+        quality_steps = (self._settings.rate_control_max_quality - self.__rate_control.quality) / 10
+        size = int(DummyCam._PICTURE_SIZE * self.__rate_control.scale ** 2 * 0.8 ** quality_steps)
+        LOGGER.debug(f"Simulating picture with quality {self.__rate_control.quality}, scale "
+                     f"{self.__rate_control.scale}: {size} bytes")
+        self.__rate_control.update(size)
+        return b"dummy-mode".ljust(size, b"\0")
 
     @property
     def id(self) -> int:
-        return DummyCam._id
+        return self.__id
@@ -6,6 +6,7 @@ from camguard.file_storage_settings import DummyGDriveStorageSettings
 
 from camguard.bridge_impl import FileStorageImpl
 from camguard.gdrive_storage import GDriveUploadManager
+from camguard.recorded_file import RecordedFile
 
 LOGGER = logging.getLogger(__name__)
 
@@ -33,11 +34,11 @@ class DummyGDriveStorage(FileStorageImpl):
     def stop(self) -> None:
         self._daemon.stop()
 
-    def enqueue_files(self, files: List[str]) -> None:
+    def enqueue_files(self, files: List[RecordedFile]) -> None:
         """enqueue file paths for upload
 
         Args:
-            files (List[str]): files to enqueue 
+            files (List[RecordedFile]): files to enqueue 
         """
         self._daemon.enqueue_files(files)
 
@@ -46,7 +47,7 @@ class DummyGDriveStorage(FileStorageImpl):
         return DummyGDriveStorage._id
 
     @classmethod
-    def upload(cls, file: str) -> None:
+    def upload(cls, file: RecordedFile) -> None:
         LOGGER.info(f"Simulating upload (waiting {cls._UPLOAD_SIM_TIME} sec)"
                     f"for: {file}")
         sleep(cls._UPLOAD_SIM_TIME)
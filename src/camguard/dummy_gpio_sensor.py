@@ -1,11 +1,14 @@
 
+import asyncio
 import logging
+from concurrent.futures import Future
 from random import uniform
 from threading import Event, Lock, Thread
 from typing import Callable, ClassVar, Optional
 
 from camguard.motion_detector_settings import DummyGpioSensorSettings
 
+from .async_runtime import AsyncRuntime
 from .exceptions import CamguardError
 
 from .bridge_impl import MotionDetectorImpl
@@ -64,25 +67,56 @@ class DummySensorThread(Thread):
 
 class DummyGpioSensor(MotionDetectorImpl):
     """dummy gpio sensor implementation
-    this can be used for running camguard in a dummy mode
+    this can be used for running camguard in a dummy mode,
+    motion is simulated by a task on the async runtime if available, otherwise by a sensor thread
     """
     __id: ClassVar[int] = 0
+    __MAX_TRIGGER_SECONDS: ClassVar[float] = 10.0
+    __MIN_TRIGGER_SECONDS: ClassVar[float] = 5.0
 
     # skipcq: PYL-W0613
     def __init__(self, settings: DummyGpioSensorSettings) -> None:
         super().__init__()
 
-        self.__sensor_thread = DummySensorThread()
-        self.__sensor_thread.start()
-        self.__sensor_thread.handler = self.__when_activated
+        self.__sensor_thread: Optional[DummySensorThread] = None
+        self.__sensor_task: Optional['Future[None]'] = None
         self.__handler: Optional[Callable[..., None]] = None
         DummyGpioSensor.__id += 1
+        # identifier of this instance, multiple detectors can be configured
+        self.__instance_id = DummyGpioSensor.__id
 
     def register_handler(self, handler: Callable[..., None]) -> None:
         self.__handler = handler
+        if self.__sensor_task or self.__sensor_thread:
+            return
+
+        # simulation starts with the registration instead of the creation, because threads and the runtime
+        # don't survive detaching the daemon process
+        runtime = AsyncRuntime.current()
+        if runtime:
+            self.__sensor_task = runtime.submit(self.__simulate_async())
+        else:
+            self.__sensor_thread = DummySensorThread()
+            self.__sensor_thread.start()
+            self.__sensor_thread.handler = self.__when_activated
 
     def shutdown(self) -> None:
-        self.__sensor_thread.stop()
+        if self.__sensor_task:
+            LOGGER.info("Shutting down gracefully")
+            self.__sensor_task.cancel()
+        if self.__sensor_thread:
+            self.__sensor_thread.stop()
+
+    async def __simulate_async(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(round(uniform(DummyGpioSensor.__MIN_TRIGGER_SECONDS,
+                                                  DummyGpioSensor.__MAX_TRIGGER_SECONDS), 1))
+                LOGGER.debug("Simulating motion detection")
+                self.__when_activated()
+        except asyncio.CancelledError:
+            LOGGER.info("Finished")
+            raise
 
     def __when_activated(self) -> None:
         if self.disabled:
@@ -93,4 +127,4 @@ class DummyGpioSensor(MotionDetectorImpl):
 
     @property
     def id(self) -> int:
-        return DummyGpioSensor.__id
+        return self.__instance_id
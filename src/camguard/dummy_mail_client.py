@@ -2,12 +2,15 @@ import logging
 import ssl
 from email.message import EmailMessage
 from smtplib import SMTP as Client, SMTPConnectError
+from os import path
 from typing import ClassVar, List
 
 from camguard.bridge_impl import MailClientImpl
 from camguard.certs import MAIL_CERT
 from camguard.dummy_mail_server import DummyMailServer
 from camguard.mail_client_settings import DummyMailClientSettings
+from camguard.metrics import Metric, Metrics
+from camguard.recorded_file import FrameVariant, RecordedFile, file_name
 
 LOGGER = logging.getLogger(__name__)
 
@@ -27,7 +30,7 @@ class DummyMailClient(MailClientImpl):
         self._ssl_context.load_verify_locations(MAIL_CERT)
         self._ssl_context.check_hostname = False
 
-    def send_mail(self, files: List[str]) -> None:
+    def send_mail(self, files: List[RecordedFile]) -> None:
         LOGGER.info(f"Sending mail with: {files}")
         sender = self._settings.sender_mail
         receiver = self._settings.receiver_mail
@@ -45,17 +48,23 @@ class DummyMailClient(MailClientImpl):
                 client.send_message(self._create_msg(sender, receiver, files))
 
         except (TimeoutError, RuntimeError) as server_err:
+            Metrics.count(Metric.MAIL_FAILURES)
             LOGGER.error(f"Error while start mail server: {self._settings.hostname}:{DummyMailClient._PORT}",
                          exc_info=server_err)
         except (SMTPConnectError, OSError) as client_err:
+            Metrics.count(Metric.MAIL_FAILURES)
             LOGGER.error(f"Error while connecting to mail server: {self._settings.hostname}:{DummyMailClient._PORT}",
                          exc_info=client_err)
 
-    def _create_msg(self, sender: str, receiver: str, files: List[str]) -> EmailMessage:
+    def _create_msg(self, sender: str, receiver: str, files: List[RecordedFile]) -> EmailMessage:
+        recorded, variants = FrameVariant.select(files, self._settings.attachment_variant)
         msg: EmailMessage = EmailMessage()
         msg.add_header("Subject", self.__class__.__name__ + " test mail")
         msg.add_header("From", sender)
         msg.add_header("To", receiver)
-        msg.set_content(DummyMailClient._MAIL_MSG.format(files=",\n".join(files)))
+        msg.set_content(DummyMailClient._MAIL_MSG.format(files=",\n".join(file_name(file) for file in recorded)))
+        for variant in variants:
+            msg.add_attachment(variant.data.tobytes(), maintype="image", subtype="jpeg",
+                               filename=path.basename(variant.name))
 
         return msg
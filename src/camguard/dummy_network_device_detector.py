@@ -1,9 +1,13 @@
+import asyncio
 import logging
+from concurrent.futures import Future, wait
 from random import uniform, random
 from threading import Event, Thread
 import threading
 from typing import Callable, List, Optional, Tuple
+from camguard.async_runtime import AsyncRuntime
 from camguard.bridge_impl import NetworkDeviceDetectorImpl
+from camguard.metrics import Metric, Metrics
 from camguard.network_device_detector_settings import DummyNetworkDeviceDetectorSettings
 
 LOGGER = logging.getLogger(__name__)
@@ -27,6 +31,7 @@ class DummyNetworkDeviceDetector(NetworkDeviceDetectorImpl):
         self.__max_detection_seconds = 20.0
         self.__handler: Optional[Callable[[List[Tuple[str, bool]]], None]] = None
         self.__thread: Optional[Thread] = None
+        self.__task: Optional['Future[None]'] = None
 
     def register_handler(self, handler: Callable[[List[Tuple[str, bool]]], None]) -> None:
         """registers a given handler, which will be called on device check
@@ -41,10 +46,15 @@ class DummyNetworkDeviceDetector(NetworkDeviceDetectorImpl):
         """start the detection thread, stops an already running threads
         """
         LOGGER.info("Starting detector thread")
-        if self.__thread:
+        if self.__thread or self.__task:
             LOGGER.debug("Detector thread already running")
             self.stop()
 
+        runtime = AsyncRuntime.current()
+        if runtime:
+            self.__task = runtime.submit(self.__do_work_async())
+            return
+
         self.__thread = threading.Thread(target=self.__do_work)
         self.__thread.start()
 
@@ -52,6 +62,14 @@ class DummyNetworkDeviceDetector(NetworkDeviceDetectorImpl):
         """stop nmap device detection thread, does nothing is thread has never been started
         """
         LOGGER.info("Stopping detector thread")
+        if self.__task:
+            # cancels waiting for the next detection interval
+            self.__task.cancel()
+            wait([self.__task], timeout=4 * self.__max_detection_seconds)
+            self.__task = None
+            LOGGER.info("Shutdown successful")
+            return
+
         # stop check thread
         if not self.__thread:
             LOGGER.debug("Detector thread has never been started")
@@ -68,17 +86,31 @@ class DummyNetworkDeviceDetector(NetworkDeviceDetectorImpl):
         # check event in random interval
         while not self.__stop_event.wait(round(uniform(self.__min_detection_seconds,
                                                        self.__max_detection_seconds), 1)):
-            # check for device in network
-            LOGGER.debug("Simulating device detection")
-
-            # randomize found device
-            found_device: bool = bool(round(random()))
-            found_devices: List[Tuple[str, bool]] = [('Dummy', found_device)]
-
-            LOGGER.debug(f"Device detection state: {found_devices}")
-
-            if self.__handler:
-                # call handler and notice about detection status
-                self.__handler(found_devices)
+            self.__simulate_detection()
 
         LOGGER.info("Exiting device check thread")
+
+    async def __do_work_async(self) -> None:
+        LOGGER.info("Starting device check task")
+        try:
+            while True:
+                await asyncio.sleep(round(uniform(self.__min_detection_seconds, self.__max_detection_seconds), 1))
+                self.__simulate_detection()
+        except asyncio.CancelledError:
+            LOGGER.info("Exiting device check task")
+            raise
+
+    def __simulate_detection(self) -> None:
+        # check for device in network
+        LOGGER.debug("Simulating device detection")
+
+        # randomize found device
+        found_device: bool = bool(round(random()))
+        found_devices: List[Tuple[str, bool]] = [('Dummy', found_device)]
+
+        Metrics.gauge(Metric.NETWORK_DEVICES_FOUND, int(found_device))
+        LOGGER.debug(f"Device detection state: {found_devices}")
+
+        if self.__handler:
+            # call handler and notice about detection status
+            self.__handler(found_devices)
@@ -0,0 +1,58 @@
+import logging
+from typing import Any, Callable, ClassVar
+
+from camguard.queue_worker import QueueWorker
+
+LOGGER = logging.getLogger(__name__)
+
+
+class EventDispatcher(QueueWorker):
+    """dispatches events from a bounded queue to a handler function on a dedicated dispatcher thread.
+    this decouples event sources (i.e. gpio callbacks) from event handling, dispatching an event returns immediately.
+    the dispatcher keeps its thread in asyncio mode as well, handling a motion event records for its whole duration
+    and would compete with uploads and network scans for the workers of the runtime
+    """
+    _KIND: ClassVar[str] = "dispatcher"
+
+    def __init__(self, name: str, handler: Callable[[Any], None], queue_size: int = 10) -> None:
+        """default initialization
+
+        Args:
+            name (str): name of the dispatcher thread
+            handler (Callable[[Any], None]): handler function which will be called for every dispatched event
+            queue_size (int, optional): maximum number of pending events. Defaults to 10.
+        """
+        super().__init__(name, queue_size=queue_size, use_runtime=False)
+        self.__handler = handler
+        self.__dispatched = 0
+
+    @property
+    def dispatched(self) -> int:
+        """get number of events which have been passed to the handler
+
+        Returns:
+            int: dispatched event count
+        """
+        with self._lock:
+            return self.__dispatched
+
+    def dispatch(self, event: Any) -> bool:
+        """enqueue event for the dispatcher thread, does not block
+
+        Args:
+            event (Any): the event to pass to the handler
+
+        Returns:
+            bool: True if event was enqueued, False if it was dropped due to a full queue
+        """
+        return self.put(event)
+
+    def _handle(self, value: Any) -> None:
+        try:
+            self.__handler(value)
+            with self._lock:
+                self.__dispatched += 1
+        # skipcq: PYL-W0703
+        except Exception as e:
+            # errors do not stop the dispatcher, so that the following events are still handled
+            LOGGER.exception(f"{self.name}: Error while handling event: {value}", exc_info=e)
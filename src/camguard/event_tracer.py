@@ -0,0 +1,439 @@
+import logging
+from collections import deque
+from json import dumps
+from math import ceil
+from threading import Lock, local
+from time import monotonic
+from typing import Any, ClassVar, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from camguard.extended_enum import ExtendedEnum
+from camguard.recorded_file import FrameVariant, RecordedFile, file_name
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TraceMark(ExtendedEnum):
+    """timestamps, which are traced for a motion event
+    """
+    ACTIVATION = "activation"
+    DISPATCH = "dispatch"
+    CAMERA_OPEN = "camera_open"
+    FRAME = "frame"
+    ENQUEUE = "enqueue"
+    UPLOAD_START = "upload_start"
+    UPLOAD_END = "upload_end"
+    MAIL_SENT = "mail_sent"
+
+
+class MotionEvent:
+    """trace of a single motion event, holds the monotonic timestamps of every trace mark
+    and the recorded files of the event. access has to be synchronized by the tracer
+    """
+
+    def __init__(self, event_id: int, detector_id: int, activation: float) -> None:
+        """default initialization
+
+        Args:
+            event_id (int): unique identifier of the event
+            detector_id (int): identifier of the motion detector which detected motion
+            activation (float): monotonic timestamp of the sensor activation
+        """
+        self.__id = event_id
+        self.__detector_id = detector_id
+        self.__marks: Dict[TraceMark, List[float]] = {TraceMark.ACTIVATION: [activation]}
+        # marks of every recorded file, to check if all files passed the expected steps
+        self.__files: Dict[str, Set[TraceMark]] = {}
+        self.__handled = False
+
+    @property
+    def id(self) -> int:
+        return self.__id
+
+    @property
+    def detector_id(self) -> int:
+        return self.__detector_id
+
+    @property
+    def activation(self) -> float:
+        return self.__marks[TraceMark.ACTIVATION][0]
+
+    @property
+    def files(self) -> List[str]:
+        return list(self.__files)
+
+    @property
+    def handled(self) -> bool:
+        """get handled state
+
+        Returns:
+            bool: True if the motion handler pipeline finished handling the event
+        """
+        return self.__handled
+
+    @handled.setter
+    def handled(self, value: bool) -> None:
+        self.__handled = value
+
+    def mark(self, mark: TraceMark, timestamp: float) -> None:
+        """add timestamp for a trace mark
+
+        Args:
+            mark (TraceMark): the trace mark
+            timestamp (float): monotonic timestamp
+        """
+        self.__marks.setdefault(mark, []).append(timestamp)
+
+    def mark_file(self, file: str, mark: TraceMark) -> None:
+        """record that a file passed a trace mark
+
+        Args:
+            file (str): name of a recorded file of this event
+            mark (TraceMark): the trace mark
+        """
+        self.__files.setdefault(file, set()).add(mark)
+
+    def add_file(self, file: str) -> None:
+        self.__files.setdefault(file, set())
+
+    def passed(self, marks: Iterable[TraceMark]) -> bool:
+        """check if every file of the event passed the given marks
+
+        Args:
+            marks (Iterable[TraceMark]): the expected marks
+
+        Returns:
+            bool: True if all files have been marked with all marks
+        """
+        expected = set(marks)
+        return all(expected <= file_marks for file_marks in self.__files.values())
+
+    def first(self, mark: TraceMark) -> Optional[float]:
+        timestamps = self.__marks.get(mark)
+        return timestamps[0] if timestamps else None
+
+    def last(self, mark: TraceMark) -> Optional[float]:
+        timestamps = self.__marks.get(mark)
+        return timestamps[-1] if timestamps else None
+
+    def end(self) -> float:
+        """get timestamp of the latest trace mark
+
+        Returns:
+            float: monotonic timestamp
+        """
+        return max(timestamps[-1] for timestamps in self.__marks.values())
+
+    def to_record(self, complete: bool, spans: Dict[str, float]) -> Dict[str, Any]:
+        """create structured record of the event, timestamps are milliseconds since the sensor activation
+
+        Args:
+            complete (bool): False if the event expired before it passed all expected steps
+            spans (Dict[str, float]): spans of the event in milliseconds
+
+        Returns:
+            Dict[str, Any]: the record
+        """
+        return {
+            "event_id": self.__id,
+            "detector_id": self.__detector_id,
+            "complete": complete,
+            "files": len(self.__files),
+            "marks": {mark.value: [round((timestamp - self.activation) * 1000, 1) for timestamp in timestamps]
+                      for mark, timestamps in self.__marks.items()},
+            "spans": spans
+        }
+
+
+class EventTracer:
+    """traces the latency of motion events from the sensor activation through the motion handler pipeline.
+    every event is emitted as a single structured log record when it passed all expected steps, rolling percentiles
+    of the spans are logged periodically. the tracer is optional, components check for the current tracer
+    and skip tracing if there is none.
+    the event which is handled by the current thread is tracked thread locally, so that the motion handler
+    and its implementation can add marks without passing the event. files are assigned to their event, so that
+    pipeline steps on other threads can add marks for the files they receive.
+    """
+    __current: ClassVar[Optional['EventTracer']] = None
+    __current_lock: ClassVar[Lock] = Lock()
+    # span name -> (start mark, end mark, use last end timestamp), start is always the first timestamp
+    SPANS: ClassVar[Dict[str, Tuple[TraceMark, TraceMark, bool]]] = {
+        "dispatch": (TraceMark.ACTIVATION, TraceMark.DISPATCH, False),
+        "camera_open": (TraceMark.DISPATCH, TraceMark.CAMERA_OPEN, False),
+        "first_frame": (TraceMark.ACTIVATION, TraceMark.FRAME, False),
+        "record": (TraceMark.CAMERA_OPEN, TraceMark.FRAME, True),
+        "upload_wait": (TraceMark.ENQUEUE, TraceMark.UPLOAD_START, False),
+        "upload": (TraceMark.UPLOAD_START, TraceMark.UPLOAD_END, True),
+        "mail": (TraceMark.ACTIVATION, TraceMark.MAIL_SENT, True),
+    }
+    PERCENTILES: ClassVar[Tuple[int, ...]] = (50, 95, 99)
+
+    def __init__(self, expected: Iterable[TraceMark] = (), window_size: int = 100, summary_interval: int = 10,
+                 timeout_sec: float = 300.0) -> None:
+        """default initialization
+
+        Args:
+            expected (Iterable[TraceMark], optional): marks every file has to pass until an event is complete,
+            i.e. upload end if there is a file storage. Defaults to ().
+            window_size (int, optional): number of events for the rolling percentiles. Defaults to 100.
+            summary_interval (int, optional): log percentiles every number of events, 0 disables logging.
+            Defaults to 10.
+            timeout_sec (float, optional): seconds after activation, when an event is emitted as incomplete.
+            Defaults to 300.0.
+        """
+        self.__expected = list(expected)
+        self.__summary_interval = summary_interval
+        self.__timeout_sec = timeout_sec
+        self.__lock = Lock()
+        self.__local = local()
+        self.__next_id = 1
+        self.__events: Dict[int, MotionEvent] = {}
+        self.__file_events: Dict[str, MotionEvent] = {}
+        self.__windows: Dict[str, Deque[float]] = {span: deque(maxlen=window_size)
+                                                   for span in list(EventTracer.SPANS) + ["total"]}
+        self.__traced = 0
+        self.__incomplete = 0
+
+    @classmethod
+    def current(cls) -> Optional['EventTracer']:
+        """get the tracer, which has been set as current tracer for all components - thread safe
+
+        Returns:
+            Optional[EventTracer]: the current tracer, None if tracing is disabled
+        """
+        with EventTracer.__current_lock:
+            return EventTracer.__current
+
+    @classmethod
+    def set_current(cls, tracer: Optional['EventTracer']) -> None:
+        """set the current tracer for all components - thread safe
+
+        Args:
+            tracer (Optional[EventTracer]): the tracer to use, None for disabling tracing
+        """
+        with EventTracer.__current_lock:
+            EventTracer.__current = tracer
+
+    @classmethod
+    def trace(cls, mark: TraceMark) -> None:
+        """add mark to the event of the current thread, if tracing is enabled
+
+        Args:
+            mark (TraceMark): the trace mark
+        """
+        tracer = cls.current()
+        if tracer:
+            tracer.mark(mark)
+
+    @classmethod
+    def trace_files(cls, files: List[RecordedFile], mark: TraceMark) -> None:
+        """add mark to the events of the given files, if tracing is enabled
+
+        Args:
+            files (List[RecordedFile]): recorded files
+            mark (TraceMark): the trace mark
+        """
+        tracer = cls.current()
+        if tracer:
+            tracer.mark_files(files, mark)
+
+    @classmethod
+    def trace_record(cls, files: List[RecordedFile]) -> None:
+        """assign recorded files to the event of the current thread, if tracing is enabled
+
+        Args:
+            files (List[RecordedFile]): recorded files
+        """
+        tracer = cls.current()
+        if tracer:
+            tracer.add_files(files)
+
+    @property
+    def traced_events(self) -> int:
+        """get number of emitted events
+
+        Returns:
+            int: emitted event count, including incomplete events
+        """
+        with self.__lock:
+            return self.__traced
+
+    @property
+    def incomplete_events(self) -> int:
+        """get number of events, which expired before they passed all expected steps
+
+        Returns:
+            int: incomplete event count
+        """
+        with self.__lock:
+            return self.__incomplete
+
+    def begin(self, detector_id: int, activation: Optional[float] = None) -> MotionEvent:
+        """begin tracing of a new motion event
+
+        Args:
+            detector_id (int): identifier of the motion detector which detected motion
+            activation (Optional[float], optional): monotonic timestamp of the activation. Defaults to now.
+
+        Returns:
+            MotionEvent: the traced event
+        """
+        now = monotonic()
+        with self.__lock:
+            self.__expire(now)
+            event = MotionEvent(self.__next_id, detector_id, activation if activation is not None else now)
+            self.__next_id += 1
+            self.__events[event.id] = event
+        return event
+
+    def discard(self, event: MotionEvent) -> None:
+        """stop tracing of an event without emitting it, i.e. if it has been dropped
+
+        Args:
+            event (MotionEvent): the traced event
+        """
+        with self.__lock:
+            self.__remove(event)
+
+    def activate(self, event: MotionEvent) -> None:
+        """set event as the event of the current thread and mark its dispatch
+
+        Args:
+            event (MotionEvent): the traced event
+        """
+        self.__local.event = event
+        with self.__lock:
+            event.mark(TraceMark.DISPATCH, monotonic())
+
+    def deactivate(self) -> None:
+        """finish handling of the event of the current thread,
+        the event is emitted as soon as all of its files passed the expected steps
+        """
+        event: Optional[MotionEvent] = getattr(self.__local, 'event', None)
+        self.__local.event = None
+        if not event:
+            return
+
+        with self.__lock:
+            event.handled = True
+            self.__check_complete(event)
+
+    def mark(self, mark: TraceMark) -> None:
+        """add mark to the event of the current thread, does nothing if there is none
+
+        Args:
+            mark (TraceMark): the trace mark
+        """
+        event: Optional[MotionEvent] = getattr(self.__local, 'event', None)
+        if not event:
+            return
+
+        with self.__lock:
+            event.mark(mark, monotonic())
+
+    def add_files(self, files: List[RecordedFile]) -> None:
+        """assign recorded files to the event of the current thread, does nothing if there is none
+
+        Args:
+            files (List[RecordedFile]): recorded files
+        """
+        event: Optional[MotionEvent] = getattr(self.__local, 'event', None)
+        if not event:
+            return
+
+        with self.__lock:
+            for file in files:
+                # files are traced by name, memory files are named like their persisted file
+                name = file_name(file)
+                event.add_file(name)
+                self.__file_events[name] = event
+
+    def mark_files(self, files: List[RecordedFile], mark: TraceMark) -> None:
+        """add mark to the events of the given files, unknown files are ignored
+
+        Args:
+            files (List[RecordedFile]): recorded files
+            mark (TraceMark): the trace mark
+        """
+        now = monotonic()
+        with self.__lock:
+            events: Dict[int, MotionEvent] = {}
+            for file in files:
+                # variants are traced as their source picture
+                name = file.source if isinstance(file, FrameVariant) else file_name(file)
+                event = self.__file_events.get(name)
+                if event:
+                    event.mark_file(name, mark)
+                    events[event.id] = event
+
+            for event in events.values():
+                # one timestamp per event, files which are passed together share it
+                event.mark(mark, now)
+                self.__check_complete(event)
+            self.__expire(now)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """get rolling percentiles of the spans of the latest complete events
+
+        Returns:
+            Dict[str, Dict[str, float]]: span name -> percentile name (i.e. 'p95') -> milliseconds,
+            spans without values are omitted
+        """
+        with self.__lock:
+            return self.__summarize()
+
+    def __summarize(self) -> Dict[str, Dict[str, float]]:
+        """has to be called with lock held
+        """
+        windows = {span: sorted(values) for span, values in self.__windows.items() if values}
+        return {span: {f"p{percentile}": EventTracer.__percentile(values, percentile)
+                       for percentile in EventTracer.PERCENTILES}
+                for span, values in windows.items()}
+
+    @staticmethod
+    def __percentile(values: List[float], percentile: int) -> float:
+        # nearest rank of sorted values
+        rank = max(1, ceil(percentile / 100 * len(values)))
+        return values[rank - 1]
+
+    def __check_complete(self, event: MotionEvent) -> None:
+        """emit event, if it has been handled and all files passed the expected steps, has to be called with lock held
+        """
+        if event.id in self.__events and event.handled and event.passed(self.__expected):
+            self.__emit(event, complete=True)
+
+    def __expire(self, now: float) -> None:
+        """emit events as incomplete, which exceeded the timeout, has to be called with lock held
+        """
+        for event in [event for event in self.__events.values() if now - event.activation > self.__timeout_sec]:
+            self.__emit(event, complete=False)
+
+    def __remove(self, event: MotionEvent) -> None:
+        self.__events.pop(event.id, None)
+        for file in event.files:
+            self.__file_events.pop(file, None)
+
+    def __emit(self, event: MotionEvent, complete: bool) -> None:
+        """emit structured record of an event and add its spans to the rolling windows, has to be called with lock held
+        """
+        self.__remove(event)
+        spans: Dict[str, float] = {}
+        for span, (start_mark, end_mark, use_last) in EventTracer.SPANS.items():
+            start = event.first(start_mark)
+            end = event.last(end_mark) if use_last else event.first(end_mark)
+            if start is not None and end is not None:
+                spans[span] = round((end - start) * 1000, 1)
+        spans["total"] = round((event.end() - event.activation) * 1000, 1)
+
+        if complete:
+            # incomplete events would distort the percentiles
+            for span, value in spans.items():
+                self.__windows[span].append(value)
+        else:
+            self.__incomplete += 1
+
+        self.__traced += 1
+        LOGGER.info(f"Motion event trace: {dumps(event.to_record(complete, spans))}")
+        if self.__summary_interval > 0 and self.__traced % self.__summary_interval == 0:
+            LOGGER.info("Motion event latency summary [ms]: " + ", ".join(
+                f"{span} " + "/".join(f"{name} {value:.1f}" for name, value in percentiles.items())
+                for span, percentiles in self.__summarize().items()))
@@ -0,0 +1,122 @@
+import logging
+from os import path
+from typing import Any, ClassVar, Dict, Generator, List, Optional
+
+# pillow is an optional dependency, which is only needed for near-duplicate frame suppression
+from PIL import Image  # type: ignore reportMissingImports
+
+from camguard.bridge_api import pipelinestep
+from camguard.event_tracer import EventTracer, TraceMark
+from camguard.metrics import Metric, Metrics
+from camguard.recorded_file import RecordedFile, file_name, open_file
+
+LOGGER = logging.getLogger(__name__)
+
+
+def difference_hash(file: RecordedFile) -> Optional[int]:
+    """compute the 64 bit difference hash (dhash) of a picture. the picture is shrunk to 9x8 grayscale pixels
+    and every bit tells, if a pixel is brighter than its right neighbour. pictures of the same scene have
+    hashes with a small hamming distance, even if they differ by noise or compression.
+    jpeg pictures are decoded in reduced size, which skips most of the decoding work
+
+    Args:
+        file (RecordedFile): path of the picture or memory file
+
+    Returns:
+        Optional[int]: the hash, None if the file is not a picture
+    """
+    try:
+        # raises if the file is missing, instead of treating it like a file which is no picture
+        stream = open_file(file)
+        with stream, Image.open(stream) as image:
+            image.draft('L', (FrameDeduplicator.HASH_WIDTH * 8, FrameDeduplicator.HASH_HEIGHT * 8))
+            pixels = image.convert('L').resize((FrameDeduplicator.HASH_WIDTH + 1, FrameDeduplicator.HASH_HEIGHT),
+                                               Image.BILINEAR).tobytes()
+    except OSError as e:
+        LOGGER.debug(f"Not hashing {file_name(file)}: {e}")
+        return None
+
+    value = 0
+    row_length = FrameDeduplicator.HASH_WIDTH + 1
+    for row in range(0, len(pixels), row_length):
+        for col in range(row, row + FrameDeduplicator.HASH_WIDTH):
+            value = (value << 1) | (pixels[col] > pixels[col + 1])
+    return value
+
+
+class FrameDeduplicator:
+    """suppresses near-duplicate pictures, i.e. the pictures of a static scene after the subject left.
+    a picture is dropped, if the hamming distance of its difference hash to the previous kept picture
+    of the same record folder is within the maximum distance. files which are no pictures are always kept
+    """
+    HASH_WIDTH: ClassVar[int] = 8
+    HASH_HEIGHT: ClassVar[int] = 8
+
+    def __init__(self, max_distance: int) -> None:
+        """default initialization
+
+        Args:
+            max_distance (int): maximum hamming distance (0-64) of a near-duplicate picture
+        """
+        self.__max_distance = max_distance
+        # hash of the previous kept picture by record folder, pictures of different cameras aren't compared
+        self.__previous: Dict[str, int] = {}
+        self.__suppressed = 0
+
+    @property
+    def suppressed(self) -> int:
+        """get number of suppressed pictures
+
+        Returns:
+            int: suppressed pictures since creation
+        """
+        return self.__suppressed
+
+    def filter_files(self, files: List[RecordedFile]) -> List[RecordedFile]:
+        """drop near-duplicate pictures
+
+        Args:
+            files (List[RecordedFile]): recorded files in record order
+
+        Returns:
+            List[RecordedFile]: files which have been kept
+        """
+        kept: List[RecordedFile] = []
+        for file in files:
+            value = difference_hash(file)
+            if value is None:
+                kept.append(file)
+                continue
+
+            folder = path.dirname(file_name(file))
+            previous = self.__previous.get(folder)
+            if previous is not None and bin(value ^ previous).count('1') <= self.__max_distance:
+                LOGGER.debug(f"Suppressing near-duplicate picture: {file_name(file)}")
+                self.__suppressed += 1
+                Metrics.count(Metric.FRAMES_SUPPRESSED)
+                # suppressed pictures are done for the file storage, the motion event doesn't wait for them
+                EventTracer.trace_files([file], TraceMark.UPLOAD_END)
+                continue
+
+            self.__previous[folder] = value
+            kept.append(file)
+
+        return kept
+
+    @pipelinestep
+    def deduplicate(self, target: Generator[None, Any, None]) -> Generator[None, List[RecordedFile], None]:
+        """motion handler pipeline step: forward files to the target step without near-duplicate pictures
+
+        Args:
+            target (Generator[None, Any, None]): pipeline step, which receives the kept files
+
+        Yields:
+            Generator[None, List[RecordedFile], None]: recorded files
+        """
+        while True:
+            files: List[RecordedFile] = (yield)
+            kept = self.filter_files(files)
+            if len(kept) < len(files):
+                LOGGER.info(f"Suppressed {len(files) - len(kept)} of {len(files)} near-duplicate pictures")
+            if kept:
+                target.send(kept)
@@ -0,0 +1,345 @@
+import logging
+import os
+import time
+from threading import Event, Thread
+from typing import Any, Callable, ClassVar, Iterator, List, Optional, Sequence, Tuple
+
+# numpy is an optional dependency, which is only needed for camera based motion detection
+import numpy as np  # type: ignore reportMissingImports
+
+from camguard.bridge_impl import MotionDetectorImpl
+from camguard.exceptions import ConfigurationError
+from camguard.metrics import Metric, Metrics
+from camguard.motion_detector_settings import FrameDiffDetectorSettings
+from camguard.shared_camera import SharedCamera, SplitterRecording
+
+LOGGER = logging.getLogger(__name__)
+
+
+def region_mask(shape: Tuple[int, ...], regions: Sequence[Tuple[float, float, float, float]]) -> Optional[np.ndarray]:
+    """create mask of the regions of interest for frames of the given shape
+
+    Args:
+        shape (Tuple[int, ...]): frame shape as (height, width)
+        regions (Sequence[Tuple[float, float, float, float]]): regions of interest as (x, y, width, height)
+        relative to the frame size
+
+    Raises:
+        ConfigurationError: if the regions don't cover any pixel
+
+    Returns:
+        Optional[np.ndarray]: the mask, None for the whole frame if no regions are given
+    """
+    if not regions:
+        return None
+
+    height, width = shape[:2]
+    mask = np.zeros(shape[:2], dtype=bool)
+    for x, y, region_width, region_height in regions:
+        mask[int(round(y * height)):int(round((y + region_height) * height)),
+             int(round(x * width)):int(round((x + region_width) * width))] = True
+    if not mask.any():
+        raise ConfigurationError(f"Regions don't cover any pixel of the frame: {regions}")
+    return mask
+
+
+class FrameDiffModel:
+    """running background model, which compares grayscale frames against an exponentially weighted average
+    of the previous frames. all operations are vectorized and work on buffers, which are allocated once
+    for the first frame, so that processing a frame doesn't allocate memory
+    """
+
+    def __init__(self, pixel_threshold: int, background_rate: float,
+                 regions: Sequence[Tuple[float, float, float, float]] = ()) -> None:
+        """default initialization
+
+        Args:
+            pixel_threshold (int): minimum intensity difference of a changed pixel, between 0 and 255
+            background_rate (float): weight of a new frame in the background model, between 0.0 and 1.0
+            regions (Sequence[Tuple[float, float, float, float]], optional): regions of interest as
+            (x, y, width, height) relative to the frame size. Defaults to the whole frame.
+
+        Raises:
+            ConfigurationError: if a region is not given by four values
+        """
+        if any(len(region) != 4 for region in regions):
+            raise ConfigurationError(f"Regions have to be given as [x, y, width, height]: {regions}")
+
+        self.__pixel_threshold = pixel_threshold
+        self.__background_rate = background_rate
+        self.__regions = regions
+        self.__background: Optional[np.ndarray] = None
+        self.__diff: Optional[np.ndarray] = None
+        self.__abs_diff: Optional[np.ndarray] = None
+        self.__changed: Optional[np.ndarray] = None
+        self.__mask: Optional[np.ndarray] = None
+        self.__pixels = 0
+
+    def reset(self) -> None:
+        """drop the background, the next frame is used as new background
+        """
+        self.__background = None
+
+    def update(self, frame: np.ndarray) -> float:
+        """compare frame against the background and blend it into the background afterwards
+
+        Args:
+            frame (np.ndarray): grayscale frame, all frames must have the same shape
+
+        Returns:
+            float: fraction of changed pixels within the regions of interest, between 0.0 and 1.0
+        """
+        if self.__background is None:
+            self.__init_buffers(frame.shape)
+            self.__background = frame.astype(np.float32)
+            return 0.0
+
+        np.subtract(frame, self.__background, out=self.__diff)
+        np.abs(self.__diff, out=self.__abs_diff)
+        np.greater(self.__abs_diff, self.__pixel_threshold, out=self.__changed)
+        if self.__mask is not None:
+            np.logical_and(self.__changed, self.__mask, out=self.__changed)
+        changed = np.count_nonzero(self.__changed) / self.__pixels
+
+        # background += rate * (frame - background)
+        np.multiply(self.__diff, self.__background_rate, out=self.__diff)
+        np.add(self.__background, self.__diff, out=self.__background)
+        return changed
+
+    def __init_buffers(self, shape: Tuple[int, ...]) -> None:
+        if self.__diff is not None and self.__diff.shape == shape:
+            return
+
+        self.__diff = np.empty(shape, dtype=np.float32)
+        self.__abs_diff = np.empty(shape, dtype=np.float32)
+        self.__changed = np.empty(shape, dtype=bool)
+        self.__mask = region_mask(shape, self.__regions)
+        self.__pixels = int(np.count_nonzero(self.__mask)) if self.__mask is not None else shape[0] * shape[1]
+
+
+class PiCameraFrames(SplitterRecording):
+    """low resolution grayscale frames of the persistent camera of a motion handler, which are taken from
+    the luminance plane of a yuv recording on a splitter port. frames are only available while the camera is open
+    """
+    _WAIT_SEC: ClassVar[float] = 0.5
+
+    def __init__(self, camera_number: int, resolution: Tuple[int, int], stop_event: Event) -> None:
+        """default initialization
+
+        Args:
+            camera_number (int): number of the shared camera
+            resolution (Tuple[int, int]): frame resolution as (width, height)
+            stop_event (Event): stops waiting for frames
+        """
+        self.__camera_number = camera_number
+        self.__resolution = resolution
+        self.__stop_event = stop_event
+        width, height = resolution
+        # yuv frames are padded to a multiple of 32 columns and 16 rows
+        self.__shape = ((height + 15) // 16 * 16, (width + 31) // 32 * 32)
+        self.__frame: Optional[bytes] = None
+        self.__frame_ready = Event()
+
+    def start(self, pi_camera: Any, splitter_port: int) -> None:
+        pi_camera.start_recording(self, format='yuv', resize=self.__resolution, splitter_port=splitter_port)
+
+    def write(self, data: bytes) -> int:
+        """keep the latest frame, called by the encoder for every frame of the recording
+
+        Args:
+            data (bytes): yuv frame
+
+        Returns:
+            int: number of written bytes
+        """
+        # the luminance plane comes first, chrominance planes are ignored
+        if len(data) >= self.__shape[0] * self.__shape[1]:
+            self.__frame = data
+            self.__frame_ready.set()
+        return len(data)
+
+    def frames(self) -> Iterator[np.ndarray]:
+        """take the latest frame whenever the next frame is requested, the camera is shared until the iterator
+        is closed or the stop event is set. while the camera is closed, i.e. while disarmed, there are no frames
+
+        Yields:
+            Iterator[np.ndarray]: grayscale frame
+        """
+        width, height = self.__resolution
+        SharedCamera.attach(self.__camera_number, self)
+        try:
+            while not self.__stop_event.is_set():
+                if not self.__frame_ready.wait(PiCameraFrames._WAIT_SEC):
+                    continue
+
+                self.__frame_ready.clear()
+                frame = np.frombuffer(self.__frame, dtype=np.uint8,  # type: ignore
+                                      count=self.__shape[0] * self.__shape[1]).reshape(self.__shape)
+                yield frame[:height, :width]
+        finally:
+            SharedCamera.detach(self.__camera_number, self)
+
+
+class RecordedFrames:
+    """frames, which have been recorded as numpy files (.npy), i.e. grayscale frames or motion vector arrays.
+    they are replayed in file name order
+    """
+    _EXTENSION: ClassVar[str] = ".npy"
+
+    def __init__(self, replay_path: str) -> None:
+        self.__replay_path = os.path.expandvars(os.path.expanduser(replay_path))
+
+    def frames(self) -> Iterator[np.ndarray]:
+        """load recorded frames
+
+        Raises:
+            ConfigurationError: if the replay path is not a directory
+
+        Yields:
+            Iterator[np.ndarray]: recorded frame
+        """
+        if not os.path.isdir(self.__replay_path):
+            raise ConfigurationError(f"Replay path not found: {self.__replay_path}")
+
+        for file in sorted(os.listdir(self.__replay_path)):
+            if file.endswith(RecordedFrames._EXTENSION):
+                yield np.load(os.path.join(self.__replay_path, file))
+
+        LOGGER.info(f"Replayed all frames of {self.__replay_path}")
+
+
+class FrameDiffDetector(MotionDetectorImpl):
+    """camera based motion detector, which detects motion by differencing low resolution grayscale frames
+    against a running background model. frames are sampled on a dedicated thread, the sample rate is lowered
+    if processing a frame would exceed the cpu budget.
+    frames are taken from the persistent camera of a raspi cam handler with the same camera number
+    """
+    __id: ClassVar[int] = 0
+
+    def __init__(self, settings: FrameDiffDetectorSettings) -> None:
+        """default initialization
+
+        Args:
+            settings (FrameDiffDetectorSettings): frame difference detector settings
+
+        Raises:
+            ConfigurationError: if sample rate or cpu budget are invalid
+        """
+        super().__init__()
+        if settings.sample_rate <= 0:
+            raise ConfigurationError(f"Sample rate has to be positive: {settings.sample_rate}")
+        if not 0 < settings.cpu_budget <= 1:
+            raise ConfigurationError(f"CPU budget has to be between 0.0 and 1.0: {settings.cpu_budget}")
+
+        self.__settings = settings
+        self.__model = FrameDiffModel(settings.pixel_threshold, settings.background_rate, settings.regions)
+        self.__handler: Optional[Callable[..., None]] = None
+        self.__stop_event = Event()
+        self.__thread: Optional[Thread] = None
+        self.__activated = False
+        self.__throttled = False
+        self.__outdated = False
+        FrameDiffDetector.__id += 1
+        # identifier of this instance, multiple detectors can be configured
+        self.__instance_id = FrameDiffDetector.__id
+
+    def register_handler(self, handler: Callable[..., None]) -> None:
+        """register handler and start sampling frames
+
+        Args:
+            handler (Callable[..., None]): handler which is called on motion
+        """
+        LOGGER.debug("Registering frame diff detector callback")
+        self.__handler = handler
+        if self.__thread:
+            return
+
+        self.__thread = Thread(target=self.__run, name=f"FrameDiffDetectorThread-{self.__instance_id}",
+                               daemon=True)
+        self.__thread.start()
+
+    def shutdown(self, timeout_sec: float = 4.0) -> None:
+        if not self.__thread:
+            LOGGER.debug("Detector has never been started")
+            return
+
+        LOGGER.info("Shutting down gracefully")
+        self.__stop_event.set()
+        self.__thread.join(timeout_sec)
+        if self.__thread.is_alive():
+            LOGGER.error(f"Failed to stop within {timeout_sec}")
+
+    def on_disable(self, ips: List[Tuple[str, bool]]) -> None:
+        super().on_disable(ips)
+        if self.disabled:
+            # the shared camera is closed while disabled, possibly before the next frame is processed
+            self.__outdated = True
+
+    @property
+    def id(self) -> int:
+        return self.__instance_id
+
+    @property
+    def motion_active(self) -> bool:
+        return self.__activated
+
+    def __frames(self) -> Iterator[np.ndarray]:
+        if self.__settings.replay_path:
+            LOGGER.info(f"Replaying frames of {self.__settings.replay_path}")
+            return RecordedFrames(self.__settings.replay_path).frames()
+
+        LOGGER.info(f"Using camera {self.__settings.camera_number} for motion detection")
+        return PiCameraFrames(self.__settings.camera_number, self.__settings.resolution, self.__stop_event).frames()
+
+    def __run(self) -> None:
+        interval_sec = 1.0 / self.__settings.sample_rate
+        frames = self.__frames()
+        try:
+            for frame in frames:
+                start = time.monotonic()
+                self.__process(frame)
+                duration = time.monotonic() - start
+                Metrics.measure(Metric.MOTION_ANALYSIS_DURATION, duration, detector=self.id)
+                if self.__stop_event.wait(self.__wait_time(interval_sec, duration)):
+                    break
+        # skipcq: PYL-W0703
+        except Exception as e:
+            LOGGER.exception("Unrecoverable error in frame diff detector thread", exc_info=e)
+        finally:
+            frames.close()  # type: ignore
+
+        LOGGER.info("Finished")
+
+    def __wait_time(self, interval_sec: float, duration: float) -> float:
+        """get time to wait until the next frame, so that processing stays within the cpu budget
+
+        Args:
+            interval_sec (float): configured interval between frames
+            duration (float): processing duration of the current frame
+
+        Returns:
+            float: seconds to wait
+        """
+        budget_interval_sec = duration / self.__settings.cpu_budget
+        if budget_interval_sec > interval_sec and not self.__throttled:
+            self.__throttled = True
+            LOGGER.warning(f"Processing a frame takes {duration:.3f}s, lowering sample rate "
+                           f"to {1 / budget_interval_sec:.1f} fps for the cpu budget")
+        return max(interval_sec, budget_interval_sec) - duration
+
+    def __process(self, frame: np.ndarray) -> None:
+        if self.disabled or self.__outdated:
+            # the background is outdated when re-enabled
+            self.__model.reset()
+            self.__outdated = False
+        if self.disabled:
+            self.__activated = False
+            return
+
+        changed = self.__model.update(frame)
+        motion = changed >= self.__settings.area_threshold
+        if motion and not self.__activated:
+            LOGGER.debug(f"Motion detected, changed area: {changed:.3f}")
+            if self.__handler:
+                self.__handler()
+        self.__activated = motion
@@ -0,0 +1,123 @@
+import logging
+from typing import Any, ClassVar, Generator, List, NamedTuple, Optional, Tuple
+
+# numpy and pillow are optional dependencies, which are only needed for best picture selection
+import numpy as np  # type: ignore reportMissingImports
+from PIL import Image  # type: ignore reportMissingImports
+
+from camguard.bridge_api import pipelinestep
+from camguard.event_tracer import EventTracer, TraceMark
+from camguard.pipeline_settings import SelectPolicy
+from camguard.recorded_file import RecordedFile, file_name, open_file
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FrameScore(NamedTuple):
+    """quality score of a picture
+    """
+    # variance of the laplacian of the grayscale picture, blurred pictures have few edges and a low variance
+    sharpness: float
+    # fraction of pixels, which are neither under- nor overexposed
+    exposure: float
+
+    @property
+    def value(self) -> float:
+        return self.sharpness * self.exposure
+
+
+def score_picture(file: RecordedFile) -> Optional[FrameScore]:
+    """score sharpness and exposure of a picture. jpeg pictures are decoded in reduced size,
+    which is sufficient for comparing pictures of the same camera and skips most of the decoding work
+
+    Args:
+        file (RecordedFile): path of the picture or memory file
+
+    Returns:
+        Optional[FrameScore]: the score, None if the file is not a picture
+    """
+    try:
+        # raises if the file is missing, instead of treating it like a file which is no picture
+        stream = open_file(file)
+        with stream, Image.open(stream) as image:
+            image.draft('L', FrameSelector.SCORE_SIZE)
+            pixels = np.asarray(image.convert('L'), dtype=np.int16)
+    except OSError as e:
+        LOGGER.debug(f"Not scoring {file_name(file)}: {e}")
+        return None
+
+    # 4-neighbour laplacian of the inner pixels
+    laplacian = pixels[1:-1, :-2] + pixels[1:-1, 2:] + pixels[:-2, 1:-1] + pixels[2:, 1:-1] - 4 * pixels[1:-1, 1:-1]
+    histogram = np.bincount(pixels.ravel(), minlength=256)
+    clipped = histogram[:FrameSelector.CLIP_LEVEL].sum() + histogram[256 - FrameSelector.CLIP_LEVEL:].sum()
+    return FrameScore(float(laplacian.var()), 1.0 - clipped / max(1, pixels.size))
+
+
+class FrameSelector:
+    """selects the best pictures of a motion event by sharpness and exposure, i.e. pictures without motion blur.
+    pictures which are not selected are dropped or passed after the selected ones, so that the best pictures
+    are uploaded first. files which are no pictures are always selected
+    """
+    # minimum size for decoding pictures, jpeg pictures are decoded in the smallest size which is still larger
+    SCORE_SIZE: ClassVar[Tuple[int, int]] = (640, 480)
+    # brightness levels at both ends of the histogram, which count as under- or overexposed
+    CLIP_LEVEL: ClassVar[int] = 8
+
+    def __init__(self, top_k: int) -> None:
+        """default initialization
+
+        Args:
+            top_k (int): number of pictures to select per motion event
+        """
+        self.__top_k = top_k
+
+    def select_files(self, files: List[RecordedFile]) -> Tuple[List[RecordedFile], List[RecordedFile]]:
+        """select the best pictures
+
+        Args:
+            files (List[RecordedFile]): recorded files of a motion event
+
+        Returns:
+            Tuple[List[RecordedFile], List[RecordedFile]]: selected files and other pictures, both in record order
+        """
+        scores = [score_picture(file) for file in files]
+        pictures = sorted((index for index, score in enumerate(scores) if score),
+                          key=lambda index: scores[index].value, reverse=True)  # type: ignore
+        rejected = set(pictures[self.__top_k:])
+        selected = [file for index, file in enumerate(files) if index not in rejected]
+        others = [file for index, file in enumerate(files) if index in rejected]
+        if others:
+            LOGGER.debug(f"Selected {len(pictures) - len(others)} of {len(pictures)} pictures, scores: "
+                         f"{[round(scores[index].value) for index in pictures]}")  # type: ignore
+        return selected, others
+
+    @pipelinestep
+    def select(self, target: Generator[None, Any, None], done_mark: TraceMark,
+               policy: SelectPolicy = SelectPolicy.DROP) -> Generator[None, List[RecordedFile], None]:
+        """motion handler pipeline step: forward the best pictures to the target step
+
+        Args:
+            target (Generator[None, Any, None]): pipeline step, which receives the selected files
+            done_mark (TraceMark): trace mark of the target component, which is added to dropped pictures
+            policy (SelectPolicy, optional): handling of pictures, which are not selected. Defaults to DROP.
+
+        Yields:
+            Generator[None, List[RecordedFile], None]: recorded files
+        """
+        while True:
+            files: List[RecordedFile] = (yield)
+            selected, others = self.select_files(files)
+            if others:
+                LOGGER.info(f"Selected the best {len(files) - len(others)} of {len(files)} files, "
+                            f"{'deferring' if policy == SelectPolicy.DEFER else 'dropping'} {len(others)} pictures")
+            if selected:
+                target.send(selected)
+            if not others:
+                continue
+
+            if policy == SelectPolicy.DEFER:
+                # the upload queue is processed in order, deferred pictures are uploaded after the selected ones
+                target.send(others)
+            else:
+                # dropped pictures are done, the motion event doesn't wait for them
+                EventTracer.trace_files(others, done_mark)
@@ -0,0 +1,197 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from itertools import repeat
+from os import path
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple, Union
+
+# pillow is an optional dependency, which is only needed for rendering picture variants
+from PIL import Image  # type: ignore reportMissingImports
+
+from camguard.bridge_api import pipelinestep
+from camguard.exceptions import CamguardError
+from camguard.metrics import Metric, Metrics
+from camguard.pipeline_settings import QualityProfile
+from camguard.recorded_file import FrameVariant, RecordedFile, file_name, file_source
+
+LOGGER = logging.getLogger(__name__)
+
+# rendered variants of a picture as (tag, jpeg data) and the render duration in seconds
+_Rendered = Tuple[List[Tuple[str, bytes]], float]
+
+
+def _render(source: Union[str, bytes], profiles: Sequence[Tuple[str, QualityProfile]]) -> _Rendered:
+    """render variants of a picture, executed in a worker process
+
+    Args:
+        source (Union[str, bytes]): path or content of the picture
+        profiles (Sequence[Tuple[str, QualityProfile]]): tag and quality profile of every variant
+
+    Returns:
+        _Rendered: variants, empty if the source is not a picture, and the render duration
+    """
+    start = perf_counter()
+    variants: List[Tuple[str, bytes]] = []
+    try:
+        with Image.open(BytesIO(source) if isinstance(source, bytes) else source) as image:
+            # jpeg pictures are decoded in the smallest size, which is still large enough for all variants
+            image.draft('RGB', (max(profile.resolution[0] for _, profile in profiles),
+                                max(profile.resolution[1] for _, profile in profiles)))
+            image = image.convert('RGB')
+            for tag, profile in profiles:
+                variant = image.copy()
+                # keeps the aspect ratio
+                variant.thumbnail(profile.resolution)
+                stream = BytesIO()
+                variant.save(stream, format='jpeg', quality=profile.quality)
+                variants.append((tag, stream.getvalue()))
+    except OSError as e:
+        LOGGER.debug(f"Not rendering variants: {e}")
+    return variants, perf_counter() - start
+
+
+class VariantRenderer:
+    """renders reduced-size variants of recorded pictures by named quality profiles, i.e. thumbnails for
+    notification mails. pictures are rendered in parallel by a pool of worker processes, therefore rendering neither
+    holds the interpreter lock of the recording threads nor is it limited to a single cpu core.
+    the renderer can be shared by the pipeline steps of multiple components. if the worker processes break,
+    rendering is disabled and files are forwarded without variants
+    """
+
+    def __init__(self, profiles: Dict[str, QualityProfile], workers: int) -> None:
+        """default initialization
+
+        Args:
+            profiles (Dict[str, QualityProfile]): quality profiles of the variants by tag
+            workers (int): number of worker processes
+        """
+        self.__profiles = profiles
+        self.__workers = workers
+        self.__executor: Optional[ProcessPoolExecutor] = None
+        self.__broken = False
+        self.__lock = Lock()
+
+    @property
+    def broken(self) -> bool:
+        """get state of the worker processes
+
+        Returns:
+            bool: True if the worker processes broke and rendering has been disabled
+        """
+        with self.__lock:
+            return self.__broken
+
+    def start(self) -> None:
+        """start the worker processes, this has to be done after detaching the daemon process,
+        which would close the pipes to the workers
+        """
+        if self.__executor:
+            return
+
+        LOGGER.info(f"Starting {self.__workers} workers for rendering variants: {self.__profiles}")
+        # workers are spawned instead of forked, forking would copy the locks of running threads
+        self.__executor = ProcessPoolExecutor(max_workers=self.__workers,
+                                              mp_context=multiprocessing.get_context('spawn'))
+
+    def stop(self) -> None:
+        """stop the worker processes, running renders are finished before
+        """
+        with self.__lock:
+            executor = self.__executor
+            self.__executor = None
+            self.__broken = False
+        if executor:
+            executor.shutdown(wait=True)
+
+    @property
+    def tags(self) -> List[str]:
+        return sorted(self.__profiles)
+
+    def render_files(self, files: List[RecordedFile], tags: Optional[List[str]] = None) -> List[FrameVariant]:
+        """render the variants of the given pictures, files which are no pictures are skipped
+
+        Args:
+            files (List[RecordedFile]): recorded files
+            tags (Optional[List[str]], optional): tags of the variants to render. Defaults to None, all variants.
+
+        Raises:
+            CamguardError: if the renderer has not been started
+
+        Returns:
+            List[FrameVariant]: variants in the order of the files and tags, empty if rendering has been disabled
+        """
+        with self.__lock:
+            executor = self.__executor
+            if self.__broken:
+                LOGGER.debug("Rendering has been disabled, not rendering variants")
+                return []
+        if not executor:
+            raise CamguardError("Variant renderer has not been started")
+
+        profiles = [(tag, self.__profiles[tag]) for tag in (tags if tags is not None else self.tags)]
+        start = perf_counter()
+        sources = [file_source(file) for file in files]
+        try:
+            results = list(executor.map(_render, sources, repeat(profiles)))
+        except (BrokenProcessPool, OSError) as e:
+            self.__disable(executor, e)
+            return []
+
+        variants: List[FrameVariant] = []
+        rendered = 0
+        for file, (file_variants, duration) in zip(files, results):
+            if not file_variants:
+                continue
+
+            rendered += 1
+            Metrics.measure(Metric.VARIANT_RENDER_DURATION, duration)
+            name = file_name(file)
+            root, _ = path.splitext(name)
+            variants.extend(FrameVariant(f"{root}_{tag}.jpg", data, tag, name) for tag, data in file_variants)
+
+        elapsed = perf_counter() - start
+        if rendered:
+            LOGGER.debug(f"Rendered variants of {rendered} pictures in {elapsed:.3f}s "
+                         f"({rendered / elapsed:.1f} pictures/s)")
+        return variants
+
+    def __disable(self, executor: ProcessPoolExecutor, error: Exception) -> None:
+        """disable rendering after the worker processes broke, it's logged once instead of failing every event
+        """
+        with self.__lock:
+            if self.__broken:
+                return
+            self.__broken = True
+
+        LOGGER.error("Worker processes for rendering variants broke, files are forwarded without variants "
+                     "until restart", exc_info=error)
+        Metrics.count(Metric.WORKER_POOL_FAILURES, pool="variants")
+        executor.shutdown(wait=False)
+
+    @pipelinestep
+    def render(self, target: Generator[None, Any, None],
+               substitute: str = "") -> Generator[None, List[RecordedFile], None]:
+        """motion handler pipeline step: forward files together with their variants to the target step
+
+        Args:
+            target (Generator[None, Any, None]): pipeline step, which receives files and variants
+            substitute (str, optional): tag of the variant, which is forwarded instead of its picture.
+            Defaults to '', all variants are forwarded in addition to the files.
+
+        Yields:
+            Generator[None, List[RecordedFile], None]: recorded files
+        """
+        while True:
+            files: List[RecordedFile] = (yield)
+            variants: List[FrameVariant] = []
+            try:
+                variants = self.render_files(files, [substitute] if substitute else None)
+            # skipcq: PYL-W0703
+            except Exception as e:
+                # the files are forwarded without variants
+                LOGGER.error("Failed to render variants", exc_info=e)
+            target.send(FrameVariant.substitute(files, variants) if substitute else files + variants)
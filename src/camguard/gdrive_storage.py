@@ -1,23 +1,41 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import date
 from enum import Enum
 from os import path
 from queue import Empty, Full, Queue
 from random import uniform
 from threading import Event, Lock
-from typing import Any, Callable, ClassVar, Dict, List, Optional, Sequence
-
-from google.oauth2.credentials import Credentials, exceptions  # type: ignore
-from google.auth.transport.requests import Request  # type: ignore
-from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
-from googleapiclient.discovery import build  # type: ignore
-from googleapiclient.http import MediaFileUpload  # type: ignore
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Dict, List, Optional, Sequence
 
 from camguard.file_storage_settings import GDriveStorageSettings
 
+from camguard.async_runtime import AsyncRuntime, QueueWaiter
 from camguard.bridge_impl import FileStorageImpl
+from camguard.event_tracer import EventTracer, TraceMark
 from camguard.exceptions import GDriveError
+from camguard.lazy_import import LazyImport
+from camguard.recorded_file import MemoryFile, RecordedFile, file_name
+from camguard.metrics import Metric, Metrics
+from camguard.rate_control import UploadBandwidth
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials, exceptions  # type: ignore
+    from google.auth.transport.requests import Request  # type: ignore
+    from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
+    from googleapiclient.discovery import build  # type: ignore
+    from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload  # type: ignore
+else:
+    # google api client libraries take seconds to import on a raspberry pi,
+    # defer them until authentication or upload, so that motion detection is not delayed
+    Credentials = LazyImport('google.oauth2.credentials', 'Credentials')
+    exceptions = LazyImport('google.auth.exceptions')
+    Request = LazyImport('google.auth.transport.requests', 'Request')
+    InstalledAppFlow = LazyImport('google_auth_oauthlib.flow', 'InstalledAppFlow')
+    build = LazyImport('googleapiclient.discovery', 'build')
+    MediaFileUpload = LazyImport('googleapiclient.http', 'MediaFileUpload')
+    MediaIoBaseUpload = LazyImport('googleapiclient.http', 'MediaIoBaseUpload')
 
 LOGGER = logging.getLogger(__name__)
 
@@ -28,6 +46,22 @@ class GDriveMimetype(Enum):
     """
     FOLDER = "application/vnd.google-apps.folder"
     JPEG = "image/jpeg"
+    H264 = "video/h264"
+
+    @classmethod
+    def from_file(cls, file: str) -> 'GDriveMimetype':
+        """get mimetype of a recorded file by its extension
+
+        Args:
+            file (str): file path
+
+        Returns:
+            GDriveMimetype: the mimetype, defaults to JPEG
+        """
+        if path.splitext(file)[1].lower() == ".h264":
+            return cls.H264
+
+        return cls.JPEG
 
 
 class GDriveStorageAuth:
@@ -83,37 +117,66 @@ class GDriveStorageAuth:
 
 class GDriveUploadManager():
     """handles gdrive upload management, enqueues files, start/stop workers,...
+    if an async runtime is available, the workers are tasks on its event loop which wait for enqueued files,
+    instead of threads polling the upload queue
     """
     __MAX_WORKERS: ClassVar[int] = 3
 
-    def __init__(self, upload_fn: Callable[[str], None], queue_size: int = 100) -> None:
+    def __init__(self, upload_fn: Callable[[RecordedFile], None], queue_size: int = 100) -> None:
         """ctor
 
         Args:
-            upload_fn (Callable[[str], None]): function to upload file
+            upload_fn (Callable[[RecordedFile], None]): function to upload file
             queue_size (int, optional): gdrive upload queue size. Defaults to 100.
         """
         self.__stop_event = Event()
-        self.__queue: Queue[str] = Queue(maxsize=queue_size)
+        self.__queue: Queue[RecordedFile] = Queue(maxsize=queue_size)
         self.__upload_fn = upload_fn
         self.__executor = ThreadPoolExecutor(max_workers=self.__MAX_WORKERS, thread_name_prefix='UploadWorkerThread')
         self.__worker_futures = None
+        self.__waiter: Optional[QueueWaiter] = None
+        self.__in_flight_lock = Lock()
+        self.__in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """get number of files waiting for upload
+
+        Returns:
+            int: pending file count
+        """
+        return self.__queue.qsize()
+
+    @property
+    def in_flight(self) -> int:
+        """get number of running uploads
 
-    def enqueue_files(self, files: List[str]) -> None:
+        Returns:
+            int: running upload count
+        """
+        with self.__in_flight_lock:
+            return self.__in_flight
+
+    def enqueue_files(self, files: List[RecordedFile]) -> None:
         """enqueue files for upload.
 
         Args:
-            files (List[str]): path of the files to enqueue 
+            files (List[RecordedFile]): path of the files or memory files to enqueue 
         """
         for file in files:
             self.__enqueue_file(file)
 
-    def __enqueue_file(self, file_path: str) -> None:
+    def __enqueue_file(self, file_path: RecordedFile) -> None:
         LOGGER.debug(f"Enqueuing file: {file_path}")
         try:
             self.__queue.put_nowait(file_path)
         except Full:
+            Metrics.count(Metric.UPLOAD_DROPPED)
             LOGGER.warning(f"Maximum queue length of {self.__queue.maxsize} reached. Loosing item {file_path}")
+            return
+
+        if self.__waiter:
+            self.__waiter.notify()
 
     def start(self) -> None:
         """fire up workers
@@ -125,6 +188,21 @@ class GDriveUploadManager():
             raise GDriveError("Upload workers already running")
 
         LOGGER.info("Starting up workers")
+        metrics = Metrics.current()
+        if metrics:
+            metrics.register_gauge(Metric.UPLOAD_QUEUE_DEPTH, lambda: self.queue_depth)
+            metrics.register_gauge(Metric.UPLOADS_IN_FLIGHT, lambda: self.in_flight)
+
+        runtime = AsyncRuntime.current()
+        if runtime:
+            waiter = QueueWaiter(runtime, self.__queue)
+            self.__waiter = waiter
+            self.__worker_futures = dict(
+                enumerate(runtime.submit(self.__upload_worker_async(runtime, waiter))
+                          for _ in range(self.__MAX_WORKERS))
+            )
+            return
+
         # set up dictionary of worker futures
         self.__worker_futures = dict(
             enumerate(self.__executor.submit(self.__upload_worker) for _ in range(self.__MAX_WORKERS))
@@ -144,7 +222,23 @@ class GDriveUploadManager():
             return
 
         LOGGER.info("Shutting down workers")
+        metrics = Metrics.current()
+        if metrics:
+            metrics.unregister_gauge(Metric.UPLOAD_QUEUE_DEPTH)
+            metrics.unregister_gauge(Metric.UPLOADS_IN_FLIGHT)
+
         self.__stop_event.set()
+        if self.__waiter:
+            LOGGER.debug("Wait for worker tasks")
+            self.__waiter.close()
+            # running uploads are finished, like on executor shutdown
+            wait(self.__worker_futures.values())
+            self.__waiter = None
+            self.__worker_futures = None
+            self.__stop_event.clear()
+            LOGGER.info("Shutdown successful")
+            return
+
         LOGGER.debug("Cancel futures")
         for _, worker_future in self.__worker_futures.items():
             worker_future.cancel()
@@ -169,14 +263,7 @@ class GDriveUploadManager():
                 continue
 
             try:
-                LOGGER.debug(f"Starting upload: {file}")
-                self.__upload_fn(file)
-                LOGGER.debug(f"Upload successful: {file}")
-            # skipcq: PYL-W0703
-            except Exception as e:
-                # errors do not stop the thread,
-                # so that the upload component can recover from google drive errors
-                LOGGER.warning(f"Upload failed: {file}", exc_info=e)
+                self.__upload_file(file)
             finally:
                 # indicate formerly enqueued task is done
                 # therefore also a unsuccessful upload, in case of an Error, won't lead to a retry
@@ -185,6 +272,65 @@ class GDriveUploadManager():
 
         LOGGER.info("Exit")
 
+    async def __upload_worker_async(self, runtime: AsyncRuntime, waiter: QueueWaiter) -> None:
+        LOGGER.info("Init task")
+
+        while not self.__stop_event.is_set():
+            file = await waiter.get()
+            if file is None:
+                # waiter has been closed
+                break
+
+            try:
+                await runtime.run_blocking(self.__upload_file, file)
+            finally:
+                self.__queue.task_done()
+
+        LOGGER.info("Exit task")
+
+    def __upload_file(self, file: RecordedFile) -> None:
+        LOGGER.debug(f"Starting upload: {file}")
+        EventTracer.trace_files([file], TraceMark.UPLOAD_START)
+        with self.__in_flight_lock:
+            self.__in_flight += 1
+        UploadBandwidth.upload_started()
+        start = monotonic()
+        size = 0
+        try:
+            self.__upload_fn(file)
+            LOGGER.debug(f"Upload successful: {file}")
+            size = self.__record_upload(file, monotonic() - start)
+        # skipcq: PYL-W0703
+        except Exception as e:
+            # errors do not stop the worker,
+            # so that the upload component can recover from google drive errors
+            Metrics.count(Metric.UPLOAD_FAILURES)
+            LOGGER.warning(f"Upload failed: {file}", exc_info=e)
+        finally:
+            UploadBandwidth.upload_finished(size)
+            with self.__in_flight_lock:
+                self.__in_flight -= 1
+            # failed uploads are finished as well, they won't be retried
+            EventTracer.trace_files([file], TraceMark.UPLOAD_END)
+
+    @staticmethod
+    def __record_upload(file: RecordedFile, duration_sec: float) -> int:
+        """record metrics of a successful upload
+
+        Returns:
+            int: uploaded bytes, 0 if the file doesn't exist anymore
+        """
+        try:
+            size = file.size if isinstance(file, MemoryFile) else path.getsize(file)
+        except OSError:
+            # file has been removed in the meantime, i.e. by the upload function
+            size = 0
+        Metrics.measure(Metric.UPLOAD_DURATION, duration_sec)
+        Metrics.count(Metric.UPLOAD_BYTES, size)
+        if duration_sec > 0:
+            Metrics.gauge(Metric.UPLOAD_BYTES_PER_SECOND, size / duration_sec)
+        return size
+
 
 class GDriveStorage(FileStorageImpl):
     """ Manages GDrive file upload
@@ -217,19 +363,19 @@ class GDriveStorage(FileStorageImpl):
         """
         self.__upload_man.stop()
 
-    def enqueue_files(self, files: List[str]) -> None:
+    def enqueue_files(self, files: List[RecordedFile]) -> None:
         """enqueue file paths for upload
 
         Args:
-            files (List[str]): files to enqueue 
+            files (List[RecordedFile]): files to enqueue 
         """
         self.__upload_man.enqueue_files(files)
 
-    def upload(self, file: str) -> None:
+    def upload(self, file: RecordedFile) -> None:
         """upload given file to gdrive
 
         Args:
-            file (str): file to upload 
+            file (RecordedFile): file to upload, memory files are uploaded from memory 
 
         Raises:
             GDriveError: on authentication failure
@@ -255,18 +401,18 @@ class GDriveStorage(FileStorageImpl):
         # released lock with ctx manager
 
         # check if file path is a file with os.path.isfile
-        file_name = path.basename(file)
-        LOGGER.info(f"Uploading file: {file}")
+        name = path.basename(file_name(file))
+        LOGGER.info(f"Uploading file: {file_name(file)}")
 
         GDriveStorage.__create_file(
             creds=creds,
-            file_name=file_name,
+            file_name=name,
             file_path=file,
-            mimetype=GDriveMimetype.JPEG,
+            mimetype=GDriveMimetype.from_file(file_name(file)),
             parent_id=date_folder['id'])
 
         LOGGER.info("Upload file finished: "
-                    f"'{self.__upload_folder_name}/{cur_date}/{file_name}'")
+                    f"'{self.__upload_folder_name}/{cur_date}/{name}'")
 
     @classmethod
     def __create_folder(cls, *, creds: Credentials, name: str, parent_id: Optional[str] = None) -> Dict[str, Any]:
@@ -303,7 +449,7 @@ class GDriveStorage(FileStorageImpl):
         return folder
 
     @classmethod
-    def __create_file(cls, *, creds: Credentials, file_name: str, file_path: str, mimetype: GDriveMimetype,
+    def __create_file(cls, *, creds: Credentials, file_name: str, file_path: RecordedFile, mimetype: GDriveMimetype,
                       parent_id: Optional[str] = None) -> Dict[str, Any]:
         """create file or folder on gdrive storage if it's not already existing
 
@@ -338,7 +484,11 @@ class GDriveStorage(FileStorageImpl):
             if parent_id:
                 file_metadata.update({'parents': [parent_id]})
 
-            media = MediaFileUpload(filename=file_path, mimetype=mimetype.value)
+            if isinstance(file_path, MemoryFile):
+                # in-memory files are uploaded from memory, they may not have been persisted yet
+                media = MediaIoBaseUpload(file_path.open(), mimetype=mimetype.value)
+            else:
+                media = MediaFileUpload(filename=file_path, mimetype=mimetype.value)
             with build(serviceName='drive', version='v3', credentials=creds) as gdrive_service:  # type: ignore
                 response = gdrive_service.files().create(body=file_metadata,  # type: ignore
                                                          media_body=media,
@@ -8,6 +8,8 @@ from typing import ClassVar, List
 
 from camguard.bridge_impl import MailClientImpl
 from camguard.mail_client_settings import GenericMailClientSettings
+from camguard.metrics import Metric, Metrics
+from camguard.recorded_file import FrameVariant, RecordedFile, file_name
 
 LOGGER = logging.getLogger(__name__)
 
@@ -28,11 +30,11 @@ class GenericMailClient(MailClientImpl):
         """
         self.__settings = settings
 
-    def send_mail(self, files: List[str]) -> None:
+    def send_mail(self, files: List[RecordedFile]) -> None:
         """send mail to configured receiver to notify about recorded files list
 
         Args:
-            files (List[str]): the list of already recorded files to inform about
+            files (List[RecordedFile]): the list of already recorded files to inform about
         """
         LOGGER.info(f"Sending mail with: {files}")
         sender = self.__settings.sender_mail
@@ -42,18 +44,26 @@ class GenericMailClient(MailClientImpl):
             with Client(host=self.__settings.hostname, port=GenericMailClient.__PORT) as client:
                 client.starttls()
                 client.login(self.__settings.user, self.__settings.password)
-                client.send_message(GenericMailClient.__create_msg(sender, receiver, files))
+                client.send_message(GenericMailClient.__create_msg(sender, receiver, files,
+                                                                   self.__settings.attachment_variant))
         except (SMTPConnectError, OSError) as client_err:
+            Metrics.count(Metric.MAIL_FAILURES)
             LOGGER.error("Error while connecting to mail server: "
                          f"{self.__settings.hostname}:{GenericMailClient.__PORT}",
                          exc_info=client_err)
 
     @ staticmethod
-    def __create_msg(sender: str, receiver: str, files: List[str]) -> EmailMessage:
+    def __create_msg(sender: str, receiver: str, files: List[RecordedFile],
+                     attachment_variant: str) -> EmailMessage:
+        recorded, variants = FrameVariant.select(files, attachment_variant)
         msg: EmailMessage = EmailMessage()
         msg.add_header('Subject', GenericMailClient.__MAIL_SUBJECT)
         msg.add_header('From', sender)
         msg.add_header('To', receiver)
-        msg.set_content(GenericMailClient.__MAIL_MSG.format(files=[path.basename(file) for file in files]))
+        names = [path.basename(file_name(file)) for file in recorded]
+        msg.set_content(GenericMailClient.__MAIL_MSG.format(files=names))
+        for variant in variants:
+            msg.add_attachment(variant.data.tobytes(), maintype='image', subtype='jpeg',
+                               filename=path.basename(variant.name))
 
         return msg
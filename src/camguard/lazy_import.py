@@ -0,0 +1,198 @@
+import importlib
+import logging
+import sys
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from threading import RLock, local
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LazyImport:
+    """proxy for a module or a module attribute, which defers the actual import until first usage.
+    attribute access and calls are forwarded to the imported object, therefore a proxy can be used
+    as drop-in replacement for a module level import, i.e.:
+
+        build = LazyImport('googleapiclient.discovery', 'build')
+    """
+    _lock: ClassVar[RLock] = RLock()
+
+    def __init__(self, module_name: str, attr_name: Optional[str] = None) -> None:
+        """default initialization
+
+        Args:
+            module_name (str): full name of the module to import
+            attr_name (Optional[str], optional): attribute of the module to resolve. Defaults to None,
+            which resolves the module itself.
+        """
+        self.__module_name = module_name
+        self.__attr_name = attr_name
+        self.__target: Any = None
+        self.__resolved = False
+
+    @property
+    def resolved(self) -> bool:
+        """get resolved state
+
+        Returns:
+            bool: True if the import has already been done
+        """
+        return self.__resolved
+
+    def resolve(self) -> Any:
+        """import module and resolve attribute, if not already done - thread safe
+
+        Returns:
+            Any: the imported module or module attribute
+        """
+        if not self.__resolved:
+            with LazyImport._lock:
+                if not self.__resolved:
+                    start = perf_counter()
+                    module = importlib.import_module(self.__module_name)
+                    self.__target = getattr(module, self.__attr_name) if self.__attr_name else module
+                    self.__resolved = True
+                    LOGGER.debug(f"Deferred import of {self.__name} took {(perf_counter() - start) * 1000:.1f} ms")
+
+        return self.__target
+
+    @property
+    def __name(self) -> str:
+        return f"{self.__module_name}.{self.__attr_name}" if self.__attr_name else self.__module_name
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith(f"_{LazyImport.__name__}__"):
+            # private attributes are not forwarded, this prevents recursion before initialization
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<{LazyImport.__name__} {self.__name} (resolved: {self.__resolved})>"
+
+
+class _ProfilingLoader:
+    """loader wrapper which measures module execution of the wrapped loader
+    """
+
+    def __init__(self, loader: Any, profiler: 'ImportProfiler') -> None:
+        self.__loader = loader
+        self.__profiler = profiler
+
+    def create_module(self, spec: ModuleSpec) -> Optional[ModuleType]:
+        return self.__loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        # restore original loader, so that the wrapper doesn't outlive the import
+        if module.__spec__:
+            module.__spec__.loader = self.__loader
+        module.__loader__ = self.__loader
+        self.__profiler.measure(module.__name__, lambda: self.__loader.exec_module(module))
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith(f"_{_ProfilingLoader.__name__}__"):
+            raise AttributeError(name)
+        return getattr(self.__loader, name)
+
+
+class ImportProfiler(MetaPathFinder):
+    """measures the import cost of every module, which is imported while the profiler is installed.
+    the self time of a module excludes the time for importing its sub-imports, the cumulative time includes them.
+    """
+
+    def __init__(self) -> None:
+        self.__timings: Dict[str, Tuple[float, float]] = {}
+        self.__local = local()
+        self.__installed_at: float = 0.0
+
+    def install(self) -> None:
+        """install profiler as first import finder
+        """
+        if self not in sys.meta_path:
+            self.__installed_at = perf_counter()
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        """remove profiler from import finders
+        """
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    @property
+    def elapsed_sec(self) -> float:
+        """get seconds since installation
+
+        Returns:
+            float: elapsed seconds
+        """
+        return perf_counter() - self.__installed_at
+
+    def find_spec(self, fullname: str, path: Optional[Sequence[str]],
+                  target: Optional[ModuleType] = None) -> Optional[ModuleSpec]:
+        """find module spec by using the remaining finders and wrap its loader for measurement
+        """
+        for finder in sys.meta_path:
+            if isinstance(finder, ImportProfiler) or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _ProfilingLoader(spec.loader, self)  # type: ignore
+            return spec
+
+        return None
+
+    def measure(self, name: str, exec_fn: Callable[[], None]) -> None:
+        """execute module and record its self and cumulative import time
+
+        Args:
+            name (str): full module name
+            exec_fn (Callable[[], None]): function which executes the module
+        """
+        stack: List[float] = self.__stack()
+        stack.append(0.0)
+        start = perf_counter()
+        try:
+            exec_fn()
+        finally:
+            cumulative = perf_counter() - start
+            sub_imports = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            self.__timings[name] = (cumulative - sub_imports, cumulative)
+
+    def report(self, limit: int = 20) -> List[Tuple[str, float, float]]:
+        """get the most expensive imports sorted by cumulative time
+
+        Args:
+            limit (int, optional): maximum number of entries. Defaults to 20.
+
+        Returns:
+            List[Tuple[str, float, float]]: list of module name, self seconds and cumulative seconds
+        """
+        timings = sorted(((name, self_sec, cumulative_sec) for name, (self_sec, cumulative_sec)
+                          in dict(self.__timings).items()), key=lambda t: t[2], reverse=True)
+        return timings[:limit]
+
+    def log_report(self, limit: int = 20) -> None:
+        """log the most expensive imports
+
+        Args:
+            limit (int, optional): maximum number of entries. Defaults to 20.
+        """
+        LOGGER.info(f"Startup profile: {len(self.__timings)} modules imported, "
+                    f"{self.elapsed_sec * 1000:.1f} ms since start")
+        LOGGER.info(f"{'self [ms]':>10} | {'cumulative [ms]':>15} | module")
+        for name, self_sec, cumulative_sec in self.report(limit):
+            LOGGER.info(f"{self_sec * 1000:10.1f} | {cumulative_sec * 1000:15.1f} | {name}")
+
+    def __stack(self) -> List[float]:
+        if not hasattr(self.__local, 'stack'):
+            self.__local.stack = []
+        return self.__local.stack
@@ -12,6 +12,7 @@ class MailClientSettings(Settings):
     _RECEIVER_MAIL: ClassVar[str] = "receiver_mail"
     _SENDER_MAIL: ClassVar[str] = "sender_mail"
     _HOSTNAME: ClassVar[str] = "hostname"
+    _ATTACHMENT_VARIANT: ClassVar[str] = "attachment_variant"
 
     @property
     def impl_type(self) -> ImplementationType:
@@ -61,6 +62,16 @@ class MailClientSettings(Settings):
     def hostname(self, hostname: str) -> None:
         self._hostname = hostname
 
+    @property
+    def attachment_variant(self) -> str:
+        """tag of the picture variants, which are attached to notification mails, empty for no attachments
+        """
+        return self._attachment_variant
+
+    @attachment_variant.setter
+    def attachment_variant(self, value: str) -> None:
+        self._attachment_variant = value
+
     def _parse_data(self, data: Dict[str, Any]):
         super()._parse_data(data)
 
@@ -95,6 +106,12 @@ class MailClientSettings(Settings):
             settings=data
         )
 
+        self.attachment_variant = super().get_setting_from_key(
+            setting_key=f"{MailClientSettings._KEY}.{MailClientSettings._ATTACHMENT_VARIANT}",
+            settings=data,
+            default=""
+        )
+
 
 class GenericMailClientSettings(MailClientSettings):
     """specialized mail notification settings for a common mail client implementation 
@@ -0,0 +1,57 @@
+import logging
+from os import makedirs, path
+from time import monotonic, sleep
+from typing import Generator
+
+from camguard.bridge_api import pipelinestep
+from camguard.pipeline import PipelineStep
+from camguard.recorded_file import MemoryFile
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FilePersistence:
+    """writes memory files to disk on an isolated worker, so that recording doesn't wait for the sd card
+    """
+
+    def __init__(self, name: str, queue_size: int = 100) -> None:
+        """default initialization
+
+        Args:
+            name (str): name of the persistence step, used for the worker name
+            queue_size (int, optional): maximum number of files waiting to be written. Defaults to 100.
+        """
+        self.__step = PipelineStep(name, self.__write_files, queue_size=queue_size)
+
+    def start(self) -> None:
+        self.__step.start()
+
+    def stop(self, timeout_sec: float = 4.0) -> None:
+        """stop the worker, pending files are written before, within the timeout
+
+        Args:
+            timeout_sec (float, optional): timeout for writing pending files. Defaults to 4.0.
+        """
+        deadline = monotonic() + timeout_sec
+        while self.__step.running and self.__step.queue_depth and monotonic() < deadline:
+            sleep(0.05)
+        if self.__step.queue_depth:
+            LOGGER.warning(f"Discarding {self.__step.queue_depth} files, which have not been persisted")
+        self.__step.stop()
+
+    def persist(self, file: MemoryFile) -> None:
+        """enqueue file for writing, does not block
+
+        Args:
+            file (MemoryFile): the file to write to its path
+        """
+        self.__step.send(file)
+
+    @pipelinestep
+    def __write_files(self) -> Generator[None, MemoryFile, None]:
+        while True:
+            file: MemoryFile = (yield)
+            makedirs(path.dirname(file.name), exist_ok=True)
+            with open(file.name, 'wb') as stream:
+                stream.write(file.data)
+            LOGGER.debug(f"Persisted file: {file.name}")
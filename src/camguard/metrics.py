@@ -0,0 +1,318 @@
+import logging
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Dict, List, Optional, Tuple
+
+from camguard.extended_enum import ExtendedEnum
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+LOGGER = logging.getLogger(__name__)
+
+# sorted label name/value pairs
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+class Metric(ExtendedEnum):
+    """metrics which are exposed by camguard components
+    """
+    MOTION_EVENTS = ('camguard_motion_events_total', 'counter', "Detected motion events")
+    MOTION_EVENTS_DROPPED = ('camguard_motion_events_dropped_total', 'counter',
+                             "Motion events dropped due to a full event queue")
+    MOTION_EVENTS_COALESCED = ('camguard_motion_events_coalesced_total', 'counter',
+                               "Motion events merged into an ongoing motion event")
+    CAPTURE_DURATION = ('camguard_capture_duration_seconds', 'summary', "Duration of capturing a single picture")
+    CAPTURE_FPS = ('camguard_capture_fps', 'gauge', "Achieved capture frame rate of the latest motion event")
+    MOTION_ANALYSIS_DURATION = ('camguard_motion_analysis_duration_seconds', 'summary',
+                                "Duration of analysing a frame for camera based motion detection")
+    UPLOAD_QUEUE_DEPTH = ('camguard_upload_queue_depth', 'gauge', "Files waiting for upload")
+    UPLOADS_IN_FLIGHT = ('camguard_uploads_in_flight', 'gauge', "Running uploads")
+    UPLOAD_DURATION = ('camguard_upload_duration_seconds', 'summary', "Duration of successful uploads")
+    UPLOAD_BYTES = ('camguard_upload_bytes_total', 'counter', "Uploaded bytes")
+    UPLOAD_BYTES_PER_SECOND = ('camguard_upload_bytes_per_second', 'gauge', "Throughput of the latest upload")
+    UPLOAD_FAILURES = ('camguard_upload_failures_total', 'counter', "Failed uploads")
+    UPLOAD_DROPPED = ('camguard_upload_dropped_total', 'counter', "Files dropped due to a full upload queue")
+    VARIANT_RENDER_DURATION = ('camguard_variant_render_duration_seconds', 'summary',
+                               "Duration of rendering the reduced-size variants of a picture")
+    FRAMES_SUPPRESSED = ('camguard_frames_suppressed_total', 'counter',
+                         "Near-duplicate pictures which have not been uploaded")
+    CLASSIFY_DURATION = ('camguard_classify_duration_seconds', 'summary',
+                         "Duration of classifying the pictures of a motion event")
+    CLASSIFY_FRAMES = ('camguard_classify_frames_total', 'counter', "Pictures classified by the object detector")
+    MOTION_EVENTS_FILTERED = ('camguard_motion_events_filtered_total', 'counter',
+                              "Motion events without configured object classes, which have been suppressed "
+                              "or downgraded")
+    NETWORK_SCAN_DURATION = ('camguard_network_scan_duration_seconds', 'summary',
+                             "Duration of a network device scan of all configured ip addresses")
+    NETWORK_DEVICES_FOUND = ('camguard_network_devices_found', 'gauge', "Devices found by the latest network scan")
+    MAIL_SEND_DURATION = ('camguard_mail_send_duration_seconds', 'summary', "Duration of sending a notification mail")
+    MAIL_FAILURES = ('camguard_mail_failures_total', 'counter', "Failed notification mails")
+    WORKER_POOL_FAILURES = ('camguard_worker_pool_failures_total', 'counter',
+                            "Pools of worker processes which broke and have been disabled")
+
+    def __init__(self, metric_name: str, metric_type: str, description: str) -> None:
+        super().__init__()
+        self.__metric_name = metric_name
+        self.__metric_type = metric_type
+        self.__description = description
+
+    @property
+    def metric_name(self) -> str:
+        return self.__metric_name
+
+    @property
+    def metric_type(self) -> str:
+        return self.__metric_type
+
+    @property
+    def description(self) -> str:
+        return self.__description
+
+
+class Metrics:
+    """registry for counters, gauges and summaries of camguard components, which can be rendered
+    in the prometheus text exposition format. metrics are optional, components check for the current registry
+    and skip recording if there is none.
+    """
+    __current: ClassVar[Optional['Metrics']] = None
+    __current_lock: ClassVar[Lock] = Lock()
+
+    def __init__(self) -> None:
+        self.__lock = Lock()
+        self.__values: Dict[Metric, Dict[_Labels, float]] = {}
+        # summaries: count and sum of observed values
+        self.__summaries: Dict[Metric, Dict[_Labels, List[float]]] = {}
+        # gauges, which are read when rendering
+        self.__gauge_fns: Dict[Metric, Dict[_Labels, Callable[[], float]]] = {}
+
+    @classmethod
+    def current(cls) -> Optional['Metrics']:
+        """get the registry, which has been set as current registry for all components - thread safe
+
+        Returns:
+            Optional[Metrics]: the current registry, None if metrics are disabled
+        """
+        with Metrics.__current_lock:
+            return Metrics.__current
+
+    @classmethod
+    def set_current(cls, metrics: Optional['Metrics']) -> None:
+        """set the current registry for all components - thread safe
+
+        Args:
+            metrics (Optional[Metrics]): the registry to use, None for disabling metrics
+        """
+        with Metrics.__current_lock:
+            Metrics.__current = metrics
+
+    @classmethod
+    def count(cls, metric: Metric, value: float = 1.0, **labels: Any) -> None:
+        """increment counter of the current registry, if metrics are enabled
+
+        Args:
+            metric (Metric): counter metric
+            value (float, optional): increment. Defaults to 1.0.
+        """
+        metrics = cls.current()
+        if metrics:
+            metrics.inc(metric, value, **labels)
+
+    @classmethod
+    def gauge(cls, metric: Metric, value: float, **labels: Any) -> None:
+        """set gauge of the current registry, if metrics are enabled
+
+        Args:
+            metric (Metric): gauge metric
+            value (float): the gauge value
+        """
+        metrics = cls.current()
+        if metrics:
+            metrics.set(metric, value, **labels)
+
+    @classmethod
+    def measure(cls, metric: Metric, value: float, **labels: Any) -> None:
+        """observe value for a summary of the current registry, if metrics are enabled
+
+        Args:
+            metric (Metric): summary metric
+            value (float): observed value, i.e. a duration in seconds
+        """
+        metrics = cls.current()
+        if metrics:
+            metrics.observe(metric, value, **labels)
+
+    def inc(self, metric: Metric, value: float = 1.0, **labels: Any) -> None:
+        key = Metrics.__labels(labels)
+        with self.__lock:
+            values = self.__values.setdefault(metric, {})
+            values[key] = values.get(key, 0.0) + value
+
+    def set(self, metric: Metric, value: float, **labels: Any) -> None:
+        with self.__lock:
+            self.__values.setdefault(metric, {})[Metrics.__labels(labels)] = value
+
+    def observe(self, metric: Metric, value: float, **labels: Any) -> None:
+        key = Metrics.__labels(labels)
+        with self.__lock:
+            summary = self.__summaries.setdefault(metric, {}).setdefault(key, [0.0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+
+    def register_gauge(self, metric: Metric, gauge_fn: Callable[[], float], **labels: Any) -> None:
+        """register function, which is called for reading a gauge value when rendering
+
+        Args:
+            metric (Metric): gauge metric
+            gauge_fn (Callable[[], float]): function returning the current value, must not block
+        """
+        with self.__lock:
+            self.__gauge_fns.setdefault(metric, {})[Metrics.__labels(labels)] = gauge_fn
+
+    def unregister_gauge(self, metric: Metric, **labels: Any) -> None:
+        with self.__lock:
+            self.__gauge_fns.get(metric, {}).pop(Metrics.__labels(labels), None)
+
+    def get(self, metric: Metric, **labels: Any) -> Optional[float]:
+        """get current value of a counter or gauge
+
+        Returns:
+            Optional[float]: the value, None if it has never been recorded
+        """
+        key = Metrics.__labels(labels)
+        with self.__lock:
+            gauge_fn = self.__gauge_fns.get(metric, {}).get(key)
+            if not gauge_fn:
+                return self.__values.get(metric, {}).get(key)
+        return float(gauge_fn())
+
+    def render(self) -> str:
+        """render all recorded metrics in the prometheus text exposition format
+
+        Returns:
+            str: the rendered metrics
+        """
+        with self.__lock:
+            values = {metric: dict(samples) for metric, samples in self.__values.items()}
+            summaries = {metric: {key: list(summary) for key, summary in samples.items()}
+                         for metric, samples in self.__summaries.items()}
+            gauge_fns = {metric: dict(fns) for metric, fns in self.__gauge_fns.items()}
+
+        lines: List[str] = []
+        for metric in Metric:
+            samples: List[Tuple[str, _Labels, float]] = []
+            samples += [(metric.metric_name, key, value) for key, value in values.get(metric, {}).items()]
+            for key, gauge_fn in gauge_fns.get(metric, {}).items():
+                try:
+                    samples.append((metric.metric_name, key, float(gauge_fn())))
+                # skipcq: PYL-W0703
+                except Exception as e:
+                    LOGGER.warning(f"Failed to read gauge {metric.metric_name}", exc_info=e)
+            for key, (count, total) in summaries.get(metric, {}).items():
+                samples += [(f"{metric.metric_name}_count", key, count), (f"{metric.metric_name}_sum", key, total)]
+
+            if not samples:
+                continue
+
+            lines.append(f"# HELP {metric.metric_name} {metric.description}")
+            lines.append(f"# TYPE {metric.metric_name} {metric.metric_type}")
+            lines += [f"{name}{Metrics.__format_labels(key)} {value:g}" for name, key, value in samples]
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def __labels(labels: Dict[str, Any]) -> _Labels:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    @staticmethod
+    def __format_labels(labels: _Labels) -> str:
+        if not labels:
+            return ""
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+class MetricsServer:
+    """local http server, which exposes the metrics of a registry on /metrics for scraping
+    """
+    _PATH: ClassVar[str] = "/metrics"
+    _CONTENT_TYPE: ClassVar[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, metrics: Metrics, port: int, address: str = "127.0.0.1") -> None:
+        """default initialization
+
+        Args:
+            metrics (Metrics): registry to expose
+            port (int): tcp port to listen on, 0 selects a free port
+            address (str, optional): address to bind to. Defaults to "127.0.0.1".
+        """
+        self.__metrics = metrics
+        self.__port = port
+        self.__address = address
+        self.__server: Optional['ThreadingHTTPServer'] = None
+        self.__thread: Optional[Thread] = None
+
+    @property
+    def port(self) -> int:
+        """get the port the server is listening on
+
+        Returns:
+            int: tcp port
+        """
+        if self.__server:
+            return self.__server.server_address[1]
+        return self.__port
+
+    def start(self) -> None:
+        """start the server thread, does nothing if already running
+
+        Raises:
+            OSError: if the server can't bind to address and port
+        """
+        if self.__server:
+            LOGGER.debug("Metrics server already running")
+            return
+
+        # the http server is only needed if metrics are served, defer import to speed up startup
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self.__metrics
+
+        class _Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:  # skipcq: PYL-C0103
+                if self.path.split("?")[0] != MetricsServer._PATH:
+                    self.send_error(404)
+                    return
+
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", MetricsServer._CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # skipcq: PYL-W0622
+            def log_message(self, format: str, *args: Any) -> None:
+                LOGGER.debug(format, *args)
+
+        self.__server = ThreadingHTTPServer((self.__address, self.__port), _Handler)
+        self.__server.daemon_threads = True
+        LOGGER.info(f"Serving metrics on http://{self.__address}:{self.port}{MetricsServer._PATH}")
+        self.__thread = Thread(target=self.__server.serve_forever, name="MetricsServerThread", daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout_sec: float = 4.0) -> None:
+        """stop the server thread
+
+        Args:
+            timeout_sec (float, optional): timeout for joining the server thread. Defaults to 4.0.
+        """
+        if not self.__server or not self.__thread:
+            LOGGER.debug("Metrics server has never been started")
+            return
+
+        LOGGER.info("Stopping metrics server")
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join(timeout_sec)
+        self.__server = None
+        self.__thread = None
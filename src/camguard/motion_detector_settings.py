@@ -1,4 +1,4 @@
-from typing import Any, ClassVar, Dict
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
 
 from camguard.settings import ImplementationType, Settings
 
@@ -8,6 +8,9 @@ class MotionDetectorSettings(Settings):
     """
     _IMPL: ClassVar[str] = "implementation"
     _KEY: ClassVar[str] = "motion_detector"
+    _EVENT_QUEUE_SIZE: ClassVar[str] = "event_queue_size"
+    _HANDLERS: ClassVar[str] = "handlers"
+    _LIST_NODE: ClassVar[Optional[str]] = _KEY
 
     @property
     def impl_type(self) -> ImplementationType:
@@ -17,12 +20,39 @@ class MotionDetectorSettings(Settings):
     def impl_type(self, value: ImplementationType):
         self._impl_type = value
 
+    @property
+    def event_queue_size(self) -> int:
+        return self._event_queue_size
+
+    @event_queue_size.setter
+    def event_queue_size(self, value: int) -> None:
+        self._event_queue_size = value
+
+    @property
+    def handlers(self) -> List[str]:
+        return self._handlers
+
+    @handlers.setter
+    def handlers(self, value: List[str]) -> None:
+        self._handlers = value
+
     def _parse_data(self, data: Dict[str, Any]):
         self.impl_type = ImplementationType.parse(super().get_setting_from_key(
             setting_key=f"{MotionDetectorSettings._KEY}.{MotionDetectorSettings._IMPL}",
             settings=data,
             default=ImplementationType.RASPI))
 
+        self.event_queue_size = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{MotionDetectorSettings._EVENT_QUEUE_SIZE}",
+            settings=data,
+            default=10)
+
+        # names of the motion handlers, which handle motion of this detector, empty for default routing
+        self.handlers = [str(handler) for handler in super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{MotionDetectorSettings._HANDLERS}",
+            settings=data,
+            default=[])]
+
 
 class RaspiGpioSensorSettings(MotionDetectorSettings):
     """Specialized motion detector settings for raspi gpio sensor
@@ -116,3 +146,266 @@ class DummyGpioSensorSettings(MotionDetectorSettings):
     """specialized motion detector settings for dummy gpio sensor
     """
     _KEY: ClassVar[str] = "dummy_gpio_sensor"
+
+
+class FrameDiffDetectorSettings(MotionDetectorSettings):
+    """specialized motion detector settings for the camera based frame difference detector
+    """
+    _KEY: ClassVar[str] = "frame_diff_detector"
+    _CAMERA_NUMBER: ClassVar[str] = "camera_number"
+    _RESOLUTION: ClassVar[str] = "resolution"
+    _SAMPLE_RATE: ClassVar[str] = "sample_rate"
+    _PIXEL_THRESHOLD: ClassVar[str] = "pixel_threshold"
+    _AREA_THRESHOLD: ClassVar[str] = "area_threshold"
+    _BACKGROUND_RATE: ClassVar[str] = "background_rate"
+    _CPU_BUDGET: ClassVar[str] = "cpu_budget"
+    _REGIONS: ClassVar[str] = "regions"
+    _REPLAY_PATH: ClassVar[str] = "replay_path"
+
+    @property
+    def camera_number(self) -> int:
+        return self._camera_number
+
+    @camera_number.setter
+    def camera_number(self, value: int) -> None:
+        self._camera_number = value
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        return self._resolution
+
+    @resolution.setter
+    def resolution(self, value: Tuple[int, int]) -> None:
+        self._resolution = value
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate
+
+    @sample_rate.setter
+    def sample_rate(self, value: float) -> None:
+        self._sample_rate = value
+
+    @property
+    def pixel_threshold(self) -> int:
+        return self._pixel_threshold
+
+    @pixel_threshold.setter
+    def pixel_threshold(self, value: int) -> None:
+        self._pixel_threshold = value
+
+    @property
+    def area_threshold(self) -> float:
+        return self._area_threshold
+
+    @area_threshold.setter
+    def area_threshold(self, value: float) -> None:
+        self._area_threshold = value
+
+    @property
+    def background_rate(self) -> float:
+        return self._background_rate
+
+    @background_rate.setter
+    def background_rate(self, value: float) -> None:
+        self._background_rate = value
+
+    @property
+    def cpu_budget(self) -> float:
+        return self._cpu_budget
+
+    @cpu_budget.setter
+    def cpu_budget(self, value: float) -> None:
+        self._cpu_budget = value
+
+    @property
+    def regions(self) -> List[Tuple[float, float, float, float]]:
+        return self._regions
+
+    @regions.setter
+    def regions(self, value: List[Tuple[float, float, float, float]]) -> None:
+        self._regions = value
+
+    @property
+    def replay_path(self) -> str:
+        return self._replay_path
+
+    @replay_path.setter
+    def replay_path(self, value: str) -> None:
+        self._replay_path = value
+
+    def _parse_data(self, data: Dict[str, Any]):
+        """parse settings data for frame difference detector settings
+        """
+        super()._parse_data(data)
+
+        self.camera_number = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._CAMERA_NUMBER}",
+            settings=data,
+            default=0
+        )
+
+        self.resolution = super().parse_resolution(super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._RESOLUTION}",
+            settings=data,
+            default="128x96"
+        ))
+
+        self.sample_rate = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._SAMPLE_RATE}",
+            settings=data,
+            default=4.0
+        )
+
+        self.pixel_threshold = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._PIXEL_THRESHOLD}",
+            settings=data,
+            default=25
+        )
+
+        self.area_threshold = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._AREA_THRESHOLD}",
+            settings=data,
+            default=0.02
+        )
+
+        self.background_rate = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._BACKGROUND_RATE}",
+            settings=data,
+            default=0.05
+        )
+
+        self.cpu_budget = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._CPU_BUDGET}",
+            settings=data,
+            default=0.25
+        )
+
+        # regions of interest as [x, y, width, height] relative to the frame size, empty for the whole frame
+        self.regions = [tuple(float(value) for value in region) for region in super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._REGIONS}",
+            settings=data,
+            default=[])]
+
+        self.replay_path = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{FrameDiffDetectorSettings._REPLAY_PATH}",
+            settings=data,
+            default=""
+        )
+
+
+class MotionVectorDetectorSettings(MotionDetectorSettings):
+    """specialized motion detector settings for the camera based motion vector detector
+    """
+    _KEY: ClassVar[str] = "motion_vector_detector"
+    _CAMERA_NUMBER: ClassVar[str] = "camera_number"
+    _RESOLUTION: ClassVar[str] = "resolution"
+    _FRAMERATE: ClassVar[str] = "framerate"
+    _MAGNITUDE_THRESHOLD: ClassVar[str] = "magnitude_threshold"
+    _MIN_REGION_SIZE: ClassVar[str] = "min_region_size"
+    _REGIONS: ClassVar[str] = "regions"
+    _REPLAY_PATH: ClassVar[str] = "replay_path"
+
+    @property
+    def camera_number(self) -> int:
+        return self._camera_number
+
+    @camera_number.setter
+    def camera_number(self, value: int) -> None:
+        self._camera_number = value
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        return self._resolution
+
+    @resolution.setter
+    def resolution(self, value: Tuple[int, int]) -> None:
+        self._resolution = value
+
+    @property
+    def framerate(self) -> int:
+        return self._framerate
+
+    @framerate.setter
+    def framerate(self, value: int) -> None:
+        self._framerate = value
+
+    @property
+    def magnitude_threshold(self) -> int:
+        return self._magnitude_threshold
+
+    @magnitude_threshold.setter
+    def magnitude_threshold(self, value: int) -> None:
+        self._magnitude_threshold = value
+
+    @property
+    def min_region_size(self) -> int:
+        return self._min_region_size
+
+    @min_region_size.setter
+    def min_region_size(self, value: int) -> None:
+        self._min_region_size = value
+
+    @property
+    def regions(self) -> List[Tuple[float, float, float, float]]:
+        return self._regions
+
+    @regions.setter
+    def regions(self, value: List[Tuple[float, float, float, float]]) -> None:
+        self._regions = value
+
+    @property
+    def replay_path(self) -> str:
+        return self._replay_path
+
+    @replay_path.setter
+    def replay_path(self, value: str) -> None:
+        self._replay_path = value
+
+    def _parse_data(self, data: Dict[str, Any]):
+        """parse settings data for motion vector detector settings
+        """
+        super()._parse_data(data)
+
+        self.camera_number = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{MotionVectorDetectorSettings._CAMERA_NUMBER}",
+            settings=data,
+            default=0
+        )
+
+        self.resolution = super().parse_resolution(super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{MotionVectorDetectorSettings._RESOLUTION}",
+            settings=data,
+            default="640x480"
+        ))
+
+        self.framerate = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{MotionVectorDetectorSettings._FRAMERATE}",
+            settings=data,
+            default=10
+        )
+
+        self.magnitude_threshold = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}."
+            f"{MotionVectorDetectorSettings._MAGNITUDE_THRESHOLD}",
+            settings=data,
+            default=60
+        )
+
+        self.min_region_size = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{MotionVectorDetectorSettings._MIN_REGION_SIZE}",
+            settings=data,
+            default=10
+        )
+
+        # regions of interest as [x, y, width, height] relative to the frame size, empty for the whole frame
+        self.regions = [tuple(float(value) for value in region) for region in super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{MotionVectorDetectorSettings._REGIONS}",
+            settings=data,
+            default=[])]
+
+        self.replay_path = super().get_setting_from_key(
+            setting_key=f"{MotionDetectorSettings._KEY}.{self._KEY}.{MotionVectorDetectorSettings._REPLAY_PATH}",
+            settings=data,
+            default=""
+        )
@@ -1,12 +1,47 @@
-from typing import Any, ClassVar, Dict
+import logging
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+from camguard.exceptions import ConfigurationError
+from camguard.extended_enum import ExtendedEnum
 from camguard.settings import ImplementationType, Settings
 
 
+class RecordMode(ExtendedEnum):
+    """record mode setting, selects whether a camera records a burst of pictures or a video
+    """
+    PICTURE = "picture"
+    VIDEO = "video"
+    BURST = "burst"
+
+    @classmethod
+    def parse(cls, value: str):
+        enum_vals = cls.list_values()
+        logger = logging.getLogger(cls.__name__)  # log with specific cls name
+
+        if value not in enum_vals:
+            raise ConfigurationError(f"Record mode {value} not allowed. "
+                                     f"Allowed values are: {enum_vals}")
+
+        logger.debug(f"Parsing record mode: {value}")
+
+        if value == cls.VIDEO.value:
+            return cls.VIDEO
+
+        if value == cls.BURST.value:
+            return cls.BURST
+
+        return cls.PICTURE
+
+
 class MotionHandlerSettings(Settings):
     """Specialized motion handler settings class
     """
     _IMPL: ClassVar[str] = 'implementation'
+    _STREAM_FRAMES: ClassVar[str] = 'stream_frames'
+    _COALESCE_WINDOW_SEC: ClassVar[str] = 'coalesce_window_seconds'
+    _NAME: ClassVar[str] = 'name'
     _KEY: ClassVar[str] = 'motion_handler'
+    _LIST_NODE: ClassVar[Optional[str]] = _KEY
 
     @property
     def impl_type(self) -> ImplementationType:
@@ -16,6 +51,30 @@ class MotionHandlerSettings(Settings):
     def impl_type(self, value: ImplementationType):
         self._impl_type = value
 
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        self._name = value
+
+    @property
+    def stream_frames(self) -> bool:
+        return self._stream_frames
+
+    @stream_frames.setter
+    def stream_frames(self, value: bool):
+        self._stream_frames = value
+
+    @property
+    def coalesce_window_sec(self) -> float:
+        return self._coalesce_window_sec
+
+    @coalesce_window_sec.setter
+    def coalesce_window_sec(self, value: float):
+        self._coalesce_window_sec = value
+
     def _parse_data(self, data: Dict[Any, Any]):
         super()._parse_data(data)
 
@@ -24,6 +83,22 @@ class MotionHandlerSettings(Settings):
             settings=data,
             default=ImplementationType.RASPI))
 
+        # empty name, if the handler is referenced by its position in the motion handler list
+        self.name = str(super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{MotionHandlerSettings._NAME}",
+            settings=data,
+            default=""))
+
+        self.stream_frames = bool(super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{MotionHandlerSettings._STREAM_FRAMES}",
+            settings=data,
+            default=False))
+
+        self.coalesce_window_sec = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{MotionHandlerSettings._COALESCE_WINDOW_SEC}",
+            settings=data,
+            default=0.0)
+
 
 class RaspiCamSettings(MotionHandlerSettings):
     """ specialized settings for raspi cam motion handler
@@ -31,7 +106,29 @@ class RaspiCamSettings(MotionHandlerSettings):
     _RECORD_PATH: ClassVar[str] = 'record_path'
     _RECORD_INTERVAL_SEC: ClassVar[str] = 'record_interval_seconds'
     _RECORD_COUNT: ClassVar[str] = 'record_count'
+    _MAX_RECORD_COUNT: ClassVar[str] = 'max_record_count'
     _RECORD_FILE_FORMAT: ClassVar[str] = 'record_file_format'
+    _CAMERA_NUMBER: ClassVar[str] = 'camera_number'
+    _PERSISTENT_CAMERA: ClassVar[str] = 'persistent_camera'
+    _WARMUP_SEC: ClassVar[str] = 'warmup_seconds'
+    _LOCK_EXPOSURE: ClassVar[str] = 'lock_exposure'
+    _PRE_RECORD_SEC: ClassVar[str] = 'pre_record_seconds'
+    _PRE_RECORD_BUFFER_SIZE: ClassVar[str] = 'pre_record_buffer_size'
+    _RECORD_MODE: ClassVar[str] = 'record_mode'
+    _SEGMENT_SEC: ClassVar[str] = 'segment_seconds'
+    _VIDEO_FILE_FORMAT: ClassVar[str] = 'video_file_format'
+    _VIDEO_BITRATE: ClassVar[str] = 'video_bitrate'
+    _IN_MEMORY: ClassVar[str] = 'in_memory'
+    _MEMORY_ONLY: ClassVar[str] = 'memory_only'
+    _BURST_FPS: ClassVar[str] = 'burst_fps'
+    _BURST_RESOLUTION: ClassVar[str] = 'burst_resolution'
+    _BURST_MAX_SECONDS: ClassVar[str] = 'burst_max_seconds'
+    _BURST_MAX_BYTES: ClassVar[str] = 'burst_max_bytes'
+    _RATE_CONTROL: ClassVar[str] = 'rate_control'
+    _RATE_CONTROL_UPLOAD_SECONDS: ClassVar[str] = 'rate_control_upload_seconds'
+    _RATE_CONTROL_MAX_QUALITY: ClassVar[str] = 'rate_control_max_quality'
+    _RATE_CONTROL_MIN_QUALITY: ClassVar[str] = 'rate_control_min_quality'
+    _MOTION_TAIL_SEC: ClassVar[str] = 'motion_tail_seconds'
     _KEY: ClassVar[str] = 'raspi_cam'
 
     @property
@@ -58,6 +155,14 @@ class RaspiCamSettings(MotionHandlerSettings):
     def record_count(self, value: int) -> None:
         self._record_count = value
 
+    @property
+    def max_record_count(self) -> int:
+        return self._max_record_count
+
+    @max_record_count.setter
+    def max_record_count(self, value: int) -> None:
+        self._max_record_count = value
+
     @property
     def record_file_format(self) -> str:
         return self._record_file_format
@@ -66,6 +171,176 @@ class RaspiCamSettings(MotionHandlerSettings):
     def record_file_format(self, value: str) -> None:
         self._record_file_format = value
 
+    @property
+    def camera_number(self) -> int:
+        return self._camera_number
+
+    @camera_number.setter
+    def camera_number(self, value: int) -> None:
+        self._camera_number = value
+
+    @property
+    def persistent_camera(self) -> bool:
+        return self._persistent_camera
+
+    @persistent_camera.setter
+    def persistent_camera(self, value: bool) -> None:
+        self._persistent_camera = value
+
+    @property
+    def warmup_sec(self) -> float:
+        return self._warmup_sec
+
+    @warmup_sec.setter
+    def warmup_sec(self, value: float) -> None:
+        self._warmup_sec = value
+
+    @property
+    def lock_exposure(self) -> bool:
+        return self._lock_exposure
+
+    @lock_exposure.setter
+    def lock_exposure(self, value: bool) -> None:
+        self._lock_exposure = value
+
+    @property
+    def pre_record_seconds(self) -> float:
+        return self._pre_record_seconds
+
+    @pre_record_seconds.setter
+    def pre_record_seconds(self, value: float) -> None:
+        self._pre_record_seconds = value
+
+    @property
+    def pre_record_buffer_size(self) -> int:
+        return self._pre_record_buffer_size
+
+    @pre_record_buffer_size.setter
+    def pre_record_buffer_size(self, value: int) -> None:
+        self._pre_record_buffer_size = value
+
+    @property
+    def record_mode(self) -> RecordMode:
+        return self._record_mode
+
+    @record_mode.setter
+    def record_mode(self, value: RecordMode) -> None:
+        self._record_mode = value
+
+    @property
+    def segment_sec(self) -> float:
+        return self._segment_sec
+
+    @segment_sec.setter
+    def segment_sec(self, value: float) -> None:
+        self._segment_sec = value
+
+    @property
+    def video_file_format(self) -> str:
+        return self._video_file_format
+
+    @video_file_format.setter
+    def video_file_format(self, value: str) -> None:
+        self._video_file_format = value
+
+    @property
+    def video_bitrate(self) -> int:
+        return self._video_bitrate
+
+    @video_bitrate.setter
+    def video_bitrate(self, value: int) -> None:
+        self._video_bitrate = value
+
+    @property
+    def in_memory(self) -> bool:
+        return self._in_memory
+
+    @in_memory.setter
+    def in_memory(self, value: bool) -> None:
+        self._in_memory = value
+
+    @property
+    def memory_only(self) -> bool:
+        return self._memory_only
+
+    @memory_only.setter
+    def memory_only(self, value: bool) -> None:
+        self._memory_only = value
+
+    @property
+    def burst_fps(self) -> int:
+        return self._burst_fps
+
+    @burst_fps.setter
+    def burst_fps(self, value: int) -> None:
+        self._burst_fps = value
+
+    @property
+    def burst_resolution(self) -> Tuple[int, int]:
+        return self._burst_resolution
+
+    @burst_resolution.setter
+    def burst_resolution(self, value: Tuple[int, int]) -> None:
+        self._burst_resolution = value
+
+    @property
+    def burst_max_sec(self) -> float:
+        return self._burst_max_sec
+
+    @burst_max_sec.setter
+    def burst_max_sec(self, value: float) -> None:
+        self._burst_max_sec = value
+
+    @property
+    def burst_max_bytes(self) -> int:
+        return self._burst_max_bytes
+
+    @burst_max_bytes.setter
+    def burst_max_bytes(self, value: int) -> None:
+        self._burst_max_bytes = value
+
+    @property
+    def rate_control(self) -> bool:
+        return self._rate_control
+
+    @rate_control.setter
+    def rate_control(self, value: bool) -> None:
+        self._rate_control = value
+
+    @property
+    def rate_control_upload_sec(self) -> float:
+        return self._rate_control_upload_sec
+
+    @rate_control_upload_sec.setter
+    def rate_control_upload_sec(self, value: float) -> None:
+        self._rate_control_upload_sec = value
+
+    @property
+    def rate_control_max_quality(self) -> int:
+        return self._rate_control_max_quality
+
+    @rate_control_max_quality.setter
+    def rate_control_max_quality(self, value: int) -> None:
+        self._rate_control_max_quality = value
+
+    @property
+    def rate_control_min_quality(self) -> int:
+        return self._rate_control_min_quality
+
+    @rate_control_min_quality.setter
+    def rate_control_min_quality(self, value: int) -> None:
+        self._rate_control_min_quality = value
+
+    @property
+    def motion_tail_sec(self) -> float:
+        """seconds to continue recording after the motion ended, 0 records a fixed count of files
+        """
+        return self._motion_tail_sec
+
+    @motion_tail_sec.setter
+    def motion_tail_sec(self, value: float) -> None:
+        self._motion_tail_sec = value
+
     def _parse_data(self, data: Dict[Any, Any]):
         """parse settings data for raspi cam settings
         take care: in here self._KEY is used for key, this can be a different value than RaspiCamSettings._KEY,
@@ -97,6 +372,138 @@ class RaspiCamSettings(MotionHandlerSettings):
             default=15
         )
 
+        self.max_record_count = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._MAX_RECORD_COUNT}",
+            settings=data,
+            default=60
+        )
+
+        self.camera_number = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._CAMERA_NUMBER}",
+            settings=data,
+            default=0
+        )
+
+        self.persistent_camera = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._PERSISTENT_CAMERA}",
+            settings=data,
+            default=False
+        )
+
+        self.warmup_sec = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._WARMUP_SEC}",
+            settings=data,
+            default=2.0
+        )
+
+        self.lock_exposure = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._LOCK_EXPOSURE}",
+            settings=data,
+            default=False
+        )
+
+        self.pre_record_seconds = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._PRE_RECORD_SEC}",
+            settings=data,
+            default=0.0
+        )
+
+        self.pre_record_buffer_size = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._PRE_RECORD_BUFFER_SIZE}",
+            settings=data,
+            default=8388608
+        )
+
+        self.record_mode = RecordMode.parse(super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._RECORD_MODE}",
+            settings=data,
+            default=RecordMode.PICTURE.value
+        ))
+
+        self.segment_sec = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._SEGMENT_SEC}",
+            settings=data,
+            default=5.0
+        )
+
+        self.video_file_format = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._VIDEO_FILE_FORMAT}",
+            settings=data,
+            default="{counter:03d}_{timestamp:%y%m%d_%H%M%S%f}_video.h264"
+        )
+
+        self.video_bitrate = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._VIDEO_BITRATE}",
+            settings=data,
+            default=2000000
+        )
+
+        self.in_memory = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._IN_MEMORY}",
+            settings=data,
+            default=False
+        )
+
+        self.memory_only = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._MEMORY_ONLY}",
+            settings=data,
+            default=False
+        )
+
+        self.burst_fps = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._BURST_FPS}",
+            settings=data,
+            default=10
+        )
+
+        self.burst_resolution = Settings.parse_resolution(super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._BURST_RESOLUTION}",
+            settings=data,
+            default="640x480"
+        ))
+
+        self.burst_max_sec = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._BURST_MAX_SECONDS}",
+            settings=data,
+            default=10.0
+        )
+
+        self.burst_max_bytes = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._BURST_MAX_BYTES}",
+            settings=data,
+            default=20971520
+        )
+
+        self.rate_control = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._RATE_CONTROL}",
+            settings=data,
+            default=False
+        )
+
+        self.rate_control_upload_sec = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._RATE_CONTROL_UPLOAD_SECONDS}",
+            settings=data,
+            default=30.0
+        )
+
+        self.rate_control_max_quality = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._RATE_CONTROL_MAX_QUALITY}",
+            settings=data,
+            default=85
+        )
+
+        self.rate_control_min_quality = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._RATE_CONTROL_MIN_QUALITY}",
+            settings=data,
+            default=30
+        )
+
+        self.motion_tail_sec = super().get_setting_from_key(
+            setting_key=f"{MotionHandlerSettings._KEY}.{self._KEY}.{RaspiCamSettings._MOTION_TAIL_SEC}",
+            settings=data,
+            default=0.0
+        )
+
 
 class DummyCamSettings(RaspiCamSettings):
     """ specialized settings for dummy cam motion handler
@@ -0,0 +1,265 @@
+import logging
+import os
+import time
+from threading import Event, Thread
+from typing import Any, Callable, ClassVar, Optional, Sequence, Tuple
+
+# numpy is an optional dependency, which is only needed for camera based motion detection
+import numpy as np  # type: ignore reportMissingImports
+
+from camguard.bridge_impl import MotionDetectorImpl
+from camguard.exceptions import ConfigurationError
+from camguard.frame_diff_detector import RecordedFrames, region_mask
+from camguard.metrics import Metric, Metrics
+from camguard.motion_detector_settings import MotionVectorDetectorSettings
+from camguard.shared_camera import SharedCamera, SplitterRecording
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MotionVectorModel:
+    """finds connected regions of moving macroblocks in the motion vectors of a h264 frame.
+    vectors are given as structured array with signed 'x' and 'y' fields per macroblock, like the motion data
+    of the pi camera encoder. connected regions are labeled by propagating labels between neighbouring
+    macroblocks, which takes as many vectorized steps as the longest path through a region
+    """
+
+    def __init__(self, magnitude_threshold: int, min_region_size: int,
+                 regions: Sequence[Tuple[float, float, float, float]] = ()) -> None:
+        """default initialization
+
+        Args:
+            magnitude_threshold (int): minimum vector magnitude of a moving macroblock
+            min_region_size (int): minimum number of connected moving macroblocks for detecting motion
+            regions (Sequence[Tuple[float, float, float, float]], optional): regions of interest as
+            (x, y, width, height) relative to the frame size. Defaults to the whole frame.
+
+        Raises:
+            ConfigurationError: if a region is not given by four values
+        """
+        if any(len(region) != 4 for region in regions):
+            raise ConfigurationError(f"Regions have to be given as [x, y, width, height]: {regions}")
+
+        # compare squared magnitudes, which avoids the square root
+        self.__magnitude_threshold = magnitude_threshold ** 2
+        self.__min_region_size = min_region_size
+        self.__regions = regions
+        self.__magnitude: Optional[np.ndarray] = None
+        self.__y_square: Optional[np.ndarray] = None
+        self.__active: Optional[np.ndarray] = None
+        self.__indices: Optional[np.ndarray] = None
+        self.__mask: Optional[np.ndarray] = None
+
+    def update(self, vectors: np.ndarray) -> int:
+        """find the largest connected region of moving macroblocks
+
+        Args:
+            vectors (np.ndarray): motion vectors of a frame, all frames must have the same shape
+
+        Returns:
+            int: size of the largest region in macroblocks, 0 if there are less moving macroblocks
+            than the minimum region size
+        """
+        self.__init_buffers(vectors.shape)
+        np.square(vectors['x'], out=self.__magnitude, dtype=np.int32)
+        np.square(vectors['y'], out=self.__y_square, dtype=np.int32)
+        np.add(self.__magnitude, self.__y_square, out=self.__magnitude)
+        np.greater(self.__magnitude, self.__magnitude_threshold, out=self.__active)
+        if self.__mask is not None:
+            np.logical_and(self.__active, self.__mask, out=self.__active)
+
+        # most frames don't have enough motion for a region, they don't need labeling
+        if np.count_nonzero(self.__active) < self.__min_region_size:
+            return 0
+
+        return self.__largest_region()
+
+    def __largest_region(self) -> int:
+        active: np.ndarray = self.__active  # type: ignore
+        # every moving macroblock starts with a label of its own, the largest label spreads through a region
+        labels = np.where(active, self.__indices, 0)
+        while True:
+            spread = labels.copy()
+            np.maximum(spread[1:], labels[:-1], out=spread[1:])
+            np.maximum(spread[:-1], labels[1:], out=spread[:-1])
+            np.maximum(spread[:, 1:], labels[:, :-1], out=spread[:, 1:])
+            np.maximum(spread[:, :-1], labels[:, 1:], out=spread[:, :-1])
+            # labels don't spread over still macroblocks
+            spread *= active
+            if np.array_equal(spread, labels):
+                break
+            labels = spread
+
+        return int(np.bincount(labels[active]).max())
+
+    def __init_buffers(self, shape: Tuple[int, ...]) -> None:
+        if self.__magnitude is not None and self.__magnitude.shape == shape:
+            return
+
+        self.__magnitude = np.empty(shape, dtype=np.int32)
+        self.__y_square = np.empty(shape, dtype=np.int32)
+        self.__active = np.empty(shape, dtype=bool)
+        self.__indices = np.arange(1, shape[0] * shape[1] + 1, dtype=np.int32).reshape(shape)
+        self.__mask = region_mask(shape, self.__regions)
+
+
+class PiCameraMotionVectors(SplitterRecording):
+    """motion vectors of the persistent camera of a motion handler, which are taken from a h264 recording
+    on a splitter port. only the motion vectors are used, the video is discarded.
+    the recording runs at the framerate of the camera, frames are skipped for the configured framerate
+    """
+
+    def __init__(self, resolution: Tuple[int, int], framerate: int, analyse: Callable[[np.ndarray], None]) -> None:
+        """default initialization
+
+        Args:
+            resolution (Tuple[int, int]): video resolution as (width, height)
+            framerate (int): maximum number of analysed frames per second
+            analyse (Callable[[np.ndarray], None]): called by the encoder with the motion vectors of a frame
+        """
+        self.__resolution = resolution
+        self.__interval_sec = 1.0 / framerate
+        self.__analyse = analyse
+        self.__analysed = 0.0
+
+    def start(self, pi_camera: Any, splitter_port: int) -> None:
+        # picamera cannot be installed on a non-pi system, it's not needed for replaying motion vectors
+        from picamera.array import PiMotionAnalysis  # type: ignore reportMissingImports
+        analyse = self.__sample
+
+        class _Analysis(PiMotionAnalysis):  # type: ignore
+
+            def analyse(self, a: np.ndarray) -> None:
+                analyse(a)
+
+        pi_camera.start_recording(os.devnull, format='h264', resize=self.__resolution, splitter_port=splitter_port,
+                                  motion_output=_Analysis(pi_camera, size=self.__resolution))
+
+    def __sample(self, vectors: np.ndarray) -> None:
+        now = time.monotonic()
+        if now - self.__analysed < self.__interval_sec:
+            return
+
+        self.__analysed = now
+        self.__analyse(vectors)
+
+
+class MotionVectorDetector(MotionDetectorImpl):
+    """camera based motion detector, which analyses the motion vectors of the h264 encoder.
+    the encoder computes them on the gpu while recording, therefore detection costs little cpu time
+    compared to differencing frames. the recorded video itself is discarded.
+    motion vectors are taken from the persistent camera of a raspi cam handler with the same camera number
+    """
+    __id: ClassVar[int] = 0
+
+    def __init__(self, settings: MotionVectorDetectorSettings) -> None:
+        """default initialization
+
+        Args:
+            settings (MotionVectorDetectorSettings): motion vector detector settings
+
+        Raises:
+            ConfigurationError: if the framerate is invalid
+        """
+        super().__init__()
+        if settings.framerate <= 0:
+            raise ConfigurationError(f"Framerate has to be positive: {settings.framerate}")
+
+        self.__settings = settings
+        self.__model = MotionVectorModel(settings.magnitude_threshold, settings.min_region_size, settings.regions)
+        self.__handler: Optional[Callable[..., None]] = None
+        self.__activated = False
+        self.__recording: Optional[PiCameraMotionVectors] = None
+        self.__replay_thread: Optional[Thread] = None
+        self.__stop_event = Event()
+        MotionVectorDetector.__id += 1
+        # identifier of this instance, multiple detectors can be configured
+        self.__instance_id = MotionVectorDetector.__id
+
+    def register_handler(self, handler: Callable[..., None]) -> None:
+        """register handler and start analysing motion vectors
+
+        Args:
+            handler (Callable[..., None]): handler which is called on motion
+        """
+        LOGGER.debug("Registering motion vector detector callback")
+        self.__handler = handler
+        if self.__settings.replay_path:
+            self.__start_replay()
+        else:
+            self.__start_camera()
+
+    def shutdown(self, timeout_sec: float = 4.0) -> None:
+        LOGGER.info("Shutting down gracefully")
+        if self.__recording:
+            SharedCamera.detach(self.__settings.camera_number, self.__recording)
+            self.__recording = None
+
+        if self.__replay_thread:
+            self.__stop_event.set()
+            self.__replay_thread.join(timeout_sec)
+            if self.__replay_thread.is_alive():
+                LOGGER.error(f"Failed to stop within {timeout_sec}")
+
+    @property
+    def id(self) -> int:
+        return self.__instance_id
+
+    @property
+    def motion_active(self) -> bool:
+        return self.__activated
+
+    def __start_camera(self) -> None:
+        if self.__recording:
+            return
+
+        LOGGER.info(f"Using motion vectors of camera {self.__settings.camera_number} for motion detection")
+        self.__recording = PiCameraMotionVectors(self.__settings.resolution, self.__settings.framerate,
+                                                 self.__analyse)
+        SharedCamera.attach(self.__settings.camera_number, self.__recording)
+
+    def __start_replay(self) -> None:
+        if self.__replay_thread:
+            return
+
+        LOGGER.info(f"Replaying motion vectors of {self.__settings.replay_path}")
+        self.__replay_thread = Thread(target=self.__replay, name=f"MotionVectorReplayThread-{self.__instance_id}",
+                                      daemon=True)
+        self.__replay_thread.start()
+
+    def __replay(self) -> None:
+        interval_sec = 1.0 / self.__settings.framerate
+        try:
+            for vectors in RecordedFrames(self.__settings.replay_path).frames():
+                self.__analyse(vectors)
+                if self.__stop_event.wait(interval_sec):
+                    break
+        # skipcq: PYL-W0703
+        except Exception as e:
+            LOGGER.exception("Unrecoverable error in motion vector replay thread", exc_info=e)
+
+        LOGGER.info("Finished")
+
+    def __analyse(self, vectors: np.ndarray) -> None:
+        """analyse motion vectors of a frame, called by the encoder thread for every frame
+        """
+        if self.disabled:
+            self.__activated = False
+            return
+
+        try:
+            start = time.monotonic()
+            region_size = self.__model.update(vectors)
+            Metrics.measure(Metric.MOTION_ANALYSIS_DURATION, time.monotonic() - start, detector=self.id)
+        # skipcq: PYL-W0703
+        except Exception as e:
+            # errors must not stop the encoder
+            LOGGER.error("Failed to analyse motion vectors", exc_info=e)
+            return
+
+        motion = region_size >= self.__settings.min_region_size
+        if motion and not self.__activated:
+            LOGGER.debug(f"Motion detected, region size: {region_size} macroblocks")
+            if self.__handler:
+                self.__handler()
+        self.__activated = motion
@@ -1,12 +1,17 @@
+import asyncio
 import logging
 import threading
+from concurrent.futures import Future, wait
 from shutil import which
 from subprocess import run
 from threading import Event, Thread
+from time import monotonic
 from typing import Callable, ClassVar, List, Optional, Tuple
 
+from camguard.async_runtime import AsyncRuntime
 from camguard.bridge_impl import NetworkDeviceDetectorImpl
 from camguard.exceptions import CamguardError
+from camguard.metrics import Metric, Metrics
 from camguard.network_device_detector_settings import \
     NMapDeviceDetectorSettings
 
@@ -36,7 +41,8 @@ class NMapDeviceDetector(NetworkDeviceDetectorImpl):
         self.__settings = settings
         self.__handler: Optional[Callable[[List[Tuple[str, bool]]], None]] = None
         self.__thread: Optional[Thread] = None
-        
+        self.__task: Optional['Future[None]'] = None
+
         if not which(self.__NMAP_BIN):
             # check if nmap is available, otherwise raise error
             raise CamguardError(f"Couldn't find nmap binary: '{self.__NMAP_BIN}'")
@@ -54,10 +60,15 @@ class NMapDeviceDetector(NetworkDeviceDetectorImpl):
         """start the detection thread, stops an already running threads
         """
         LOGGER.info("Starting detector thread")
-        if self.__thread:
+        if self.__thread or self.__task:
             LOGGER.debug("Detector thread already running")
             self.stop()
 
+        runtime = AsyncRuntime.current()
+        if runtime:
+            self.__task = runtime.submit(self.__do_work_async(runtime))
+            return
+
         self.__thread = threading.Thread(target=self.__do_work)
         self.__thread.start()
 
@@ -67,6 +78,14 @@ class NMapDeviceDetector(NetworkDeviceDetectorImpl):
         """
         LOGGER.info("Stopping detector thread")
 
+        if self.__task:
+            # cancels waiting for the next detection interval
+            self.__task.cancel()
+            wait([self.__task], timeout=4 * self.__settings.interval_seconds)
+            self.__task = None
+            LOGGER.info("Shutdown successful")
+            return
+
         if not self.__thread:
             LOGGER.debug("Detector thread has never been started")
             return
@@ -80,19 +99,38 @@ class NMapDeviceDetector(NetworkDeviceDetectorImpl):
     def __do_work(self):
         LOGGER.info("Starting device check thread")
         while not self.__stop_event.wait(self.__settings.interval_seconds):
-            found_devices: List[Tuple[str, bool]] = []
-            for ip in self.__settings.ip_addr:
-                args: List[str] = [self.__NMAP_BIN, self.__SCAN_ALGORITHM, self.__SCAN_TYPE, ip]
-                # check for device in network
-                result = run(args, capture_output=True, text=True) # skipcq: PYL-W1510
-                # TODO: handle errors from cmd
-                found = self.__FOUND_HOST_MSG in result.stdout.lower()
-                found_devices.append((ip, found))
-
-            LOGGER.debug(f"Device detection state: %s", found_devices)
-
-            if self.__handler:
-                # call handler and notice about detection status
-                self.__handler(found_devices)
+            self.__notify(self.__detect_devices())
 
         LOGGER.info("Exiting device check thread")
+
+    async def __do_work_async(self, runtime: AsyncRuntime) -> None:
+        LOGGER.info("Starting device check task")
+        try:
+            while True:
+                await asyncio.sleep(self.__settings.interval_seconds)
+                # nmap blocks for the whole scan, therefore it's pushed to the executor
+                self.__notify(await runtime.run_blocking(self.__detect_devices))
+        except asyncio.CancelledError:
+            LOGGER.info("Exiting device check task")
+            raise
+
+    def __detect_devices(self) -> List[Tuple[str, bool]]:
+        found_devices: List[Tuple[str, bool]] = []
+        scan_start = monotonic()
+        for ip in self.__settings.ip_addr:
+            args: List[str] = [self.__NMAP_BIN, self.__SCAN_ALGORITHM, self.__SCAN_TYPE, ip]
+            # check for device in network
+            result = run(args, capture_output=True, text=True) # skipcq: PYL-W1510
+            # TODO: handle errors from cmd
+            found = self.__FOUND_HOST_MSG in result.stdout.lower()
+            found_devices.append((ip, found))
+
+        Metrics.measure(Metric.NETWORK_SCAN_DURATION, monotonic() - scan_start)
+        Metrics.gauge(Metric.NETWORK_DEVICES_FOUND, sum(found for _, found in found_devices))
+        LOGGER.debug(f"Device detection state: %s", found_devices)
+        return found_devices
+
+    def __notify(self, found_devices: List[Tuple[str, bool]]) -> None:
+        if self.__handler:
+            # call handler and notice about detection status
+            self.__handler(found_devices)
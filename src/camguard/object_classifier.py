@@ -0,0 +1,312 @@
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from os import path
+from threading import Lock
+from time import perf_counter
+from typing import Any, ClassVar, Dict, Generator, List, Optional, Tuple, Union
+
+# opencv and numpy are optional dependencies, which are only needed for object classification
+import cv2  # type: ignore reportMissingImports
+import numpy as np  # type: ignore reportMissingImports
+
+from camguard.bridge_api import pipelinestep
+from camguard.event_tracer import EventTracer, TraceMark
+from camguard.exceptions import CamguardError, ConfigurationError
+from camguard.metrics import Metric, Metrics
+from camguard.pipeline_settings import ClassifyPolicy, PipelineSettings
+from camguard.recorded_file import RecordedFile, file_name, file_source
+
+LOGGER = logging.getLogger(__name__)
+
+# network of a worker process, loaded once by the initializer of the pool
+_net: Any = None
+
+
+def _load_model(model: str) -> None:
+    """load the object detection model, executed in a worker process
+
+    Args:
+        model (str): path of the model
+    """
+    global _net
+    _net = cv2.dnn.readNet(model)
+
+
+def detections(output: np.ndarray, confidence: float) -> Dict[int, float]:
+    """get the detected object classes of a model output. detection output layers (ssd models) yield rows of
+    (image, class id, confidence, box), yolov8 models yield (box, confidence of every class) for every anchor
+
+    Args:
+        output (np.ndarray): output of the model
+        confidence (float): minimum confidence of a detection
+
+    Returns:
+        Dict[int, float]: best confidence by class id
+    """
+    found: Dict[int, float] = {}
+    if output.shape[-1] == 7:
+        for _, class_id, score, *_ in output.reshape(-1, 7):
+            if score >= confidence:
+                found[int(class_id)] = max(found.get(int(class_id), 0.0), float(score))
+        return found
+
+    # (1, 4 + classes, anchors), the best confidence of every class over all anchors
+    scores = output.reshape(output.shape[-2], output.shape[-1])[4:].max(axis=1)
+    return {int(class_id): float(scores[class_id]) for class_id in np.flatnonzero(scores >= confidence)}
+
+
+def _detect(source: Union[str, bytes], input_size: Tuple[int, int],
+            confidence: float) -> Tuple[Optional[Dict[int, float]], float]:
+    """detect objects in a picture, executed in a worker process
+
+    Args:
+        source (Union[str, bytes]): path or content of the picture
+        input_size (Tuple[int, int]): input size of the model as (width, height)
+        confidence (float): minimum confidence of a detection
+
+    Returns:
+        Tuple[Optional[Dict[int, float]], float]: best confidence by class id, None if the source is not a picture,
+        and the inference duration
+    """
+    start = perf_counter()
+    if isinstance(source, bytes):
+        image = cv2.imdecode(np.frombuffer(source, dtype=np.uint8), cv2.IMREAD_COLOR)
+    else:
+        image = cv2.imread(source, cv2.IMREAD_COLOR)
+    if image is None:
+        return None, perf_counter() - start
+
+    # scaled to 0..1, in rgb order and stretched to the input size
+    _net.setInput(cv2.dnn.blobFromImage(image, 1 / 255.0, input_size, swapRB=True, crop=False))
+    return detections(_net.forward(), confidence), perf_counter() - start
+
+
+class ObjectClassifier:
+    """classifies motion events by running an object detection model (i.e. a small yolo or ssd model exported
+    to onnx) on a subsample of the recorded pictures. events without any of the configured object classes,
+    like moving shadows or pets, are suppressed or downgraded to an upload without notification mail.
+    inference runs in a pool of worker processes, which load the model once. the cost of an event is bounded
+    by the number of classified pictures and the classify timeout, classification stops at the first picture
+    which shows a configured class. events which can't be classified are forwarded, a missed intruder is worse
+    than a false alarm. if the worker processes break, classification is disabled and every event is forwarded
+    """
+    _PICTURE_EXTENSIONS: ClassVar[Tuple[str, ...]] = ('.jpg', '.jpeg', '.png')
+
+    def __init__(self, settings: PipelineSettings) -> None:
+        """default initialization
+
+        Args:
+            settings (PipelineSettings): pipeline settings with the classify settings
+
+        Raises:
+            ConfigurationError: if the labels can't be read or a configured class is unknown
+        """
+        self.__settings = settings
+        self.__executor: Optional[ProcessPoolExecutor] = None
+        self.__broken = False
+        self.__lock = Lock()
+        try:
+            with open(settings.classify_labels, 'r') as labels_file:
+                labels = [line.strip() for line in labels_file]
+        except OSError as e:
+            raise ConfigurationError(f"Failed to read classify labels {settings.classify_labels}") from e
+
+        unknown = [name for name in settings.classify_classes if name not in labels]
+        if unknown:
+            raise ConfigurationError(f"Unknown classify classes {unknown}, available classes are: "
+                                     f"{[label for label in labels if label]}")
+        # names of the configured classes by class id
+        self.__classes = {class_id: label for class_id, label in enumerate(labels)
+                          if label in settings.classify_classes}
+
+    @property
+    def broken(self) -> bool:
+        """get state of the worker processes
+
+        Returns:
+            bool: True if the worker processes broke and classification has been disabled
+        """
+        with self.__lock:
+            return self.__broken
+
+    def start(self) -> None:
+        """start the worker processes, this has to be done after detaching the daemon process,
+        which would close the pipes to the workers
+        """
+        if self.__executor:
+            return
+
+        LOGGER.info(f"Starting {self.__settings.classify_workers} workers for classifying motion events with model "
+                    f"{self.__settings.classify_model}, classes: {self.__settings.classify_classes}")
+        # workers are spawned instead of forked, forking would copy the locks of running threads
+        self.__executor = ProcessPoolExecutor(max_workers=self.__settings.classify_workers,
+                                              mp_context=multiprocessing.get_context('spawn'),
+                                              initializer=_load_model,
+                                              initargs=(self.__settings.classify_model,))
+
+    def stop(self) -> None:
+        """stop the worker processes, running inferences are finished before
+        """
+        with self.__lock:
+            executor = self.__executor
+            self.__executor = None
+            self.__broken = False
+        if executor:
+            executor.shutdown(wait=True)
+
+    def sample(self, files: List[RecordedFile]) -> List[RecordedFile]:
+        """get the pictures to classify, evenly spread over the record
+
+        Args:
+            files (List[RecordedFile]): recorded files of a motion event
+
+        Returns:
+            List[RecordedFile]: at most classify_max_frames pictures, in record order
+        """
+        pictures = [file for file in files
+                    if path.splitext(file_name(file))[1].lower() in ObjectClassifier._PICTURE_EXTENSIONS]
+        max_frames = self.__settings.classify_max_frames
+        if len(pictures) <= max_frames:
+            return pictures
+        if max_frames == 1:
+            return [pictures[len(pictures) // 2]]
+
+        step = (len(pictures) - 1) / (max_frames - 1)
+        return [pictures[round(index * step)] for index in range(max_frames)]
+
+    def classify_files(self, files: List[RecordedFile]) -> bool:
+        """classify the recorded files of a motion event
+
+        Args:
+            files (List[RecordedFile]): recorded files of a motion event
+
+        Raises:
+            CamguardError: if the classifier has not been started
+
+        Returns:
+            bool: True if a picture shows a configured class or the event couldn't be classified
+        """
+        with self.__lock:
+            executor = self.__executor
+            if self.__broken:
+                LOGGER.debug("Classification has been disabled, forwarding motion event")
+                return True
+        if not executor:
+            raise CamguardError("Object classifier has not been started")
+
+        samples = self.sample(files)
+        if not samples:
+            LOGGER.debug("Motion event without pictures, not classifying")
+            return True
+
+        # raises if a picture is missing, instead of treating it like a picture which can't be decoded
+        sources = [file_source(file) for file in samples]
+        start = perf_counter()
+        futures: List['Future[Tuple[Optional[Dict[int, float]], float]]'] = []
+        classified = 0
+        found: Dict[str, float] = {}
+        timed_out = False
+        broken: Optional[Exception] = None
+        try:
+            futures = [executor.submit(_detect, source, self.__settings.classify_input_size,
+                                       self.__settings.classify_confidence)
+                       for source in sources]
+            for future in as_completed(futures, timeout=self.__settings.classify_timeout_sec):
+                try:
+                    detected, _ = future.result()
+                except BrokenProcessPool as e:
+                    broken = e
+                    break
+                # skipcq: PYL-W0703
+                except Exception as e:
+                    LOGGER.error("Failed to classify picture", exc_info=e)
+                    continue
+
+                if detected is None:
+                    continue
+                classified += 1
+                found = {self.__classes[class_id]: score for class_id, score in detected.items()
+                         if class_id in self.__classes}
+                if found:
+                    break
+        except FutureTimeoutError:
+            timed_out = True
+        except (BrokenProcessPool, OSError) as e:
+            broken = e
+        finally:
+            # pictures which are still pending are not classified anymore
+            for future in futures:
+                future.cancel()
+
+        if broken:
+            self.__disable(executor, broken)
+            return True
+
+        elapsed = perf_counter() - start
+        Metrics.count(Metric.CLASSIFY_FRAMES, classified)
+        Metrics.measure(Metric.CLASSIFY_DURATION, elapsed)
+        if found:
+            LOGGER.info(f"Detected {found} after classifying {classified} pictures in {elapsed:.3f}s")
+            return True
+        if timed_out:
+            LOGGER.warning(f"Classification exceeded {self.__settings.classify_timeout_sec}s after {classified} of "
+                           f"{len(samples)} pictures, forwarding motion event")
+            return True
+        if not classified:
+            LOGGER.warning("Failed to classify any picture, forwarding motion event")
+            return True
+
+        LOGGER.info(f"No configured class in {classified} pictures, classified in {elapsed:.3f}s")
+        return False
+
+    def __disable(self, executor: ProcessPoolExecutor, error: Exception) -> None:
+        """disable classification after the worker processes broke, it's logged once instead of failing every event
+        """
+        with self.__lock:
+            if self.__broken:
+                return
+            self.__broken = True
+
+        LOGGER.error("Worker processes for classifying motion events broke, motion events are forwarded "
+                     "unclassified until restart", exc_info=error)
+        Metrics.count(Metric.WORKER_POOL_FAILURES, pool="classify")
+        executor.shutdown(wait=False)
+
+    @pipelinestep
+    def classify(self, mail_pipeline: List[Generator[None, Any, None]],
+                 storage_pipeline: List[Generator[None, Any, None]]) -> Generator[None, List[RecordedFile], None]:
+        """motion handler pipeline step: forward relevant motion events to the mail client and file storage steps,
+        other motion events are uploaded without mail (downgrade) or dropped (suppress)
+
+        Args:
+            mail_pipeline (List[Generator[None, Any, None]]): steps of the mail client
+            storage_pipeline (List[Generator[None, Any, None]]): steps of the file storage
+
+        Yields:
+            Generator[None, List[RecordedFile], None]: recorded files of a motion event
+        """
+        policy = self.__settings.classify_policy
+        while True:
+            files: List[RecordedFile] = (yield)
+            relevant = True
+            try:
+                relevant = self.classify_files(files)
+            # skipcq: PYL-W0703
+            except Exception as e:
+                # the event is forwarded unclassified
+                LOGGER.error("Failed to classify motion event", exc_info=e)
+
+            targets = mail_pipeline + storage_pipeline
+            if not relevant:
+                Metrics.count(Metric.MOTION_EVENTS_FILTERED, policy=policy.value)
+                # skipped components are done, the motion event doesn't wait for them
+                EventTracer.trace_files(files, TraceMark.MAIL_SENT)
+                targets = storage_pipeline
+                if policy == ClassifyPolicy.SUPPRESS:
+                    EventTracer.trace_files(files, TraceMark.UPLOAD_END)
+                    targets = []
+
+            for step in targets:
+                step.send(files)
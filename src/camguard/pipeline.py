@@ -0,0 +1,119 @@
+import logging
+from threading import local
+from time import monotonic
+from typing import Any, Callable, ClassVar, Generator, Optional
+
+from camguard.queue_worker import QueueWorker
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PipelineStep(QueueWorker):
+    """isolated motion handler pipeline step, which runs a generator based pipeline step on its own worker thread.
+    sending a value to the step enqueues it and returns immediately, therefore a slow step doesn't throttle the
+    sender or the other steps of a pipeline. the generator is re-created from the step factory if it raised an error,
+    or if it didn't finish handling a value within the step timeout. steps run on dedicated threads even if an async
+    runtime is available: a hanging step (i.e. an smtp send) can't be interrupted, on the executor of the runtime
+    it would occupy a worker shared by all components for good. a step instance can be used in place of a pipeline
+    step generator, i.e.:
+
+        step = PipelineStep("MailClientStep", mail_client.send_mail)
+        step.start()
+        step.send(files)
+    """
+    _KIND: ClassVar[str] = "step"
+
+    def __init__(self, name: str, step_factory: Callable[[], Generator[None, Any, None]],
+                 queue_size: int = 10, timeout_sec: float = 60.0) -> None:
+        """default initialization
+
+        Args:
+            name (str): name of the step, used for the worker thread name
+            step_factory (Callable[[], Generator[None, Any, None]]): function which creates a primed pipeline step
+            generator, i.e. a function decorated with @pipelinestep
+            queue_size (int, optional): maximum number of pending values. Defaults to 10.
+            timeout_sec (float, optional): maximum seconds for handling a single value, before the worker
+            is considered as hanging and will be replaced. Defaults to 60.0.
+        """
+        super().__init__(name, queue_size=queue_size, use_runtime=False)
+        self.__step_factory = step_factory
+        self.__timeout_sec = timeout_sec
+        # step generator of a worker thread
+        self.__local = local()
+        self.__busy_since: Optional[float] = None
+        self.__failures = 0
+        self.__timeouts = 0
+
+    @property
+    def failures(self) -> int:
+        """get number of errors raised by the step
+
+        Returns:
+            int: error count
+        """
+        with self._lock:
+            return self.__failures
+
+    @property
+    def timeouts(self) -> int:
+        """get number of step timeouts, every timeout leaves a hanging worker thread behind
+
+        Returns:
+            int: timeout count
+        """
+        with self._lock:
+            return self.__timeouts
+
+    def send(self, value: Any) -> None:
+        """enqueue value for the worker thread, does not block.
+        a worker, which exceeded the step timeout, is replaced before enqueuing
+
+        Args:
+            value (Any): the value to send to the step generator
+        """
+        self.__check_timeout()
+        self.put(value)
+
+    def _thread_name(self, generation: int) -> str:
+        return f"{self.name}Thread-{generation}"
+
+    def _start_thread(self) -> None:
+        self.__busy_since = None
+        super()._start_thread()
+
+    def _handle(self, value: Any) -> None:
+        step: Optional[Generator[None, Any, None]] = getattr(self.__local, 'step', None)
+        try:
+            if not step:
+                step = self.__step_factory()
+                self.__local.step = step
+
+            with self._lock:
+                self.__busy_since = monotonic()
+            step.send(value)
+        # skipcq: PYL-W0703
+        except Exception as e:
+            # a generator which raised is exhausted, it's re-created for the next value
+            with self._lock:
+                self.__failures += 1
+            LOGGER.exception(f"{self.name}: Error while handling value: {value}, restarting step", exc_info=e)
+            self.__local.step = None
+        finally:
+            with self._lock:
+                if self._is_current_thread():
+                    self.__busy_since = None
+
+    def __check_timeout(self) -> None:
+        with self._lock:
+            if self.__busy_since is None or not self._has_thread():
+                return
+            busy_sec = monotonic() - self.__busy_since
+            if busy_sec <= self.__timeout_sec:
+                return
+
+            self.__timeouts += 1
+            LOGGER.error(f"{self.name}: Step is busy for {busy_sec:.1f} seconds, exceeding the timeout of "
+                         f"{self.__timeout_sec} seconds. Replacing worker, {self.__timeouts} workers are left "
+                         "hanging")
+            # the hanging worker can't be interrupted, it exits as soon as its current value has been handled
+            self._start_thread()
@@ -0,0 +1,365 @@
+from typing import Any, ClassVar, Dict, List, NamedTuple, Tuple, Union
+
+import logging
+
+from camguard.exceptions import ConfigurationError
+from camguard.extended_enum import ExtendedEnum
+from camguard.settings import Settings
+
+_DEFAULT_QUALITY = 85
+
+
+class QualityProfile(NamedTuple):
+    """named quality of a picture variant
+    """
+    # maximum size as (width, height), the aspect ratio of the picture is kept
+    resolution: Tuple[int, int]
+    # jpeg quality between 1 and 100
+    quality: int = _DEFAULT_QUALITY
+
+
+class SelectPolicy(ExtendedEnum):
+    """handling of pictures, which are not among the best pictures of a motion event
+    """
+    DEFER = "defer"
+    DROP = "drop"
+
+    @classmethod
+    def parse(cls, value: str):
+        enum_vals = cls.list_values()
+        logger = logging.getLogger(cls.__name__)  # log with specific cls name
+
+        if value not in enum_vals:
+            raise ConfigurationError(f"Select policy {value} not allowed. "
+                                     f"Allowed values are: {enum_vals}")
+
+        logger.debug(f"Parsing select policy: {value}")
+
+        if value == cls.DEFER.value:
+            return cls.DEFER
+
+        return cls.DROP
+
+
+class ClassifyPolicy(ExtendedEnum):
+    """handling of motion events, which don't show any of the configured object classes
+    """
+    DOWNGRADE = "downgrade"
+    SUPPRESS = "suppress"
+
+    @classmethod
+    def parse(cls, value: str):
+        enum_vals = cls.list_values()
+        logger = logging.getLogger(cls.__name__)  # log with specific cls name
+
+        if value not in enum_vals:
+            raise ConfigurationError(f"Classify policy {value} not allowed. "
+                                     f"Allowed values are: {enum_vals}")
+
+        logger.debug(f"Parsing classify policy: {value}")
+
+        if value == cls.SUPPRESS.value:
+            return cls.SUPPRESS
+
+        return cls.DOWNGRADE
+
+
+class PipelineSettings(Settings):
+    """Specialized settings for the motion handler pipeline steps
+    """
+    _KEY: ClassVar[str] = "pipeline"
+    _STEP_TIMEOUT_SEC: ClassVar[str] = "step_timeout_seconds"
+    _STEP_QUEUE_SIZE: ClassVar[str] = "step_queue_size"
+    _DEDUP_MAX_DISTANCE: ClassVar[str] = "dedup_max_distance"
+    _VARIANTS: ClassVar[str] = "variants"
+    _VARIANT_WORKERS: ClassVar[str] = "variant_workers"
+    _UPLOAD_VARIANT: ClassVar[str] = "upload_variant"
+    _SELECT_TOP_K: ClassVar[str] = "select_top_k"
+    _SELECT_POLICY: ClassVar[str] = "select_policy"
+    _CLASSIFY_MODEL: ClassVar[str] = "classify_model"
+    _CLASSIFY_LABELS: ClassVar[str] = "classify_labels"
+    _CLASSIFY_CLASSES: ClassVar[str] = "classify_classes"
+    _CLASSIFY_CONFIDENCE: ClassVar[str] = "classify_confidence"
+    _CLASSIFY_INPUT_SIZE: ClassVar[str] = "classify_input_size"
+    _CLASSIFY_MAX_FRAMES: ClassVar[str] = "classify_max_frames"
+    _CLASSIFY_TIMEOUT_SEC: ClassVar[str] = "classify_timeout_seconds"
+    _CLASSIFY_WORKERS: ClassVar[str] = "classify_workers"
+    _CLASSIFY_POLICY: ClassVar[str] = "classify_policy"
+
+    @property
+    def step_timeout_sec(self) -> float:
+        return self._step_timeout_sec
+
+    @step_timeout_sec.setter
+    def step_timeout_sec(self, value: float) -> None:
+        self._step_timeout_sec = value
+
+    @property
+    def step_queue_size(self) -> int:
+        return self._step_queue_size
+
+    @step_queue_size.setter
+    def step_queue_size(self, value: int) -> None:
+        self._step_queue_size = value
+
+    @property
+    def dedup_max_distance(self) -> int:
+        """maximum hamming distance of near-duplicate pictures, which are not uploaded, 0 disables suppression
+        """
+        return self._dedup_max_distance
+
+    @dedup_max_distance.setter
+    def dedup_max_distance(self, value: int) -> None:
+        self._dedup_max_distance = value
+
+    @property
+    def variants(self) -> Dict[str, QualityProfile]:
+        """quality profiles of reduced-size picture variants by tag, empty disables variants
+        """
+        return self._variants
+
+    @variants.setter
+    def variants(self, value: Dict[str, QualityProfile]) -> None:
+        self._variants = value
+
+    @property
+    def variant_workers(self) -> int:
+        """number of worker processes for rendering variants
+        """
+        return self._variant_workers
+
+    @variant_workers.setter
+    def variant_workers(self, value: int) -> None:
+        self._variant_workers = value
+
+    @property
+    def upload_variant(self) -> str:
+        """tag of the variant, which is uploaded by the file storage instead of the recorded picture,
+        empty uploads the recorded pictures
+        """
+        return self._upload_variant
+
+    @upload_variant.setter
+    def upload_variant(self, value: str) -> None:
+        self._upload_variant = value
+
+    @property
+    def select_top_k(self) -> int:
+        """number of the best pictures of a motion event, which are uploaded and mailed, 0 disables selection
+        """
+        return self._select_top_k
+
+    @select_top_k.setter
+    def select_top_k(self, value: int) -> None:
+        self._select_top_k = value
+
+    @property
+    def select_policy(self) -> SelectPolicy:
+        """upload handling of the pictures, which have not been selected
+        """
+        return self._select_policy
+
+    @select_policy.setter
+    def select_policy(self, value: SelectPolicy) -> None:
+        self._select_policy = value
+
+    @property
+    def classify_model(self) -> str:
+        """path of the object detection model, empty disables classification
+        """
+        return self._classify_model
+
+    @classify_model.setter
+    def classify_model(self, value: str) -> None:
+        self._classify_model = value
+
+    @property
+    def classify_labels(self) -> str:
+        """path of the class names of the model, one name per line in the order of the class ids
+        """
+        return self._classify_labels
+
+    @classify_labels.setter
+    def classify_labels(self, value: str) -> None:
+        self._classify_labels = value
+
+    @property
+    def classify_classes(self) -> List[str]:
+        """object classes, which make a motion event relevant
+        """
+        return self._classify_classes
+
+    @classify_classes.setter
+    def classify_classes(self, value: List[str]) -> None:
+        self._classify_classes = value
+
+    @property
+    def classify_confidence(self) -> float:
+        return self._classify_confidence
+
+    @classify_confidence.setter
+    def classify_confidence(self, value: float) -> None:
+        self._classify_confidence = value
+
+    @property
+    def classify_input_size(self) -> Tuple[int, int]:
+        """input size of the model as (width, height)
+        """
+        return self._classify_input_size
+
+    @classify_input_size.setter
+    def classify_input_size(self, value: Tuple[int, int]) -> None:
+        self._classify_input_size = value
+
+    @property
+    def classify_max_frames(self) -> int:
+        """maximum number of pictures of a motion event, which are classified
+        """
+        return self._classify_max_frames
+
+    @classify_max_frames.setter
+    def classify_max_frames(self, value: int) -> None:
+        self._classify_max_frames = value
+
+    @property
+    def classify_timeout_sec(self) -> float:
+        """maximum seconds for classifying a motion event
+        """
+        return self._classify_timeout_sec
+
+    @classify_timeout_sec.setter
+    def classify_timeout_sec(self, value: float) -> None:
+        self._classify_timeout_sec = value
+
+    @property
+    def classify_workers(self) -> int:
+        """number of worker processes for classification
+        """
+        return self._classify_workers
+
+    @classify_workers.setter
+    def classify_workers(self, value: int) -> None:
+        self._classify_workers = value
+
+    @property
+    def classify_policy(self) -> ClassifyPolicy:
+        """handling of motion events, which don't show any of the configured object classes
+        """
+        return self._classify_policy
+
+    @classify_policy.setter
+    def classify_policy(self, value: ClassifyPolicy) -> None:
+        self._classify_policy = value
+
+    def _parse_data(self, data: Dict[str, Any]):
+        super()._parse_data(data)
+
+        self.step_timeout_sec = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._STEP_TIMEOUT_SEC}",
+            settings=data,
+            default=60.0)
+
+        self.step_queue_size = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._STEP_QUEUE_SIZE}",
+            settings=data,
+            default=10)
+
+        self.dedup_max_distance = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._DEDUP_MAX_DISTANCE}",
+            settings=data,
+            default=0)
+
+        variants: Dict[str, Union[str, Dict[str, Any]]] = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._VARIANTS}",
+            settings=data,
+            default={})
+        self.variants = {str(tag): PipelineSettings.__parse_profile(profile) for tag, profile in variants.items()}
+
+        self.variant_workers = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._VARIANT_WORKERS}",
+            settings=data,
+            default=2)
+
+        self.upload_variant = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._UPLOAD_VARIANT}",
+            settings=data,
+            default="")
+        self.select_top_k = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._SELECT_TOP_K}",
+            settings=data,
+            default=0)
+
+        self.select_policy = SelectPolicy.parse(super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._SELECT_POLICY}",
+            settings=data,
+            default=SelectPolicy.DROP.value))
+
+        self.classify_model = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_MODEL}",
+            settings=data,
+            default="")
+
+        self.classify_labels = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_LABELS}",
+            settings=data,
+            default="")
+
+        self.classify_classes = [str(name) for name in super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_CLASSES}",
+            settings=data,
+            default=["person"])]
+
+        self.classify_confidence = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_CONFIDENCE}",
+            settings=data,
+            default=0.5)
+
+        self.classify_input_size = Settings.parse_resolution(super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_INPUT_SIZE}",
+            settings=data,
+            default="640x640"))
+
+        self.classify_max_frames = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_MAX_FRAMES}",
+            settings=data,
+            default=3)
+
+        self.classify_timeout_sec = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_TIMEOUT_SEC}",
+            settings=data,
+            default=5.0)
+
+        self.classify_workers = super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_WORKERS}",
+            settings=data,
+            default=1)
+
+        self.classify_policy = ClassifyPolicy.parse(super().get_setting_from_key(
+            setting_key=f"{PipelineSettings._KEY}.{PipelineSettings._CLASSIFY_POLICY}",
+            settings=data,
+            default=ClassifyPolicy.DOWNGRADE.value))
+
+        if self.upload_variant and self.upload_variant not in self.variants:
+            raise ConfigurationError(f"Upload variant {self.upload_variant} is not configured. "
+                                     f"Available variants are: {list(self.variants)}")
+
+        if self.classify_model and not self.classify_labels:
+            raise ConfigurationError(f"Classify labels have to be configured for model {self.classify_model}")
+
+    @staticmethod
+    def __parse_profile(profile: Union[str, Dict[str, Any]]) -> QualityProfile:
+        """parse quality profile, which is given by its resolution '<width>x<height>' only
+        or by a dict with resolution and quality
+
+        Raises:
+            ConfigurationError: if the profile has a wrong format
+        """
+        if not isinstance(profile, dict):
+            return QualityProfile(Settings.parse_resolution(profile))
+
+        if 'resolution' not in profile:
+            raise ConfigurationError(f"Quality profile without resolution: {profile}")
+        quality = int(profile.get('quality', _DEFAULT_QUALITY))
+        if not 0 < quality <= 100:
+            raise ConfigurationError(f"JPEG quality has to be between 1 and 100: {quality}")
+        return QualityProfile(Settings.parse_resolution(profile['resolution']), quality)
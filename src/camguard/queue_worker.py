@@ -0,0 +1,222 @@
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, wait
+from queue import Full, Queue
+from threading import Event, Lock, Thread, local
+from typing import Any, ClassVar, Optional
+
+from camguard.async_runtime import AsyncRuntime, QueueWaiter
+
+LOGGER = logging.getLogger(__name__)
+
+
+class QueueWorker(ABC):
+    """bounded queue of values, which are handled one after another by a worker. putting a value enqueues it and
+    returns immediately, values are dropped if the queue is full. the worker is a dedicated thread, or a task on the
+    event loop of the async runtime, which pushes the handling to the executor of the runtime. subclasses implement
+    the handling of a single value and may replace a hanging worker thread by a new one
+    """
+    # kind of the worker, used for logging
+    _KIND: ClassVar[str] = "worker"
+
+    def __init__(self, name: str, queue_size: int = 10, use_runtime: bool = True) -> None:
+        """default initialization
+
+        Args:
+            name (str): name of the worker, used for the thread name
+            queue_size (int, optional): maximum number of pending values. Defaults to 10.
+            use_runtime (bool, optional): run as task of the async runtime, if it's available. Defaults to True.
+        """
+        self.__name = name
+        self.__use_runtime = use_runtime
+        self.__queue: Queue[Any] = Queue(maxsize=queue_size)
+        self.__stop_event = Event()
+        self.__thread: Optional[Thread] = None
+        self.__task: Optional['Future[None]'] = None
+        self.__waiter: Optional[QueueWaiter] = None
+        self.__local = local()
+        # generation of the current worker thread, outdated threads exit after their current value
+        self.__generation = 0
+        self.__dropped = 0
+        # guards the worker state and the counters of subclasses
+        self._lock = Lock()
+
+    @property
+    def name(self) -> str:
+        """get worker name
+
+        Returns:
+            str: the worker name
+        """
+        return self.__name
+
+    @property
+    def queue_depth(self) -> int:
+        """get number of pending values
+
+        Returns:
+            int: pending value count
+        """
+        return self.__queue.qsize()
+
+    @property
+    def dropped(self) -> int:
+        """get number of dropped values, due to a full queue
+
+        Returns:
+            int: dropped value count
+        """
+        with self._lock:
+            return self.__dropped
+
+    @property
+    def running(self) -> bool:
+        """get running state of the worker thread or task
+
+        Returns:
+            bool: True if worker is running
+        """
+        if self.__task:
+            return not self.__task.done()
+        return bool(self.__thread and self.__thread.is_alive())
+
+    def start(self) -> None:
+        """start the worker, does nothing if already running
+        """
+        if self.running:
+            LOGGER.debug(f"{self.__name}: {self._KIND.capitalize()} already running")
+            return
+
+        LOGGER.info(f"{self.__name}: Starting {self._KIND}")
+        self.__stop_event.clear()
+        runtime = AsyncRuntime.current() if self.__use_runtime else None
+        if runtime:
+            self.__waiter = QueueWaiter(runtime, self.__queue)
+            self.__task = runtime.submit(self.__run_async(runtime, self.__waiter))
+            return
+
+        with self._lock:
+            self._start_thread()
+
+    def stop(self, timeout_sec: float = 4.0) -> None:
+        """stop the worker, pending values will be discarded
+
+        Args:
+            timeout_sec (float, optional): timeout for joining the worker thread. Defaults to 4.0.
+        """
+        if self.__task and self.__waiter:
+            LOGGER.info(f"{self.__name}: Stopping {self._KIND}")
+            self.__stop_event.set()
+            self.__waiter.close()
+            _, not_done = wait([self.__task], timeout=timeout_sec)
+            if not_done:
+                LOGGER.error(f"{self.__name}: Failed to stop {self._KIND} within {timeout_sec} seconds")
+            self.__task = None
+            self.__waiter = None
+            return
+
+        if not self.__thread:
+            LOGGER.debug(f"{self.__name}: {self._KIND.capitalize()} has never been started")
+            return
+
+        LOGGER.info(f"{self.__name}: Stopping {self._KIND}")
+        self.__stop_event.set()
+        try:
+            # wake up worker thread
+            self.__queue.put_nowait(None)
+        except Full:
+            # worker is busy and checks stop event before handling the next value
+            pass
+
+        self.__thread.join(timeout_sec)
+        if self.__thread.is_alive():
+            LOGGER.error(f"{self.__name}: Failed to stop {self._KIND} within {timeout_sec} seconds")
+        self.__thread = None
+
+    def put(self, value: Any) -> bool:
+        """enqueue value for the worker, does not block
+
+        Args:
+            value (Any): the value to handle
+
+        Returns:
+            bool: True if value was enqueued, False if it was dropped due to a full queue
+        """
+        try:
+            self.__queue.put_nowait(value)
+        except Full:
+            with self._lock:
+                self.__dropped += 1
+            LOGGER.warning(f"{self.__name}: Maximum queue length of {self.__queue.maxsize} reached. "
+                           f"Loosing value: {value}")
+            return False
+
+        if self.__waiter:
+            self.__waiter.notify()
+        return True
+
+    @abstractmethod
+    def _handle(self, value: Any) -> None:
+        """handle a single value, called on the worker thread or on the executor of the runtime
+
+        Args:
+            value (Any): the dequeued value
+        """
+
+    def _thread_name(self, generation: int) -> str:
+        """get name of a worker thread
+
+        Args:
+            generation (int): generation of the worker thread, starting with 1
+        """
+        return self.__name
+
+    def _start_thread(self) -> None:
+        """start a new worker thread, the previous thread exits after its current value - has to be called
+        with lock held
+        """
+        self.__generation += 1
+        self.__thread = Thread(target=self.__run, args=(self.__generation,),
+                               name=self._thread_name(self.__generation), daemon=True)
+        self.__thread.start()
+
+    def _is_current_thread(self) -> bool:
+        """check whether the calling thread is the current worker thread - has to be called with lock held
+        """
+        return getattr(self.__local, 'generation', None) == self.__generation
+
+    def _has_thread(self) -> bool:
+        return self.__thread is not None
+
+    def __run(self, generation: int) -> None:
+        LOGGER.info(f"{self.__name}: Init")
+        self.__local.generation = generation
+        while True:
+            with self._lock:
+                if not self._is_current_thread():
+                    break
+            value = self.__queue.get()
+            try:
+                if self.__stop_event.is_set():
+                    break
+
+                self._handle(value)
+            finally:
+                self.__queue.task_done()
+
+        LOGGER.info(f"{self.__name}: Exit")
+
+    async def __run_async(self, runtime: AsyncRuntime, waiter: QueueWaiter) -> None:
+        LOGGER.info(f"{self.__name}: Init task")
+        while not self.__stop_event.is_set():
+            value = await waiter.get()
+            if value is None:
+                # waiter has been closed
+                break
+            try:
+                # handling blocks, therefore it's pushed to the executor
+                await runtime.run_blocking(self._handle, value)
+            finally:
+                self.__queue.task_done()
+
+        LOGGER.info(f"{self.__name}: Exit task")
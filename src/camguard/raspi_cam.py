@@ -1,55 +1,554 @@
 import logging
+import math
 import os
 import time
-from datetime import date
-from typing import Any, ClassVar, List
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from io import BytesIO
+from threading import Lock, Thread
+from typing import Any, ClassVar, Iterator, List, Optional, Tuple
 
 # picamera cannot be installed on a non-pi system
-from picamera import PiCamera  # type: ignore reportMissingImports
+from picamera import PiCamera, PiCameraCircularIO  # type: ignore reportMissingImports
 
-from camguard.motion_handler_settings import RaspiCamSettings
+from camguard.motion_handler_settings import RaspiCamSettings, RecordMode
 from camguard.bridge_impl import MotionHandlerImpl
+from camguard.capture_scheduler import CaptureScheduler
+from camguard.exceptions import ConfigurationError
+from camguard.memory_file import FilePersistence
+from camguard.metrics import Metric, Metrics
+from camguard.rate_control import RateController
+from camguard.recorded_file import MemoryFile, RecordedFile, file_name
+from camguard.shared_camera import SharedCamera
 
 
 LOGGER = logging.getLogger(__name__)
 
 
+class PreRecordBuffer:
+    """in-memory ring buffer, which continuously records mjpeg frames on the video port of an open camera,
+    so that frames from before a motion event are available. the buffer is bounded by bytes,
+    the oldest frames are overwritten
+    """
+    _SPLITTER_PORT: ClassVar[int] = 1
+
+    def __init__(self, pi_camera: Any, size: int, seconds: float, interval_sec: float) -> None:
+        """default initialization
+
+        Args:
+            pi_camera (Any): the open camera
+            size (int): maximum buffer size in bytes
+            seconds (float): seconds before the motion event to take frames from
+            interval_sec (float): minimum interval between the taken frames
+        """
+        self.__pi_camera = pi_camera
+        self.__seconds = seconds
+        self.__interval_sec = interval_sec
+        self.__stream = PiCameraCircularIO(pi_camera, size=size, splitter_port=PreRecordBuffer._SPLITTER_PORT)
+
+    def start(self) -> None:
+        LOGGER.info("Starting pre-record buffer")
+        self.__pi_camera.start_recording(self.__stream, format='mjpeg', splitter_port=PreRecordBuffer._SPLITTER_PORT)
+
+    def stop(self) -> None:
+        LOGGER.info("Stopping pre-record buffer")
+        self.__pi_camera.stop_recording(splitter_port=PreRecordBuffer._SPLITTER_PORT)
+        self.__stream.close()
+
+    def snapshot(self) -> List[Tuple[float, bytes]]:
+        """copy the buffered frames of the configured seconds, thinned out to the frame interval
+
+        Returns:
+            List[Tuple[float, bytes]]: age of the frame in seconds relative to the latest frame
+            and the jpeg data, oldest frame first
+        """
+        snapshot: List[Tuple[float, bytes]] = []
+        with self.__stream.lock:
+            frames = [frame for frame in self.__stream.frames if frame.complete and frame.timestamp is not None]
+            if not frames:
+                return snapshot
+
+            # the encoder writes at the current position, it has to be restored after reading
+            position = self.__stream.tell()
+            latest = frames[-1].timestamp
+            taken: Optional[int] = None
+            try:
+                for frame in frames:
+                    # frame timestamps are microseconds
+                    age_sec = (latest - frame.timestamp) / 1000000
+                    if age_sec > self.__seconds:
+                        continue
+                    if taken is not None and (frame.timestamp - taken) / 1000000 < self.__interval_sec:
+                        continue
+
+                    self.__stream.seek(frame.position)
+                    snapshot.append((age_sec, self.__stream.read(frame.frame_size)))
+                    taken = frame.timestamp
+            finally:
+                self.__stream.seek(position)
+
+        LOGGER.debug(f"Took {len(snapshot)} frames from pre-record buffer")
+        return snapshot
+
+
 class RaspiCam(MotionHandlerImpl):
-    """Class for wrapping python camera
+    """Class for wrapping python camera.
+    by default the camera is opened for every motion event, with a persistent camera it is opened on start
+    and kept warm while armed, so that the first picture doesn't wait for sensor init and exposure settling.
+    a persistent camera can additionally record into a pre-record buffer, to save frames from before the trigger.
+    it's shared with camera based motion detectors, which record on a splitter port of their own while it's open.
+    in video mode, a motion event is recorded as h264 video, which is split into segments of a fixed length.
+    in burst mode, pictures are captured on the video port at a fixed frame rate and reduced resolution,
+    which avoids the mode switch of still captures.
+    in memory mode, pictures are captured into memory and handed to the pipeline without reading them from disk,
+    video segments are always recorded to disk.
+    with rate control, jpeg quality and resolution of pictures are lowered, so that a motion event can be uploaded
+    within the configured seconds at the measured upload throughput
     """
+    _PRE_RECORD_PREFIX: ClassVar[str] = 'pre_'
+    # splitter port 1 is used by the pre-record buffer
+    _VIDEO_PORT: ClassVar[int] = 2
+    # splitter port 0 is used by burst captures, splitter port 3 by motion detectors of the shared camera
+    _MAX_BURST_FPS: ClassVar[int] = 30
     _id: ClassVar[int] = 0
 
     def __init__(self, settings: RaspiCamSettings) -> None:
+        super().__init__()
         self._settings = settings
         self._shutdown: bool = False
         RaspiCam._id += 1
+        # identifier of this instance, multiple handlers can be configured
+        self.__id = RaspiCam._id
+        # guards the persistent camera, it's held while recording
+        self.__camera_lock = Lock()
+        self.__pi_camera: Optional[Any] = None
+        self.__pre_record: Optional[PreRecordBuffer] = None
+        self.__started = False
+        self.__persistence: Optional[FilePersistence] = None
+        if self._settings.in_memory and not self._settings.memory_only:
+            self.__persistence = FilePersistence(f"RaspiCamPersistence-{self.__id}")
+
+        if self._settings.record_mode == RecordMode.VIDEO and self._settings.segment_sec <= 0:
+            raise ConfigurationError(f"Segment seconds have to be positive: {self._settings.segment_sec}")
+
+        if self._settings.record_mode == RecordMode.BURST and \
+                not 0 < self._settings.burst_fps <= RaspiCam._MAX_BURST_FPS:
+            raise ConfigurationError(f"Burst fps have to be between 1 and {RaspiCam._MAX_BURST_FPS}: "
+                                     f"{self._settings.burst_fps}")
+
+        if self._settings.pre_record_seconds > 0 and not self._settings.persistent_camera:
+            LOGGER.warning("Pre-record buffer requires a persistent camera, ignoring pre-record seconds")
+
+        self.__scheduler = CaptureScheduler(self._settings.record_interval_sec, camera=self.__id)
+        self.__rate_control: Optional[RateController] = None
+        if self._settings.rate_control:
+            self.__rate_control = RateController(self._settings.rate_control_upload_sec,
+                                                 self._settings.rate_control_max_quality,
+                                                 self._settings.rate_control_min_quality)
+            if self._settings.record_mode != RecordMode.PICTURE:
+                LOGGER.warning(f"Rate control only applies to picture mode, ignoring it for mode: "
+                               f"{self._settings.record_mode.value}")
+
+    def start(self) -> None:
+        """start writing in-memory files and open the persistent camera in the background, if configured
+        """
+        if self.__persistence:
+            self.__persistence.start()
+
+        if not self._settings.persistent_camera:
+            return
+
+        self.__started = True
+        Thread(target=self.__update_camera, name=f"CameraWarmupThread-{self.__id}", daemon=True).start()
+
+    def on_disable(self, ips: List[Tuple[str, bool]]) -> None:
+        """release the persistent camera while disarmed and re-open it when armed again
+
+        Args:
+            ips (List[Tuple[str, bool]]): detected network device ips
+        """
+        super().on_disable(ips)
+        if self.__started:
+            # the camera lock is held during a whole record and opening the camera sleeps for the warmup,
+            # therefore the callback of the network device detector doesn't wait for it
+            Thread(target=self.__update_camera, name=f"CameraUpdateThread-{self.__id}", daemon=True).start()
 
     def handle_motion(self) -> Any:
         LOGGER.debug("Triggered by motion")
-        with PiCamera() as pi_camera:  # type: ignore
-            return self._record_picture(pi_camera)
+        return list(self.handle_motion_stream())
+
+    def handle_motion_stream(self) -> Iterator[RecordedFile]:
+        LOGGER.debug("Triggered by motion, streaming pictures")
+        with self.__camera() as pi_camera:
+            # take buffered frames right away, before they get overwritten during the record
+            pre_frames = self.__pre_record.snapshot() if self.__pre_record else []
+            if self._settings.record_mode == RecordMode.VIDEO:
+                yield from self._record_video_stream(pi_camera)
+            elif self._settings.record_mode == RecordMode.BURST:
+                yield from self._record_burst_stream(pi_camera)
+            else:
+                yield from self._record_picture_stream(pi_camera)
+            # pre-record frames are written after the live record, so that they don't delay its first picture
+            yield from self.__write_pre_frames(pre_frames)
+
+    def extend_record(self) -> bool:
+        if self._settings.record_mode == RecordMode.VIDEO:
+            return self._extend_record_limit(self.__segments(self._settings.record_count),
+                                             self.__segments(self._settings.max_record_count))
+
+        return self._extend_record_limit(self._settings.record_count, self._settings.max_record_count)
 
     def shutdown(self) -> None:
-        """shutdown picam recording 
+        """shutdown picam recording and release the persistent camera, a running record is interrupted
         """
         LOGGER.info("Shutting down")
         self._shutdown = True
+        with self.__camera_lock:
+            self.__close_camera()
+        if self.__persistence:
+            self.__persistence.stop()
 
-    def _record_picture(self, pi_camera: Any) -> List[str]:
-        """ record picture to given file_path
+    @contextmanager
+    def __camera(self) -> Iterator[Any]:
+        """get the persistent camera, or a camera for the current motion event only,
+        if the persistent camera is not configured or not open (i.e. while disarmed)
+        """
+        with self.__camera_lock:
+            if self.__pi_camera:
+                yield self.__pi_camera
+                return
 
-        Raises:
-            ConfigurationError: if record_root_path is :None: or not an directory
+            with PiCamera(camera_num=self._settings.camera_number) as pi_camera:  # type: ignore
+                yield pi_camera
 
-        Returns:
-            List[str]: list of recorded file paths
+    def __update_camera(self) -> None:
+        """open or close the persistent camera according to the disabled state
+        """
+        with self.__camera_lock:
+            if self._disabled or self._shutdown:
+                self.__close_camera()
+                return
+
+            try:
+                self.__open_camera()
+            # skipcq: PYL-W0703
+            except Exception as e:
+                # motion events still open a camera on their own
+                LOGGER.error("Failed to open persistent camera", exc_info=e)
+
+    def __open_camera(self) -> None:
+        """open the persistent camera and let it settle, has to be called with camera lock held
+        """
+        if self.__pi_camera:
+            return
+
+        LOGGER.info("Opening persistent camera")
+        pi_camera = PiCamera(camera_num=self._settings.camera_number)  # type: ignore
+        try:
+            # give the sensor time for adjusting gain, exposure and white balance
+            time.sleep(self._settings.warmup_sec)
+            if self._settings.lock_exposure:
+                RaspiCam.__lock_exposure(pi_camera)
+        except Exception:
+            pi_camera.close()
+            raise
+
+        self.__pi_camera = pi_camera
+        if self._settings.pre_record_seconds > 0:
+            self.__pre_record = PreRecordBuffer(pi_camera,
+                                                size=self._settings.pre_record_buffer_size,
+                                                seconds=self._settings.pre_record_seconds,
+                                                interval_sec=self._settings.record_interval_sec)
+            try:
+                self.__pre_record.start()
+            # skipcq: PYL-W0703
+            except Exception as e:
+                # the camera is still usable for recording without pre-record frames
+                LOGGER.error("Failed to start pre-record buffer", exc_info=e)
+                self.__pre_record = None
+
+        SharedCamera.publish(self._settings.camera_number, pi_camera)
+
+    def __close_camera(self) -> None:
+        """release the persistent camera, has to be called with camera lock held
+        """
+        if not self.__pi_camera:
+            return
+
+        SharedCamera.withdraw(self._settings.camera_number)
+        if self.__pre_record:
+            self.__pre_record.stop()
+            self.__pre_record = None
+
+        LOGGER.info("Releasing persistent camera")
+        self.__pi_camera.close()
+        self.__pi_camera = None
+
+    @staticmethod
+    def __lock_exposure(pi_camera: Any) -> None:
+        """fix the settled exposure and white balance, so that pictures of a record are consistent
+        and the camera doesn't re-adjust between pictures
+        """
+        pi_camera.shutter_speed = pi_camera.exposure_speed
+        pi_camera.exposure_mode = 'off'
+        awb_gains = pi_camera.awb_gains
+        pi_camera.awb_mode = 'off'
+        pi_camera.awb_gains = awb_gains
+        LOGGER.debug(f"Locked exposure, shutter speed: {pi_camera.shutter_speed}, awb gains: {awb_gains}")
+
+    def _record_picture_stream(self, pi_camera: Any) -> Iterator[RecordedFile]:
+        """ record pictures to given file_path and yield every picture right after capturing it
+
+        Yields:
+            Iterator[RecordedFile]: recorded file path, a memory file in memory mode
         """
         if self._shutdown:
             # do not record if shutdown was triggered
-            return []
+            return
 
         LOGGER.info("Recording pictures")
+        record_path = self.__record_path()
+        self._start_record(self._settings.record_count, self._settings.max_record_count,
+                           self._settings.motion_tail_sec)
+        if self.__rate_control:
+            self.__rate_control.begin(self._settings.record_count)
+        self.__scheduler.start()
+        try:
+            if self._settings.in_memory or self.__rate_control:
+                pictures = self.__capture_pictures(pi_camera, record_path)
+            else:
+                pictures = iter(pi_camera.capture_continuous(record_path + self._settings.record_file_format))
+            while True:
+                # pictures are captured at fixed deadlines, pictures which are behind schedule are skipped
+                skipped = self.__scheduler.wait()
+                if skipped and not self._skip_records(skipped):
+                    break
+
+                capture_start = time.monotonic()
+                file = next(pictures, None)
+                if file is None:
+                    break
+
+                Metrics.measure(Metric.CAPTURE_DURATION, time.monotonic() - capture_start, camera=self.id)
+                LOGGER.info(f"Recorded picture to {file_name(file)}")
+                record_next = self._record_next()
+                yield file
+                if self._shutdown:
+                    LOGGER.debug("Record interrupted by shutdown")
+                    break
+
+                if not record_next:
+                    break
+        finally:
+            self._finish_record()
+            self.__scheduler.finish()
+
+        LOGGER.info("Finished recording")
 
+    def __capture_pictures(self, pi_camera: Any, record_path: str) -> Iterator[RecordedFile]:
+        """capture pictures continuously into memory, the equivalent of capture_continuous, which allows to change
+        the quality for every picture. pictures are stored afterwards
+
+        Yields:
+            Iterator[RecordedFile]: captured picture, a memory file in memory mode
+        """
+        counter = 1
+        while True:
+            stream = BytesIO()
+            if self.__rate_control:
+                pi_camera.capture(stream, format='jpeg', quality=self.__rate_control.quality,
+                                  resize=self.__rate_control.resize(tuple(pi_camera.resolution)))
+                self.__rate_control.update(stream.tell())
+            else:
+                pi_camera.capture(stream, format='jpeg')
+            filename = self._settings.record_file_format.format(counter=counter, timestamp=datetime.today())
+            # the buffer is handed over without copying, the stream is not used afterwards
+            yield self.__store(os.path.join(record_path, filename), stream.getbuffer())
+            counter += 1
+
+    def __store(self, file_path: str, data: Any) -> RecordedFile:
+        """store a recorded file, in memory mode it's kept in memory and written in the background if enabled
+
+        Args:
+            file_path (str): path of the file
+            data (Any): file content, bytes-like
+
+        Returns:
+            RecordedFile: the file path, a memory file in memory mode
+        """
+        if not self._settings.in_memory:
+            with open(file_path, 'wb') as stream:
+                stream.write(data)
+            return file_path
+
+        file = MemoryFile(file_path, data)
+        if self.__persistence:
+            self.__persistence.persist(file)
+        return file
+
+    def _record_burst_stream(self, pi_camera: Any) -> Iterator[RecordedFile]:
+        """ record pictures on the video port at the burst frame rate, until the record count is reached, or while
+        motion lasts if a motion tail is configured, or until the time or byte budget of the event is exhausted.
+        pictures are captured into memory in sequences of about a second and yielded after every sequence,
+        so that storing them doesn't lower the frame rate
+
+        Yields:
+            Iterator[RecordedFile]: recorded file path, a memory file in memory mode
+        """
+        if self._shutdown:
+            # do not record if shutdown was triggered
+            return
+
+        LOGGER.info(f"Recording burst with {self._settings.burst_fps} fps")
+        record_path = self.__record_path()
+        deadline = time.monotonic() + self._settings.burst_max_sec
+        frame_sec = 1.0 / self._settings.burst_fps
+        record_bytes = 0
+        stop_reason: Optional[str] = None
+
+        def sequence(captured: List[Tuple[datetime, BytesIO]]) -> Iterator[BytesIO]:
+            nonlocal record_bytes, stop_reason
+            next_frame = time.monotonic()
+            for _ in range(self._settings.burst_fps):
+                stream = BytesIO()
+                yield stream
+                # the next output is requested after the frame has been captured
+                captured.append((datetime.today(), stream))
+                record_bytes += stream.tell()
+                if not self._record_next():
+                    stop_reason = "record finished"
+                elif self._shutdown:
+                    stop_reason = "shutdown"
+                elif time.monotonic() >= deadline:
+                    stop_reason = "time budget exhausted"
+                elif record_bytes >= self._settings.burst_max_bytes:
+                    stop_reason = "byte budget exhausted"
+                if stop_reason:
+                    return
+
+                next_frame += frame_sec
+                time.sleep(max(0.0, next_frame - time.monotonic()))
+
+        self._start_record(self._settings.record_count, self._settings.max_record_count,
+                           self._settings.motion_tail_sec)
+        counter = 0
+        try:
+            while not stop_reason:
+                captured: List[Tuple[datetime, BytesIO]] = []
+                capture_start = time.monotonic()
+                pi_camera.capture_sequence(sequence(captured), format='jpeg', use_video_port=True,
+                                           resize=self._settings.burst_resolution)
+                if captured:
+                    Metrics.measure(Metric.CAPTURE_DURATION, (time.monotonic() - capture_start) / len(captured),
+                                    camera=self.id)
+                for timestamp, stream in captured:
+                    counter += 1
+                    filename = self._settings.record_file_format.format(counter=counter, timestamp=timestamp)
+                    file = self.__store(os.path.join(record_path, filename), stream.getbuffer())
+                    LOGGER.debug(f"Recorded burst picture to {file_name(file)}")
+                    yield file
+        finally:
+            self._finish_record()
+
+        LOGGER.info(f"Finished recording burst of {counter} pictures, {record_bytes} bytes: {stop_reason}")
+
+    def _record_video_stream(self, pi_camera: Any) -> Iterator[str]:
+        """ record h264 video split into segments and yield every segment right after it has been closed
+
+        Yields:
+            Iterator[str]: recorded segment file path
+        """
+        if self._shutdown:
+            # do not record if shutdown was triggered
+            return
+
+        LOGGER.info("Recording video")
+        record_path = self.__record_path()
+        counter = 1
+        file_path = self.__segment_path(record_path, counter)
+        self._start_record(self.__segments(self._settings.record_count),
+                           self.__segments(self._settings.max_record_count), self._settings.motion_tail_sec)
+        pi_camera.start_recording(file_path, format='h264', splitter_port=RaspiCam._VIDEO_PORT,
+                                  bitrate=self._settings.video_bitrate)
+        try:
+            while True:
+                self.__wait_segment(pi_camera)
+                record_next = self._record_next()
+                if self._shutdown:
+                    LOGGER.debug("Record interrupted by shutdown")
+                    break
+
+                if not record_next:
+                    break
+
+                counter += 1
+                next_path = self.__segment_path(record_path, counter)
+                # the encoder continues with the next file at a key frame, this closes the current segment
+                pi_camera.split_recording(next_path, splitter_port=RaspiCam._VIDEO_PORT)
+                LOGGER.info(f"Recorded video segment to {file_path}")
+                yield file_path
+                file_path = next_path
+        finally:
+            pi_camera.stop_recording(splitter_port=RaspiCam._VIDEO_PORT)
+            self._finish_record()
+
+        LOGGER.info(f"Recorded video segment to {file_path}")
+        yield file_path
+        LOGGER.info("Finished recording")
+
+    def __wait_segment(self, pi_camera: Any) -> None:
+        """wait for the segment length, while the camera is recording
+        """
+        deadline = time.monotonic() + self._settings.segment_sec
+        # wait in slices, so that a shutdown interrupts the record in time
+        while not self._shutdown:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # raises encoder errors
+            pi_camera.wait_recording(min(remaining, 1.0), splitter_port=RaspiCam._VIDEO_PORT)
+
+    def __segment_path(self, record_path: str, counter: int) -> str:
+        return os.path.join(record_path, self._settings.video_file_format.format(counter=counter,
+                                                                                  timestamp=datetime.today()))
+
+    def __segments(self, record_count: int) -> int:
+        """get number of video segments, covering the duration of a picture record with the given count
+
+        Args:
+            record_count (int): picture count
+
+        Returns:
+            int: segment count, at least one
+        """
+        duration_sec = record_count * self._settings.record_interval_sec
+        # rounding avoids an additional segment due to float inaccuracy
+        return max(1, math.ceil(round(duration_sec / self._settings.segment_sec, 6)))
+
+    def __write_pre_frames(self, pre_frames: List[Tuple[float, bytes]]) -> Iterator[RecordedFile]:
+        """write frames of the pre-record buffer and yield every file after writing it
+
+        Args:
+            pre_frames (List[Tuple[float, bytes]]): age in seconds and jpeg data of the frames
+        """
+        if not pre_frames:
+            return
+
+        record_path = self.__record_path()
+        now = datetime.today()
+        for counter, (age_sec, data) in enumerate(pre_frames, start=1):
+            filename = self._settings.record_file_format.format(counter=counter,
+                                                                timestamp=now - timedelta(seconds=age_sec))
+            file = self.__store(os.path.join(record_path, RaspiCam._PRE_RECORD_PREFIX + filename), data)
+            LOGGER.info(f"Recorded pre-record picture to {file_name(file)}")
+            yield file
+
+    def __record_path(self) -> str:
+        """get the record folder of the current date, it's created if it doesn't exist
+
+        Returns:
+            str: record folder path, with trailing separator
+        """
         # expand env variables and '~' in path
         resolved_path = os.path.expandvars(os.path.expanduser(self._settings.record_path))
 
@@ -60,22 +559,8 @@ class RaspiCam(MotionHandlerImpl):
         if not os.path.exists(record_path):
             os.makedirs(record_path, exist_ok=True)
 
-        recorded: List[str] = []
-        for i, filename in enumerate(
-                pi_camera.capture_continuous(record_path + self._settings.record_file_format)):
-            LOGGER.info(f"Recorded picture to {filename}")
-            recorded.append(filename)
-            if self._shutdown:
-                LOGGER.debug("Record interrupted by shutdown")
-                break
-
-            time.sleep(self._settings.record_interval_sec)
-            if i == self._settings.record_count - 1:
-                break
-
-        LOGGER.info("Finished recording")
-        return recorded
+        return record_path
 
     @property
     def id(self) -> int:
-        return RaspiCam._id
+        return self.__id
@@ -48,6 +48,10 @@ class RaspiGpioSensor(MotionDetectorImpl):
     def id(self) -> int:
         return self.__settings.gpio_pin_number
 
+    @property
+    def motion_active(self) -> bool:
+        return self._activated
+
     def __when_activated(self) -> None:
         if self.disabled:
             LOGGER.debug("Sensor disabled, activation signal ignored")
@@ -0,0 +1,240 @@
+import logging
+from threading import Lock
+from time import monotonic
+from typing import ClassVar, List, Optional, Tuple
+
+from camguard.exceptions import ConfigurationError
+
+LOGGER = logging.getLogger(__name__)
+
+
+class UploadBandwidth:
+    """estimates the upload throughput of the file storage. uploads run concurrently, therefore the throughput
+    is measured over busy periods, which last as long as at least one upload is running. the estimate is an
+    exponentially weighted average of the busy periods. the estimate is optional, components check for the
+    current estimate and skip recording if there is none.
+    """
+    __current: ClassVar[Optional['UploadBandwidth']] = None
+    __current_lock: ClassVar[Lock] = Lock()
+
+    def __init__(self, smoothing: float = 0.3) -> None:
+        """default initialization
+
+        Args:
+            smoothing (float, optional): weight of the latest busy period, between 0.0 and 1.0. Defaults to 0.3.
+        """
+        self.__smoothing = smoothing
+        self.__lock = Lock()
+        self.__in_flight = 0
+        self.__busy_since = 0.0
+        self.__busy_bytes = 0
+        self.__bytes_per_sec: Optional[float] = None
+
+    @classmethod
+    def current(cls) -> Optional['UploadBandwidth']:
+        """get the estimate, which has been set as current estimate for all components - thread safe
+
+        Returns:
+            Optional[UploadBandwidth]: the current estimate, None if it's disabled
+        """
+        with cls.__current_lock:
+            return cls.__current
+
+    @classmethod
+    def set_current(cls, bandwidth: Optional['UploadBandwidth']) -> None:
+        """set the estimate for all components - thread safe
+
+        Args:
+            bandwidth (Optional[UploadBandwidth]): the estimate to use, None for disabling it
+        """
+        with cls.__current_lock:
+            cls.__current = bandwidth
+
+    @classmethod
+    def upload_started(cls) -> None:
+        """record the start of an upload in the current estimate, if there is one
+        """
+        bandwidth = cls.current()
+        if bandwidth:
+            bandwidth.start_upload()
+
+    @classmethod
+    def upload_finished(cls, size: int) -> None:
+        """record the end of an upload in the current estimate, if there is one
+
+        Args:
+            size (int): uploaded bytes, 0 for failed uploads
+        """
+        bandwidth = cls.current()
+        if bandwidth:
+            bandwidth.finish_upload(size)
+
+    @property
+    def bytes_per_sec(self) -> Optional[float]:
+        """get estimated throughput
+
+        Returns:
+            Optional[float]: bytes per second, None as long as no busy period has been measured
+        """
+        with self.__lock:
+            return self.__bytes_per_sec
+
+    def start_upload(self) -> None:
+        with self.__lock:
+            if not self.__in_flight:
+                self.__busy_since = monotonic()
+                self.__busy_bytes = 0
+            self.__in_flight += 1
+
+    def finish_upload(self, size: int) -> None:
+        with self.__lock:
+            self.__in_flight -= 1
+            self.__busy_bytes += size
+            if self.__in_flight:
+                return
+
+            busy_sec = monotonic() - self.__busy_since
+            if busy_sec <= 0 or not self.__busy_bytes:
+                # failed uploads don't tell anything about the throughput
+                return
+
+            rate = self.__busy_bytes / busy_sec
+            if self.__bytes_per_sec is None:
+                self.__bytes_per_sec = rate
+            else:
+                self.__bytes_per_sec += self.__smoothing * (rate - self.__bytes_per_sec)
+            LOGGER.debug(f"Measured upload throughput: {rate:.0f} bytes/s, estimate: {self.__bytes_per_sec:.0f} "
+                         "bytes/s")
+
+
+class RateController:
+    """chooses jpeg quality and resolution of the pictures of a motion event, so that the event stays within a
+    byte budget, which can be uploaded within the configured seconds at the estimated upload throughput.
+    settings are taken from a ladder, which first lowers the quality down to the minimum quality and afterwards
+    the resolution. after every picture, the size of the next picture is predicted from the size of the current
+    one and the ladder is stepped down until the prediction fits the remaining budget per picture. if there is
+    room, the ladder is stepped up by one step per picture. the chosen settings are kept for the next event,
+    because the scene usually doesn't change much
+    """
+    _QUALITY_STEP: ClassVar[int] = 10
+    # picture size factor of a quality step, a rough average for jpeg qualities between 30 and 90
+    _QUALITY_STEP_FACTOR: ClassVar[float] = 0.8
+    _SCALES: ClassVar[Tuple[float, ...]] = (1.0, 0.75, 0.5, 0.25)
+    # step up only if the prediction is clearly below the budget, which prevents oscillating between two steps
+    _STEP_UP_MARGIN: ClassVar[float] = 0.8
+
+    def __init__(self, upload_sec: float, max_quality: int, min_quality: int) -> None:
+        """default initialization
+
+        Args:
+            upload_sec (float): seconds for uploading the pictures of an event
+            max_quality (int): jpeg quality of the top step, between 1 and 100
+            min_quality (int): lowest jpeg quality, before the resolution is lowered
+
+        Raises:
+            ConfigurationError: if the qualities or the upload seconds are invalid
+        """
+        if not 0 < min_quality <= max_quality <= 100:
+            raise ConfigurationError(f"Rate control qualities have to be 0 < min quality <= max quality <= 100: "
+                                     f"{min_quality}, {max_quality}")
+        if upload_sec <= 0:
+            raise ConfigurationError(f"Rate control upload seconds have to be positive: {upload_sec}")
+
+        self.__upload_sec = upload_sec
+        self.__ladder: List[Tuple[int, float]] = \
+            [(quality, 1.0) for quality in range(max_quality, min_quality, -RateController._QUALITY_STEP)] + \
+            [(min_quality, scale) for scale in RateController._SCALES]
+        self.__step = 0
+        self.__budget: Optional[float] = None
+        self.__pictures = 0
+
+    @property
+    def quality(self) -> int:
+        return self.__ladder[self.__step][0]
+
+    @property
+    def scale(self) -> float:
+        return self.__ladder[self.__step][1]
+
+    @property
+    def budget(self) -> Optional[float]:
+        """get remaining byte budget of the current event
+
+        Returns:
+            Optional[float]: remaining bytes, None if there is no limit
+        """
+        return self.__budget
+
+    def resize(self, resolution: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """get the resolution of the next picture
+
+        Args:
+            resolution (Tuple[int, int]): camera resolution as (width, height)
+
+        Returns:
+            Optional[Tuple[int, int]]: reduced resolution, None for the camera resolution
+        """
+        if self.scale >= 1.0:
+            return None
+
+        width, height = resolution
+        return int(width * self.scale), int(height * self.scale)
+
+    def begin(self, pictures: int) -> None:
+        """begin a motion event, the budget is derived from the current upload throughput estimate.
+        if there is no estimate yet, pictures are taken at the top step
+
+        Args:
+            pictures (int): expected number of pictures of the event
+        """
+        bandwidth = UploadBandwidth.current()
+        bytes_per_sec = bandwidth.bytes_per_sec if bandwidth else None
+        self.__pictures = max(1, pictures)
+        if bytes_per_sec is None:
+            self.__budget = None
+            self.__step = 0
+            return
+
+        self.__budget = bytes_per_sec * self.__upload_sec
+        LOGGER.debug(f"Byte budget of the event: {self.__budget:.0f} bytes, quality: {self.quality}, "
+                     f"scale: {self.scale}")
+
+    def update(self, size: int) -> None:
+        """choose settings for the next picture by the size of the current picture
+
+        Args:
+            size (int): bytes of the current picture
+        """
+        if self.__budget is None:
+            return
+
+        self.__budget -= size
+        # an extended record takes more pictures than expected, the last picture is predicted to repeat
+        self.__pictures = max(1, self.__pictures - 1)
+        picture_budget = max(0.0, self.__budget) / self.__pictures
+
+        predicted = float(size)
+        last_step = len(self.__ladder) - 1
+        stepped = self.__step
+        while self.__step < last_step and predicted > picture_budget:
+            predicted *= self.__factor(self.__step, self.__step + 1)
+            self.__step += 1
+
+        if self.__step == stepped and self.__step > 0:
+            predicted_up = predicted / self.__factor(self.__step - 1, self.__step)
+            if predicted_up < RateController._STEP_UP_MARGIN * picture_budget:
+                self.__step -= 1
+
+        if self.__step != stepped:
+            LOGGER.debug(f"Picture of {size} bytes with {picture_budget:.0f} bytes left per picture, next quality: "
+                         f"{self.quality}, scale: {self.scale}")
+
+    def __factor(self, step: int, next_step: int) -> float:
+        """predicted size factor from a step to the next lower step
+        """
+        quality, scale = self.__ladder[step]
+        next_quality, next_scale = self.__ladder[next_step]
+        if next_quality != quality:
+            return RateController._QUALITY_STEP_FACTOR ** ((quality - next_quality) / RateController._QUALITY_STEP)
+        # picture size is about proportional to the number of pixels
+        return (next_scale / scale) ** 2
@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+from io import BytesIO
+from os import path
+from typing import BinaryIO, List, Tuple, Union
+
+from camguard.exceptions import CamguardError
+
+
+@dataclass(frozen=True, eq=False)
+class MemoryFile:
+    """recorded file, which is kept in memory instead of being read from disk by the pipeline steps.
+    the name is the path the file is persisted to, it identifies the file in the pipeline like the path of a file
+    on disk. memory files are compared by identity, their content isn't compared
+    """
+    name: str
+    data: memoryview = field(repr=False)
+
+    def __post_init__(self) -> None:
+        # bytes are wrapped without copying them
+        object.__setattr__(self, 'data', memoryview(self.data))
+
+    @property
+    def size(self) -> int:
+        """get file size
+
+        Returns:
+            int: size in bytes
+        """
+        return self.data.nbytes
+
+    def open(self) -> BinaryIO:
+        """open file content as a stream, every stream has its own position, so that multiple steps can read it
+
+        Returns:
+            BinaryIO: stream of the file content
+        """
+        return BytesIO(self.data)
+
+
+@dataclass(frozen=True, eq=False)
+class FrameVariant(MemoryFile):
+    """reduced-size variant of a recorded picture, i.e. a thumbnail. variants are tagged by the name of
+    their configured size, so that pipeline steps can choose the variant they need. variants are kept in memory
+    and not persisted, the name is the path next to the source picture
+    """
+    tag: str
+    source: str
+
+    @staticmethod
+    def select(files: List['RecordedFile'], tag: str) -> Tuple[List['RecordedFile'], List['FrameVariant']]:
+        """split files of a motion event into recorded files and the variants with the given tag
+
+        Args:
+            files (List[RecordedFile]): recorded files and variants
+            tag (str): tag of the selected variants, empty for no variants
+
+        Returns:
+            Tuple[List[RecordedFile], List[FrameVariant]]: recorded files and selected variants
+        """
+        recorded = [file for file in files if not isinstance(file, FrameVariant)]
+        variants = [file for file in files if isinstance(file, FrameVariant) and tag and file.tag == tag]
+        return recorded, variants
+
+    @staticmethod
+    def substitute(files: List['RecordedFile'], variants: List['FrameVariant']) -> List['RecordedFile']:
+        """replace recorded files by their variants, files without variant are kept
+
+        Args:
+            files (List[RecordedFile]): recorded files
+            variants (List[FrameVariant]): variants of a single tag
+
+        Returns:
+            List[RecordedFile]: files and variants in the order of the files
+        """
+        by_source = {variant.source: variant for variant in variants}
+        return [by_source.get(file_name(file), file) for file in files]
+
+
+# files are passed through the pipeline as path of a file on disk or as file in memory
+RecordedFile = Union[str, MemoryFile]
+
+
+def file_name(file: RecordedFile) -> str:
+    """get path of a recorded file, memory files are named by the path they are persisted to
+
+    Args:
+        file (RecordedFile): path of the file or memory file
+
+    Returns:
+        str: path of the file
+    """
+    return file.name if isinstance(file, MemoryFile) else file
+
+
+def open_file(file: RecordedFile) -> BinaryIO:
+    """open content of a recorded file, memory files are read from memory and other files from disk
+
+    Args:
+        file (RecordedFile): path of the file or memory file
+
+    Raises:
+        CamguardError: if the file is not on disk
+
+    Returns:
+        BinaryIO: stream of the file content
+    """
+    if isinstance(file, MemoryFile):
+        return file.open()
+
+    try:
+        return open(file, 'rb')
+    except FileNotFoundError as e:
+        raise CamguardError(f"Recorded file not found: {file}") from e
+
+
+def file_source(file: RecordedFile) -> Union[str, bytes]:
+    """get content of a memory file or path of another file, for passing a file to a worker process.
+    memory files can't be pickled, their content is copied
+
+    Args:
+        file (RecordedFile): path of the file or memory file
+
+    Raises:
+        CamguardError: if the file is not on disk
+
+    Returns:
+        Union[str, bytes]: content of a memory file, path of another file
+    """
+    if isinstance(file, MemoryFile):
+        return bytes(file.data)
+
+    if not path.exists(file):
+        raise CamguardError(f"Recorded file not found: {file}")
+    return file
@@ -0,0 +1,68 @@
+import logging
+from typing import Any, ClassVar, Dict
+
+from camguard.exceptions import ConfigurationError
+from camguard.extended_enum import ExtendedEnum
+from camguard.settings import Settings
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RuntimeMode(ExtendedEnum):
+    """runtime mode setting, selects how camguard components run their workers
+    """
+    THREADS = "threads"
+    ASYNCIO = "asyncio"
+
+    @classmethod
+    def parse(cls, value: str):
+        enum_vals = cls.list_values()
+        logger = logging.getLogger(cls.__name__)  # log with specific cls name
+
+        if value not in enum_vals:
+            raise ConfigurationError(f"Runtime mode {value} not allowed. "
+                                     f"Allowed values are: {enum_vals}")
+
+        logger.debug(f"Parsing runtime mode: {value}")
+
+        if value == cls.ASYNCIO.value:
+            return cls.ASYNCIO
+
+        return cls.THREADS
+
+
+class RuntimeSettings(Settings):
+    """Specialized settings for the camguard runtime
+    """
+    _KEY: ClassVar[str] = "runtime"
+    _MODE: ClassVar[str] = "mode"
+    _MAX_WORKERS: ClassVar[str] = "max_workers"
+
+    @property
+    def mode(self) -> RuntimeMode:
+        return self._mode
+
+    @mode.setter
+    def mode(self, value: RuntimeMode) -> None:
+        self._mode = value
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, value: int) -> None:
+        self._max_workers = value
+
+    def _parse_data(self, data: Dict[str, Any]):
+        super()._parse_data(data)
+
+        self.mode = RuntimeMode.parse(super().get_setting_from_key(
+            setting_key=f"{RuntimeSettings._KEY}.{RuntimeSettings._MODE}",
+            settings=data,
+            default=RuntimeMode.THREADS.value))
+
+        self.max_workers = super().get_setting_from_key(
+            setting_key=f"{RuntimeSettings._KEY}.{RuntimeSettings._MAX_WORKERS}",
+            settings=data,
+            default=6)
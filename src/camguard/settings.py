@@ -1,6 +1,7 @@
 import logging
-from os import path
-from typing import Any, Dict, List
+from os import path, stat
+from threading import Lock
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
 
 from yaml import safe_load
 from yaml.error import YAMLError
@@ -16,6 +17,9 @@ class ImplementationType(ExtendedEnum):
     """
     DUMMY = "dummy"
     RASPI = "raspi"
+    # camera based motion detection
+    CAMERA = "camera"
+    MOTION_VECTORS = "motion_vectors"
     DEFAULT = "default"
 
     @classmethod
@@ -33,48 +37,156 @@ class ImplementationType(ExtendedEnum):
             return cls.RASPI
         if value == cls.DUMMY.value:
             return cls.DUMMY
+        if value == cls.CAMERA.value:
+            return cls.CAMERA
+        if value == cls.MOTION_VECTORS.value:
+            return cls.MOTION_VECTORS
 
         return ImplementationType.DEFAULT
 
 class Settings:
     """camguard yaml settings base class
     """
+    # process wide snapshot cache of parsed settings files: resolved path -> (mtime, data)
+    # the parsed data is shared by all settings instances and must be treated as read-only
+    _cache: ClassVar[Dict[str, Tuple[int, Dict[str, Any]]]] = {}
+    _cache_lock: ClassVar[Lock] = Lock()
+    # root node, which can be configured as list of nodes for multiple equipment instances, None if not supported
+    _LIST_NODE: ClassVar[Optional[str]] = None
 
     @classmethod
-    def load_settings(cls, config_path: str, *, settings_file: str = "settings.yaml") -> Any:
+    def load_settings(cls, config_path: str, *, settings_file: str = "settings.yaml", index: int = 0) -> Any:
         """load settings from yaml file path
 
         Args:
             filepath (str, optional): yaml file. Defaults to "settings.yaml".
+            index (int, optional): entry to load, if the root node is configured as list. Defaults to 0.
 
         Raises:
             CamguardError: if settings file cannot be openend 
-            ConfigurationError: on yaml errors 
+            ConfigurationError: on yaml errors or if there is no entry for index
 
         Returns:
             Settings: an initialized Settings object 
         """
-        resolved_path = path.expandvars(path.expanduser(config_path))
-        settings_path = path.join(resolved_path, settings_file)
+        settings_path = cls.__settings_path(config_path, settings_file)
         LOGGER.info(f"{cls.__name__}: Loading settings from {settings_path}")
 
         instance = cls._create_instance()
+        instance._parse_data(cls._select_entry(cls._load_data(settings_path), index))
+
+        return instance
+
+    @classmethod
+    def count_entries(cls, config_path: str, *, settings_file: str = "settings.yaml") -> int:
+        """get number of configured entries, if the root node is configured as list
+
+        Args:
+            filepath (str, optional): yaml file. Defaults to "settings.yaml".
+
+        Raises:
+            CamguardError: if settings file cannot be openend 
+            ConfigurationError: on yaml errors 
+
+        Returns:
+            int: number of list entries, 1 if the root node is not configured as list
+        """
+        data = cls._load_data(cls.__settings_path(config_path, settings_file))
+        if cls._LIST_NODE and data and isinstance(data.get(cls._LIST_NODE), list):
+            return len(data[cls._LIST_NODE])
+        return 1
+
+    @classmethod
+    def __settings_path(cls, config_path: str, settings_file: str) -> str:
+        resolved_path = path.expandvars(path.expanduser(config_path))
+        settings_path = path.join(resolved_path, settings_file)
+
         # altough every settings instance is pre-configured with default settings,
         # it's still necessary to have a settings file (for pin configuration, etc...)
         if not path.isfile(settings_path):
             raise ConfigurationError(f"{cls.__name__}: Settings path not found: {settings_path}")
 
-        try:
-            with open(settings_path, 'r') as stream:
-                data = safe_load(stream)
-        except OSError as ose:
-            raise CamguardError(f"{cls.__name__}: Cannot open settings file {settings_path}: {ose}")
-        except YAMLError as yamle:
-            raise ConfigurationError(f"{cls.__name__}: Error in settings file {settings_path}: {yamle}")
-        else:
-            instance._parse_data(data)
+        return settings_path
 
-        return instance
+    @classmethod
+    def _select_entry(cls, data: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """select the entry of a root node which is configured as list,
+        the entry replaces the list in a shallow copy of data, so that the settings can be parsed as usual
+
+        Args:
+            data (Dict[str, Any]): parsed yaml data
+            index (int): entry to select
+
+        Raises:
+            ConfigurationError: if there is no entry for index
+
+        Returns:
+            Dict[str, Any]: yaml data with the selected entry as root node
+        """
+        node = data.get(cls._LIST_NODE) if cls._LIST_NODE and data else None
+        if not isinstance(node, list):
+            if index != 0:
+                raise ConfigurationError(f"{cls.__name__}: No settings entry with index {index} found")
+            return data
+
+        if index < 0 or index >= len(node):
+            raise ConfigurationError(f"{cls.__name__}: No settings entry with index {index} found "
+                                     f"in {cls._LIST_NODE}, {len(node)} entries available")
+
+        # cached data is shared and must not be modified
+        entry = dict(data)
+        entry[cls._LIST_NODE] = node[index]  # type: ignore
+        return entry
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """drop all cached settings snapshots, the next load will parse the settings file again
+        """
+        with Settings._cache_lock:
+            Settings._cache.clear()
+
+    @classmethod
+    def _load_data(cls, settings_path: str) -> Dict[str, Any]:
+        """load yaml data from the settings snapshot cache,
+        the settings file is only parsed if it's not cached yet or has been modified since
+
+        Args:
+            settings_path (str): path of the settings file
+
+        Raises:
+            CamguardError: if settings file cannot be openend 
+            ConfigurationError: on yaml errors 
+
+        Returns:
+            Dict[str, Any]: parsed yaml data
+        """
+        cache_key = path.realpath(settings_path)
+        mtime: Optional[int]
+        try:
+            mtime = stat(cache_key).st_mtime_ns
+        except OSError:
+            # not cacheable, always parse
+            mtime = None
+
+        # parse under lock, so that concurrent loads of the same file do only parse once
+        with Settings._cache_lock:
+            cached = Settings._cache.get(cache_key)
+            if mtime is not None and cached and cached[0] == mtime:
+                LOGGER.debug(f"{cls.__name__}: Using cached settings snapshot of {settings_path}")
+                return cached[1]
+
+            try:
+                with open(settings_path, 'r') as stream:
+                    data = safe_load(stream)
+            except OSError as ose:
+                raise CamguardError(f"{cls.__name__}: Cannot open settings file {settings_path}: {ose}")
+            except YAMLError as yamle:
+                raise ConfigurationError(f"{cls.__name__}: Error in settings file {settings_path}: {yamle}")
+
+            if mtime is not None:
+                Settings._cache[cache_key] = (mtime, data)
+
+        return data
 
     @classmethod
     def get_setting_from_key(cls, setting_key: str, settings: Dict[str, Any], default: Any = None) -> Any:
@@ -110,6 +222,20 @@ class Settings:
 
         return value
 
+    @staticmethod
+    def parse_resolution(value: str) -> Tuple[int, int]:
+        """parse resolution in the format '<width>x<height>'
+
+        Raises:
+            ConfigurationError: if the resolution has a wrong format
+        """
+        try:
+            width, height = (int(dim) for dim in str(value).lower().split('x'))
+        except ValueError as e:
+            raise ConfigurationError(f"Resolution {value} not allowed, expected format <width>x<height>") from e
+
+        return width, height
+
     @classmethod
     def _create_instance(cls) -> Any:
         """create settings instance of given class and load default settings
@@ -0,0 +1,128 @@
+import logging
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Any, ClassVar, Dict
+
+from camguard.exceptions import ConfigurationError
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SplitterRecording(ABC):
+    """recording on a splitter port of a shared camera, e.g. the frames or motion vectors of a motion detector.
+    it's started whenever the camera is opened and stopped before it's closed
+    """
+
+    @abstractmethod
+    def start(self, pi_camera: Any, splitter_port: int) -> None:
+        """start recording on the open camera
+
+        Args:
+            pi_camera (Any): the open camera
+            splitter_port (int): splitter port to record on
+        """
+
+    def stop(self, pi_camera: Any, splitter_port: int) -> None:
+        """stop recording, before the camera is closed or the recording is detached
+
+        Args:
+            pi_camera (Any): the open camera
+            splitter_port (int): splitter port of the recording
+        """
+        pi_camera.stop_recording(splitter_port=splitter_port)
+
+
+class SharedCamera:
+    """registry of the persistent cameras of motion handlers, by camera number. a camera can be used by one
+    recording of a motion detector in addition, which runs on a splitter port of its own while the camera is open.
+    the detector doesn't need a camera of its own, which couldn't be opened by the motion handler at the same time
+    """
+    # splitter ports 0 to 2 are used by the raspi cam handler
+    _SPLITTER_PORT: ClassVar[int] = 3
+    __lock: ClassVar[Lock] = Lock()
+    __cameras: ClassVar[Dict[int, Any]] = {}
+    __recordings: ClassVar[Dict[int, SplitterRecording]] = {}
+
+    @classmethod
+    def attach(cls, camera_number: int, recording: SplitterRecording) -> None:
+        """attach a recording to a camera, it's started right away if the camera is open - thread safe
+
+        Args:
+            camera_number (int): number of the camera
+            recording (SplitterRecording): the recording
+
+        Raises:
+            ConfigurationError: if another recording is attached to the camera
+        """
+        with cls.__lock:
+            attached = cls.__recordings.get(camera_number)
+            if attached and attached is not recording:
+                raise ConfigurationError(f"Camera {camera_number} is already used by another motion detector")
+
+            LOGGER.info(f"Attaching to camera {camera_number}, recording while the persistent camera is open")
+            cls.__recordings[camera_number] = recording
+            pi_camera = cls.__cameras.get(camera_number)
+            if pi_camera and not attached:
+                cls.__start(recording, camera_number, pi_camera)
+
+    @classmethod
+    def detach(cls, camera_number: int, recording: SplitterRecording) -> None:
+        """detach a recording from a camera, it's stopped if the camera is open - thread safe
+
+        Args:
+            camera_number (int): number of the camera
+            recording (SplitterRecording): the recording
+        """
+        with cls.__lock:
+            if cls.__recordings.get(camera_number) is not recording:
+                return
+
+            del cls.__recordings[camera_number]
+            pi_camera = cls.__cameras.get(camera_number)
+            if pi_camera:
+                cls.__stop(recording, pi_camera)
+
+    @classmethod
+    def publish(cls, camera_number: int, pi_camera: Any) -> None:
+        """share an opened camera and start the attached recording - thread safe
+
+        Args:
+            camera_number (int): number of the camera
+            pi_camera (Any): the open camera
+        """
+        with cls.__lock:
+            cls.__cameras[camera_number] = pi_camera
+            recording = cls.__recordings.get(camera_number)
+            if recording:
+                cls.__start(recording, camera_number, pi_camera)
+
+    @classmethod
+    def withdraw(cls, camera_number: int) -> None:
+        """stop sharing a camera, which is about to be closed, the attached recording is stopped - thread safe
+
+        Args:
+            camera_number (int): number of the camera
+        """
+        with cls.__lock:
+            pi_camera = cls.__cameras.pop(camera_number, None)
+            recording = cls.__recordings.get(camera_number)
+            if pi_camera and recording:
+                cls.__stop(recording, pi_camera)
+
+    @classmethod
+    def __start(cls, recording: SplitterRecording, camera_number: int, pi_camera: Any) -> None:
+        try:
+            recording.start(pi_camera, cls._SPLITTER_PORT)
+        # skipcq: PYL-W0703
+        except Exception as e:
+            # the camera is still usable by its motion handler
+            LOGGER.error(f"Failed to start recording on camera {camera_number}", exc_info=e)
+
+    @classmethod
+    def __stop(cls, recording: SplitterRecording, pi_camera: Any) -> None:
+        try:
+            recording.stop(pi_camera, cls._SPLITTER_PORT)
+        # skipcq: PYL-W0703
+        except Exception as e:
+            # e.g. the recording has never been started
+            LOGGER.debug("Failed to stop recording", exc_info=e)
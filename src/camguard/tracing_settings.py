@@ -0,0 +1,54 @@
+from typing import Any, ClassVar, Dict
+
+from camguard.settings import Settings
+
+
+class TracingSettings(Settings):
+    """Specialized settings for motion event latency tracing
+    """
+    _KEY: ClassVar[str] = "tracing"
+    _ENABLED: ClassVar[str] = "enabled"
+    _WINDOW_SIZE: ClassVar[str] = "window_size"
+    _SUMMARY_INTERVAL: ClassVar[str] = "summary_interval"
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        self._enabled = value
+
+    @property
+    def window_size(self) -> int:
+        return self._window_size
+
+    @window_size.setter
+    def window_size(self, value: int) -> None:
+        self._window_size = value
+
+    @property
+    def summary_interval(self) -> int:
+        return self._summary_interval
+
+    @summary_interval.setter
+    def summary_interval(self, value: int) -> None:
+        self._summary_interval = value
+
+    def _parse_data(self, data: Dict[str, Any]):
+        super()._parse_data(data)
+
+        self.enabled = bool(super().get_setting_from_key(
+            setting_key=f"{TracingSettings._KEY}.{TracingSettings._ENABLED}",
+            settings=data,
+            default=False))
+
+        self.window_size = super().get_setting_from_key(
+            setting_key=f"{TracingSettings._KEY}.{TracingSettings._WINDOW_SIZE}",
+            settings=data,
+            default=100)
+
+        self.summary_interval = super().get_setting_from_key(
+            setting_key=f"{TracingSettings._KEY}.{TracingSettings._SUMMARY_INTERVAL}",
+            settings=data,
+            default=10)
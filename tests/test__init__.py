@@ -3,6 +3,8 @@ from unittest.mock import MagicMock, PropertyMock, create_autospec, patch
 from camguard import main
 from camguard.camguard import Camguard
 from camguard.exceptions import CamguardError
+from camguard.lazy_import import ImportProfiler
+from camguard.metrics import Metrics, MetricsServer
 
 
 class Test__init__(TestCase):
@@ -13,6 +15,9 @@ class Test__init__(TestCase):
         type(self.__args_mock).daemonize = PropertyMock(return_value=False)
         type(self.__args_mock).config_path = PropertyMock(return_value='$HOME/.config/camguard')
         type(self.__args_mock).log = PropertyMock(return_value='INFO')
+        type(self.__args_mock).startup_profile = PropertyMock(return_value=False)
+        type(self.__args_mock).metrics_port = PropertyMock(return_value=None)
+        type(self.__args_mock).metrics_address = PropertyMock(return_value='127.0.0.1')
 
         self.__camguard_mock = create_autospec(spec=Camguard, spec_set=True)
         self.__camguard_init_mock = MagicMock(return_value=self.__camguard_mock)
@@ -64,6 +69,55 @@ class Test__init__(TestCase):
         self.__camguard_mock.stop.assert_not_called()
         self.assertEqual(0, rc)
 
+    @patch('camguard.sigwait', MagicMock())
+    @patch('camguard.logging', MagicMock())
+    @patch('camguard.LOGGER', MagicMock())
+    def test_should_log_startup_profile(self):
+        # arrange
+        type(self.__args_mock).startup_profile = PropertyMock(return_value=True)
+        args_parser_mock = MagicMock(name='args_parser_mock')
+        args_parser_mock.parse_args = MagicMock(return_value=self.__args_mock)
+        args_parser_init_mock = MagicMock(return_value=args_parser_mock)
+        profiler_mock = create_autospec(spec=ImportProfiler, spec_set=True)
+        type(profiler_mock).elapsed_sec = PropertyMock(return_value=0.5)
+
+        # act
+        with patch('camguard.ArgumentParser', args_parser_init_mock),\
+                patch('camguard.camguard.Camguard', self.__camguard_init_mock),\
+                patch('camguard.ImportProfiler', MagicMock(return_value=profiler_mock)):
+            rc = main()
+
+        # assert
+        profiler_mock.install.assert_called_once()
+        profiler_mock.log_report.assert_called_once()
+        profiler_mock.uninstall.assert_called()
+        self.assertEqual(0, rc)
+
+    @patch('camguard.sigwait', MagicMock())
+    @patch('camguard.logging', MagicMock())
+    @patch('camguard.LOGGER', MagicMock())
+    def test_should_serve_metrics(self):
+        # arrange
+        type(self.__args_mock).metrics_port = PropertyMock(return_value=9100)
+        args_parser_mock = MagicMock(name='args_parser_mock')
+        args_parser_mock.parse_args = MagicMock(return_value=self.__args_mock)
+        args_parser_init_mock = MagicMock(return_value=args_parser_mock)
+        server_mock = create_autospec(spec=MetricsServer, spec_set=True, instance=True)
+        server_init_mock = MagicMock(return_value=server_mock)
+
+        # act
+        with patch('camguard.ArgumentParser', args_parser_init_mock),\
+                patch('camguard.camguard.Camguard', self.__camguard_init_mock),\
+                patch('camguard.metrics.MetricsServer', server_init_mock):
+            rc = main()
+
+        # assert
+        self.assertIsNotNone(Metrics.current())
+        server_init_mock.assert_called_once_with(Metrics.current(), 9100, '127.0.0.1')
+        server_mock.start.assert_called_once()
+        server_mock.stop.assert_called_once()
+        self.assertEqual(0, rc)
+
     @patch('camguard.sigwait', MagicMock())
     @patch('camguard.logging', MagicMock())
     @patch('camguard.LOGGER', MagicMock())
@@ -109,3 +163,6 @@ class Test__init__(TestCase):
         self.__camguard_mock.start.assert_not_called()
         self.__camguard_mock.stop.assert_not_called()
         self.assertEqual(1, rc)
+
+    def tearDown(self) -> None:
+        Metrics.set_current(None)
@@ -0,0 +1,105 @@
+import asyncio
+from queue import Queue
+from threading import Event, current_thread
+from typing import Any
+from unittest import TestCase
+
+from camguard.async_runtime import AsyncRuntime, QueueWaiter
+from camguard.exceptions import CamguardError
+
+
+class AsyncRuntimeTest(TestCase):
+
+    def setUp(self) -> None:
+        self.sut = AsyncRuntime(max_workers=2)
+
+    def test_should_run_coroutine_on_loop_thread(self):
+        # arrange
+        async def coro() -> str:
+            return current_thread().name
+
+        # act
+        self.sut.start()
+        thread_name = self.sut.submit(coro()).result(2.0)
+
+        # assert
+        self.assertEqual("RuntimeLoopThread", thread_name)
+
+    def test_should_run_blocking_on_executor(self):
+        # arrange
+        async def coro() -> str:
+            return await self.sut.run_blocking(lambda: current_thread().name)
+
+        # act
+        self.sut.start()
+        thread_name = self.sut.submit(coro()).result(2.0)
+
+        # assert
+        self.assertTrue(thread_name.startswith("RuntimeWorkerThread"))
+
+    def test_should_cancel_tasks_on_stop(self):
+        # arrange
+        cancelled = []
+        started = Event()
+
+        async def coro() -> None:
+            started.set()
+            try:
+                await asyncio.sleep(60.0)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        self.sut.start()
+        future = self.sut.submit(coro())
+        started.wait(2.0)
+
+        # act
+        self.sut.stop()
+
+        # assert
+        self.assertTrue(future.cancelled())
+        self.assertEqual([True], cancelled)
+        self.assertFalse(self.sut.running)
+
+    def test_should_raise_without_start(self):
+        # act / assert
+        with self.assertRaises(CamguardError):
+            _ = self.sut.loop
+
+    def tearDown(self) -> None:
+        self.sut.stop()
+
+
+class QueueWaiterTest(TestCase):
+
+    def setUp(self) -> None:
+        self._runtime = AsyncRuntime(max_workers=1)
+        self._runtime.start()
+        self._queue: 'Queue[Any]' = Queue()
+        self.sut = QueueWaiter(self._runtime, self._queue)
+
+    def test_should_get_item_after_notify(self):
+        # arrange
+        future = self._runtime.submit(self.sut.get())
+
+        # act
+        self._queue.put_nowait("item1")
+        self.sut.notify()
+
+        # assert
+        self.assertEqual("item1", future.result(2.0))
+
+    def test_should_return_none_when_closed(self):
+        # arrange
+        future = self._runtime.submit(self.sut.get())
+
+        # act
+        self.sut.close()
+
+        # assert
+        self.assertIsNone(future.result(2.0))
+        self.assertTrue(self.sut.closed)
+
+    def tearDown(self) -> None:
+        self._runtime.stop()
@@ -1,15 +1,19 @@
+from threading import Event
 from unittest import TestCase
-from unittest.mock import MagicMock, PropertyMock, create_autospec, patch
+from unittest.mock import MagicMock, PropertyMock, call, create_autospec, patch
 
 from camguard.bridge_api import FileStorage, MailClient, MotionDetector, MotionHandler
 from camguard.bridge_impl import (FileStorageImpl, MailClientImpl, MotionDetectorImpl,
                                   MotionHandlerImpl)
+from camguard.event_tracer import EventTracer
 
 from camguard.settings import ImplementationType
 from camguard.file_storage_settings import DummyGDriveStorageSettings, FileStorageSettings, GDriveStorageSettings
 from camguard.mail_client_settings import MailClientSettings, DummyMailClientSettings
 from camguard.motion_handler_settings import MotionHandlerSettings, DummyCamSettings, RaspiCamSettings
-from camguard.motion_detector_settings import MotionDetectorSettings, DummyGpioSensorSettings, RaspiGpioSensorSettings
+from camguard.motion_detector_settings import (MotionDetectorSettings, DummyGpioSensorSettings,
+                                               FrameDiffDetectorSettings, MotionVectorDetectorSettings,
+                                               RaspiGpioSensorSettings)
 
 
 class MotionHandlerTest(TestCase):
@@ -18,11 +22,15 @@ class MotionHandlerTest(TestCase):
         # MotionhandlerSettings
         self._mh_settings_mock = create_autospec(spec=MotionHandlerSettings, spec_set=True)
         type(self._mh_settings_mock).impl_type = PropertyMock(return_value=ImplementationType.DUMMY)
+        type(self._mh_settings_mock).stream_frames = PropertyMock(return_value=False)
+        type(self._mh_settings_mock).coalesce_window_sec = PropertyMock(return_value=0.0)
         # settings should return MotionHandlerSettings mock on load_settings
         self._mh_settings_mock.load_settings = MagicMock(return_value=self._mh_settings_mock)
 
         # DummyCamSettings
         self._dummy_cam_settings_mock = create_autospec(spec=DummyCamSettings, spec_set=True)
+        type(self._dummy_cam_settings_mock).rate_control = PropertyMock(return_value=False)
+        type(self._dummy_cam_settings_mock).motion_tail_sec = PropertyMock(return_value=0.0)
         self._dummy_cam_settings_mock.load_settings = MagicMock(return_value=self._dummy_cam_settings_mock)
 
         self._patcher = patch.multiple("camguard.bridge_api",
@@ -46,8 +54,8 @@ class MotionHandlerTest(TestCase):
 
         # assert
         dummy_cam_mock.DummyCam.assert_called_with(self._dummy_cam_settings_mock)  # type: ignore
-        self._mh_settings_mock.load_settings.assert_called_with(self._config_path)
-        self._dummy_cam_settings_mock.load_settings.assert_called_with(self._config_path)
+        self._mh_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
+        self._dummy_cam_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
 
     def test_should_load_raspi_settings_on_init(self):
         # arrange
@@ -74,8 +82,8 @@ class MotionHandlerTest(TestCase):
 
         # assert
         raspi_cam_mock.RaspiCam.assert_called_with(raspi_cam_settings_mock)  # type: ignore
-        mh_settings_mock.load_settings.assert_called_with(self._config_path)
-        raspi_cam_settings_mock.load_settings.assert_called_with(self._config_path)
+        mh_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
+        raspi_cam_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
 
     def test_should_handle_motion(self):
         # arrange
@@ -89,6 +97,96 @@ class MotionHandlerTest(TestCase):
         # assert
         get_impl_mock.handle_motion.assert_called()
 
+    def test_should_track_motion_of_triggering_detector(self):
+        # arrange
+        get_impl_mock = create_autospec(spec=MotionHandlerImpl, spec_set=True)
+        detector_mock = create_autospec(spec=MotionDetector, spec_set=True)
+        type(detector_mock).motion_active = PropertyMock(side_effect=[True, False])
+
+        # act
+        with patch("camguard.bridge_api.MotionHandler._get_impl", return_value=get_impl_mock):
+            self.sut.on_motion([]).send(detector_mock)
+        active = get_impl_mock.track_motion.call_args[0][0]
+
+        # assert
+        self.assertEqual([True, False], [active(), active()])
+
+    def test_should_send_all_files_to_frame_pipeline_without_streaming(self):
+        # arrange
+        get_impl_mock = create_autospec(spec=MotionHandlerImpl, spec_set=True)
+        get_impl_mock.handle_motion.return_value = ["file1", "file2"]
+        detector_mock = create_autospec(spec=MotionDetector, spec_set=True)
+        frame_step_mock = MagicMock()
+        event_step_mock = MagicMock()
+
+        # act
+        with patch("camguard.bridge_api.MotionHandler._get_impl", return_value=get_impl_mock):
+            self.sut.on_motion([event_step_mock], [frame_step_mock]).send(detector_mock)
+
+        # assert
+        get_impl_mock.handle_motion_stream.assert_not_called()
+        frame_step_mock.send.assert_called_once_with(["file1", "file2"])
+        event_step_mock.send.assert_called_once_with(["file1", "file2"])
+
+    def test_should_stream_files_to_frame_pipeline(self):
+        # arrange
+        type(self._mh_settings_mock).stream_frames = PropertyMock(return_value=True)
+        get_impl_mock = create_autospec(spec=MotionHandlerImpl, spec_set=True)
+        detector_mock = create_autospec(spec=MotionDetector, spec_set=True)
+        frame_step_mock = MagicMock()
+        event_step_mock = MagicMock()
+        frames_before_record_end = []
+
+        def record_stream():
+            yield "file1"
+            # first frame has to be forwarded before the second frame is recorded
+            frames_before_record_end.extend(frame_step_mock.send.call_args_list)
+            yield "file2"
+
+        get_impl_mock.handle_motion_stream.side_effect = record_stream
+
+        # act
+        with patch("camguard.bridge_api.MotionHandler._get_impl", return_value=get_impl_mock):
+            self.sut.on_motion([event_step_mock], [frame_step_mock]).send(detector_mock)
+
+        # assert
+        get_impl_mock.handle_motion.assert_not_called()
+        self.assertEqual([call(["file1"])], frames_before_record_end)
+        self.assertEqual([call(["file1"]), call(["file2"])], frame_step_mock.send.call_args_list)
+        event_step_mock.send.assert_called_once_with(["file1", "file2"])
+
+    def test_should_not_extend_motion_when_coalescing_disabled(self):
+        # arrange
+        get_impl_mock = create_autospec(spec=MotionHandlerImpl, spec_set=True)
+        detector_mock = create_autospec(spec=MotionDetector, spec_set=True)
+
+        # act
+        with patch("camguard.bridge_api.MotionHandler._get_impl", return_value=get_impl_mock):
+            self.sut.on_motion([]).send(detector_mock)
+            extended = self.sut.extend_motion(detector_mock)
+
+        # assert
+        self.assertFalse(extended)
+        get_impl_mock.extend_record.assert_not_called()
+
+    def test_should_extend_motion_within_coalesce_window(self):
+        # arrange
+        type(self._mh_settings_mock).coalesce_window_sec = PropertyMock(return_value=60.0)
+        get_impl_mock = create_autospec(spec=MotionHandlerImpl, spec_set=True)
+        get_impl_mock.extend_record.return_value = True
+        detector_mock = create_autospec(spec=MotionDetector, spec_set=True)
+
+        # act
+        with patch("camguard.bridge_api.MotionHandler._get_impl", return_value=get_impl_mock):
+            extended_before = self.sut.extend_motion(detector_mock)
+            self.sut.on_motion([]).send(detector_mock)
+            extended = self.sut.extend_motion(detector_mock)
+
+        # assert
+        self.assertFalse(extended_before)
+        self.assertTrue(extended)
+        get_impl_mock.extend_record.assert_called_once()
+
     def test_should_shutdown_on_stop(self):
         # arrange
         get_impl_mock = create_autospec(spec=MotionHandlerImpl, spec_set=True)
@@ -100,6 +198,20 @@ class MotionHandlerTest(TestCase):
         # assert
         get_impl_mock.shutdown.assert_called()
 
+    def test_should_forward_start_and_disable(self):
+        # arrange
+        get_impl_mock = create_autospec(spec=MotionHandlerImpl, spec_set=True)
+        ips = [("192.168.0.1", True)]
+
+        # act
+        with patch("camguard.bridge_api.MotionHandler._get_impl", return_value=get_impl_mock):
+            self.sut.start()
+            self.sut.on_disable(ips)
+
+        # assert
+        get_impl_mock.start.assert_called_once()
+        get_impl_mock.on_disable.assert_called_once_with(ips)
+
     def tearDown(self) -> None:
         self._patcher.stop()
 
@@ -109,6 +221,7 @@ class MotionDetectorTest(TestCase):
         # MotionDetectorSettings
         self._md_settings_mock = create_autospec(spec=MotionDetectorSettings, spec_set=True)
         type(self._md_settings_mock).impl_type = PropertyMock(return_value=ImplementationType.DUMMY)
+        type(self._md_settings_mock).event_queue_size = PropertyMock(return_value=10)
         # settings should return MotionDetectorSettings mock on load_settings
         self._md_settings_mock.load_settings = MagicMock(return_value=self._md_settings_mock)
 
@@ -136,8 +249,8 @@ class MotionDetectorTest(TestCase):
 
         # assert
         dummy_sensor_mock.DummyGpioSensor.assert_called_with(self._dummy_sensor_settings_mock)  # type: ignore
-        self._md_settings_mock.load_settings.assert_called_with(self._config_path)
-        self._dummy_sensor_settings_mock.load_settings.assert_called_with(self._config_path)
+        self._md_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
+        self._dummy_sensor_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
 
     def test_should_load_raspi_settings_on_init(self):
         # arrange
@@ -163,8 +276,54 @@ class MotionDetectorTest(TestCase):
 
         # assert
         raspi_sensor_mock.RaspiGpioSensor.assert_called_with(raspi_sensor_settings_mock)  # type: ignore
-        md_settings_mock.load_settings.assert_called_with(self._config_path)
-        raspi_sensor_settings_mock.load_settings.assert_called_with(self._config_path)
+        md_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
+        raspi_sensor_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
+
+    def test_should_load_camera_settings_on_init(self):
+        # arrange
+        type(self._md_settings_mock).impl_type = PropertyMock(return_value=ImplementationType.CAMERA)
+        frame_diff_settings_mock = create_autospec(spec=FrameDiffDetectorSettings, spec_set=True)
+        frame_diff_settings_mock.load_settings = MagicMock(return_value=frame_diff_settings_mock)
+        frame_diff_mock = MagicMock()
+        frame_diff_mock.FrameDiffDetector = MagicMock()
+
+        # act
+        with patch("camguard.bridge_api.FrameDiffDetectorSettings", frame_diff_settings_mock), \
+                patch.dict("sys.modules", {"camguard.frame_diff_detector": frame_diff_mock}):
+            MotionDetector(self._config_path)
+
+        # assert
+        frame_diff_mock.FrameDiffDetector.assert_called_with(frame_diff_settings_mock)  # type: ignore
+        frame_diff_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
+
+    def test_should_load_motion_vector_settings_on_init(self):
+        # arrange
+        type(self._md_settings_mock).impl_type = PropertyMock(return_value=ImplementationType.MOTION_VECTORS)
+        motion_vector_settings_mock = create_autospec(spec=MotionVectorDetectorSettings, spec_set=True)
+        motion_vector_settings_mock.load_settings = MagicMock(return_value=motion_vector_settings_mock)
+        motion_vector_mock = MagicMock()
+        motion_vector_mock.MotionVectorDetector = MagicMock()
+
+        # act
+        with patch("camguard.bridge_api.MotionVectorDetectorSettings", motion_vector_settings_mock), \
+                patch.dict("sys.modules", {"camguard.motion_vector_detector": motion_vector_mock}):
+            MotionDetector(self._config_path)
+
+        # assert
+        motion_vector_mock.MotionVectorDetector.assert_called_with(motion_vector_settings_mock)  # type: ignore
+        motion_vector_settings_mock.load_settings.assert_called_with(self._config_path, index=0)
+
+    def test_should_load_settings_entry_of_index(self):
+        # arrange
+        dummy_sensor_mock = MagicMock()
+
+        # act
+        with patch.dict("sys.modules", {"camguard.dummy_gpio_sensor": dummy_sensor_mock}):
+            MotionDetector(self._config_path, 2)
+
+        # assert
+        self._md_settings_mock.load_settings.assert_called_with(self._config_path, index=2)
+        self._dummy_sensor_settings_mock.load_settings.assert_called_with(self._config_path, index=2)
 
     def test_should_shutdown_on_stop(self):
         # arrange
@@ -184,10 +343,73 @@ class MotionDetectorTest(TestCase):
         # act
         with patch("camguard.bridge_api.MotionDetector._get_impl", return_value=get_impl_mock):
             self.sut.register_handlers([])
+            self.sut.stop()
 
         # assert
         get_impl_mock.register_handler.assert_called()
 
+    def test_should_dispatch_motion_to_pipeline(self):
+        # arrange
+        get_impl_mock = create_autospec(spec=MotionDetectorImpl, spec_set=True)
+        handled = Event()
+        step_mock = MagicMock()
+        step_mock.send = MagicMock(side_effect=lambda _: handled.set())
+
+        # act
+        with patch("camguard.bridge_api.MotionDetector._get_impl", return_value=get_impl_mock):
+            self.sut.register_handlers([step_mock])
+            # call registered sensor callback
+            get_impl_mock.register_handler.call_args[0][0]()
+            handled.wait(2.0)
+            self.sut.stop()
+
+        # assert
+        step_mock.send.assert_called_once_with(self.sut)
+        self.assertEqual(0, self.sut.dropped_events)
+        self.assertEqual(0, self.sut.event_queue_depth)
+
+    def test_should_trace_dispatched_motion(self):
+        # arrange
+        get_impl_mock = create_autospec(spec=MotionDetectorImpl, spec_set=True)
+        type(get_impl_mock).id = PropertyMock(return_value=23)
+        tracer = EventTracer(summary_interval=0)
+        handled = Event()
+        step_mock = MagicMock()
+        step_mock.send = MagicMock(side_effect=lambda _: handled.set())
+        EventTracer.set_current(tracer)
+
+        # act
+        with patch("camguard.bridge_api.MotionDetector._get_impl", return_value=get_impl_mock):
+            self.sut.register_handlers([step_mock])
+            get_impl_mock.register_handler.call_args[0][0]()
+            handled.wait(2.0)
+            # joins dispatcher thread
+            self.sut.stop()
+        EventTracer.set_current(None)
+
+        # assert
+        step_mock.send.assert_called_once_with(self.sut)
+        self.assertEqual(1, tracer.traced_events)
+        self.assertIn("dispatch", tracer.summary())
+
+    def test_should_not_dispatch_coalesced_motion(self):
+        # arrange
+        get_impl_mock = create_autospec(spec=MotionDetectorImpl, spec_set=True)
+        step_mock = MagicMock()
+        coalesce_mock = MagicMock(return_value=True)
+
+        # act
+        with patch("camguard.bridge_api.MotionDetector._get_impl", return_value=get_impl_mock):
+            self.sut.register_handlers([step_mock], coalesce=coalesce_mock)
+            # call registered sensor callback
+            get_impl_mock.register_handler.call_args[0][0]()
+            self.sut.stop()
+
+        # assert
+        coalesce_mock.assert_called_once_with(self.sut)
+        step_mock.send.assert_not_called()
+        self.assertEqual(1, self.sut.coalesced_events)
+
     def tearDown(self) -> None:
         self._patcher.stop()
 
@@ -0,0 +1,604 @@
+import os
+import subprocess
+import sys
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+from threading import Event
+from time import monotonic
+from typing import Any, Generator, List
+from unittest import TestCase
+from unittest.mock import MagicMock, PropertyMock, create_autospec, patch
+
+from PIL import Image, ImageDraw, ImageFilter  # type: ignore
+
+from camguard.async_runtime import AsyncRuntime
+from camguard.bridge_api import (FileStorage, MailClient, MotionDetector, MotionHandler,
+                                 NetworkDeviceDetector, pipelinestep)
+from camguard.camguard import Camguard
+from camguard.camguard_settings import CamguardSettings, ComponentsType
+from camguard.event_tracer import EventTracer
+from camguard.exceptions import CamguardError, ConfigurationError
+from camguard.recorded_file import FrameVariant, MemoryFile
+from camguard.motion_detector_settings import MotionDetectorSettings
+from camguard.motion_handler_settings import MotionHandlerSettings
+from camguard.pipeline_settings import PipelineSettings, QualityProfile, SelectPolicy
+from camguard.rate_control import UploadBandwidth
+from camguard.runtime_settings import RuntimeMode, RuntimeSettings
+from camguard.tracing_settings import TracingSettings
+
+
+def _picture(blur: float = 0.0, subject: bool = False) -> bytes:
+    """jpeg picture of a checkerboard, optionally blurred or with a subject in the middle
+    """
+    image = Image.new('L', (640, 480), color=60)
+    draw = ImageDraw.Draw(image)
+    for x in range(0, 640, 40):
+        for y in range(0, 480, 40):
+            if (x + y) // 40 % 2:
+                draw.rectangle((x, y, x + 39, y + 39), fill=180)
+    if subject:
+        draw.ellipse((200, 100, 440, 400), fill=240)
+    if blur:
+        image = image.filter(ImageFilter.GaussianBlur(blur))
+    stream = BytesIO()
+    image.save(stream, format='jpeg')
+    return stream.getvalue()
+
+
+class CamguardTest(TestCase):
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        self._settings_mock = create_autospec(spec=CamguardSettings, spec_set=True)
+        type(self._settings_mock).components = PropertyMock(return_value=[
+            ComponentsType.MOTION_DETECTOR,
+            ComponentsType.MOTION_HANDLER,
+            ComponentsType.FILE_STORAGE,
+            ComponentsType.MAIL_CLIENT,
+            ComponentsType.NETWORK_DEVICE_DETECTOR
+        ])
+        self._settings_mock.load_settings = MagicMock(return_value=self._settings_mock)
+        self._pipeline_settings_mock = create_autospec(spec=PipelineSettings, spec_set=True)
+        type(self._pipeline_settings_mock).step_queue_size = PropertyMock(return_value=10)
+        type(self._pipeline_settings_mock).step_timeout_sec = PropertyMock(return_value=5.0)
+        type(self._pipeline_settings_mock).dedup_max_distance = PropertyMock(return_value=0)
+        type(self._pipeline_settings_mock).variants = PropertyMock(return_value={})
+        type(self._pipeline_settings_mock).variant_workers = PropertyMock(return_value=2)
+        type(self._pipeline_settings_mock).upload_variant = PropertyMock(return_value="")
+        type(self._pipeline_settings_mock).select_top_k = PropertyMock(return_value=0)
+        type(self._pipeline_settings_mock).select_policy = PropertyMock(return_value=SelectPolicy.DROP)
+        type(self._pipeline_settings_mock).classify_model = PropertyMock(return_value="")
+        self._pipeline_settings_mock.load_settings = MagicMock(return_value=self._pipeline_settings_mock)
+        self._runtime_settings_mock = create_autospec(spec=RuntimeSettings, spec_set=True)
+        type(self._runtime_settings_mock).mode = PropertyMock(return_value=RuntimeMode.THREADS)
+        type(self._runtime_settings_mock).max_workers = PropertyMock(return_value=4)
+        self._runtime_settings_mock.load_settings = MagicMock(return_value=self._runtime_settings_mock)
+        self._tracing_settings_mock = create_autospec(spec=TracingSettings, spec_set=True)
+        type(self._tracing_settings_mock).enabled = PropertyMock(return_value=False)
+        type(self._tracing_settings_mock).window_size = PropertyMock(return_value=100)
+        type(self._tracing_settings_mock).summary_interval = PropertyMock(return_value=10)
+        self._tracing_settings_mock.load_settings = MagicMock(return_value=self._tracing_settings_mock)
+
+        self._md_settings_mock = create_autospec(spec=MotionDetectorSettings, spec_set=True)
+        self._md_settings_mock.count_entries = MagicMock(return_value=1)
+        self._mh_settings_mock = create_autospec(spec=MotionHandlerSettings, spec_set=True)
+        self._mh_settings_mock.count_entries = MagicMock(return_value=1)
+
+        self._detector_mock = create_autospec(spec=MotionDetector, spec_set=True, instance=True)
+        type(self._detector_mock).handlers = PropertyMock(return_value=[])
+        self._handler_mock = create_autospec(spec=MotionHandler, spec_set=True, instance=True)
+        type(self._handler_mock).name = PropertyMock(return_value="0")
+        self._storage_mock = create_autospec(spec=FileStorage, spec_set=True, instance=True)
+        self._storage_step_mock = MagicMock()
+        self._storage_sent = Event()
+        self._storage_step_mock.send.side_effect = lambda _: self._storage_sent.set()
+        self._storage_mock.enqueue_files.return_value = self._storage_step_mock
+        self._mail_mock = create_autospec(spec=MailClient, spec_set=True, instance=True)
+        self._mail_step_mock = MagicMock()
+        self._mail_sent = Event()
+        self._mail_step_mock.send.side_effect = lambda _: self._mail_sent.set()
+        self._mail_mock.send_mail.return_value = self._mail_step_mock
+        self._netw_detector_mock = create_autospec(spec=NetworkDeviceDetector, spec_set=True, instance=True)
+
+        self._patcher = patch.multiple("camguard.camguard",
+                                       CamguardSettings=self._settings_mock,
+                                       PipelineSettings=self._pipeline_settings_mock,
+                                       RuntimeSettings=self._runtime_settings_mock,
+                                       TracingSettings=self._tracing_settings_mock,
+                                       MotionDetectorSettings=self._md_settings_mock,
+                                       MotionHandlerSettings=self._mh_settings_mock,
+                                       MotionDetector=MagicMock(return_value=self._detector_mock),
+                                       MotionHandler=MagicMock(return_value=self._handler_mock),
+                                       FileStorage=MagicMock(return_value=self._storage_mock),
+                                       MailClient=MagicMock(return_value=self._mail_mock),
+                                       NetworkDeviceDetector=MagicMock(return_value=self._netw_detector_mock))
+        self._patcher.start()
+        self.sut = Camguard(".")
+
+    def _file(self, name: str, data: bytes) -> str:
+        file_path = os.path.join(self._tmp_dir.name, name)
+        with open(file_path, 'wb') as file:
+            file.write(data)
+        return file_path
+
+    def _on_motion_pipe(self) -> List[Any]:
+        # motion event pipe and frame pipe
+        return self._handler_mock.on_motion.call_args[0][0] + self._handler_mock.on_motion.call_args[0][1]
+
+    def test_should_raise_on_start_without_init(self):
+        # act / assert
+        with self.assertRaises(CamguardError):
+            self.sut.start()
+
+    def test_should_init_components_in_background(self):
+        # arrange
+        auth_event = Event()
+        self._storage_mock.authenticate.side_effect = lambda: auth_event.wait(5.0)
+
+        # act
+        self.sut.init()
+        self.sut.start()
+
+        # assert
+        # motion detection is armed while storage is still authenticating
+        self._detector_mock.register_handlers.assert_called_once()
+        self._storage_mock.start.assert_not_called()
+
+        auth_event.set()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+        self._storage_mock.start.assert_called_once()
+        self._netw_detector_mock.register_handler.assert_called_once()
+        self._netw_detector_mock.start.assert_called_once()
+        self.sut.stop()
+
+    def test_should_init_components_on_start(self):
+        # act
+        self.sut.init()
+
+        # assert
+        # background threads are started after the daemon context has been entered
+        self._storage_mock.authenticate.assert_not_called()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+        self._storage_mock.authenticate.assert_called_once()
+        self.sut.stop()
+
+    def test_should_not_wait_for_hanging_init_on_stop(self):
+        # arrange
+        release = Event()
+        self._storage_mock.authenticate.side_effect = lambda: release.wait(5.0)
+        self.sut.init()
+        self.sut.start()
+
+        # act
+        with patch.object(Camguard, "_Camguard__INIT_STOP_TIMEOUT_SEC", 0.1):
+            start = monotonic()
+            self.sut.stop()
+            stop_sec = monotonic() - start
+
+        # assert
+        self.assertLess(stop_sec, 2.0)
+        # the abandoned initialization isn't waited for anymore
+        self.assertTrue(self.sut.wait_for_components(0.0))
+        release.set()
+
+    def test_should_init_components_again_on_restart(self):
+        # arrange
+        self.sut.init()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+        self.sut.stop()
+        self._storage_step_mock.reset_mock()
+        release = Event()
+        self._storage_mock.authenticate.side_effect = lambda: release.wait(5.0)
+
+        # act
+        self.sut.init()
+        self.sut.start()
+        for step in self._on_motion_pipe():
+            step.send(["file1"])
+        release.set()
+
+        # assert
+        # motion events are buffered for the new run, instead of being sent to the stopped steps
+        self.assertTrue(self.sut.wait_for_components(5.0))
+        self.assertTrue(self._storage_sent.wait(5.0))
+        self._storage_step_mock.send.assert_called_once_with(["file1"])
+        self.assertEqual(2, self._storage_mock.start.call_count)
+        self.sut.stop()
+
+    def test_should_buffer_motion_events_during_init(self):
+        # arrange
+        auth_event = Event()
+        self._storage_mock.authenticate.side_effect = lambda: auth_event.wait(5.0)
+        files = ["file1", "file2"]
+
+        # act
+        self.sut.init()
+        self.sut.start()
+        for step in self._on_motion_pipe():
+            step.send(files)
+
+        # assert
+        self._storage_step_mock.send.assert_not_called()
+        auth_event.set()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+        self.assertTrue(self._storage_sent.wait(5.0))
+        self.assertTrue(self._mail_sent.wait(5.0))
+        self._storage_step_mock.send.assert_called_once_with(files)
+        self._mail_step_mock.send.assert_called_once_with(files)
+        self.sut.stop()
+
+    def test_should_skip_component_on_init_error(self):
+        # arrange
+        self._storage_mock.authenticate.side_effect = CamguardError("Test")
+        files = ["file1", "file2"]
+
+        # act
+        self.sut.init()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+        for step in self._on_motion_pipe():
+            step.send(files)
+
+        # assert
+        self.assertTrue(self._mail_sent.wait(5.0))
+        self._storage_mock.start.assert_not_called()
+        self._storage_step_mock.send.assert_not_called()
+        self._mail_step_mock.send.assert_called_once_with(files)
+        self.sut.stop()
+
+    def test_should_suppress_near_duplicates_before_storage(self):
+        # arrange
+        type(self._pipeline_settings_mock).dedup_max_distance = PropertyMock(return_value=5)
+        scene = MemoryFile(os.path.join(self._tmp_dir.name, "001_capture.jpg"), _picture())
+        duplicate = self._file("002_capture.jpg", _picture())
+        subject = self._file("003_capture.jpg", _picture(subject=True))
+        video = self._file("004_video.h264", b"\x00\x00\x00\x01")
+        self.sut.init()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+
+        # act
+        for step in self._on_motion_pipe():
+            step.send([scene, duplicate, subject, video])
+
+        # assert
+        # files which are no pictures pass the deduplication, memory files are forwarded with their content
+        self.assertTrue(self._storage_sent.wait(5.0))
+        self._storage_step_mock.send.assert_called_once_with([scene, subject, video])
+        self.assertIsInstance(self._storage_step_mock.send.call_args[0][0][0], MemoryFile)
+        self.sut.stop()
+
+    def test_should_render_variants_for_mail_client(self):
+        # arrange
+        type(self._pipeline_settings_mock).variants = \
+            PropertyMock(return_value={'thumbnail': QualityProfile((160, 120))})
+        type(self._pipeline_settings_mock).variant_workers = PropertyMock(return_value=1)
+        picture = self._file("001_capture.jpg", _picture())
+        memory_picture = MemoryFile(os.path.join(self._tmp_dir.name, "002_capture.jpg"), _picture())
+        video = self._file("003_video.h264", b"\x00\x00\x00\x01")
+        self.sut.init()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+
+        # act
+        for step in self._on_motion_pipe():
+            step.send([picture, memory_picture, video])
+
+        # assert
+        # files which are no pictures don't have variants
+        self.assertTrue(self._mail_sent.wait(10.0))
+        files = self._mail_step_mock.send.call_args[0][0]
+        self.assertEqual([picture, memory_picture, video], files[:3])
+        self.assertEqual([os.path.join(self._tmp_dir.name, "001_capture_thumbnail.jpg"),
+                          os.path.join(self._tmp_dir.name, "002_capture_thumbnail.jpg")],
+                         [variant.name for variant in files[3:]])
+        self.assertTrue(all(isinstance(variant, FrameVariant) and variant.size for variant in files[3:]))
+        self.sut.stop()
+
+    def test_should_start_variant_workers_on_start(self):
+        # arrange
+        type(self._pipeline_settings_mock).variants = \
+            PropertyMock(return_value={'thumbnail': QualityProfile((160, 120))})
+        variants_module = MagicMock()
+
+        # act
+        with patch.dict("sys.modules", {"camguard.frame_variants": variants_module}):
+            self.sut.init()
+            started_on_init = variants_module.VariantRenderer.return_value.start.called
+            self.sut.start()
+
+        # assert
+        # worker processes don't survive detaching the daemon process
+        self.assertFalse(started_on_init)
+        variants_module.VariantRenderer.return_value.start.assert_called_once()
+        self.sut.stop()
+
+    def test_should_select_best_pictures_for_mail_client(self):
+        # arrange
+        type(self._pipeline_settings_mock).select_top_k = PropertyMock(return_value=1)
+        blurred = self._file("001_capture.jpg", _picture(blur=4.0))
+        sharp = MemoryFile(os.path.join(self._tmp_dir.name, "002_capture.jpg"), _picture())
+        video = self._file("003_video.h264", b"\x00\x00\x00\x01")
+        self.sut.init()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+
+        # act
+        for step in self._on_motion_pipe():
+            step.send([blurred, sharp, video])
+
+        # assert
+        # files which are no pictures are always selected, other pictures are dropped by default
+        self.assertTrue(self._mail_sent.wait(5.0))
+        self.assertTrue(self._storage_sent.wait(5.0))
+        self._mail_step_mock.send.assert_called_once_with([sharp, video])
+        self._storage_step_mock.send.assert_called_once_with([sharp, video])
+        # frames are not streamed to the storage, a single frame would always be selected
+        self.assertEqual([], self._handler_mock.on_motion.call_args[0][1])
+        self.assertIsInstance(self._mail_step_mock.send.call_args[0][0][0], MemoryFile)
+        self.sut.stop()
+
+    def test_should_classify_motion_events_before_components(self):
+        # arrange
+        @pipelinestep
+        def downgrade(_: List[Generator[None, Any, None]],
+                      storage_pipeline: List[Generator[None, Any, None]]) -> Generator[None, List[str], None]:
+            while True:
+                files = (yield)
+                for step in storage_pipeline:
+                    step.send(files)
+
+        classifier_module = MagicMock()
+        classifier_module.ObjectClassifier.return_value.classify.side_effect = downgrade
+        type(self._pipeline_settings_mock).classify_model = PropertyMock(return_value="yolov8n.onnx")
+        with patch.dict("sys.modules", {"camguard.object_classifier": classifier_module}):
+            self.sut.init()
+        # worker processes don't survive detaching the daemon process
+        classifier_module.ObjectClassifier.return_value.start.assert_not_called()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+
+        # act
+        for step in self._on_motion_pipe():
+            step.send(["file1", "file2"])
+
+        # assert
+        # files are not streamed to the storage, downgraded events are uploaded without mail
+        self.assertEqual([], self._handler_mock.on_motion.call_args[0][1])
+        self.assertTrue(self._storage_sent.wait(5.0))
+        self._storage_step_mock.send.assert_called_once_with(["file1", "file2"])
+        self._mail_step_mock.send.assert_not_called()
+        classifier_module.ObjectClassifier.return_value.start.assert_called_once()
+        self.sut.stop()
+        classifier_module.ObjectClassifier.return_value.stop.assert_called_once()
+
+    def test_should_upload_variant_instead_of_picture(self):
+        # arrange
+        type(self._pipeline_settings_mock).variants = PropertyMock(return_value={'preview': QualityProfile((640, 480))})
+        type(self._pipeline_settings_mock).variant_workers = PropertyMock(return_value=1)
+        type(self._pipeline_settings_mock).upload_variant = PropertyMock(return_value='preview')
+        picture = MemoryFile(os.path.join(self._tmp_dir.name, "001_capture.jpg"), _picture())
+        video = self._file("002_video.h264", b"\x00\x00\x00\x01")
+        self.sut.init()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+
+        # act
+        for step in self._on_motion_pipe():
+            step.send([picture, video])
+
+        # assert
+        # files which are no pictures are uploaded as they are
+        self.assertTrue(self._storage_sent.wait(10.0))
+        preview, uploaded_video = self._storage_step_mock.send.call_args[0][0]
+        self.assertIsInstance(preview, FrameVariant)
+        self.assertEqual(os.path.join(self._tmp_dir.name, "001_capture_preview.jpg"), preview.name)
+        self.assertEqual(video, uploaded_video)
+        self.sut.stop()
+
+    def test_should_measure_upload_bandwidth_while_running(self):
+        # act
+        self.sut.init()
+        self.sut.start()
+        bandwidth = UploadBandwidth.current()
+        self.sut.stop()
+
+        # assert
+        self.assertIsNotNone(bandwidth)
+        self.assertIsNone(UploadBandwidth.current())
+
+    def test_should_not_throttle_steps_by_slow_step(self):
+        # arrange
+        release_mail = Event()
+        self._mail_step_mock.send.side_effect = lambda _: release_mail.wait(5.0)
+        self.sut.init()
+        self.sut.start()
+        self.assertTrue(self.sut.wait_for_components(5.0))
+
+        # act
+        for step in self._on_motion_pipe():
+            step.send(["file1"])
+
+        # assert
+        # storage receives files while mail client is still busy
+        self.assertTrue(self._storage_sent.wait(5.0))
+        release_mail.set()
+        self.sut.stop()
+
+    def test_should_run_components_on_async_runtime(self):
+        # arrange
+        type(self._runtime_settings_mock).mode = PropertyMock(return_value=RuntimeMode.ASYNCIO)
+        sut = Camguard(".")
+        files = ["file1", "file2"]
+
+        # act
+        sut.init()
+        # the runtime doesn't exist before start, it wouldn't survive detaching the daemon process
+        self.assertIsNone(AsyncRuntime.current())
+        sut.start()
+        runtime = AsyncRuntime.current()
+        self.assertTrue(sut.wait_for_components(5.0))
+        for step in self._on_motion_pipe():
+            step.send(files)
+
+        # assert
+        self.assertTrue(self._storage_sent.wait(5.0))
+        self.assertTrue(self._mail_sent.wait(5.0))
+        self.assertIsNotNone(runtime)
+        sut.stop()
+        self.assertIsNone(AsyncRuntime.current())
+        self.assertFalse(runtime.running)  # type: ignore
+
+    def test_should_route_detectors_to_handlers(self):
+        # arrange
+        self._md_settings_mock.count_entries.return_value = 3
+        self._mh_settings_mock.count_entries.return_value = 2
+        detectors = [create_autospec(spec=MotionDetector, spec_set=True, instance=True) for _ in range(3)]
+        handlers = [create_autospec(spec=MotionHandler, spec_set=True, instance=True) for _ in range(2)]
+        type(detectors[0]).handlers = PropertyMock(return_value=[])
+        type(detectors[1]).handlers = PropertyMock(return_value=[])
+        type(detectors[2]).handlers = PropertyMock(return_value=["garden", "0"])
+        type(handlers[0]).name = PropertyMock(return_value="0")
+        type(handlers[1]).name = PropertyMock(return_value="garden")
+
+        with patch("camguard.camguard.MotionDetector", MagicMock(side_effect=detectors)), \
+                patch("camguard.camguard.MotionHandler", MagicMock(side_effect=handlers)):
+            sut = Camguard(".")
+
+        # act
+        sut.init()
+        sut.start()
+
+        # assert
+        detectors[0].register_handlers.assert_called_once()
+        self.assertEqual(1, len(detectors[0].register_handlers.call_args[0][0]))
+        self.assertEqual(1, len(detectors[1].register_handlers.call_args[0][0]))
+        self.assertEqual(2, len(detectors[2].register_handlers.call_args[0][0]))
+        self.assertEqual(2, handlers[0].on_motion.call_count)
+        self.assertEqual(2, handlers[1].on_motion.call_count)
+        sut.stop()
+        for mock in detectors + handlers:
+            mock.stop.assert_called_once()
+
+    def test_should_disable_all_detectors(self):
+        # arrange
+        self._md_settings_mock.count_entries.return_value = 2
+        detectors = [create_autospec(spec=MotionDetector, spec_set=True, instance=True) for _ in range(2)]
+        for detector in detectors:
+            type(detector).handlers = PropertyMock(return_value=[])
+
+        with patch("camguard.camguard.MotionDetector", MagicMock(side_effect=detectors)):
+            sut = Camguard(".")
+        sut.init()
+        sut.start()
+        self.assertTrue(sut.wait_for_components(5.0))
+        on_disable = self._netw_detector_mock.register_handler.call_args[0][0]
+
+        # act
+        on_disable([("192.168.0.1", True)])
+
+        # assert
+        for detector in detectors:
+            detector.on_disable.assert_called_once_with([("192.168.0.1", True)])
+        self._handler_mock.on_disable.assert_called_once_with([("192.168.0.1", True)])
+        sut.stop()
+
+    def test_should_raise_on_unknown_handler(self):
+        # arrange
+        type(self._detector_mock).handlers = PropertyMock(return_value=["unknown"])
+
+        # act / assert
+        with self.assertRaises(ConfigurationError):
+            self.sut.init()
+
+    def test_should_enable_tracing(self):
+        # arrange
+        type(self._tracing_settings_mock).enabled = PropertyMock(return_value=True)
+
+        # act
+        sut = Camguard(".")
+        sut.init()
+        sut.start()
+
+        # assert
+        self.assertIsNotNone(EventTracer.current())
+        sut.stop()
+        self.assertIsNone(EventTracer.current())
+
+    def test_should_stop_components(self):
+        # arrange
+        self.sut.init()
+        self.sut.start()
+        # components are initialized in the background, a component which isn't ready yet isn't stopped
+        self.assertTrue(self.sut.wait_for_components(5.0))
+
+        # act
+        self.sut.stop()
+
+        # assert
+        self._handler_mock.start.assert_called_once()
+        self._handler_mock.stop.assert_called_once()
+        self._detector_mock.stop.assert_called_once()
+        self._storage_mock.stop.assert_called_once()
+        self._netw_detector_mock.stop.assert_called_once()
+
+    def tearDown(self) -> None:
+        self._patcher.stop()
+        self._tmp_dir.cleanup()
+        AsyncRuntime.set_current(None)
+        EventTracer.set_current(None)
+
+
+class CamguardDaemonTest(TestCase):
+    """camguard is initialized before and started after entering the daemon context, which closes all open files.
+    the daemon is run in a child process, which doesn't close the files of the test runner
+    """
+
+    def setUp(self) -> None:
+        self._config_dir = TemporaryDirectory()
+        with open(f"{self._config_dir.name}/settings.yaml", 'w') as settings_file:
+            settings_file.write(dedent("""\
+                components:
+                    - motion_handler
+                    - motion_detector
+                motion_handler:
+                    implementation: dummy
+                motion_detector:
+                    implementation: dummy
+                runtime:
+                    mode: asyncio
+                tracing:
+                    enabled: true
+                """))
+
+    def test_should_run_async_runtime_after_entering_daemon_context(self):
+        # arrange
+        script = dedent("""\
+            import asyncio
+            import sys
+            from daemon import DaemonContext
+            from camguard.async_runtime import AsyncRuntime
+            from camguard.camguard import Camguard
+
+            sut = Camguard(sys.argv[1])
+            sut.init()
+            with DaemonContext(detach_process=False, working_directory=sys.argv[1]):
+                sut.start()
+                try:
+                    result = AsyncRuntime.current().submit(asyncio.sleep(0, result=True)).result(timeout=3)
+                finally:
+                    sut.stop()
+            sys.exit(0 if result else 1)
+            """)
+
+        # act
+        process = subprocess.run([sys.executable, "-c", script, self._config_dir.name], timeout=30)
+
+        # assert
+        self.assertEqual(0, process.returncode)
+
+    def tearDown(self) -> None:
+        self._config_dir.cleanup()
@@ -0,0 +1,71 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from camguard.capture_scheduler import CaptureScheduler
+from camguard.metrics import Metric, Metrics
+
+MONOTONIC = "camguard.capture_scheduler.time.monotonic"
+SLEEP = "camguard.capture_scheduler.time.sleep"
+
+
+class CaptureSchedulerTest(TestCase):
+
+    def setUp(self) -> None:
+        self._metrics = Metrics()
+        Metrics.set_current(self._metrics)
+
+    def test_should_wait_for_absolute_deadlines(self):
+        # arrange
+        sut = CaptureScheduler(interval_sec=1.0, camera=1)
+        sleep_mock = MagicMock()
+
+        # act
+        # captures take 0.3s, start at 10.0
+        with patch(MONOTONIC, side_effect=[10.0, 10.0, 10.3, 11.3, 12.0]), patch(SLEEP, sleep_mock):
+            sut.start()
+            skipped = [sut.wait(), sut.wait(), sut.wait()]
+            achieved_fps = sut.finish()
+
+        # assert
+        self.assertEqual([0, 0, 0], skipped)
+        self.assertEqual([0.0, 0.7, 0.7], [round(call[0][0], 3) for call in sleep_mock.call_args_list])
+        self.assertEqual(1.0, achieved_fps)
+        self.assertEqual(1.0, self._metrics.get(Metric.CAPTURE_FPS, camera=1))
+
+    def test_should_skip_missed_deadlines(self):
+        # arrange
+        sut = CaptureScheduler(interval_sec=1.0)
+        sleep_mock = MagicMock()
+
+        # act
+        # the first capture takes 2.5s, the second capture takes 0.2s
+        with patch(MONOTONIC, side_effect=[0.0, 0.0, 2.5, 2.7, 3.2]), patch(SLEEP, sleep_mock):
+            sut.start()
+            skipped = [sut.wait(), sut.wait(), sut.wait()]
+            sut.finish()
+
+        # assert
+        # the deadline at 1.0s is skipped, the late capture is taken right away at 2.5s
+        # and the next one is due at 3.0s again, instead of lagging behind
+        self.assertEqual([0, 1, 0], skipped)
+        self.assertEqual(1, sut.skipped)
+        self.assertEqual(0.3, round(sleep_mock.call_args_list[-1][0][0], 3))
+
+    def test_should_not_wait_without_interval(self):
+        # arrange
+        sut = CaptureScheduler(interval_sec=0.0)
+
+        # act
+        with patch(SLEEP) as sleep_mock:
+            sut.start()
+            skipped = [sut.wait() for _ in range(3)]
+            sut.finish()
+
+        # assert
+        self.assertEqual([0, 0, 0], skipped)
+        self.assertIsNone(sut.target_fps)
+        self.assertEqual(3, sut.captures)
+        self.assertTrue(all(call[0][0] <= 0.0 for call in sleep_mock.call_args_list))
+
+    def tearDown(self) -> None:
+        Metrics.set_current(None)
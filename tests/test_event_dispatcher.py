@@ -0,0 +1,126 @@
+from threading import Event, current_thread
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from camguard.async_runtime import AsyncRuntime
+from camguard.event_dispatcher import EventDispatcher
+
+
+class EventDispatcherTest(TestCase):
+
+    def test_should_dispatch_on_dispatcher_thread(self):
+        # arrange
+        handled = Event()
+        threads = []
+
+        def handler(event: str) -> None:
+            threads.append((event, current_thread().name))
+            handled.set()
+
+        sut = EventDispatcher("TestDispatcherThread", handler)
+
+        # act
+        sut.start()
+        enqueued = sut.dispatch("event1")
+        handled.wait(2.0)
+        sut.stop()
+
+        # assert
+        self.assertTrue(enqueued)
+        self.assertEqual([("event1", "TestDispatcherThread")], threads)
+        self.assertEqual(1, sut.dispatched)
+        self.assertFalse(sut.running)
+
+    def test_should_drop_events_when_queue_is_full(self):
+        # arrange
+        busy = Event()
+        release = Event()
+
+        def handler(_: str) -> None:
+            busy.set()
+            release.wait(2.0)
+
+        sut = EventDispatcher("TestDispatcherThread", handler, queue_size=1)
+
+        # act
+        sut.start()
+        sut.dispatch("event1")
+        busy.wait(2.0)  # handler blocks with event1
+        sut.dispatch("event2")  # waits in queue
+        dropped = not sut.dispatch("event3")
+        depth = sut.queue_depth
+        release.set()
+        sut.stop()
+
+        # assert
+        self.assertTrue(dropped)
+        self.assertEqual(1, sut.dropped)
+        self.assertEqual(1, depth)
+
+    def test_should_continue_on_handler_error(self):
+        # arrange
+        handled = Event()
+
+        def handler(event: str) -> None:
+            if event == "event1":
+                raise Exception("Test")
+            handled.set()
+
+        handler_mock = MagicMock(side_effect=handler)
+        sut = EventDispatcher("TestDispatcherThread", handler_mock)
+
+        # act
+        sut.start()
+        sut.dispatch("event1")
+        sut.dispatch("event2")
+        handled.wait(2.0)
+        sut.stop()
+
+        # assert
+        self.assertEqual(2, handler_mock.call_count)
+
+    def test_should_not_stop_when_never_started(self):
+        # arrange
+        sut = EventDispatcher("TestDispatcherThread", MagicMock())
+
+        # act
+        sut.stop()
+
+        # assert
+        self.assertFalse(sut.running)
+
+
+class AsyncEventDispatcherTest(TestCase):
+
+    def setUp(self) -> None:
+        self._runtime = AsyncRuntime(max_workers=1)
+        self._runtime.start()
+        AsyncRuntime.set_current(self._runtime)
+
+    def test_should_dispatch_on_dispatcher_thread_in_async_mode(self):
+        # arrange
+        handled = Event()
+        threads = []
+
+        def handler(event: str) -> None:
+            threads.append((event, current_thread().name))
+            handled.set()
+
+        sut = EventDispatcher("TestDispatcherThread", handler)
+
+        # act
+        sut.start()
+        enqueued = sut.dispatch("event1")
+        handled.wait(2.0)
+        sut.stop()
+
+        # assert
+        self.assertTrue(enqueued)
+        # recording doesn't occupy a worker of the runtime
+        self.assertEqual([("event1", "TestDispatcherThread")], threads)
+        self.assertEqual(1, sut.dispatched)
+        self.assertFalse(sut.running)
+
+    def tearDown(self) -> None:
+        AsyncRuntime.set_current(None)
+        self._runtime.stop()
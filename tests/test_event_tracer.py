@@ -0,0 +1,124 @@
+from threading import Thread
+from typing import List
+from unittest import TestCase
+from unittest.mock import patch
+
+from camguard.event_tracer import EventTracer, TraceMark
+
+
+class EventTracerTest(TestCase):
+
+    def setUp(self) -> None:
+        self.sut = EventTracer(expected=[TraceMark.UPLOAD_END, TraceMark.MAIL_SENT], summary_interval=0)
+
+    def _handle(self, files: List[str]) -> None:
+        # simulate motion handling on the dispatcher thread
+        event = self.sut.begin(detector_id=23)
+        self.sut.activate(event)
+        self.sut.mark(TraceMark.CAMERA_OPEN)
+        for _ in files:
+            self.sut.mark(TraceMark.FRAME)
+        self.sut.add_files(files)
+        self.sut.deactivate()
+
+    def test_should_emit_complete_event(self):
+        # arrange
+        files = ["file1", "file2"]
+        self._handle(files)
+
+        # act
+        with self.assertLogs("camguard.event_tracer", level="INFO") as logs:
+            self.sut.mark_files(files, TraceMark.ENQUEUE)
+            self.sut.mark_files(files, TraceMark.UPLOAD_START)
+            self.sut.mark_files(files, TraceMark.UPLOAD_END)
+            self.assertEqual(0, self.sut.traced_events)
+            self.sut.mark_files(files, TraceMark.MAIL_SENT)
+
+        # assert
+        self.assertEqual(1, self.sut.traced_events)
+        self.assertEqual(0, self.sut.incomplete_events)
+        self.assertEqual(1, len(logs.records))
+        self.assertIn('"complete": true', logs.output[0])
+        self.assertIn('"files": 2', logs.output[0])
+        summary = self.sut.summary()
+        for span in list(EventTracer.SPANS) + ["total"]:
+            self.assertIn(span, summary)
+            self.assertEqual({"p50", "p95", "p99"}, set(summary[span]))
+
+    def test_should_mark_events_of_current_thread_only(self):
+        # arrange
+        event = self.sut.begin(detector_id=23)
+        self.sut.activate(event)
+
+        # act
+        thread = Thread(target=self.sut.mark, args=(TraceMark.CAMERA_OPEN,))
+        thread.start()
+        thread.join()
+        self.sut.deactivate()
+
+        # assert
+        self.assertIsNone(event.first(TraceMark.CAMERA_OPEN))
+        self.assertIsNotNone(event.first(TraceMark.DISPATCH))
+
+    def test_should_ignore_unknown_files(self):
+        # act
+        self.sut.mark_files(["unknown"], TraceMark.UPLOAD_END)
+
+        # assert
+        self.assertEqual(0, self.sut.traced_events)
+
+    def test_should_emit_expired_event_as_incomplete(self):
+        # arrange
+        self._handle(["file1"])
+
+        # act
+        with patch("camguard.event_tracer.monotonic", return_value=10e6):
+            self.sut.mark_files(["file1"], TraceMark.UPLOAD_END)
+
+        # assert
+        self.assertEqual(1, self.sut.traced_events)
+        self.assertEqual(1, self.sut.incomplete_events)
+        self.assertEqual({}, self.sut.summary())
+
+    def test_should_not_emit_discarded_event(self):
+        # arrange
+        event = self.sut.begin(detector_id=23)
+
+        # act
+        self.sut.discard(event)
+        with patch("camguard.event_tracer.monotonic", return_value=10e6):
+            self.sut.begin(detector_id=23)
+
+        # assert
+        self.assertEqual(0, self.sut.traced_events)
+
+    def test_should_calculate_percentiles(self):
+        # arrange
+        sut = EventTracer(summary_interval=0)
+
+        # act
+        for delay in range(1, 101):
+            event = sut.begin(detector_id=23, activation=0.0)
+            with patch("camguard.event_tracer.monotonic", return_value=delay / 1000):
+                sut.activate(event)
+            sut.deactivate()
+
+        # assert
+        self.assertEqual({"p50": 50.0, "p95": 95.0, "p99": 99.0}, sut.summary()["dispatch"])
+
+    def test_should_trace_only_with_current_tracer(self):
+        # arrange
+        self._handle(["file1"])
+
+        # act
+        # ignored without current tracer, therefore the event is not complete after mail has been sent
+        EventTracer.trace_files(["file1"], TraceMark.UPLOAD_END)
+        EventTracer.set_current(self.sut)
+        EventTracer.trace_files(["file1"], TraceMark.MAIL_SENT)
+        EventTracer.set_current(None)
+
+        # assert
+        self.assertEqual(0, self.sut.traced_events)
+
+    def tearDown(self) -> None:
+        EventTracer.set_current(None)
@@ -0,0 +1,109 @@
+import os
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from PIL import Image, ImageDraw  # type: ignore
+
+from camguard.frame_dedup import FrameDeduplicator, difference_hash
+from camguard.recorded_file import MemoryFile
+
+
+def _picture(subject: bool = False, brightness: int = 0) -> bytes:
+    """jpeg picture of a static scene, optionally with a subject in the middle
+    """
+    image = Image.new('L', (640, 480))
+    draw = ImageDraw.Draw(image)
+    # background with a horizontal and a vertical edge
+    draw.rectangle((0, 0, 320, 480), fill=60 + brightness)
+    draw.rectangle((320, 0, 640, 480), fill=160 + brightness)
+    draw.rectangle((0, 360, 640, 480), fill=100 + brightness)
+    if subject:
+        draw.ellipse((200, 100, 440, 400), fill=240)
+    stream = BytesIO()
+    image.save(stream, format='jpeg')
+    return stream.getvalue()
+
+
+class FrameDeduplicatorTest(TestCase):
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+
+    def _file(self, name: str, data: bytes) -> str:
+        file_path = os.path.join(self._tmp_dir.name, name)
+        with open(file_path, 'wb') as file:
+            file.write(data)
+        return file_path
+
+    def test_should_hash_similar_pictures_alike(self):
+        # arrange
+        scene = MemoryFile("scene.jpg", _picture())
+        brighter_scene = MemoryFile("brighter_scene.jpg", _picture(brightness=10))
+        subject = MemoryFile("subject.jpg", _picture(subject=True))
+
+        # act
+        scene_hash = difference_hash(scene)
+        brighter_hash = difference_hash(brighter_scene)
+        subject_hash = difference_hash(subject)
+
+        # assert
+        self.assertLessEqual(bin(scene_hash ^ brighter_hash).count('1'), 2)  # type: ignore
+        self.assertGreater(bin(scene_hash ^ subject_hash).count('1'), 10)  # type: ignore
+
+    def test_should_suppress_near_duplicates(self):
+        # arrange
+        files = [self._file("0.jpg", _picture(subject=True)),
+                 self._file("1.jpg", _picture()),
+                 self._file("2.jpg", _picture(brightness=5)),
+                 self._file("3.jpg", _picture()),
+                 self._file("4.jpg", _picture(subject=True))]
+        sut = FrameDeduplicator(max_distance=5)
+
+        # act
+        kept = sut.filter_files(files)
+
+        # assert
+        self.assertEqual([files[0], files[1], files[4]], kept)
+        self.assertEqual(2, sut.suppressed)
+
+    def test_should_compare_with_previous_call(self):
+        # arrange
+        sut = FrameDeduplicator(max_distance=5)
+        sut.filter_files([self._file("0.jpg", _picture())])
+
+        # act
+        kept = sut.filter_files([self._file("1.jpg", _picture())])
+
+        # assert
+        self.assertEqual([], kept)
+
+    def test_should_keep_other_files(self):
+        # arrange
+        files = [self._file("0.h264", b"\x00\x00\x00\x01"), self._file("1.h264", b"\x00\x00\x00\x01")]
+        sut = FrameDeduplicator(max_distance=5)
+
+        # act
+        kept = sut.filter_files(files)
+
+        # assert
+        self.assertEqual(files, kept)
+
+    def test_should_forward_kept_files(self):
+        # arrange
+        target = MagicMock()
+        files = [self._file("0.jpg", _picture()), self._file("1.jpg", _picture())]
+        sut = FrameDeduplicator(max_distance=5)
+
+        # act
+        step = sut.deduplicate(target)
+        step.send(files)
+        step.send(files[1:])
+
+        # assert
+        # nothing is forwarded, if all files are suppressed
+        target.send.assert_called_once_with(files[:1])
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
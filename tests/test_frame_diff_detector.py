@@ -0,0 +1,190 @@
+import os
+import time
+from tempfile import TemporaryDirectory
+from typing import List
+from unittest import TestCase
+from unittest.mock import MagicMock, PropertyMock, create_autospec
+
+import numpy as np  # type: ignore
+
+from camguard.exceptions import ConfigurationError
+from camguard.frame_diff_detector import FrameDiffDetector, FrameDiffModel
+from camguard.motion_detector_settings import FrameDiffDetectorSettings
+from camguard.shared_camera import SharedCamera
+
+
+def _frame(block: bool = False) -> np.ndarray:
+    frame = np.full((96, 128), 40, dtype=np.uint8)
+    if block:
+        # 32x24 pixels of the upper left corner
+        frame[:24, :32] = 200
+    return frame
+
+
+class FrameDiffModelTest(TestCase):
+
+    def test_should_return_changed_area(self):
+        # arrange
+        sut = FrameDiffModel(pixel_threshold=25, background_rate=0.05)
+        sut.update(_frame())
+
+        # act
+        changed = sut.update(_frame(block=True))
+
+        # assert
+        self.assertAlmostEqual(1 / 16, changed)
+
+    def test_should_adapt_background(self):
+        # arrange
+        sut = FrameDiffModel(pixel_threshold=25, background_rate=0.5)
+        sut.update(_frame())
+
+        # act
+        changed = [sut.update(_frame(block=True)) for _ in range(4)]
+
+        # assert
+        self.assertGreater(changed[0], 0.0)
+        self.assertEqual(0.0, changed[-1])
+
+    def test_should_ignore_changes_outside_of_regions(self):
+        # arrange
+        sut = FrameDiffModel(pixel_threshold=25, background_rate=0.05, regions=[(0.5, 0.5, 0.5, 0.5)])
+        sut.update(_frame())
+
+        # act
+        changed = sut.update(_frame(block=True))
+
+        # assert
+        self.assertEqual(0.0, changed)
+
+    def test_should_raise_on_empty_regions(self):
+        # arrange
+        sut = FrameDiffModel(pixel_threshold=25, background_rate=0.05, regions=[(0.5, 0.5, 0.0, 0.0)])
+
+        # act / assert
+        with self.assertRaises(ConfigurationError):
+            sut.update(_frame())
+
+
+class FrameDiffDetectorTest(TestCase):
+
+    def setUp(self) -> None:
+        self._settings_mock = create_autospec(spec=FrameDiffDetectorSettings, spec_set=True)
+        type(self._settings_mock).camera_number = PropertyMock(return_value=0)
+        type(self._settings_mock).resolution = PropertyMock(return_value=(128, 96))
+        type(self._settings_mock).sample_rate = PropertyMock(return_value=1000.0)
+        type(self._settings_mock).pixel_threshold = PropertyMock(return_value=25)
+        type(self._settings_mock).area_threshold = PropertyMock(return_value=0.05)
+        type(self._settings_mock).background_rate = PropertyMock(return_value=0.05)
+        type(self._settings_mock).cpu_budget = PropertyMock(return_value=0.25)
+        type(self._settings_mock).regions = PropertyMock(return_value=[])
+        self._tmp_dir = TemporaryDirectory()
+        type(self._settings_mock).replay_path = PropertyMock(return_value=self._tmp_dir.name)
+
+    def _record(self, blocks: List[bool]) -> None:
+        for index, block in enumerate(blocks):
+            np.save(os.path.join(self._tmp_dir.name, f"{index:03d}.npy"), _frame(block))
+
+    def _replay(self, sut: FrameDiffDetector, handler: MagicMock) -> None:
+        sut.register_handler(handler)
+        # thread finishes after replaying all frames
+        sut._FrameDiffDetector__thread.join(5.0)  # type: ignore
+
+    def test_should_detect_motion_in_recorded_frames(self):
+        # arrange
+        self._record([False, False, True, True, False, False, True, False])
+        handler = MagicMock()
+        sut = FrameDiffDetector(self._settings_mock)
+
+        # act
+        self._replay(sut, handler)
+
+        # assert
+        # once per motion, not for every frame with motion
+        self.assertEqual(2, handler.call_count)
+
+    def test_should_not_detect_motion_while_disabled(self):
+        # arrange
+        self._record([False, True, False, True])
+        handler = MagicMock()
+        sut = FrameDiffDetector(self._settings_mock)
+
+        # act
+        sut.on_disable([("192.168.0.1", True)])
+        self._replay(sut, handler)
+
+        # assert
+        handler.assert_not_called()
+
+    def test_should_detect_motion_in_frames_of_shared_camera(self):
+        # arrange
+        type(self._settings_mock).replay_path = PropertyMock(return_value="")
+        pi_camera = MagicMock()
+        SharedCamera.publish(0, pi_camera)
+        handler = MagicMock(side_effect=lambda: sut.shutdown())
+        sut = FrameDiffDetector(self._settings_mock)
+
+        # act
+        sut.register_handler(handler)
+        for _ in range(100):
+            if pi_camera.start_recording.called:
+                break
+            time.sleep(0.01)
+        output = pi_camera.start_recording.call_args[0][0]
+        for block in [False, True, True]:
+            # yuv frame with chrominance planes
+            yuv = np.full((144, 128), 128, dtype=np.uint8)
+            yuv[:96] = _frame(block)
+            output.write(yuv.tobytes())
+            time.sleep(0.05)
+        sut._FrameDiffDetector__thread.join(5.0)  # type: ignore
+
+        # assert
+        self.assertEqual('yuv', pi_camera.start_recording.call_args[1]['format'])
+        self.assertEqual((128, 96), pi_camera.start_recording.call_args[1]['resize'])
+        handler.assert_called_once()
+        # the shared camera stays open, only the recording of the detector is stopped
+        pi_camera.stop_recording.assert_called_once_with(splitter_port=3)
+        pi_camera.close.assert_not_called()
+        SharedCamera.withdraw(0)
+
+    def test_should_reset_background_after_disabled(self):
+        # arrange
+        type(self._settings_mock).area_threshold = PropertyMock(return_value=0.01)
+        handler = MagicMock()
+        sut = FrameDiffDetector(self._settings_mock)
+        sut.register_handler(handler)
+        sut._FrameDiffDetector__process(_frame())  # type: ignore
+
+        # act
+        # no frames while disabled, the shared camera is closed
+        sut.on_disable([("192.168.0.1", True)])
+        sut.on_disable([("192.168.0.1", False)])
+        sut._FrameDiffDetector__process(_frame(True))  # type: ignore
+
+        # assert
+        handler.assert_not_called()
+
+    def test_should_lower_sample_rate_for_cpu_budget(self):
+        # arrange
+        sut = FrameDiffDetector(self._settings_mock)
+
+        # act
+        within_budget = sut._FrameDiffDetector__wait_time(0.5, 0.1)  # type: ignore
+        exceeding_budget = sut._FrameDiffDetector__wait_time(0.25, 0.1)  # type: ignore
+
+        # assert
+        self.assertAlmostEqual(0.4, within_budget)
+        # a frame takes 0.1s, which is 25% of 0.4s
+        self.assertAlmostEqual(0.3, exceeding_budget)
+
+    def test_should_raise_on_invalid_cpu_budget(self):
+        # arrange
+        type(self._settings_mock).cpu_budget = PropertyMock(return_value=0.0)
+
+        # act / assert
+        with self.assertRaises(ConfigurationError):
+            FrameDiffDetector(self._settings_mock)
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
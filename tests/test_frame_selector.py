@@ -0,0 +1,101 @@
+import os
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from PIL import Image, ImageDraw, ImageFilter  # type: ignore
+
+from camguard.event_tracer import TraceMark
+from camguard.frame_selector import FrameSelector, score_picture
+from camguard.recorded_file import MemoryFile
+from camguard.pipeline_settings import SelectPolicy
+
+
+def _picture(blur: float = 0.0, brightness: int = 0) -> bytes:
+    """jpeg picture of a checkerboard, optionally blurred or brightened
+    """
+    image = Image.new('L', (640, 480), color=60)
+    draw = ImageDraw.Draw(image)
+    for x in range(0, 640, 40):
+        for y in range(0, 480, 40):
+            if (x + y) // 40 % 2:
+                draw.rectangle((x, y, x + 39, y + 39), fill=180)
+    if blur:
+        image = image.filter(ImageFilter.GaussianBlur(blur))
+    if brightness:
+        image = image.point(lambda value: min(255, value + brightness))
+    stream = BytesIO()
+    image.save(stream, format='jpeg')
+    return stream.getvalue()
+
+
+class FrameSelectorTest(TestCase):
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+
+    def _file(self, name: str, data: bytes) -> str:
+        file_path = os.path.join(self._tmp_dir.name, name)
+        with open(file_path, 'wb') as file:
+            file.write(data)
+        return file_path
+
+    def test_should_score_sharp_and_exposed_pictures_higher(self):
+        # act
+        sharp = score_picture(MemoryFile("sharp.jpg", _picture()))
+        blurred = score_picture(MemoryFile("blurred.jpg", _picture(blur=4.0)))
+        overexposed = score_picture(MemoryFile("overexposed.jpg", _picture(brightness=120)))
+
+        # assert
+        self.assertGreater(sharp.sharpness, 2 * blurred.sharpness)  # type: ignore
+        self.assertGreater(sharp.exposure, 0.99)  # type: ignore
+        self.assertLess(overexposed.exposure, 0.6)  # type: ignore
+        self.assertGreater(sharp.value, overexposed.value)  # type: ignore
+
+    def test_should_select_best_pictures_in_record_order(self):
+        # arrange
+        files = [self._file("001.jpg", _picture(blur=4.0)),
+                 self._file("002.jpg", _picture()),
+                 self._file("003.h264", b"\x00\x00\x00\x01"),
+                 self._file("004.jpg", _picture(blur=2.0)),
+                 self._file("005.jpg", _picture(blur=1.0))]
+        sut = FrameSelector(top_k=2)
+
+        # act
+        selected, others = sut.select_files(files)
+
+        # assert
+        # files which are no pictures are always selected
+        self.assertEqual([files[1], files[2], files[4]], selected)
+        self.assertEqual([files[0], files[3]], others)
+
+    def test_should_defer_other_pictures(self):
+        # arrange
+        target = MagicMock()
+        files = [self._file("001.jpg", _picture(blur=4.0)), self._file("002.jpg", _picture())]
+        sut = FrameSelector(top_k=1)
+
+        # act
+        sut.select(target, TraceMark.UPLOAD_END, policy=SelectPolicy.DEFER).send(files)
+
+        # assert
+        self.assertEqual([[files[1]], [files[0]]], [call[0][0] for call in target.send.call_args_list])
+
+    @patch("camguard.frame_selector.EventTracer")
+    def test_should_drop_other_pictures(self, tracer_mock: MagicMock):
+        # arrange
+        target = MagicMock()
+        files = [self._file("001.jpg", _picture(blur=4.0)), self._file("002.jpg", _picture())]
+        sut = FrameSelector(top_k=1)
+
+        # act
+        sut.select(target, TraceMark.MAIL_SENT).send(files)
+
+        # assert
+        target.send.assert_called_once_with([files[1]])
+        # dropped pictures don't hold back the motion event
+        tracer_mock.trace_files.assert_called_once_with([files[0]], TraceMark.MAIL_SENT)
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
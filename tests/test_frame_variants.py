@@ -0,0 +1,146 @@
+import os
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+from PIL import Image  # type: ignore
+
+from camguard.exceptions import CamguardError
+from camguard.frame_variants import VariantRenderer
+from camguard.recorded_file import FrameVariant, MemoryFile, file_name
+from camguard.pipeline_settings import QualityProfile
+
+
+def _picture() -> bytes:
+    stream = BytesIO()
+    Image.new('RGB', (640, 480), color=(30, 120, 200)).save(stream, format='jpeg')
+    return stream.getvalue()
+
+
+class VariantRendererTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # spawning worker processes is expensive, they are shared by all tests
+        cls._sut = VariantRenderer({'thumbnail': QualityProfile((160, 160), quality=85),
+                                    'preview': QualityProfile((320, 240), quality=30)}, workers=2)
+        cls._sut.start()
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+
+    def test_should_render_tagged_variants(self):
+        # arrange
+        file_path = os.path.join(self._tmp_dir.name, "001_capture.jpg")
+        with open(file_path, 'wb') as file:
+            file.write(_picture())
+        files = [file_path, MemoryFile(os.path.join(self._tmp_dir.name, "002_capture.jpg"), _picture())]
+
+        # act
+        variants = self._sut.render_files(files)
+
+        # assert
+        self.assertEqual([os.path.join(self._tmp_dir.name, "001_capture_preview.jpg"),
+                          os.path.join(self._tmp_dir.name, "001_capture_thumbnail.jpg"),
+                          os.path.join(self._tmp_dir.name, "002_capture_preview.jpg"),
+                          os.path.join(self._tmp_dir.name, "002_capture_thumbnail.jpg")],
+                         [variant.name for variant in variants])
+        self.assertEqual(['preview', 'thumbnail', 'preview', 'thumbnail'], [variant.tag for variant in variants])
+        self.assertEqual(file_name(files[1]), variants[2].source)
+        with Image.open(variants[1].open()) as thumbnail:
+            # aspect ratio is kept
+            self.assertEqual((160, 120), thumbnail.size)
+        # variants are not persisted
+        self.assertEqual(1, len(os.listdir(self._tmp_dir.name)))
+
+    def test_should_skip_other_files(self):
+        # act
+        variants = self._sut.render_files([MemoryFile("001_video.h264", b"\x00\x00\x00\x01")])
+
+        # assert
+        self.assertEqual([], variants)
+
+    def test_should_forward_files_with_variants(self):
+        # arrange
+        target = MagicMock()
+        files = [MemoryFile("001_capture.jpg", _picture())]
+
+        # act
+        self._sut.render(target).send(files)
+
+        # assert
+        forwarded = target.send.call_args[0][0]
+        self.assertEqual(files, forwarded[:1])
+        self.assertEqual(["001_capture_preview.jpg", "001_capture_thumbnail.jpg"],
+                         [variant.name for variant in forwarded[1:]])
+        self.assertTrue(all(isinstance(variant, FrameVariant) for variant in forwarded[1:]))
+
+    def test_should_forward_substituted_files(self):
+        # arrange
+        target = MagicMock()
+        files = [MemoryFile("001_capture.jpg", _picture()), MemoryFile("001_video.h264", b"\x00\x00\x00\x01")]
+
+        # act
+        self._sut.render(target, substitute='preview').send(files)
+
+        # assert
+        forwarded = target.send.call_args[0][0]
+        self.assertEqual(["001_capture_preview.jpg", "001_video.h264"], [file_name(file) for file in forwarded])
+        self.assertIs(files[1], forwarded[1])
+        self.assertEqual('preview', forwarded[0].tag)
+
+    def test_should_render_with_profile_quality(self):
+        # arrange
+        file = MemoryFile("001_capture.jpg", _picture())
+
+        # act
+        variants = self._sut.render_files([file], ['preview'])
+
+        # assert
+        self.assertEqual(['preview'], [variant.tag for variant in variants])
+        with Image.open(variants[0].open()) as preview:
+            # the quantization tables of low quality pictures have large coefficients
+            self.assertGreater(max(preview.quantization[0]), 20)
+
+    def test_should_raise_if_not_started(self):
+        # arrange
+        sut = VariantRenderer({'thumbnail': QualityProfile((160, 160))}, workers=1)
+
+        # act / assert
+        with self.assertRaises(CamguardError):
+            sut.render_files(["001_capture.jpg"])
+
+    def test_should_disable_rendering_on_broken_workers(self):
+        # arrange
+        executor_mock = MagicMock()
+        executor_mock.return_value.map.side_effect = BrokenProcessPool("worker died")
+        target = MagicMock()
+        files = [MemoryFile("001_capture.jpg", _picture())]
+        with patch("camguard.frame_variants.ProcessPoolExecutor", executor_mock):
+            sut = VariantRenderer({'thumbnail': QualityProfile((160, 160))}, workers=1)
+            sut.start()
+
+        # act
+        with self.assertLogs("camguard.frame_variants", level='ERROR') as logs:
+            step = sut.render(target)
+            step.send(files)
+            step.send(files)
+
+        # assert
+        # the broken workers are reported once, files are forwarded without variants
+        self.assertTrue(sut.broken)
+        self.assertEqual(1, len(logs.records))
+        self.assertEqual(1, executor_mock.return_value.map.call_count)
+        self.assertEqual(2, target.send.call_count)
+        target.send.assert_called_with(files)
+        sut.stop()
+        self.assertFalse(sut.broken)
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._sut.stop()
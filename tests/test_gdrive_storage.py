@@ -1,4 +1,5 @@
 import datetime
+from threading import Event
 from time import sleep
 from unittest import TestCase
 from unittest.mock import MagicMock, PropertyMock, call, create_autospec, mock_open, patch
@@ -7,10 +8,13 @@ from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
 from googleapiclient.discovery import build  # type: ignore
 from googleapiclient.http import MediaFileUpload  # type: ignore
 
+from camguard.async_runtime import AsyncRuntime
 from camguard.exceptions import GDriveError
 from camguard.file_storage_settings import GDriveStorageSettings
-from camguard.gdrive_storage import (GDriveMimetype, GDriveStorage,
+from camguard.gdrive_storage import (GDriveMimetype, GDriveStorage, GDriveUploadManager,
                                      GDriveStorageAuth)
+from camguard.recorded_file import MemoryFile
+from camguard.metrics import Metric, Metrics
 
 
 class GDriveStorageAuthTest(TestCase):
@@ -49,10 +53,12 @@ class GDriveStorageTest(TestCase):
         type(self._storage_settings_mock).upload_folder_name = PropertyMock(return_value="Camguard")
 
         self._media_file_mock = create_autospec(spec=MediaFileUpload, spec_set=True)
+        self._media_io_ctor_mock = MagicMock()
         self._patcher = patch.multiple("camguard.gdrive_storage",
                                        build=self._googleapi_build_mock,
                                        # ctor mock proxy
                                        MediaFileUpload=MagicMock(return_value=self._media_file_mock),
+                                       MediaIoBaseUpload=self._media_io_ctor_mock,
                                        GDriveStorageAuth=self._gdrive_auth_mock,
                                        GDriveStorageSettings=self._storage_settings_mock)
         self._patcher.start()
@@ -142,10 +148,42 @@ class GDriveStorageTest(TestCase):
                                              media_body=self._media_file_mock,
                                              fields='id, name, parents')], any_order=True)
 
+    def test_should_upload_memory_file(self):
+        # arrange
+        file = MemoryFile("/records/capture1.jpeg", b"jpeg-data")
+        folder_mock = MagicMock()
+        folder_mock.__getitem__ = MagicMock(key="id", return_value="folder_id")
+        search_file_mock = MagicMock(side_effect=[
+            [folder_mock],  # root folder
+            [folder_mock],  # date folder
+            []  # file
+        ])
+
+        # act
+        with patch("camguard.gdrive_storage.GDriveStorage._GDriveStorage__search_file", search_file_mock):
+            self.sut.upload(file)
+
+        # assert
+        self._media_io_ctor_mock.assert_called_once()
+        self.assertEqual(b"jpeg-data", self._media_io_ctor_mock.call_args[0][0].read())
+        self.assertEqual(GDriveMimetype.JPEG.value, self._media_io_ctor_mock.call_args[1]['mimetype'])
+        self._googleapi_service_mock.assert_has_calls(
+            [call.__enter__().files().create(body={'name': "capture1.jpeg", 'parents': ["folder_id"]},
+                                             media_body=self._media_io_ctor_mock.return_value,
+                                             fields='id, name, parents')], any_order=True)
+
     def tearDown(self) -> None:
         self._patcher.stop()
 
 
+class GDriveMimetypeTest(TestCase):
+
+    def test_should_get_mimetype_from_file(self):
+        # act / assert
+        self.assertEqual(GDriveMimetype.JPEG, GDriveMimetype.from_file("/records/001_capture.jpg"))
+        self.assertEqual(GDriveMimetype.H264, GDriveMimetype.from_file("/records/001_video.h264"))
+
+
 class GDriveUploadManagerTest(TestCase):
     @patch("camguard.gdrive_storage.GDriveStorage.upload")
     @patch("camguard.gdrive_storage.GDriveStorageAuth.authenticate", MagicMock())
@@ -186,3 +224,53 @@ class GDriveUploadManagerTest(TestCase):
         # assert
         upload_mock.assert_called()
         self.assertEqual(0, sut._GDriveStorage__upload_man._GDriveUploadManager__queue.unfinished_tasks)  # type: ignore
+
+    @patch("camguard.gdrive_storage.GDriveStorageAuth.authenticate", MagicMock())
+    def test_should_upload_on_async_runtime(self):
+        # arrange
+        runtime = AsyncRuntime(max_workers=1)
+        runtime.start()
+        AsyncRuntime.set_current(runtime)
+        uploaded = Event()
+        upload_mock = MagicMock(side_effect=lambda _: uploaded.set())
+        sut = GDriveUploadManager(upload_mock)
+        file = "capture1.jpeg"
+
+        # act
+        sut.start()
+        sut.enqueue_files([file])
+        uploaded.wait(2.0)
+        sut.stop()
+        AsyncRuntime.set_current(None)
+        runtime.stop()
+
+        # assert
+        upload_mock.assert_called_once_with(file)
+
+    @patch("camguard.gdrive_storage.path.getsize", MagicMock(return_value=2048))
+    def test_should_record_upload_metrics(self):
+        # arrange
+        metrics = Metrics()
+        Metrics.set_current(metrics)
+        uploaded = Event()
+
+        def upload(file: str) -> None:
+            if file == "capture2.jpeg":
+                uploaded.set()
+                raise GDriveError("Test")
+
+        sut = GDriveUploadManager(MagicMock(side_effect=upload), queue_size=2)
+
+        # act
+        sut.enqueue_files(["capture1.jpeg", "capture2.jpeg", "capture3.jpeg"])
+        sut.start()
+        uploaded.wait(2.0)
+        sut.stop()
+        Metrics.set_current(None)
+
+        # assert
+        self.assertEqual(1, metrics.get(Metric.UPLOAD_DROPPED))
+        self.assertEqual(1, metrics.get(Metric.UPLOAD_FAILURES))
+        self.assertEqual(2048, metrics.get(Metric.UPLOAD_BYTES))
+        self.assertIsNotNone(metrics.get(Metric.UPLOAD_BYTES_PER_SECOND))
+        self.assertIsNone(metrics.get(Metric.UPLOAD_QUEUE_DEPTH))
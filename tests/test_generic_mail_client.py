@@ -2,6 +2,7 @@ from unittest import TestCase
 from unittest.mock import MagicMock, PropertyMock, create_autospec, patch
 from camguard.generic_mail_client import GenericMailClient
 from camguard.mail_client_settings import GenericMailClientSettings
+from camguard.recorded_file import FrameVariant
 
 
 class GenericMailClientTest(TestCase):
@@ -12,6 +13,7 @@ class GenericMailClientTest(TestCase):
         type(self.__settings_mock).receiver_mail = PropertyMock(return_value="sender@mail.com")
         type(self.__settings_mock).user = PropertyMock(return_value="myUser")
         type(self.__settings_mock).password = PropertyMock(return_value="myPassword")
+        type(self.__settings_mock).attachment_variant = PropertyMock(return_value="thumbnail")
 
         self.__sut = GenericMailClient(self.__settings_mock)
 
@@ -29,3 +31,19 @@ class GenericMailClientTest(TestCase):
         client_mock().__enter__().starttls.assert_called()
         client_mock().__enter__().login.assert_called_with(self.__settings_mock.user, self.__settings_mock.password)
         client_mock().__enter__().send_message.assert_called()
+
+    def test_should_attach_selected_variants(self):
+        # arrange
+        files = ['/records/file1.jpeg',
+                 FrameVariant('/records/file1_thumbnail.jpg', b"thumbnail", 'thumbnail', '/records/file1.jpeg'),
+                 FrameVariant('/records/file1_preview.jpg', b"preview", 'preview', '/records/file1.jpeg')]
+
+        # act
+        msg = GenericMailClient._GenericMailClient__create_msg(  # type: ignore
+            "sender@mail.com", "receiver@mail.com", files, "thumbnail")
+
+        # assert
+        attachments = list(msg.iter_attachments())
+        self.assertEqual(['file1_thumbnail.jpg'], [attachment.get_filename() for attachment in attachments])
+        self.assertEqual(b"thumbnail", attachments[0].get_content())
+        self.assertIn("['file1.jpeg']", msg.get_body().get_content())
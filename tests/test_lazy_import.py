@@ -0,0 +1,86 @@
+import sys
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from camguard.lazy_import import ImportProfiler, LazyImport
+
+
+class LazyImportTest(TestCase):
+
+    def test_should_not_import_before_usage(self):
+        # arrange
+        import_mock = MagicMock()
+
+        # act
+        with patch('camguard.lazy_import.importlib.import_module', import_mock):
+            sut = LazyImport('json', 'dumps')
+
+        # assert
+        import_mock.assert_not_called()
+        self.assertFalse(sut.resolved)
+
+    def test_should_import_once_on_call(self):
+        # arrange
+        module_mock = MagicMock()
+        module_mock.build = MagicMock(return_value='built')
+        import_mock = MagicMock(return_value=module_mock)
+
+        # act
+        with patch('camguard.lazy_import.importlib.import_module', import_mock):
+            sut = LazyImport('some.module', 'build')
+            first = sut('arg')
+            second = sut('arg')
+
+        # assert
+        import_mock.assert_called_once_with('some.module')
+        module_mock.build.assert_called_with('arg')
+        self.assertEqual('built', first)
+        self.assertEqual('built', second)
+        self.assertTrue(sut.resolved)
+
+    def test_should_forward_attribute_access(self):
+        # arrange
+        sut = LazyImport('json')
+
+        # act
+        dumps = sut.dumps
+
+        # assert
+        self.assertEqual('{}', dumps({}))
+
+
+class ImportProfilerTest(TestCase):
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        with open(path.join(self._tmp_dir.name, 'camguard_profiled_parent.py'), 'w') as stream:
+            stream.write("import camguard_profiled_child\n")
+        with open(path.join(self._tmp_dir.name, 'camguard_profiled_child.py'), 'w') as stream:
+            stream.write("VALUE = 1\n")
+        sys.path.insert(0, self._tmp_dir.name)
+        self.sut = ImportProfiler()
+
+    def test_should_record_imports(self):
+        # arrange
+        self.sut.install()
+
+        # act
+        import camguard_profiled_parent  # type: ignore # noqa: F401
+        self.sut.uninstall()
+
+        # assert
+        report = {name: (self_sec, cumulative_sec) for name, self_sec, cumulative_sec in self.sut.report()}
+        self.assertIn('camguard_profiled_parent', report)
+        self.assertIn('camguard_profiled_child', report)
+        # cumulative time of the parent includes the child import
+        self.assertGreaterEqual(report['camguard_profiled_parent'][1], report['camguard_profiled_child'][1])
+        self.assertNotIn(self.sut, sys.meta_path)
+
+    def tearDown(self) -> None:
+        self.sut.uninstall()
+        sys.path.remove(self._tmp_dir.name)
+        for module in ['camguard_profiled_parent', 'camguard_profiled_child']:
+            sys.modules.pop(module, None)
+        self._tmp_dir.cleanup()
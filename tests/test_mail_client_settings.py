@@ -20,7 +20,8 @@ class MailClientSettingsTest(TestCase):
                 'password': 'myPw',
                 'sender_mail': 'mail@sender.com',
                 'receiver_mail': 'mail@receiver.com',
-                'hostname': 'mail.myhost.com'
+                'hostname': 'mail.myhost.com',
+                'attachment_variant': 'thumbnail'
             }
         }
 
@@ -55,6 +56,7 @@ class MailClientSettingsTest(TestCase):
                     self.assertEqual('mail@sender.com', settings.sender_mail)
                     self.assertEqual('mail@receiver.com', settings.receiver_mail)
                     self.assertEqual('mail.myhost.com', settings.hostname)
+                    self.assertEqual('thumbnail', settings.attachment_variant)
 
     @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
     @patch('camguard.settings.open', mock_open())
@@ -75,3 +77,4 @@ class MailClientSettingsTest(TestCase):
                     self.assertEqual('mail@sender.com', settings.sender_mail)
                     self.assertEqual('mail@receiver.com', settings.receiver_mail)
                     self.assertEqual('mail.myhost.com', settings.hostname)
+                    self.assertEqual('', settings.attachment_variant)
@@ -0,0 +1,27 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from camguard.memory_file import FilePersistence
+from camguard.recorded_file import MemoryFile
+
+
+class FilePersistenceTest(TestCase):
+
+    def test_should_write_pending_files_on_stop(self):
+        # arrange
+        with TemporaryDirectory() as tmp_dir:
+            files = [MemoryFile(os.path.join(tmp_dir, "20240101", f"00{i}_capture.jpg"), f"jpeg{i}".encode())
+                     for i in range(3)]
+            sut = FilePersistence("TestPersistence")
+
+            # act
+            sut.start()
+            for file in files:
+                sut.persist(file)
+            sut.stop()
+
+            # assert
+            for i, file in enumerate(files):
+                with open(file.name, 'rb') as stream:
+                    self.assertEqual(f"jpeg{i}".encode(), stream.read())
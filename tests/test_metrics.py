@@ -0,0 +1,88 @@
+from unittest import TestCase
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from camguard.metrics import Metric, Metrics, MetricsServer
+
+
+class MetricsTest(TestCase):
+
+    def setUp(self) -> None:
+        self.sut = Metrics()
+
+    def test_should_render_counter(self):
+        # arrange
+        self.sut.inc(Metric.MOTION_EVENTS, detector=1)
+        self.sut.inc(Metric.MOTION_EVENTS, detector=1)
+        self.sut.inc(Metric.MOTION_EVENTS, detector=2)
+
+        # act
+        text = self.sut.render()
+
+        # assert
+        self.assertEqual("# HELP camguard_motion_events_total Detected motion events\n"
+                         "# TYPE camguard_motion_events_total counter\n"
+                         "camguard_motion_events_total{detector=\"1\"} 2\n"
+                         "camguard_motion_events_total{detector=\"2\"} 1\n", text)
+
+    def test_should_render_summary(self):
+        # arrange
+        self.sut.observe(Metric.MAIL_SEND_DURATION, 0.5)
+        self.sut.observe(Metric.MAIL_SEND_DURATION, 1.5)
+
+        # act
+        text = self.sut.render()
+
+        # assert
+        self.assertIn("# TYPE camguard_mail_send_duration_seconds summary\n", text)
+        self.assertIn("camguard_mail_send_duration_seconds_count 2\n", text)
+        self.assertIn("camguard_mail_send_duration_seconds_sum 2\n", text)
+
+    def test_should_read_registered_gauge(self):
+        # arrange
+        depth = [3]
+        self.sut.register_gauge(Metric.UPLOAD_QUEUE_DEPTH, lambda: depth[0])
+
+        # act
+        depth[0] = 5
+        text = self.sut.render()
+
+        # assert
+        self.assertIn("camguard_upload_queue_depth 5\n", text)
+        self.assertEqual(5, self.sut.get(Metric.UPLOAD_QUEUE_DEPTH))
+        self.sut.unregister_gauge(Metric.UPLOAD_QUEUE_DEPTH)
+        self.assertNotIn("camguard_upload_queue_depth", self.sut.render())
+
+    def test_should_skip_recording_without_current_registry(self):
+        # arrange
+        Metrics.set_current(None)
+
+        # act
+        Metrics.count(Metric.UPLOAD_FAILURES)
+        Metrics.set_current(self.sut)
+        Metrics.count(Metric.UPLOAD_FAILURES)
+
+        # assert
+        self.assertEqual(1, self.sut.get(Metric.UPLOAD_FAILURES))
+
+    def test_should_serve_metrics(self):
+        # arrange
+        self.sut.inc(Metric.UPLOAD_BYTES, 1024)
+        server = MetricsServer(self.sut, 0)
+        server.start()
+
+        try:
+            # act
+            with urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5.0) as response:
+                text = response.read().decode("utf-8")
+
+            # assert
+            self.assertIn("camguard_upload_bytes_total 1024\n", text)
+            with self.assertRaises(HTTPError) as ctx:
+                urlopen(f"http://127.0.0.1:{server.port}/", timeout=5.0)
+            self.assertEqual(404, ctx.exception.code)
+        finally:
+            server.stop()
+
+    def tearDown(self) -> None:
+        Metrics.set_current(None)
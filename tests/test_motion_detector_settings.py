@@ -1,6 +1,9 @@
 
 from typing import Any, Dict
-from camguard.motion_detector_settings import DummyGpioSensorSettings, MotionDetectorSettings, RaspiGpioSensorSettings
+from camguard.motion_detector_settings import (DummyGpioSensorSettings, FrameDiffDetectorSettings,
+                                              MotionDetectorSettings, MotionVectorDetectorSettings,
+                                              RaspiGpioSensorSettings)
+from camguard.exceptions import ConfigurationError
 from camguard.settings import ImplementationType
 from unittest.case import TestCase
 from unittest.mock import MagicMock, mock_open, patch
@@ -27,6 +30,21 @@ class MotionDetectorSettingsTest(TestCase):
 
         # assert
         self.assertEqual(ImplementationType.DUMMY, settings.impl_type)
+        self.assertEqual(10, settings.event_queue_size)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_event_queue_size(self):
+        # arrange
+        data = {'motion_detector': {'implementation': 'dummy', 'event_queue_size': 3}}
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: MotionDetectorSettings = MotionDetectorSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(3, settings.event_queue_size)
 
 
 class RaspiGpioSensorSettingsTest(TestCase):
@@ -106,6 +124,45 @@ class RaspiGpioSensorSettingsTest(TestCase):
         self.assertEqual(1, settings.queue_length)
         self.assertEqual(0.5, settings.threshold)
         self.assertEqual(10.0, settings.sample_rate)
+        self.assertEqual([], settings.handlers)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_list_entries(self):
+        # arrange
+        data = {
+            'motion_detector': [
+                {'implementation': 'raspi', 'raspi_gpio_sensor': {'gpio_pin_number': 23}},
+                {'implementation': 'raspi', 'handlers': ['garden'], 'raspi_gpio_sensor': {'gpio_pin_number': 24}}
+            ]
+        }
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            count = RaspiGpioSensorSettings.count_entries('.')
+            first: RaspiGpioSensorSettings = RaspiGpioSensorSettings.load_settings('.')
+            second: RaspiGpioSensorSettings = RaspiGpioSensorSettings.load_settings('.', index=1)
+
+        # assert
+        self.assertEqual(2, count)
+        self.assertEqual(23, first.gpio_pin_number)
+        self.assertEqual([], first.handlers)
+        self.assertEqual(24, second.gpio_pin_number)
+        self.assertEqual(['garden'], second.handlers)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_raise_on_missing_list_entry(self):
+        # arrange
+        data = self.mock_yaml_data()
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act / assert
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            self.assertEqual(1, RaspiGpioSensorSettings.count_entries('.'))
+            with self.assertRaises(ConfigurationError):
+                RaspiGpioSensorSettings.load_settings('.', index=1)
 
 class DummyGpioSensorSettingsTest(TestCase):
 
@@ -130,3 +187,131 @@ class DummyGpioSensorSettingsTest(TestCase):
 
         # assert
         self.assertEqual(ImplementationType.DUMMY, settings.impl_type)
+
+
+class FrameDiffDetectorSettingsTest(TestCase):
+
+    @staticmethod
+    def mock_yaml_data() -> Dict[str, Any]:
+        return {
+            'motion_detector': {
+                'implementation': 'camera',
+                'frame_diff_detector': {
+                    'camera_number': 1,
+                    'resolution': '160x120',
+                    'sample_rate': 2.0,
+                    'pixel_threshold': 30,
+                    'area_threshold': 0.1,
+                    'background_rate': 0.2,
+                    'cpu_budget': 0.5,
+                    'regions': [[0, 0.5, 1, 0.5]],
+                    'replay_path': '/tmp/frames'
+                }
+            }
+        }
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_settings(self):
+        # arrange
+        data = self.mock_yaml_data()
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: FrameDiffDetectorSettings = FrameDiffDetectorSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(ImplementationType.CAMERA, settings.impl_type)
+        self.assertEqual(1, settings.camera_number)
+        self.assertEqual((160, 120), settings.resolution)
+        self.assertEqual(2.0, settings.sample_rate)
+        self.assertEqual(30, settings.pixel_threshold)
+        self.assertEqual(0.1, settings.area_threshold)
+        self.assertEqual(0.2, settings.background_rate)
+        self.assertEqual(0.5, settings.cpu_budget)
+        self.assertEqual([(0.0, 0.5, 1.0, 0.5)], settings.regions)
+        self.assertEqual('/tmp/frames', settings.replay_path)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_default(self):
+        # arrange
+        data = {'motion_detector': {'implementation': 'camera'}}
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: FrameDiffDetectorSettings = FrameDiffDetectorSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(0, settings.camera_number)
+        self.assertEqual((128, 96), settings.resolution)
+        self.assertEqual(4.0, settings.sample_rate)
+        self.assertEqual(25, settings.pixel_threshold)
+        self.assertEqual(0.02, settings.area_threshold)
+        self.assertEqual(0.05, settings.background_rate)
+        self.assertEqual(0.25, settings.cpu_budget)
+        self.assertEqual([], settings.regions)
+        self.assertEqual('', settings.replay_path)
+
+
+class MotionVectorDetectorSettingsTest(TestCase):
+
+    @staticmethod
+    def mock_yaml_data() -> Dict[str, Any]:
+        return {
+            'motion_detector': {
+                'implementation': 'motion_vectors',
+                'motion_vector_detector': {
+                    'camera_number': 1,
+                    'resolution': '1280x720',
+                    'framerate': 5,
+                    'magnitude_threshold': 30,
+                    'min_region_size': 20,
+                    'regions': [[0, 0, 0.5, 1]],
+                    'replay_path': '/tmp/vectors'
+                }
+            }
+        }
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_settings(self):
+        # arrange
+        data = self.mock_yaml_data()
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: MotionVectorDetectorSettings = MotionVectorDetectorSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(ImplementationType.MOTION_VECTORS, settings.impl_type)
+        self.assertEqual(1, settings.camera_number)
+        self.assertEqual((1280, 720), settings.resolution)
+        self.assertEqual(5, settings.framerate)
+        self.assertEqual(30, settings.magnitude_threshold)
+        self.assertEqual(20, settings.min_region_size)
+        self.assertEqual([(0.0, 0.0, 0.5, 1.0)], settings.regions)
+        self.assertEqual('/tmp/vectors', settings.replay_path)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_default(self):
+        # arrange
+        data = {'motion_detector': {'implementation': 'motion_vectors'}}
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: MotionVectorDetectorSettings = MotionVectorDetectorSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(0, settings.camera_number)
+        self.assertEqual((640, 480), settings.resolution)
+        self.assertEqual(10, settings.framerate)
+        self.assertEqual(60, settings.magnitude_threshold)
+        self.assertEqual(10, settings.min_region_size)
+        self.assertEqual([], settings.regions)
+        self.assertEqual('', settings.replay_path)
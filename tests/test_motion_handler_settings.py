@@ -1,7 +1,8 @@
 
 from typing import Any, Dict
 from camguard.settings import ImplementationType
-from camguard.motion_handler_settings import DummyCamSettings, MotionHandlerSettings, RaspiCamSettings
+from camguard.exceptions import ConfigurationError
+from camguard.motion_handler_settings import DummyCamSettings, MotionHandlerSettings, RaspiCamSettings, RecordMode
 from unittest.case import TestCase
 
 from unittest.mock import patch, mock_open, MagicMock
@@ -28,6 +29,61 @@ class MotionHandlerSettingsTest(TestCase):
 
         # assert
         self.assertEqual(ImplementationType.DUMMY, settings.impl_type)
+        self.assertFalse(settings.stream_frames)
+        self.assertEqual(0.0, settings.coalesce_window_sec)
+        self.assertEqual("", settings.name)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_list_entries(self):
+        # arrange
+        data = {
+            'motion_handler': [
+                {'implementation': 'dummy'},
+                {'implementation': 'raspi', 'name': 'garden'}
+            ]
+        }
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            count = MotionHandlerSettings.count_entries('.')
+            settings = MotionHandlerSettings.load_settings('.', index=1)
+
+        # assert
+        self.assertEqual(2, count)
+        self.assertEqual(ImplementationType.RASPI, settings.impl_type)
+        self.assertEqual('garden', settings.name)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_stream_frames(self):
+        # arrange
+        data = self.mock_yaml_data()
+        data['motion_handler']['stream_frames'] = True
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings = MotionHandlerSettings.load_settings('.')
+
+        # assert
+        self.assertTrue(settings.stream_frames)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_coalesce_window(self):
+        # arrange
+        data = self.mock_yaml_data()
+        data['motion_handler']['coalesce_window_seconds'] = 5.0
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings = MotionHandlerSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(5.0, settings.coalesce_window_sec)
 
 
 class RaspiCamSettingsTest(TestCase):
@@ -41,6 +97,28 @@ class RaspiCamSettingsTest(TestCase):
                     'record_path': '$HOME/.camguard/test',
                     'record_count': 20,
                     'record_interval_seconds': 3.0,
+                    'max_record_count': 40,
+                    'camera_number': 1,
+                    'persistent_camera': True,
+                    'warmup_seconds': 1.5,
+                    'lock_exposure': True,
+                    'pre_record_seconds': 3.0,
+                    'pre_record_buffer_size': 4194304,
+                    'record_mode': 'video',
+                    'segment_seconds': 2.5,
+                    'video_file_format': '{counter:03d}_test.h264',
+                    'video_bitrate': 1000000,
+                    'in_memory': True,
+                    'memory_only': True,
+                    'burst_fps': 25,
+                    'burst_resolution': '1280X720',
+                    'burst_max_seconds': 4.0,
+                    'burst_max_bytes': 1048576,
+                    'rate_control': True,
+                    'rate_control_upload_seconds': 20.0,
+                    'rate_control_max_quality': 90,
+                    'rate_control_min_quality': 40,
+                    'motion_tail_seconds': 3.0,
                     'record_file_format': '{counter:03d}_test_format_capture.jpg'
                 }
             }
@@ -80,6 +158,28 @@ class RaspiCamSettingsTest(TestCase):
         # assert
         self.assertEqual(ImplementationType.RASPI, settings.impl_type)
         self.assertEqual(20, settings.record_count)
+        self.assertEqual(40, settings.max_record_count)
+        self.assertEqual(1, settings.camera_number)
+        self.assertTrue(settings.persistent_camera)
+        self.assertEqual(1.5, settings.warmup_sec)
+        self.assertTrue(settings.lock_exposure)
+        self.assertEqual(3.0, settings.pre_record_seconds)
+        self.assertEqual(4194304, settings.pre_record_buffer_size)
+        self.assertEqual(RecordMode.VIDEO, settings.record_mode)
+        self.assertEqual(2.5, settings.segment_sec)
+        self.assertEqual('{counter:03d}_test.h264', settings.video_file_format)
+        self.assertEqual(1000000, settings.video_bitrate)
+        self.assertTrue(settings.in_memory)
+        self.assertTrue(settings.memory_only)
+        self.assertEqual(25, settings.burst_fps)
+        self.assertEqual((1280, 720), settings.burst_resolution)
+        self.assertEqual(4.0, settings.burst_max_sec)
+        self.assertEqual(1048576, settings.burst_max_bytes)
+        self.assertTrue(settings.rate_control)
+        self.assertEqual(20.0, settings.rate_control_upload_sec)
+        self.assertEqual(90, settings.rate_control_max_quality)
+        self.assertEqual(40, settings.rate_control_min_quality)
+        self.assertEqual(3.0, settings.motion_tail_sec)
         self.assertEqual(3.0, settings.record_interval_sec)
         self.assertEqual('{counter:03d}_test_format_capture.jpg', settings.record_file_format)
         self.assertEqual('$HOME/.camguard/test', settings.record_path)
@@ -98,11 +198,45 @@ class RaspiCamSettingsTest(TestCase):
         # assert
         self.assertEqual(ImplementationType.RASPI, settings.impl_type)
         self.assertEqual(15, settings.record_count)
+        self.assertEqual(60, settings.max_record_count)
+        self.assertEqual(0, settings.camera_number)
+        self.assertFalse(settings.persistent_camera)
+        self.assertEqual(2.0, settings.warmup_sec)
+        self.assertFalse(settings.lock_exposure)
+        self.assertEqual(0.0, settings.pre_record_seconds)
+        self.assertEqual(8388608, settings.pre_record_buffer_size)
+        self.assertEqual(RecordMode.PICTURE, settings.record_mode)
+        self.assertEqual(5.0, settings.segment_sec)
+        self.assertEqual(2000000, settings.video_bitrate)
+        self.assertFalse(settings.in_memory)
+        self.assertFalse(settings.memory_only)
+        self.assertEqual(10, settings.burst_fps)
+        self.assertEqual((640, 480), settings.burst_resolution)
+        self.assertEqual(10.0, settings.burst_max_sec)
+        self.assertEqual(20971520, settings.burst_max_bytes)
+        self.assertFalse(settings.rate_control)
+        self.assertEqual(30.0, settings.rate_control_upload_sec)
+        self.assertEqual(85, settings.rate_control_max_quality)
+        self.assertEqual(30, settings.rate_control_min_quality)
+        self.assertEqual(0.0, settings.motion_tail_sec)
         self.assertEqual(1.0, settings.record_interval_sec)
         self.assertEqual('{counter:03d}_{timestamp:%y%m%d_%H%M%S%f}_capture.jpg', settings.record_file_format)
         self.assertEqual('$HOME/.camguard/records', settings.record_path)
 
 
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_raise_on_invalid_burst_resolution(self):
+        # arrange
+        data = self.mock_yaml_data()
+        data['motion_handler']['raspi_cam']['burst_resolution'] = '1280'
+
+        # act / assert
+        with patch('camguard.settings.safe_load', MagicMock(return_value=data)), \
+                self.assertRaises(ConfigurationError):
+            RaspiCamSettings.load_settings('.')
+
+
 class DummyCamSettingsTest(TestCase):
 
     @staticmethod
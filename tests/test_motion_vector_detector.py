@@ -0,0 +1,161 @@
+import os
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
+from unittest import TestCase
+from unittest.mock import MagicMock, PropertyMock, create_autospec, patch
+
+import numpy as np  # type: ignore
+
+from camguard.exceptions import ConfigurationError
+from camguard.motion_detector_settings import MotionVectorDetectorSettings
+from camguard.motion_vector_detector import MotionVectorDetector, MotionVectorModel
+from camguard.shared_camera import SharedCamera
+
+MODULES = "sys.modules"
+
+
+def _vectors(*blocks: Tuple[int, int, int, int]) -> np.ndarray:
+    """synthetic motion vectors like the pi camera encoder creates them for 640x480, with moving blocks
+
+    Args:
+        blocks (Tuple[int, int, int, int]): moving macroblocks as (row, column, rows, columns)
+    """
+    vectors = np.zeros((30, 41), dtype=[('x', 'i1'), ('y', 'i1'), ('sad', 'u2')])
+    # small movement everywhere, i.e. noise
+    vectors['x'] = 2
+    for row, col, rows, cols in blocks:
+        vectors['x'][row:row + rows, col:col + cols] = -60
+        vectors['y'][row:row + rows, col:col + cols] = 40
+    return vectors
+
+
+class MotionVectorModelTest(TestCase):
+
+    def test_should_return_largest_connected_region(self):
+        # arrange
+        sut = MotionVectorModel(magnitude_threshold=60, min_region_size=4)
+
+        # act
+        size = sut.update(_vectors((0, 0, 2, 3), (10, 10, 4, 4), (20, 5, 1, 1)))
+
+        # assert
+        self.assertEqual(16, size)
+
+    def test_should_not_connect_diagonal_macroblocks(self):
+        # arrange
+        sut = MotionVectorModel(magnitude_threshold=60, min_region_size=2)
+        diagonal = [(index, index, 1, 1) for index in range(10)]
+
+        # act
+        size = sut.update(_vectors(*diagonal))
+
+        # assert
+        self.assertEqual(1, size)
+
+    def test_should_connect_winding_region(self):
+        # arrange
+        sut = MotionVectorModel(magnitude_threshold=60, min_region_size=2)
+        # u-shaped region, the labels have to spread around the corner
+        blocks = [(0, 0, 10, 1), (9, 0, 1, 10), (0, 9, 10, 1)]
+
+        # act
+        size = sut.update(_vectors(*blocks))
+
+        # assert
+        self.assertEqual(28, size)
+
+    def test_should_skip_labeling_for_few_moving_macroblocks(self):
+        # arrange
+        sut = MotionVectorModel(magnitude_threshold=60, min_region_size=10)
+
+        # act
+        size = sut.update(_vectors((0, 0, 3, 3)))
+
+        # assert
+        self.assertEqual(0, size)
+
+    def test_should_ignore_motion_outside_of_regions(self):
+        # arrange
+        sut = MotionVectorModel(magnitude_threshold=60, min_region_size=4, regions=[(0.5, 0.0, 0.5, 1.0)])
+
+        # act
+        size = sut.update(_vectors((10, 0, 4, 4)))
+
+        # assert
+        self.assertEqual(0, size)
+
+
+class MotionVectorDetectorTest(TestCase):
+
+    def setUp(self) -> None:
+        self._settings_mock = create_autospec(spec=MotionVectorDetectorSettings, spec_set=True)
+        type(self._settings_mock).camera_number = PropertyMock(return_value=0)
+        type(self._settings_mock).resolution = PropertyMock(return_value=(640, 480))
+        type(self._settings_mock).framerate = PropertyMock(return_value=1000)
+        type(self._settings_mock).magnitude_threshold = PropertyMock(return_value=60)
+        type(self._settings_mock).min_region_size = PropertyMock(return_value=10)
+        type(self._settings_mock).regions = PropertyMock(return_value=[])
+        self._tmp_dir = TemporaryDirectory()
+        type(self._settings_mock).replay_path = PropertyMock(return_value=self._tmp_dir.name)
+
+    def _record(self, frames: List[np.ndarray]) -> None:
+        for index, vectors in enumerate(frames):
+            np.save(os.path.join(self._tmp_dir.name, f"{index:03d}.npy"), vectors)
+
+    def test_should_detect_motion_in_recorded_vectors(self):
+        # arrange
+        moving = _vectors((5, 5, 4, 4))
+        self._record([_vectors(), moving, moving, _vectors(), moving])
+        handler = MagicMock()
+        sut = MotionVectorDetector(self._settings_mock)
+
+        # act
+        sut.register_handler(handler)
+        # thread finishes after replaying all frames
+        sut._MotionVectorDetector__replay_thread.join(5.0)  # type: ignore
+
+        # assert
+        self.assertEqual(2, handler.call_count)
+
+    def test_should_analyse_vectors_of_shared_camera(self):
+        # arrange
+        type(self._settings_mock).replay_path = PropertyMock(return_value="")
+        type(self._settings_mock).framerate = PropertyMock(return_value=1)
+        picamera_array_module = MagicMock()
+        picamera_array_module.PiMotionAnalysis = type("PiMotionAnalysis", (), {
+            "__init__": lambda self, camera, size: None})
+        pi_camera = MagicMock()
+        handler = MagicMock()
+        sut = MotionVectorDetector(self._settings_mock)
+
+        # act
+        with patch.dict(MODULES, {"picamera": MagicMock(), "picamera.array": picamera_array_module}):
+            sut.register_handler(handler)
+            SharedCamera.publish(0, pi_camera)
+        analysis = pi_camera.start_recording.call_args[1]['motion_output']
+        analysis.analyse(_vectors((5, 5, 4, 4)))
+        # skipped for the framerate
+        analysis.analyse(_vectors())
+        motion_active = sut.motion_active
+        sut.shutdown()
+        SharedCamera.withdraw(0)
+
+        # assert
+        self.assertEqual('h264', pi_camera.start_recording.call_args[1]['format'])
+        self.assertEqual((640, 480), pi_camera.start_recording.call_args[1]['resize'])
+        handler.assert_called_once()
+        self.assertTrue(motion_active)
+        # the shared camera stays open, only the recording of the detector is stopped
+        pi_camera.stop_recording.assert_called_once_with(splitter_port=3)
+        pi_camera.close.assert_not_called()
+
+    def test_should_raise_on_invalid_framerate(self):
+        # arrange
+        type(self._settings_mock).framerate = PropertyMock(return_value=0)
+
+        # act / assert
+        with self.assertRaises(ConfigurationError):
+            MotionVectorDetector(self._settings_mock)
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
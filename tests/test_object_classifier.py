@@ -0,0 +1,182 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from tempfile import TemporaryDirectory
+from typing import Any, List
+from unittest import TestCase
+from unittest.mock import MagicMock, PropertyMock, create_autospec, patch
+
+import numpy as np  # type: ignore
+
+from camguard.exceptions import CamguardError, ConfigurationError
+from camguard.recorded_file import MemoryFile
+from camguard.pipeline_settings import ClassifyPolicy, PipelineSettings
+
+MODULES = "sys.modules"
+
+
+class ObjectClassifierTest(TestCase):
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        labels = os.path.join(self._tmp_dir.name, "coco.names")
+        with open(labels, 'w') as labels_file:
+            labels_file.write("person\nbicycle\ncar\ncat\n")
+
+        self._settings_mock = create_autospec(spec=PipelineSettings, spec_set=True)
+        type(self._settings_mock).classify_model = PropertyMock(return_value="yolov8n.onnx")
+        type(self._settings_mock).classify_labels = PropertyMock(return_value=labels)
+        type(self._settings_mock).classify_classes = PropertyMock(return_value=["person", "car"])
+        type(self._settings_mock).classify_confidence = PropertyMock(return_value=0.5)
+        type(self._settings_mock).classify_input_size = PropertyMock(return_value=(320, 320))
+        type(self._settings_mock).classify_max_frames = PropertyMock(return_value=3)
+        type(self._settings_mock).classify_timeout_sec = PropertyMock(return_value=5.0)
+        type(self._settings_mock).classify_workers = PropertyMock(return_value=1)
+        type(self._settings_mock).classify_policy = PropertyMock(return_value=ClassifyPolicy.DOWNGRADE)
+
+        # opencv is not needed, inference is replaced by a fake running in threads
+        self._patcher = patch.dict(MODULES, cv2=MagicMock())
+        self._patcher.start()
+        self._detect_mock = MagicMock(return_value=({}, 0.1))
+        self._executor_patcher = patch.multiple(
+            "camguard.object_classifier",
+            ProcessPoolExecutor=lambda max_workers, **_: ThreadPoolExecutor(max_workers=max_workers),
+            _detect=self._detect_mock)
+        self._executor_patcher.start()
+
+    def _create_sut(self) -> Any:
+        from camguard.object_classifier import ObjectClassifier
+        sut = ObjectClassifier(self._settings_mock)
+        sut.start()
+        return sut
+
+    def test_should_find_detected_classes(self):
+        # arrange
+        from camguard.object_classifier import detections
+        # ssd detection output: (image, class id, confidence, box)
+        ssd_output = np.array([[[[0, 3, 0.9, 0, 0, 1, 1], [0, 0, 0.4, 0, 0, 1, 1], [0, 3, 0.7, 0, 0, 1, 1]]]])
+        # yolov8 output: (1, 4 + classes, anchors)
+        yolo_output = np.zeros((1, 8, 3))
+        yolo_output[0, 4 + 2, 1] = 0.8
+        yolo_output[0, 4 + 0, 2] = 0.3
+
+        # act / assert
+        self.assertEqual({3: 0.9}, detections(ssd_output, 0.5))
+        self.assertEqual({2: 0.8}, detections(yolo_output, 0.5))
+
+    def test_should_sample_pictures_over_record(self):
+        # arrange
+        files = [f"{index:03d}_capture.jpg" for index in range(10)] + ["010_video.h264"]
+        sut = self._create_sut()
+
+        # act
+        samples = sut.sample(files)
+
+        # assert
+        self.assertEqual(["000_capture.jpg", "004_capture.jpg", "009_capture.jpg"], samples)
+        sut.stop()
+
+    def test_should_classify_events_by_configured_classes(self):
+        # arrange
+        files = [MemoryFile("001_capture.jpg", b"jpeg1"), MemoryFile("002_capture.jpg", b"jpeg2")]
+        sut = self._create_sut()
+
+        for detected, expected in [({3: 0.9}, False), ({2: 0.6, 3: 0.9}, True), (None, True)]:
+            with self.subTest(detected=detected):
+                self._detect_mock.return_value = (detected, 0.1)
+
+                # act / assert
+                # events are forwarded, if no picture could be classified
+                self.assertEqual(expected, sut.classify_files(files))
+        sut.stop()
+
+    def test_should_downgrade_events_without_classes(self):
+        # arrange
+        mail_step = MagicMock()
+        storage_step = MagicMock()
+        files: List[str] = [MemoryFile("001_capture.jpg", b"jpeg")]
+        self._detect_mock.return_value = ({3: 0.9}, 0.1)
+        sut = self._create_sut()
+
+        # act
+        sut.classify([mail_step], [storage_step]).send(files)
+
+        # assert
+        storage_step.send.assert_called_once_with(files)
+        mail_step.send.assert_not_called()
+        sut.stop()
+
+    def test_should_suppress_events_without_classes(self):
+        # arrange
+        type(self._settings_mock).classify_policy = PropertyMock(return_value=ClassifyPolicy.SUPPRESS)
+        mail_step = MagicMock()
+        storage_step = MagicMock()
+        self._detect_mock.return_value = ({3: 0.9}, 0.1)
+        sut = self._create_sut()
+
+        # act
+        step = sut.classify([mail_step], [storage_step])
+        step.send([MemoryFile("001_capture.jpg", b"jpeg")])
+        # files which are no pictures can't be classified
+        step.send(["002_video.h264"])
+
+        # assert
+        storage_step.send.assert_called_once_with(["002_video.h264"])
+        mail_step.send.assert_called_once_with(["002_video.h264"])
+        sut.stop()
+
+    def test_should_disable_classification_on_broken_workers(self):
+        # arrange
+        files = [MemoryFile("001_capture.jpg", b"jpeg1"), MemoryFile("002_capture.jpg", b"jpeg2")]
+        self._detect_mock.side_effect = BrokenProcessPool("worker died")
+        sut = self._create_sut()
+
+        # act
+        with self.assertLogs("camguard.object_classifier", level='ERROR') as logs:
+            first = sut.classify_files(files)
+            second = sut.classify_files(files)
+
+        # assert
+        # the broken workers are reported once, motion events are forwarded unclassified
+        self.assertTrue(first)
+        self.assertTrue(second)
+        self.assertTrue(sut.broken)
+        self.assertEqual(1, len(logs.records))
+        self.assertLessEqual(self._detect_mock.call_count, len(files))
+        sut.stop()
+        self.assertFalse(sut.broken)
+
+    def test_should_send_content_of_memory_files(self):
+        # arrange
+        sut = self._create_sut()
+
+        # act
+        sut.classify_files([MemoryFile("001_capture.jpg", b"jpeg")])
+
+        # assert
+        self.assertEqual(b"jpeg", self._detect_mock.call_args[0][0])
+        sut.stop()
+
+    def test_should_raise_on_missing_file(self):
+        # arrange
+        sut = self._create_sut()
+
+        # act / assert
+        with self.assertRaises(CamguardError):
+            sut.classify_files(["/records/001_capture.jpg"])
+        self._detect_mock.assert_not_called()
+        sut.stop()
+
+    def test_should_raise_on_unknown_class(self):
+        # arrange
+        from camguard.object_classifier import ObjectClassifier
+        type(self._settings_mock).classify_classes = PropertyMock(return_value=["intruder"])
+
+        # act / assert
+        with self.assertRaises(ConfigurationError):
+            ObjectClassifier(self._settings_mock)
+
+    def tearDown(self) -> None:
+        self._executor_patcher.stop()
+        self._patcher.stop()
+        self._tmp_dir.cleanup()
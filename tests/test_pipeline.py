@@ -0,0 +1,174 @@
+from threading import Event, current_thread
+from typing import Any, Generator, List
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from camguard.async_runtime import AsyncRuntime
+from camguard.bridge_api import pipelinestep
+from camguard.pipeline import PipelineStep
+
+
+class PipelineStepTest(TestCase):
+
+    def setUp(self) -> None:
+        self._received: List[Any] = []
+        self._handled = Event()
+
+    @pipelinestep
+    def _step(self) -> Generator[None, Any, None]:
+        while True:
+            value = (yield)
+            if value == "error":
+                raise Exception("Test")
+            self._received.append((value, current_thread().name))
+            self._handled.set()
+
+    def test_should_send_on_worker_thread(self):
+        # arrange
+        sut = PipelineStep("TestStep", self._step)
+
+        # act
+        sut.start()
+        sut.send("value1")
+        self._handled.wait(2.0)
+        sut.stop()
+
+        # assert
+        self.assertEqual([("value1", "TestStepThread-1")], self._received)
+        self.assertFalse(sut.running)
+
+    def test_should_restart_step_on_error(self):
+        # arrange
+        step_factory = MagicMock(side_effect=self._step)
+        sut = PipelineStep("TestStep", step_factory)
+
+        # act
+        sut.start()
+        sut.send("error")
+        sut.send("value1")
+        self._handled.wait(2.0)
+        sut.stop()
+
+        # assert
+        self.assertEqual(["value1"], [value for value, _ in self._received])
+        self.assertEqual(1, sut.failures)
+        self.assertEqual(2, step_factory.call_count)
+
+    def test_should_replace_hanging_worker(self):
+        # arrange
+        busy = Event()
+        release = Event()
+
+        @pipelinestep
+        def hanging_step() -> Generator[None, Any, None]:
+            while True:
+                value = (yield)
+                if value == "hang":
+                    busy.set()
+                    release.wait(2.0)
+                    continue
+                self._received.append((value, current_thread().name))
+                self._handled.set()
+
+        sut = PipelineStep("TestStep", hanging_step, timeout_sec=0.0)
+
+        # act
+        sut.start()
+        sut.send("hang")
+        busy.wait(2.0)
+        sut.send("value1")
+        self._handled.wait(2.0)
+        release.set()
+        sut.stop()
+
+        # assert
+        self.assertEqual([("value1", "TestStepThread-2")], self._received)
+        self.assertEqual(1, sut.timeouts)
+
+    def test_should_drop_values_when_queue_is_full(self):
+        # arrange
+        busy = Event()
+        release = Event()
+
+        @pipelinestep
+        def blocking_step() -> Generator[None, Any, None]:
+            while True:
+                (yield)
+                busy.set()
+                release.wait(2.0)
+
+        sut = PipelineStep("TestStep", blocking_step, queue_size=1)
+
+        # act
+        sut.start()
+        sut.send("value1")
+        busy.wait(2.0)  # step blocks with value1
+        sut.send("value2")  # waits in queue
+        sut.send("value3")
+        release.set()
+        sut.stop()
+
+        # assert
+        self.assertEqual(1, sut.dropped)
+        self.assertEqual(0, sut.timeouts)
+
+    def test_should_not_stop_when_never_started(self):
+        # arrange
+        sut = PipelineStep("TestStep", self._step)
+
+        # act
+        sut.stop()
+
+        # assert
+        self.assertFalse(sut.running)
+
+
+class AsyncPipelineStepTest(TestCase):
+
+    def setUp(self) -> None:
+        self._runtime = AsyncRuntime(max_workers=1)
+        self._runtime.start()
+        AsyncRuntime.set_current(self._runtime)
+        self._received: List[Any] = []
+        self._handled = Event()
+
+    def test_should_not_occupy_runtime_workers_by_hanging_step(self):
+        # arrange
+        busy = Event()
+        release = Event()
+
+        @pipelinestep
+        def hanging_step() -> Generator[None, Any, None]:
+            while True:
+                value = (yield)
+                if value == "hang":
+                    busy.set()
+                    release.wait(2.0)
+                    continue
+                self._received.append((value, current_thread().name))
+                self._handled.set()
+
+        step_factory = MagicMock(side_effect=hanging_step)
+        sut = PipelineStep("TestStep", step_factory, timeout_sec=0.0)
+
+        # act
+        sut.start()
+        sut.send("hang")
+        busy.wait(2.0)
+        sut.send("value1")
+        self._handled.wait(2.0)
+        # the only worker of the runtime is still available
+        result = self._runtime.submit(self._runtime.run_blocking(lambda: "free")).result(timeout=2.0)
+        release.set()
+        sut.stop()
+
+        # assert
+        self.assertEqual("free", result)
+        self.assertEqual([("value1", "TestStepThread-2")], self._received)
+        self.assertEqual(1, sut.timeouts)
+        self.assertEqual(2, step_factory.call_count)
+        self.assertFalse(sut.running)
+
+    def tearDown(self) -> None:
+        AsyncRuntime.set_current(None)
+        self._runtime.stop()
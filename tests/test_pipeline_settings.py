@@ -0,0 +1,149 @@
+from typing import Any, Dict
+from unittest import TestCase
+from unittest.mock import MagicMock, mock_open, patch
+
+from camguard.exceptions import ConfigurationError
+from camguard.pipeline_settings import ClassifyPolicy, PipelineSettings, QualityProfile, SelectPolicy
+
+
+class PipelineSettingsTest(TestCase):
+
+    @staticmethod
+    def mock_yaml_data() -> Dict[str, Any]:
+        return {
+            'pipeline': {
+                'step_timeout_seconds': 5.0,
+                'step_queue_size': 3,
+                'dedup_max_distance': 5,
+                'variants': {
+                    'thumbnail': '160x120',
+                    'preview': {'resolution': '640x480', 'quality': 60}
+                },
+                'variant_workers': 4,
+                'upload_variant': 'preview',
+                'select_top_k': 3,
+                'select_policy': 'defer',
+                'classify_model': 'yolov8n.onnx',
+                'classify_labels': 'coco.names',
+                'classify_classes': ['person', 'car'],
+                'classify_confidence': 0.6,
+                'classify_input_size': '320x320',
+                'classify_max_frames': 5,
+                'classify_timeout_seconds': 2.5,
+                'classify_workers': 2,
+                'classify_policy': 'suppress'
+            }
+        }
+
+    @staticmethod
+    def mock_yaml_data_default() -> Dict[str, Any]:
+        return {
+            'components': ['motion_handler', 'motion_detector']
+        }
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_settings(self):
+        # arrange
+        safe_load_mock = MagicMock(return_value=self.mock_yaml_data())
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: PipelineSettings = PipelineSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(5.0, settings.step_timeout_sec)
+        self.assertEqual(3, settings.step_queue_size)
+        self.assertEqual(5, settings.dedup_max_distance)
+        self.assertEqual({'thumbnail': QualityProfile((160, 120), 85), 'preview': QualityProfile((640, 480), 60)},
+                         settings.variants)
+        self.assertEqual(4, settings.variant_workers)
+        self.assertEqual('preview', settings.upload_variant)
+        self.assertEqual(3, settings.select_top_k)
+        self.assertEqual(SelectPolicy.DEFER, settings.select_policy)
+        self.assertEqual('yolov8n.onnx', settings.classify_model)
+        self.assertEqual('coco.names', settings.classify_labels)
+        self.assertEqual(['person', 'car'], settings.classify_classes)
+        self.assertEqual(0.6, settings.classify_confidence)
+        self.assertEqual((320, 320), settings.classify_input_size)
+        self.assertEqual(5, settings.classify_max_frames)
+        self.assertEqual(2.5, settings.classify_timeout_sec)
+        self.assertEqual(2, settings.classify_workers)
+        self.assertEqual(ClassifyPolicy.SUPPRESS, settings.classify_policy)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_default(self):
+        # arrange
+        safe_load_mock = MagicMock(return_value=self.mock_yaml_data_default())
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: PipelineSettings = PipelineSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(60.0, settings.step_timeout_sec)
+        self.assertEqual(10, settings.step_queue_size)
+        self.assertEqual(0, settings.dedup_max_distance)
+        self.assertEqual({}, settings.variants)
+        self.assertEqual(2, settings.variant_workers)
+        self.assertEqual("", settings.upload_variant)
+        self.assertEqual(0, settings.select_top_k)
+        self.assertEqual(SelectPolicy.DROP, settings.select_policy)
+        self.assertEqual("", settings.classify_model)
+        self.assertEqual(['person'], settings.classify_classes)
+        self.assertEqual(0.5, settings.classify_confidence)
+        self.assertEqual((640, 640), settings.classify_input_size)
+        self.assertEqual(3, settings.classify_max_frames)
+        self.assertEqual(5.0, settings.classify_timeout_sec)
+        self.assertEqual(1, settings.classify_workers)
+        self.assertEqual(ClassifyPolicy.DOWNGRADE, settings.classify_policy)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_raise_on_invalid_profiles(self):
+        # arrange
+        invalid_profiles = [{'resolution': '640x480', 'quality': 0}, {'quality': 60}]
+
+        for profile in invalid_profiles:
+            with self.subTest(profile=profile):
+                data = self.mock_yaml_data()
+                data['pipeline']['variants'] = {'preview': profile}
+
+                # act / assert
+                with patch('camguard.settings.safe_load', MagicMock(return_value=data)), \
+                        self.assertRaises(ConfigurationError):
+                    PipelineSettings.load_settings('.')
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_raise_on_unknown_select_policy(self):
+        # arrange
+        data = self.mock_yaml_data()
+        data['pipeline']['select_policy'] = 'archive'
+
+        # act / assert
+        with patch('camguard.settings.safe_load', MagicMock(return_value=data)), self.assertRaises(ConfigurationError):
+            PipelineSettings.load_settings('.')
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_raise_on_model_without_labels(self):
+        # arrange
+        data = self.mock_yaml_data()
+        del data['pipeline']['classify_labels']
+
+        # act / assert
+        with patch('camguard.settings.safe_load', MagicMock(return_value=data)), self.assertRaises(ConfigurationError):
+            PipelineSettings.load_settings('.')
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_raise_on_unknown_upload_variant(self):
+        # arrange
+        data = self.mock_yaml_data()
+        data['pipeline']['upload_variant'] = 'archive'
+
+        # act / assert
+        with patch('camguard.settings.safe_load', MagicMock(return_value=data)), self.assertRaises(ConfigurationError):
+            PipelineSettings.load_settings('.')
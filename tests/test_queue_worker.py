@@ -0,0 +1,97 @@
+from threading import Event, current_thread
+from typing import Any, List
+from unittest import TestCase
+
+from camguard.async_runtime import AsyncRuntime
+from camguard.queue_worker import QueueWorker
+
+
+class _CollectingWorker(QueueWorker):
+
+    def __init__(self, name: str, use_runtime: bool = True) -> None:
+        super().__init__(name, queue_size=1, use_runtime=use_runtime)
+        self.received: List[Any] = []
+        self.handled = Event()
+        self.release = Event()
+
+    def _handle(self, value: Any) -> None:
+        self.received.append((value, current_thread().name))
+        self.handled.set()
+        self.release.wait(2.0)
+
+
+class QueueWorkerTest(TestCase):
+
+    def test_should_handle_values_on_worker_thread(self):
+        # arrange
+        sut = _CollectingWorker("TestWorkerThread")
+        sut.release.set()
+
+        # act
+        sut.start()
+        enqueued = sut.put("value1")
+        sut.handled.wait(2.0)
+        sut.stop()
+
+        # assert
+        self.assertTrue(enqueued)
+        self.assertEqual([("value1", "TestWorkerThread")], sut.received)
+        self.assertFalse(sut.running)
+
+    def test_should_drop_values_when_queue_is_full(self):
+        # arrange
+        sut = _CollectingWorker("TestWorkerThread")
+
+        # act
+        sut.start()
+        sut.put("value1")
+        sut.handled.wait(2.0)  # worker blocks with value1
+        sut.put("value2")  # waits in queue
+        enqueued = sut.put("value3")
+        sut.release.set()
+        sut.stop()
+
+        # assert
+        self.assertFalse(enqueued)
+        self.assertEqual(1, sut.dropped)
+
+
+class AsyncQueueWorkerTest(TestCase):
+
+    def setUp(self) -> None:
+        self._runtime = AsyncRuntime(max_workers=1)
+        self._runtime.start()
+        AsyncRuntime.set_current(self._runtime)
+
+    def test_should_handle_values_on_runtime_executor(self):
+        # arrange
+        sut = _CollectingWorker("TestWorkerThread")
+        sut.release.set()
+
+        # act
+        sut.start()
+        sut.put("value1")
+        sut.handled.wait(2.0)
+        sut.stop()
+
+        # assert
+        self.assertTrue(sut.received[0][1].startswith("RuntimeWorkerThread"))
+        self.assertFalse(sut.running)
+
+    def test_should_keep_dedicated_thread_without_runtime(self):
+        # arrange
+        sut = _CollectingWorker("TestWorkerThread", use_runtime=False)
+        sut.release.set()
+
+        # act
+        sut.start()
+        sut.put("value1")
+        sut.handled.wait(2.0)
+        sut.stop()
+
+        # assert
+        self.assertEqual([("value1", "TestWorkerThread")], sut.received)
+
+    def tearDown(self) -> None:
+        AsyncRuntime.set_current(None)
+        self._runtime.stop()
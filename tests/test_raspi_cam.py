@@ -1,11 +1,16 @@
 import datetime
 import re
+from collections import namedtuple
+from io import BytesIO
+from threading import RLock, Thread
 from types import TracebackType
-from typing import ContextManager, Optional, Type
+from typing import ContextManager, Iterable, List, Optional, Type
 from unittest import TestCase
-from unittest.mock import MagicMock, PropertyMock, create_autospec, patch
+from unittest.mock import MagicMock, PropertyMock, create_autospec, mock_open, patch
 
-from camguard.motion_handler_settings import RaspiCamSettings
+from camguard.exceptions import ConfigurationError
+from camguard.motion_handler_settings import RaspiCamSettings, RecordMode
+from camguard.recorded_file import file_name
 
 MODULES = "sys.modules"
 
@@ -15,6 +20,42 @@ class RaspiCamFakeContextManager(ContextManager["RaspiCamFakeContextManager"]):
     fake object for the pi camera context manager
     otherwise i don't know how to track the methodcalls to capture_continuous
     """
+    camera_num: int = -1
+    opened: int = 0
+
+    def __init__(self, camera_num: int = 0) -> None:
+        RaspiCamFakeContextManager.camera_num = camera_num
+        RaspiCamFakeContextManager.opened += 1
+        self.closed = False
+        self.exposure_speed = 20000
+        self.awb_gains = (1.5, 1.25)
+        self.resolution = (2592, 1944)
+        self.capture_args: List[dict] = []
+
+    def close(self) -> None:
+        self.closed = True
+
+    def capture(self, output: BytesIO, **kwargs) -> None:
+        self.capture_args.append(kwargs)
+        # picture size grows with the quality
+        output.write(b"jpeg" * kwargs.get('quality', 1))
+
+    def capture_sequence(self, outputs: Iterable[BytesIO], **kwargs) -> None:
+        self.sequence_args = kwargs
+        for output in outputs:
+            output.write(b"jpeg")
+
+    def start_recording(self, output: BytesIO, **_) -> None:
+        self.recording = output
+
+    def stop_recording(self, **_) -> None:
+        self.recording = None
+
+    def split_recording(self, output: str, **_) -> None:
+        self.recording = output
+
+    def wait_recording(self, timeout: float, **_) -> None:
+        pass
 
     def __enter__(self) -> "RaspiCamFakeContextManager":
         return self
@@ -24,6 +65,23 @@ class RaspiCamFakeContextManager(ContextManager["RaspiCamFakeContextManager"]):
         return False
 
 
+FakeFrame = namedtuple("FakeFrame", ["position", "frame_size", "timestamp", "complete"])
+
+
+class CircularStreamFake(BytesIO):
+    """
+    fake object for the picamera circular stream, with frame meta data of the written mjpeg frames
+    """
+
+    def __init__(self, frames: List[bytes], interval_us: int) -> None:
+        super().__init__()
+        self.lock = RLock()
+        self.frames: List[FakeFrame] = []
+        for index, frame in enumerate(frames):
+            self.frames.append(FakeFrame(self.tell(), len(frame), index * interval_us, True))
+            self.write(frame)
+
+
 class RaspiCamTest(TestCase):
 
     def setUp(self):
@@ -38,6 +96,31 @@ class RaspiCamTest(TestCase):
                 MagicMock(return_value=["capture1.jpg", "capture2.jpg"]))
 
         self._raspi_cam_settings = create_autospec(spec=RaspiCamSettings, spec_set=True)
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=2)
+        type(self._raspi_cam_settings).max_record_count = PropertyMock(return_value=4)
+        type(self._raspi_cam_settings).record_interval_sec = PropertyMock(return_value=0.0)
+        type(self._raspi_cam_settings).camera_number = PropertyMock(return_value=0)
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=False)
+        type(self._raspi_cam_settings).warmup_sec = PropertyMock(return_value=0.0)
+        type(self._raspi_cam_settings).lock_exposure = PropertyMock(return_value=False)
+        type(self._raspi_cam_settings).pre_record_seconds = PropertyMock(return_value=0.0)
+        type(self._raspi_cam_settings).pre_record_buffer_size = PropertyMock(return_value=1024)
+        type(self._raspi_cam_settings).record_mode = PropertyMock(return_value=RecordMode.PICTURE)
+        type(self._raspi_cam_settings).segment_sec = PropertyMock(return_value=0.01)
+        type(self._raspi_cam_settings).video_file_format = PropertyMock(return_value="{counter:03d}_video.h264")
+        type(self._raspi_cam_settings).video_bitrate = PropertyMock(return_value=2000000)
+        type(self._raspi_cam_settings).in_memory = PropertyMock(return_value=False)
+        type(self._raspi_cam_settings).memory_only = PropertyMock(return_value=False)
+        type(self._raspi_cam_settings).burst_fps = PropertyMock(return_value=2)
+        type(self._raspi_cam_settings).burst_resolution = PropertyMock(return_value=(640, 480))
+        type(self._raspi_cam_settings).burst_max_sec = PropertyMock(return_value=10.0)
+        type(self._raspi_cam_settings).burst_max_bytes = PropertyMock(return_value=1024)
+        type(self._raspi_cam_settings).rate_control = PropertyMock(return_value=False)
+        type(self._raspi_cam_settings).rate_control_upload_sec = PropertyMock(return_value=10.0)
+        type(self._raspi_cam_settings).rate_control_max_quality = PropertyMock(return_value=85)
+        type(self._raspi_cam_settings).rate_control_min_quality = PropertyMock(return_value=35)
+        type(self._raspi_cam_settings).motion_tail_sec = PropertyMock(return_value=0.0)
+        RaspiCamFakeContextManager.opened = 0
         self.patcher = patch.dict(MODULES, picamera=self.pi_camera_module)
         self.patcher.start()
 
@@ -54,6 +137,79 @@ class RaspiCamTest(TestCase):
         # assert
         self.pi_camera_module.PiCamera.capture_continuous.assert_called()  # type: ignore
 
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.CaptureScheduler")
+    def test_should_count_skipped_pictures(self, scheduler_mock: MagicMock):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        # the first picture is behind schedule by an interval
+        scheduler_mock.return_value.wait.side_effect = [0, 1]
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        files = sut.handle_motion()
+
+        # assert
+        # the skipped picture counts towards the record count, so that the record keeps its duration
+        self.assertEqual(["capture1.jpg"], files)
+        scheduler_mock.return_value.start.assert_called_once()
+        scheduler_mock.return_value.finish.assert_called_once()
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.bridge_impl.monotonic", MagicMock(side_effect=[0.0, 1.0, 2.0, 3.5]))
+    def test_should_record_until_motion_tail_elapsed(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=1)
+        type(self._raspi_cam_settings).motion_tail_sec = PropertyMock(return_value=2.0)
+        setattr(self.pi_camera_module.PiCamera, "capture_continuous",  # type: ignore
+                MagicMock(return_value=[f"capture{index}.jpg" for index in range(1, 5)]))
+        sut = RaspiCam(self._raspi_cam_settings)
+        # motion ends after the first picture at 1.0s
+        sut.track_motion(MagicMock(side_effect=[True, False, False]))
+
+        # act
+        files = sut.handle_motion()
+
+        # assert
+        # the record continues for the tail of 2.0s, instead of stopping at the record count
+        self.assertEqual(["capture1.jpg", "capture2.jpg", "capture3.jpg"], files)
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    def test_should_stop_motion_driven_record_at_max_count(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=1)
+        type(self._raspi_cam_settings).max_record_count = PropertyMock(return_value=3)
+        type(self._raspi_cam_settings).motion_tail_sec = PropertyMock(return_value=2.0)
+        setattr(self.pi_camera_module.PiCamera, "capture_continuous",  # type: ignore
+                MagicMock(return_value=[f"capture{index}.jpg" for index in range(1, 5)]))
+        sut = RaspiCam(self._raspi_cam_settings)
+        sut.track_motion(MagicMock(return_value=True))
+
+        # act
+        files = sut.handle_motion()
+
+        # assert
+        self.assertEqual(3, len(files))
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    def test_should_use_configured_camera(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).camera_number = PropertyMock(return_value=1)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        sut.handle_motion()
+
+        # assert
+        self.assertEqual(1, self.pi_camera_module.PiCamera.camera_num)  # type: ignore
+
     @patch("camguard.raspi_cam.os.path.isdir", MagicMock(return_value=True))
     @patch("camguard.raspi_cam.os.path.exists", MagicMock(return_value=False))
     @patch("camguard.raspi_cam.os.makedirs")
@@ -83,6 +239,55 @@ class RaspiCamTest(TestCase):
 
         self.assertTrue(found, "Check if record called for specific date folder name")
 
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.time.sleep")
+    def test_should_yield_pictures_while_recording(self, sleep_mock: MagicMock):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=2)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        stream = sut.handle_motion_stream()
+        first = next(stream)
+
+        # assert
+        self.assertEqual("capture1.jpg", first)
+        # first picture is available before waiting for the next one
+        sleep_mock.assert_not_called()
+        self.assertEqual(["capture2.jpg"], list(stream))
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.time.sleep", MagicMock())
+    def test_should_extend_running_record(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        self.pi_camera_module.PiCamera.capture_continuous.return_value = (  # type: ignore
+            f"capture{i}.jpg" for i in range(1, 10))
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        extended_before = sut.extend_record()
+        stream = sut.handle_motion_stream()
+        next(stream)
+        extended = sut.extend_record()  # 1 recorded + 2 -> 3
+        next(stream)
+        capped = sut.extend_record()  # 2 recorded + 2 -> capped at 4
+        next(stream)
+        exceeded = sut.extend_record()  # max record count reached
+        remaining = list(stream)
+        extended_after = sut.extend_record()
+
+        # assert
+        self.assertFalse(extended_before)
+        self.assertTrue(extended)
+        self.assertTrue(capped)
+        self.assertFalse(exceeded)
+        self.assertEqual(["capture4.jpg"], remaining)
+        self.assertFalse(extended_after)
+
     @patch("camguard.raspi_cam.os.path.isdir", MagicMock(return_value=True))
     @patch("camguard.raspi_cam.os.path.exists", MagicMock(return_value=False))
     @patch("camguard.raspi_cam.os.makedirs", MagicMock())
@@ -100,5 +305,328 @@ class RaspiCamTest(TestCase):
         self.assertTrue(sut._shutdown)  # type: ignore
         self.pi_camera_module.PiCamera.capture_continuous.assert_not_called()  # type: ignore
 
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.Thread", MagicMock(side_effect=lambda target, **_: MagicMock(start=target)))
+    def test_should_keep_persistent_camera_open(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=True)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        sut.start()
+        sut.handle_motion()
+        sut.handle_motion()
+
+        # assert
+        self.assertEqual(1, self.pi_camera_module.PiCamera.opened)  # type: ignore
+        self.assertEqual(2, self.pi_camera_module.PiCamera.capture_continuous.call_count)  # type: ignore
+        sut.shutdown()
+
+    @patch("camguard.raspi_cam.Thread", MagicMock(side_effect=lambda target, **_: MagicMock(start=target)))
+    def test_should_release_persistent_camera_while_disarmed(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=True)
+        sut = RaspiCam(self._raspi_cam_settings)
+        sut.start()
+        pi_camera = sut._RaspiCam__pi_camera  # type: ignore
+
+        # act
+        sut.on_disable([("192.168.0.1", True)])
+        released = sut._RaspiCam__pi_camera  # type: ignore
+        sut.on_disable([("192.168.0.1", False)])
+        reopened = sut._RaspiCam__pi_camera  # type: ignore
+        sut.shutdown()
+
+        # assert
+        self.assertTrue(pi_camera.closed)
+        self.assertIsNone(released)
+        self.assertIsNotNone(reopened)
+        self.assertTrue(reopened.closed)
+        self.assertEqual(2, self.pi_camera_module.PiCamera.opened)  # type: ignore
+
+    @patch("camguard.raspi_cam.Thread", MagicMock(side_effect=lambda target, **_: MagicMock(start=target)))
+    @patch("camguard.raspi_cam.SharedCamera")
+    def test_should_share_persistent_camera_while_open(self, shared_camera_mock: MagicMock):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).camera_number = PropertyMock(return_value=1)
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=True)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        sut.start()
+        pi_camera = sut._RaspiCam__pi_camera  # type: ignore
+        sut.on_disable([("192.168.0.1", True)])
+
+        # assert
+        shared_camera_mock.publish.assert_called_once_with(1, pi_camera)
+        shared_camera_mock.withdraw.assert_called_once_with(1)
+        self.assertTrue(pi_camera.closed)
+        sut.shutdown()
+
+    @patch("camguard.raspi_cam.Thread", MagicMock(side_effect=lambda target, **_: MagicMock(start=target)))
+    def test_should_lock_exposure(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=True)
+        type(self._raspi_cam_settings).lock_exposure = PropertyMock(return_value=True)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        sut.start()
+
+        # assert
+        pi_camera = sut._RaspiCam__pi_camera  # type: ignore
+        self.assertEqual(20000, pi_camera.shutter_speed)
+        self.assertEqual('off', pi_camera.exposure_mode)
+        self.assertEqual('off', pi_camera.awb_mode)
+        self.assertEqual((1.5, 1.25), pi_camera.awb_gains)
+        sut.shutdown()
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    def test_should_yield_video_segments(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_mode = PropertyMock(return_value=RecordMode.VIDEO)
+        # 0.03 seconds record, split into 0.01 seconds segments
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=3)
+        type(self._raspi_cam_settings).record_interval_sec = PropertyMock(return_value=0.01)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        stream = sut.handle_motion_stream()
+        first = next(stream)
+        extended = sut.extend_record()  # 1 recorded + 3 -> 4 segments
+        remaining = list(stream)
+
+        # assert
+        self.assertTrue(extended)
+        self.assertTrue(first.endswith("001_video.h264"))
+        self.assertEqual(["002_video.h264", "003_video.h264", "004_video.h264"],
+                         [path.split("/")[-1] for path in remaining])
+        self.pi_camera_module.PiCamera.capture_continuous.assert_not_called()  # type: ignore
+
+    def test_should_take_pre_record_frames(self):
+        # arrange
+        from camguard.raspi_cam import PreRecordBuffer
+        stream = CircularStreamFake([f"frame{i}".encode() for i in range(7)], interval_us=500000)
+        end = stream.tell()
+
+        with patch("camguard.raspi_cam.PiCameraCircularIO", MagicMock(return_value=stream)):
+            sut = PreRecordBuffer(MagicMock(), size=1024, seconds=2.0, interval_sec=1.0)
+
+        # act
+        snapshot = sut.snapshot()
+
+        # assert
+        self.assertEqual([(2.0, b"frame2"), (1.0, b"frame4"), (0.0, b"frame6")], snapshot)
+        # encoder continues writing at the end of the stream
+        self.assertEqual(end, stream.tell())
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.Thread", MagicMock(side_effect=lambda target, **_: MagicMock(start=target)))
+    def test_should_save_pre_record_frames(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_file_format = PropertyMock(return_value="{counter:03d}_capture.jpg")
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=True)
+        type(self._raspi_cam_settings).pre_record_seconds = PropertyMock(return_value=1.0)
+        stream = CircularStreamFake([b"frame0", b"frame1"], interval_us=1000000)
+        open_mock = mock_open()
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        with patch("camguard.raspi_cam.PiCameraCircularIO", MagicMock(return_value=stream)), \
+                patch("camguard.raspi_cam.open", open_mock):
+            sut.start()
+            files = sut.handle_motion()
+        sut.shutdown()
+
+        # assert
+        self.assertEqual(["capture1.jpg", "capture2.jpg"], files[:2])
+        self.assertEqual(2, len(files[2:]))
+        self.assertTrue(all(re.match(r".*/pre_00[12]_capture.jpg$", file) for file in files[2:]))
+        open_mock().write.assert_any_call(b"frame0")
+        open_mock().write.assert_any_call(b"frame1")
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.FilePersistence")
+    def test_should_capture_in_memory(self, persistence_mock: MagicMock):
+        # arrange
+        from camguard.recorded_file import MemoryFile
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_file_format = PropertyMock(return_value="{counter:03d}_capture.jpg")
+        type(self._raspi_cam_settings).in_memory = PropertyMock(return_value=True)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        sut.start()
+        files = sut.handle_motion()
+        sut.shutdown()
+
+        # assert
+        self.pi_camera_module.PiCamera.capture_continuous.assert_not_called()  # type: ignore
+        self.assertEqual(2, len(files))
+        self.assertTrue(all(isinstance(file, MemoryFile) for file in files))
+        self.assertTrue(re.match(r".*/001_capture.jpg$", files[0].name))
+        self.assertEqual(b"jpeg", files[0].data.tobytes())
+        persistence_mock.return_value.start.assert_called_once()
+        self.assertEqual(2, persistence_mock.return_value.persist.call_count)
+        persistence_mock.return_value.stop.assert_called_once()
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    def test_should_lower_quality_to_fit_upload_budget(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        from camguard.rate_control import UploadBandwidth
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=True)
+        type(self._raspi_cam_settings).rate_control = PropertyMock(return_value=True)
+        type(self._raspi_cam_settings).record_file_format = PropertyMock(return_value="{counter:03d}_capture.jpg")
+        bandwidth = UploadBandwidth()
+        # 50 bytes/s, the budget of 500 bytes doesn't fit four pictures of the fake camera at the top quality
+        with patch("camguard.rate_control.monotonic", side_effect=[0.0, 1.0]):
+            bandwidth.start_upload()
+            bandwidth.finish_upload(50)
+        UploadBandwidth.set_current(bandwidth)
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=4)
+        type(self._raspi_cam_settings).max_record_count = PropertyMock(return_value=4)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        sut.start()
+        with patch("camguard.raspi_cam.open", mock_open()):
+            sut.handle_motion()
+        pi_camera = sut._RaspiCam__pi_camera  # type: ignore
+        sut.shutdown()
+        UploadBandwidth.set_current(None)
+
+        # assert
+        qualities = [args['quality'] for args in pi_camera.capture_args]
+        self.assertEqual(4, len(qualities))
+        self.assertEqual(85, qualities[0])
+        self.assertTrue(all(quality < 85 for quality in qualities[1:]))
+        self.assertIsNone(pi_camera.capture_args[0]['resize'])
+        self.pi_camera_module.PiCamera.capture_continuous.assert_not_called()  # type: ignore
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.time.sleep", MagicMock())
+    def test_should_record_burst_in_sequences(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_file_format = PropertyMock(return_value="{counter:03d}_capture.jpg")
+        type(self._raspi_cam_settings).record_mode = PropertyMock(return_value=RecordMode.BURST)
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=3)
+        open_mock = mock_open()
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        with patch("camguard.raspi_cam.open", open_mock):
+            files = sut.handle_motion()
+
+        # assert
+        self.assertEqual(["/001_capture.jpg", "/002_capture.jpg", "/003_capture.jpg"],
+                         [re.sub(r"^.*/", "/", file_name(file)) for file in files])
+        self.assertEqual(3, open_mock().write.call_count)
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.time.sleep", MagicMock())
+    def test_should_stop_burst_on_byte_budget(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_file_format = PropertyMock(return_value="{counter:03d}_capture.jpg")
+        type(self._raspi_cam_settings).record_mode = PropertyMock(return_value=RecordMode.BURST)
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=10)
+        type(self._raspi_cam_settings).in_memory = PropertyMock(return_value=True)
+        type(self._raspi_cam_settings).memory_only = PropertyMock(return_value=True)
+        # two pictures of the fake camera
+        type(self._raspi_cam_settings).burst_max_bytes = PropertyMock(return_value=8)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        files = sut.handle_motion()
+
+        # assert
+        self.assertEqual(2, len(files))
+        self.assertEqual(b"jpeg", files[1].data.tobytes())
+
+    @patch("camguard.raspi_cam.os.makedirs", MagicMock())
+    @patch("camguard.raspi_cam.time.sleep", MagicMock())
+    @patch("camguard.bridge_impl.monotonic", MagicMock(side_effect=[0.0, 1.0, 2.0, 3.5]))
+    def test_should_record_burst_until_motion_tail_elapsed(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_path = PropertyMock(return_value="/")
+        type(self._raspi_cam_settings).record_file_format = PropertyMock(return_value="{counter:03d}_capture.jpg")
+        type(self._raspi_cam_settings).record_mode = PropertyMock(return_value=RecordMode.BURST)
+        type(self._raspi_cam_settings).record_count = PropertyMock(return_value=1)
+        type(self._raspi_cam_settings).motion_tail_sec = PropertyMock(return_value=2.0)
+        type(self._raspi_cam_settings).in_memory = PropertyMock(return_value=True)
+        type(self._raspi_cam_settings).memory_only = PropertyMock(return_value=True)
+        sut = RaspiCam(self._raspi_cam_settings)
+        # motion ends after the first picture at 1.0s
+        sut.track_motion(MagicMock(side_effect=[True, False, False]))
+
+        # act
+        files = sut.handle_motion()
+
+        # assert
+        # the burst continues for the tail of 2.0s, instead of stopping at the record count
+        self.assertEqual(["/001_capture.jpg", "/002_capture.jpg", "/003_capture.jpg"],
+                         [re.sub(r"^.*/", "/", file_name(file)) for file in files])
+
+    def test_should_raise_on_invalid_burst_fps(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).record_mode = PropertyMock(return_value=RecordMode.BURST)
+        type(self._raspi_cam_settings).burst_fps = PropertyMock(return_value=60)
+
+        # act / assert
+        with self.assertRaises(ConfigurationError):
+            RaspiCam(self._raspi_cam_settings)
+
+    def test_should_not_wait_for_camera_on_disable(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=True)
+        sut = RaspiCam(self._raspi_cam_settings)
+        with patch("camguard.raspi_cam.Thread", MagicMock(side_effect=lambda target, **_: MagicMock(start=target))):
+            sut.start()
+        pi_camera = sut._RaspiCam__pi_camera  # type: ignore
+        disable = Thread(target=sut.on_disable, args=([("192.168.0.1", True)],), daemon=True)
+
+        # act
+        # a running record holds the camera
+        with sut._RaspiCam__camera_lock:  # type: ignore
+            disable.start()
+            disable.join(2.0)
+            returned = not disable.is_alive()
+            closed = pi_camera.closed
+
+        # assert
+        self.assertTrue(returned)
+        self.assertFalse(closed)
+        sut.shutdown()
+        self.assertTrue(pi_camera.closed)
+
+    def test_should_not_open_camera_on_disable_before_start(self):
+        # arrange
+        from camguard.raspi_cam import RaspiCam
+        type(self._raspi_cam_settings).persistent_camera = PropertyMock(return_value=True)
+        sut = RaspiCam(self._raspi_cam_settings)
+
+        # act
+        sut.on_disable([("192.168.0.1", False)])
+
+        # assert
+        self.assertEqual(0, self.pi_camera_module.PiCamera.opened)  # type: ignore
+
     def tearDown(self):
         self.patcher.stop()
@@ -0,0 +1,110 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from camguard.exceptions import ConfigurationError
+from camguard.rate_control import RateController, UploadBandwidth
+
+MONOTONIC = "camguard.rate_control.monotonic"
+
+
+class UploadBandwidthTest(TestCase):
+
+    def test_should_estimate_throughput_of_busy_periods(self):
+        # arrange
+        sut = UploadBandwidth(smoothing=0.5)
+
+        # act
+        with patch(MONOTONIC, side_effect=[0.0, 2.0]):
+            # concurrent uploads of a single busy period
+            sut.start_upload()
+            sut.start_upload()
+            sut.finish_upload(1000)
+            sut.finish_upload(1000)
+        first = sut.bytes_per_sec
+        with patch(MONOTONIC, side_effect=[10.0, 12.0]):
+            sut.start_upload()
+            sut.finish_upload(4000)
+
+        # assert
+        self.assertEqual(1000.0, first)
+        self.assertEqual(1500.0, sut.bytes_per_sec)
+
+    def test_should_ignore_failed_uploads(self):
+        # arrange
+        sut = UploadBandwidth()
+
+        # act
+        with patch(MONOTONIC, side_effect=[0.0, 2.0]):
+            sut.start_upload()
+            sut.finish_upload(0)
+
+        # assert
+        self.assertIsNone(sut.bytes_per_sec)
+
+
+class RateControllerTest(TestCase):
+
+    def tearDown(self) -> None:
+        UploadBandwidth.set_current(None)
+
+    @staticmethod
+    def _bandwidth(bytes_per_sec: float) -> None:
+        bandwidth = UploadBandwidth()
+        with patch(MONOTONIC, side_effect=[0.0, 1.0]):
+            bandwidth.start_upload()
+            bandwidth.finish_upload(int(bytes_per_sec))
+        UploadBandwidth.set_current(bandwidth)
+
+    def test_should_keep_top_step_without_estimate(self):
+        # arrange
+        sut = RateController(upload_sec=10.0, max_quality=85, min_quality=35)
+
+        # act
+        sut.begin(pictures=5)
+        sut.update(10_000_000)
+
+        # assert
+        self.assertIsNone(sut.budget)
+        self.assertEqual(85, sut.quality)
+        self.assertIsNone(sut.resize((2592, 1944)))
+
+    def test_should_step_down_to_fit_budget(self):
+        # arrange
+        # 2 MB budget for 5 pictures of 1 MB at the top step
+        self._bandwidth(200_000)
+        sut = RateController(upload_sec=10.0, max_quality=85, min_quality=35)
+
+        # act
+        sut.begin(pictures=5)
+        sut.update(1_000_000)
+
+        # assert
+        # quality is lowered down to the minimum quality before the resolution
+        self.assertEqual(35, sut.quality)
+        self.assertEqual((1944, 1458), sut.resize((2592, 1944)))
+
+    def test_should_step_up_with_room_in_budget(self):
+        # arrange
+        self._bandwidth(1_000_000)
+        sut = RateController(upload_sec=10.0, max_quality=85, min_quality=35)
+        sut.begin(pictures=10)
+        sut.update(1_500_000)
+        degraded = sut.quality
+
+        # act
+        sut.begin(pictures=10)
+        sut.update(10_000)
+
+        # assert
+        self.assertLess(degraded, 85)
+        self.assertEqual(degraded + 10, sut.quality)
+
+    def test_should_raise_on_invalid_settings(self):
+        # arrange
+        invalid_settings = [(10.0, 85, 90), (10.0, 101, 35), (10.0, 85, 0), (0.0, 85, 35)]
+
+        for upload_sec, max_quality, min_quality in invalid_settings:
+            with self.subTest(upload_sec=upload_sec, max_quality=max_quality, min_quality=min_quality):
+                # act / assert
+                with self.assertRaises(ConfigurationError):
+                    RateController(upload_sec, max_quality, min_quality)
@@ -0,0 +1,107 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from camguard.exceptions import CamguardError
+from camguard.recorded_file import FrameVariant, MemoryFile, file_name, file_source, open_file
+
+
+class MemoryFileTest(TestCase):
+
+    def test_should_keep_data_without_copying(self):
+        # arrange
+        data = bytearray(b"jpeg")
+
+        # act
+        sut = MemoryFile("/records/001_capture.jpg", data)
+        data[0:1] = b"J"
+
+        # assert
+        self.assertEqual("/records/001_capture.jpg", sut.name)
+        self.assertEqual(b"Jpeg", sut.data.tobytes())
+        self.assertEqual(4, sut.size)
+
+    def test_should_open_independent_streams(self):
+        # arrange
+        sut = MemoryFile("/records/001_capture.jpg", b"jpeg")
+
+        # act
+        stream1 = sut.open()
+        stream1.read(2)
+        stream2 = sut.open()
+
+        # assert
+        self.assertEqual(b"jpeg", stream2.read())
+        self.assertEqual(b"eg", stream1.read())
+
+    def test_should_read_content_from_memory_or_disk(self):
+        # arrange
+        with TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "002_capture.jpg")
+            with open(file_path, 'wb') as file:
+                file.write(b"disk")
+            sut = MemoryFile(os.path.join(tmp_dir, "001_capture.jpg"), b"memory")
+
+            # act
+            with open_file(sut) as memory_stream, open_file(file_path) as disk_stream:
+                contents = memory_stream.read(), disk_stream.read()
+
+            # assert
+            self.assertEqual((b"memory", b"disk"), contents)
+            self.assertEqual(b"memory", file_source(sut))
+            self.assertEqual(file_path, file_source(file_path))
+
+    def test_should_raise_on_missing_file(self):
+        # arrange
+        with TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "001_capture.jpg")
+
+            # act / assert
+            with self.assertRaises(CamguardError):
+                open_file(file_path)
+            with self.assertRaises(CamguardError):
+                file_source(file_path)
+
+    def test_should_name_files_by_path(self):
+        # arrange
+        sut = MemoryFile("/records/001_capture.jpg", b"jpeg")
+
+        # act
+        names = [file_name(sut), file_name("/records/002_capture.jpg")]
+
+        # assert
+        self.assertEqual(["/records/001_capture.jpg", "/records/002_capture.jpg"], names)
+        # the content is not compared
+        self.assertNotEqual(MemoryFile("/records/001_capture.jpg", b"jpeg"), sut)
+
+
+class FrameVariantTest(TestCase):
+
+    def test_should_select_variants_by_tag(self):
+        # arrange
+        thumbnail = FrameVariant("/records/001_capture_thumbnail.jpg", b"jpeg", "thumbnail", "/records/001_capture.jpg")
+        preview = FrameVariant("/records/001_capture_preview.jpg", b"jpeg", "preview", "/records/001_capture.jpg")
+        files = ["/records/001_capture.jpg", thumbnail, preview]
+
+        # act
+        recorded, variants = FrameVariant.select(files, "thumbnail")
+        _, no_variants = FrameVariant.select(files, "")
+
+        # assert
+        self.assertEqual(["/records/001_capture.jpg"], recorded)
+        self.assertEqual([thumbnail], variants)
+        self.assertEqual("thumbnail", variants[0].tag)
+        self.assertEqual("/records/001_capture.jpg", variants[0].source)
+        self.assertEqual([], no_variants)
+
+    def test_should_substitute_files_by_variants(self):
+        # arrange
+        preview = FrameVariant("/records/001_capture_preview.jpg", b"jpeg", "preview", "/records/001_capture.jpg")
+        files = [MemoryFile("/records/001_capture.jpg", b"jpeg"), "/records/002_video.h264"]
+
+        # act
+        substituted = FrameVariant.substitute(files, [preview])
+
+        # assert
+        # variants are matched by the name of their source
+        self.assertEqual([preview, "/records/002_video.h264"], substituted)
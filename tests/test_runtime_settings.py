@@ -0,0 +1,64 @@
+from typing import Any, Dict
+from unittest import TestCase
+from unittest.mock import MagicMock, mock_open, patch
+
+from camguard.exceptions import ConfigurationError
+from camguard.runtime_settings import RuntimeMode, RuntimeSettings
+
+
+class RuntimeSettingsTest(TestCase):
+
+    @staticmethod
+    def mock_yaml_data() -> Dict[str, Any]:
+        return {
+            'runtime': {
+                'mode': 'asyncio',
+                'max_workers': 3
+            }
+        }
+
+    @staticmethod
+    def mock_yaml_data_default() -> Dict[str, Any]:
+        return {
+            'components': ['motion_handler', 'motion_detector']
+        }
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_settings(self):
+        # arrange
+        safe_load_mock = MagicMock(return_value=self.mock_yaml_data())
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: RuntimeSettings = RuntimeSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(RuntimeMode.ASYNCIO, settings.mode)
+        self.assertEqual(3, settings.max_workers)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_default(self):
+        # arrange
+        safe_load_mock = MagicMock(return_value=self.mock_yaml_data_default())
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: RuntimeSettings = RuntimeSettings.load_settings('.')
+
+        # assert
+        self.assertEqual(RuntimeMode.THREADS, settings.mode)
+        self.assertEqual(6, settings.max_workers)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_raise_on_unknown_mode(self):
+        # arrange
+        data = self.mock_yaml_data()
+        data['runtime']['mode'] = 'processes'
+        safe_load_mock = MagicMock(return_value=data)
+
+        # act / assert
+        with patch('camguard.settings.safe_load', safe_load_mock), self.assertRaises(ConfigurationError):
+            RuntimeSettings.load_settings('.')
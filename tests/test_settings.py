@@ -1,9 +1,11 @@
+from os import path, stat, utime
+from tempfile import TemporaryDirectory
 from typing import Any, Dict
 from unittest import TestCase
 from unittest.mock import MagicMock, mock_open, patch
 
 from camguard.exceptions import ConfigurationError
-from camguard.settings import (ImplementationType, Settings)
+from camguard.settings import (ImplementationType, Settings, safe_load)
 
 
 class ImplementationTypeTest(TestCase):
@@ -22,6 +24,20 @@ class ImplementationTypeTest(TestCase):
         # assert
         self.assertEqual(ImplementationType.RASPI, parsed)
 
+    def test_should_parse_camera(self):
+        # arrange- act
+        parsed = ImplementationType.parse(ImplementationType.CAMERA.value)
+
+        # assert
+        self.assertEqual(ImplementationType.CAMERA, parsed)
+
+    def test_should_parse_motion_vectors(self):
+        # arrange- act
+        parsed = ImplementationType.parse(ImplementationType.MOTION_VECTORS.value)
+
+        # assert
+        self.assertEqual(ImplementationType.MOTION_VECTORS, parsed)
+
     def test_should_parse_default(self):
         # arrange- act
         parsed = ImplementationType.parse(ImplementationType.DEFAULT.value)
@@ -114,3 +130,58 @@ class SettingsTest(TestCase):
             Settings.get_setting_from_key(setting_key=key, settings=data)
             # assert
             self.assertTrue(f'settings key not found: {key}' in config_error.message)  # type: ignore
+
+
+class SettingsCacheTest(TestCase):
+
+    def setUp(self) -> None:
+        Settings.clear_cache()
+        self._tmp_dir = TemporaryDirectory()
+        self._settings_file = path.join(self._tmp_dir.name, 'settings.yaml')
+        with open(self._settings_file, 'w') as stream:
+            stream.write("key1:\n  subkey1: value1\n")
+
+    def test_should_parse_once(self):
+        # arrange
+        safe_load_mock = MagicMock(wraps=safe_load)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            first = Settings.load_settings(self._tmp_dir.name)
+            second = Settings.load_settings(self._tmp_dir.name)
+
+        # assert
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        safe_load_mock.assert_called_once()
+
+    def test_should_parse_again_when_modified(self):
+        # arrange
+        safe_load_mock = MagicMock(wraps=safe_load)
+        mtime_ns = stat(self._settings_file).st_mtime_ns
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            Settings.load_settings(self._tmp_dir.name)
+            utime(self._settings_file, ns=(mtime_ns + 1_000_000_000, mtime_ns + 1_000_000_000))
+            Settings.load_settings(self._tmp_dir.name)
+
+        # assert
+        self.assertEqual(2, safe_load_mock.call_count)
+
+    def test_should_parse_again_after_clear(self):
+        # arrange
+        safe_load_mock = MagicMock(wraps=safe_load)
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            Settings.load_settings(self._tmp_dir.name)
+            Settings.clear_cache()
+            Settings.load_settings(self._tmp_dir.name)
+
+        # assert
+        self.assertEqual(2, safe_load_mock.call_count)
+
+    def tearDown(self) -> None:
+        Settings.clear_cache()
+        self._tmp_dir.cleanup()
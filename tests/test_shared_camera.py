@@ -0,0 +1,102 @@
+from typing import Any, List
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from camguard.exceptions import ConfigurationError
+from camguard.shared_camera import SharedCamera, SplitterRecording
+
+
+class RecordingFake(SplitterRecording):
+    """
+    fake recording, which tracks the cameras it has been started on
+    """
+
+    def __init__(self) -> None:
+        self.started: List[Any] = []
+        self.ports: List[int] = []
+
+    def start(self, pi_camera: Any, splitter_port: int) -> None:
+        self.started.append(pi_camera)
+        self.ports.append(splitter_port)
+
+
+class SharedCameraTest(TestCase):
+
+    def setUp(self) -> None:
+        self._pi_camera = MagicMock()
+        self._recording = RecordingFake()
+
+    def test_should_start_recording_when_camera_is_published(self):
+        # arrange
+        SharedCamera.attach(0, self._recording)
+
+        # act
+        SharedCamera.publish(0, self._pi_camera)
+
+        # assert
+        self.assertEqual([self._pi_camera], self._recording.started)
+        # splitter ports 0 to 2 are used by the motion handler
+        self.assertEqual([3], self._recording.ports)
+
+    def test_should_start_recording_on_open_camera(self):
+        # arrange
+        SharedCamera.publish(0, self._pi_camera)
+
+        # act
+        SharedCamera.attach(0, self._recording)
+        SharedCamera.attach(0, self._recording)
+
+        # assert
+        self.assertEqual([self._pi_camera], self._recording.started)
+
+    def test_should_stop_recording_when_camera_is_withdrawn(self):
+        # arrange
+        SharedCamera.attach(0, self._recording)
+        SharedCamera.publish(0, self._pi_camera)
+
+        # act
+        SharedCamera.withdraw(0)
+        SharedCamera.detach(0, self._recording)
+
+        # assert
+        self._pi_camera.stop_recording.assert_called_once_with(splitter_port=3)
+
+    def test_should_stop_recording_when_detached(self):
+        # arrange
+        SharedCamera.publish(0, self._pi_camera)
+        SharedCamera.attach(0, self._recording)
+
+        # act
+        SharedCamera.detach(0, self._recording)
+        SharedCamera.withdraw(0)
+
+        # assert
+        self._pi_camera.stop_recording.assert_called_once_with(splitter_port=3)
+
+    def test_should_keep_camera_usable_on_failed_recording(self):
+        # arrange
+        recording = MagicMock(spec=SplitterRecording)
+        recording.start.side_effect = RuntimeError("splitter port in use")
+        SharedCamera.attach(0, recording)
+
+        # act
+        SharedCamera.publish(0, self._pi_camera)
+
+        # assert
+        recording.start.assert_called_once_with(self._pi_camera, 3)
+        SharedCamera.detach(0, recording)
+
+    def test_should_raise_on_second_recording(self):
+        # arrange
+        SharedCamera.attach(0, self._recording)
+
+        # act / assert
+        with self.assertRaises(ConfigurationError):
+            SharedCamera.attach(0, RecordingFake())
+        # other cameras are independent
+        SharedCamera.attach(1, RecordingFake())
+
+    def tearDown(self) -> None:
+        SharedCamera.withdraw(0)
+        SharedCamera.withdraw(1)
+        SharedCamera._SharedCamera__recordings.clear()  # type: ignore
@@ -0,0 +1,54 @@
+from typing import Any, Dict
+from unittest import TestCase
+from unittest.mock import MagicMock, mock_open, patch
+
+from camguard.tracing_settings import TracingSettings
+
+
+class TracingSettingsTest(TestCase):
+
+    @staticmethod
+    def mock_yaml_data() -> Dict[str, Any]:
+        return {
+            'tracing': {
+                'enabled': True,
+                'window_size': 50,
+                'summary_interval': 5
+            }
+        }
+
+    @staticmethod
+    def mock_yaml_data_default() -> Dict[str, Any]:
+        return {
+            'components': ['motion_handler', 'motion_detector']
+        }
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_settings(self):
+        # arrange
+        safe_load_mock = MagicMock(return_value=self.mock_yaml_data())
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: TracingSettings = TracingSettings.load_settings('.')
+
+        # assert
+        self.assertTrue(settings.enabled)
+        self.assertEqual(50, settings.window_size)
+        self.assertEqual(5, settings.summary_interval)
+
+    @patch('camguard.settings.path.isfile', MagicMock(return_value=True))
+    @patch('camguard.settings.open', mock_open())
+    def test_should_parse_default(self):
+        # arrange
+        safe_load_mock = MagicMock(return_value=self.mock_yaml_data_default())
+
+        # act
+        with patch('camguard.settings.safe_load', safe_load_mock):
+            settings: TracingSettings = TracingSettings.load_settings('.')
+
+        # assert
+        self.assertFalse(settings.enabled)
+        self.assertEqual(100, settings.window_size)
+        self.assertEqual(10, settings.summary_interval)